@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Attachment Analysis Stream
+OBJ Attachment 스캔 결과를 아바타 폴더당 한 줄(NDJSON)로 바로 기록하고,
+유저 ID → 바이트 오프셋 인덱스로 한 유저의 분석 결과를 seek 한 번에 읽기
+
+파일 구조:
+    obj_attachment_analysis.ndjson       {"folder_path", "folder_name", "obj_files", ...} 한 줄에 하나
+    obj_attachment_analysis.ndjson.idx   {"source", "folders": {이름: [offset, length]},
+                                          "users": {유저 ID: [폴더 이름, ...]}}
+    obj_attachment_analysis.json.ndjson  JSON 결과의 레코드 사본 (save_attachment_analysis가 함께 저장)
+
+조회는 파일을 만들지 않음 - 사본이 없거나 JSON보다 오래됐으면 JSON을 읽어 선형 검색하고,
+인덱스를 쓸 수 없는 위치(읽기 전용 폴더 등)에서는 다시 만든 인덱스를 메모리에만 보관
+
+인덱스는 파일 크기/수정 시각을 확인하는 프로세스 내 캐시에 보관하므로
+패키지마다 반복되는 조회는 stat 한 번 + seek 한 번으로 끝남
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ANALYSIS_JSON = "obj_attachment_analysis.json"
+ANALYSIS_NDJSON = "obj_attachment_analysis.ndjson"
+INDEX_SUFFIX = ".idx"
+SIDECAR_SUFFIX = ".ndjson"
+INDEX_VERSION = 1
+
+# NDJSON 경로 → (크기, 수정 시각, 인덱스) - 파일이 바뀌지 않았으면 인덱스를 다시 읽지 않음
+_INDEX_CACHE: Dict[str, Tuple[int, int, Dict]] = {}
+
+# 폴더 이름에서 '_'로 구분된 숫자 토큰 (예: builderman_156_3D → 156)
+_USER_ID_TOKEN = re.compile(r"(?<=_)(\d+)(?=_|$)")
+
+
+def index_path_for(ndjson_path: Path) -> Path:
+    """obj_attachment_analysis.ndjson → obj_attachment_analysis.ndjson.idx"""
+    ndjson_path = Path(ndjson_path)
+    return ndjson_path.with_name(ndjson_path.name + INDEX_SUFFIX)
+
+
+def sidecar_path_for(json_path: Path) -> Path:
+    """obj_attachment_analysis.json → obj_attachment_analysis.json.ndjson"""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.name + SIDECAR_SUFFIX)
+
+
+def _file_signature(path: Path) -> Optional[Dict]:
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _write_index(index_path: Path, index: Dict):
+    """인덱스를 임시 파일에 쓴 뒤 교체 (중간에 중단돼도 잘린 .idx가 남지 않음)"""
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def user_ids_from_folder(folder_name: str) -> List[int]:
+    """폴더 이름의 유저 ID 후보 ({username}_{user_id}[_3D] 형식)"""
+    return [int(token) for token in _USER_ID_TOKEN.findall(folder_name)]
+
+
+class AnalysisStreamWriter:
+    """폴더 분석 결과를 NDJSON으로 한 줄씩 기록하고 닫을 때 오프셋 인덱스 저장"""
+
+    def __init__(self, ndjson_path: Path, derived_from: Optional[Dict] = None):
+        """
+        Args:
+            ndjson_path (Path): 출력 NDJSON 경로 (인덱스는 같은 이름 + .idx)
+            derived_from (Dict): 원본 JSON의 크기/수정 시각 (JSON 사본일 때만)
+        """
+        self.path = Path(ndjson_path)
+        self.derived_from = derived_from
+        self.count = 0
+        self._folders: Dict[str, List[int]] = {}
+        self._users: Dict[str, List[str]] = {}
+        self._file = open(self.path, 'wb')
+
+    def write(self, folder_data: Dict):
+        """폴더 하나의 분석 결과를 바로 파일에 기록 (메모리에 누적하지 않음)"""
+        line = json.dumps(folder_data, ensure_ascii=False).encode("utf-8") + b"\n"
+        offset = self._file.tell()
+        self._file.write(line)
+        self.count += 1
+
+        folder_name = folder_data.get("folder_name", "")
+        self._folders.setdefault(folder_name, [offset, len(line)])
+        for user_id in user_ids_from_folder(folder_name):
+            self._users.setdefault(str(user_id), []).append(folder_name)
+
+    def close(self):
+        """NDJSON을 닫고 인덱스 저장 (임시 파일에 쓴 뒤 교체)"""
+        if self._file.closed:
+            return
+        self._file.close()
+        stat = self.path.stat()
+        index = {
+            "version": INDEX_VERSION,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "source": {"name": self.path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+            "folders": self._folders,
+            "users": self._users,
+        }
+        if self.derived_from is not None:
+            index["derived_from"] = self.derived_from
+        _write_index(index_path_for(self.path), index)
+        _INDEX_CACHE[str(self.path.resolve())] = (stat.st_size, stat.st_mtime_ns, index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_analysis_stream(folder_records: Iterable[Dict], ndjson_path: Path,
+                          derived_from: Optional[Dict] = None) -> int:
+    """
+    폴더 분석 결과를 순서대로 NDJSON + 인덱스로 저장
+
+    Returns:
+        int: 기록한 폴더 수
+    """
+    with AnalysisStreamWriter(ndjson_path, derived_from) as writer:
+        for folder_data in folder_records:
+            writer.write(folder_data)
+    return writer.count
+
+
+def build_stream_index(ndjson_path: Path, derived_from: Optional[Dict] = None) -> Dict:
+    """기존 NDJSON 파일을 한 번 읽어 인덱스 다시 생성 (인덱스가 없거나 오래된 경우)"""
+    ndjson_path = Path(ndjson_path)
+    folders: Dict[str, List[int]] = {}
+    users: Dict[str, List[str]] = {}
+    offset = 0
+    with open(ndjson_path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                folder_name = json.loads(line).get("folder_name", "")
+                folders.setdefault(folder_name, [offset, len(line)])
+                for user_id in user_ids_from_folder(folder_name):
+                    users.setdefault(str(user_id), []).append(folder_name)
+            offset += len(line)
+
+    stat = ndjson_path.stat()
+    index = {"version": INDEX_VERSION, "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+             "source": {"name": ndjson_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+             "folders": folders, "users": users}
+    if derived_from is not None:
+        index["derived_from"] = derived_from
+    try:
+        _write_index(index_path_for(ndjson_path), index)
+    except OSError:
+        # 쓸 수 없는 위치면 이번 프로세스의 메모리 캐시에만 보관
+        pass
+    _INDEX_CACHE[str(ndjson_path.resolve())] = (stat.st_size, stat.st_mtime_ns, index)
+    return index
+
+
+def load_stream_index(ndjson_path: Path) -> Optional[Dict]:
+    """
+    NDJSON과 크기/수정 시각이 같은 인덱스 (메모리 캐시 → .idx 파일 → 다시 생성 순, NDJSON이 없으면 None)
+    """
+    ndjson_path = Path(ndjson_path)
+    try:
+        stat = ndjson_path.stat()
+    except OSError:
+        return None
+
+    cache_key = str(ndjson_path.resolve())
+    cached = _INDEX_CACHE.get(cache_key)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+
+    try:
+        with open(index_path_for(ndjson_path), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        source = index.get("source", {})
+        if (index.get("version") == INDEX_VERSION and source.get("size") == stat.st_size
+                and source.get("mtime_ns") == stat.st_mtime_ns):
+            _INDEX_CACHE[cache_key] = (stat.st_size, stat.st_mtime_ns, index)
+            return index
+    except (OSError, ValueError):
+        pass
+    return build_stream_index(ndjson_path)
+
+
+def read_stream_record(ndjson_path: Path, offset: int, length: int) -> Dict:
+    """오프셋 위치의 레코드 한 줄만 읽기"""
+    with open(ndjson_path, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+
+def find_user_folder_record(ndjson_path: Path, user_id: int, username: str,
+                            index: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    유저의 폴더 분석 레코드 찾기 ({username}_{user_id}가 들어 있는 첫 폴더)
+
+    Args:
+        ndjson_path (Path): 분석 NDJSON 경로
+        user_id (int): 유저 ID
+        username (str): 유저명
+        index (Dict): 스트림 인덱스 (없으면 읽거나 생성)
+
+    Returns:
+        Optional[Dict]: 폴더 레코드 (없으면 None)
+    """
+    index = index or load_stream_index(ndjson_path)
+    if index is None:
+        return None
+    key = f"{username}_{user_id}"
+    for folder_name in index["users"].get(str(user_id), []):
+        if key in folder_name:
+            offset, length = index["folders"][folder_name]
+            return read_stream_record(ndjson_path, offset, length)
+    return None
+
+
+def write_json_sidecar(scan_results: Dict, json_path: Path) -> Path:
+    """
+    JSON 분석 결과의 폴더 레코드를 NDJSON 사본 + 인덱스로 저장 (save_attachment_analysis 직후 호출)
+
+    Returns:
+        Path: 사본 NDJSON 경로
+    """
+    sidecar = sidecar_path_for(json_path)
+    write_analysis_stream(scan_results.get("avatar_folders", []), sidecar, _file_signature(json_path))
+    return sidecar
+
+
+def find_in_scan_results(scan_results: Dict, user_id: int, username: str) -> Optional[Dict]:
+    """JSON 분석 결과에서 {username}_{user_id}가 들어 있는 첫 폴더 선형 검색 (최신 사본이 없을 때)"""
+    key = f"{username}_{user_id}"
+    for folder_data in scan_results.get("avatar_folders", []):
+        if key in folder_data.get("folder_name", ""):
+            return folder_data
+    return None
+
+
+def fresh_json_sidecar(json_path: Path) -> Optional[Path]:
+    """
+    save_attachment_analysis가 함께 저장한 NDJSON 사본이 JSON과 같은 내용인지 확인 (파일을 쓰지 않음)
+
+    Returns:
+        Optional[Path]: 사본 NDJSON 경로 (사본이 없거나 JSON이 그 뒤에 바뀌었으면 None)
+    """
+    json_path = Path(json_path)
+    signature = _file_signature(json_path)
+    if signature is None:
+        return None
+    sidecar = sidecar_path_for(json_path)
+    index = load_stream_index(sidecar)
+    if index is not None and index.get("derived_from") == signature:
+        return sidecar
+    return None
+
+
+def find_user_analysis(user_id: int, username: str, json_path: Path = ANALYSIS_JSON,
+                       ndjson_path: Path = ANALYSIS_NDJSON) -> Optional[Dict]:
+    """
+    유저의 폴더 분석 레코드 찾기 - NDJSON 스트림과 JSON 결과 중 최근에 기록된 쪽 사용
+
+    기존 analyze_attachments의 선형 검색과 같은 결과({username}_{user_id}가 들어 있는 첫 폴더)를
+    유저 ID 인덱스로 찾으므로 결과 파일 크기와 관계없이 조회 비용이 일정함
+    (JSON 결과는 함께 저장된 사본이 최신일 때만 인덱스 사용, 아니면 선형 검색 - 조회 중 파일을 쓰지 않음)
+
+    Args:
+        user_id (int): 유저 ID
+        username (str): 유저명
+        json_path (Path): save_attachment_analysis 결과 JSON
+        ndjson_path (Path): stream_attachment_analysis 결과 NDJSON
+
+    Returns:
+        Optional[Dict]: 폴더 레코드 (분석 결과가 없거나 유저가 없으면 None)
+    """
+    stream_signature = _file_signature(ndjson_path)
+    json_signature = _file_signature(json_path)
+    if stream_signature is None and json_signature is None:
+        return None
+
+    if json_signature is None or (stream_signature is not None
+                                  and stream_signature["mtime_ns"] >= json_signature["mtime_ns"]):
+        source = Path(ndjson_path)
+    else:
+        source = fresh_json_sidecar(json_path)
+        if source is None:
+            # 사본이 없거나 오래됨 - 조회 중에는 파일을 쓰지 않고 기존처럼 JSON 전체를 읽어 선형 검색
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return find_in_scan_results(json.load(f), user_id, username)
+    return find_user_folder_record(source, user_id, username)
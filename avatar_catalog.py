@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Avatar Catalog
+다운로드한 모든 아바타 / 파일 / 해시를 한곳에서 조회하는 로컬 SQLite 카탈로그
+
+ROBLOX_CATALOG_DB를 설정하면 다운로더가 폴더를 저장할 때마다 catalog_folder()로 갱신하므로
+"텍스처 X를 쓰는 아바타", "OBJ가 없는 유저" 같은 질문을 폴더 순회 없이 인덱스 쿼리로 답함
+
+테이블:
+    users            유저 ID, 이름, 표시 이름
+    avatar_versions  유저별 아바타 버전 (OBJ/MTL CDN 해시 조합)
+    cdn_hashes       버전별 obj/mtl/texture CDN 해시
+    folders          카탈로그된 폴더 → 유저 / 버전 / 종류(2d, 3d, package)
+    files            파일 경로, 역할, 크기, sha256, CDN 해시
+    body_groups      버전별 그룹(바디 파트)과 기하 통계
+    analysis         폴더별 OBJ 분석 결과 (버텍스/면/Attachment 수)
+
+환경 변수:
+    ROBLOX_CATALOG_DB: 다운로더 훅이 기록할 카탈로그 경로 (설정하지 않거나 off면 기록하지 않음)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from avatar_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CATALOG = "avatar_catalog.db"
+HASH_CHUNK_SIZE = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT,
+    display_name TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_users_username ON users(username COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS avatar_versions (
+    version_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    version_key TEXT NOT NULL,
+    obj_hash TEXT,
+    mtl_hash TEXT,
+    first_seen TEXT,
+    last_seen TEXT,
+    UNIQUE (user_id, version_key)
+);
+
+CREATE TABLE IF NOT EXISTS cdn_hashes (
+    version_id INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (version_id, role, position)
+);
+CREATE INDEX IF NOT EXISTS idx_cdn_hashes_hash ON cdn_hashes(hash);
+
+CREATE TABLE IF NOT EXISTS folders (
+    folder TEXT PRIMARY KEY,
+    user_id INTEGER,
+    version_id INTEGER,
+    kind TEXT,
+    cataloged_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_folders_user ON folders(user_id);
+CREATE INDEX IF NOT EXISTS idx_folders_version ON folders(version_id);
+
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    role TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    cdn_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_files_folder ON files(folder);
+CREATE INDEX IF NOT EXISTS idx_files_role ON files(role);
+CREATE INDEX IF NOT EXISTS idx_files_sha256 ON files(sha256);
+CREATE INDEX IF NOT EXISTS idx_files_cdn_hash ON files(cdn_hash);
+
+CREATE TABLE IF NOT EXISTS body_groups (
+    version_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    body_part TEXT,
+    line INTEGER,
+    material TEXT,
+    vertices INTEGER,
+    faces INTEGER,
+    degenerate_faces INTEGER,
+    surface_area REAL,
+    uv_area REAL,
+    PRIMARY KEY (version_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_body_groups_part ON body_groups(body_part);
+
+CREATE TABLE IF NOT EXISTS analysis (
+    folder TEXT PRIMARY KEY,
+    version_id INTEGER,
+    vertices INTEGER,
+    faces INTEGER,
+    normals INTEGER,
+    texture_coords INTEGER,
+    groups_count INTEGER,
+    materials INTEGER,
+    attachments INTEGER,
+    analyzed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_version ON analysis(version_id);
+"""
+
+# 폴더 종류를 판단하는 메타데이터 파일 (앞에서부터 우선)
+_FOLDER_MARKERS = (
+    ("metadata.json", "3d"),
+    ("COMPLETE_METADATA.json", "package"),
+    ("COMPLETE_AVATAR_PACKAGE.json", "package"),
+    ("user_info.json", "2d"),
+)
+
+# 카탈로그에 넣지 않는 파생 파일 (다시 만들 수 있는 캐시)
+_SKIPPED_SUFFIXES = {".meshcache", ".objindex", ".tmp"}
+
+
+def catalog_path() -> Optional[Path]:
+    """환경 변수 기준 카탈로그 경로 (설정하지 않았거나 off / 빈 값이면 None - 훅은 기록하지 않음)"""
+    value = os.environ.get("ROBLOX_CATALOG_DB", "")
+    if not value or value.lower() in ("off", "0", "false", "none"):
+        return None
+    return Path(value)
+
+
+def file_sha256(path: Path) -> str:
+    """파일 sha256 (1MB 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_role(path: Path) -> str:
+    """파일 이름으로 역할 분류"""
+    suffix = path.suffix.lower()
+    if suffix == ".obj":
+        return "obj"
+    if suffix == ".mtl":
+        return "mtl"
+    if suffix == ".glb":
+        return "glb"
+    if path.parent.name == "textures" or path.name.startswith("texture_"):
+        return "texture"
+    if suffix in (".png", ".jpg", ".jpeg", ".webp"):
+        return "thumbnail"
+    if suffix == ".json":
+        return "metadata"
+    return "other"
+
+
+def _folder_kind(folder: Path) -> Optional[str]:
+    for marker, kind in _FOLDER_MARKERS:
+        if (folder / marker).exists():
+            return kind
+    return None
+
+
+def _read_json(path: Path) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class AvatarCatalog:
+    """SQLite 아바타 카탈로그 (연결 하나를 with 블록 동안 사용)"""
+
+    def __init__(self, db_path: Path = DEFAULT_CATALOG):
+        """
+        Args:
+            db_path (Path): SQLite 파일 경로 (없으면 생성)
+        """
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        # 다운로드 중에도 다른 프로세스가 조회할 수 있도록 WAL
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.close()
+
+    # ------------------------------------------------------------------ 기록
+
+    def upsert_user(self, user_info: Dict) -> Optional[int]:
+        """유저 정보 기록 (Roblox users API 응답 형식)"""
+        user_id = user_info.get("id")
+        if user_id is None:
+            return None
+        self.conn.execute(
+            "INSERT INTO users (user_id, username, display_name, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET username=excluded.username, "
+            "display_name=excluded.display_name, updated_at=excluded.updated_at",
+            (int(user_id), user_info.get("name"), user_info.get("displayName"), time.strftime("%Y-%m-%d %H:%M:%S")))
+        return int(user_id)
+
+    def upsert_version(self, user_id: int, avatar_3d_metadata: Dict) -> Optional[int]:
+        """3D 메타데이터(obj/mtl/textures 해시)로 아바타 버전 기록"""
+        obj_hash = avatar_3d_metadata.get("obj")
+        mtl_hash = avatar_3d_metadata.get("mtl")
+        textures = avatar_3d_metadata.get("textures") or []
+        if not (obj_hash or mtl_hash or textures):
+            return None
+
+        version_key = obj_hash or mtl_hash or textures[0]
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.conn.execute(
+            "INSERT INTO avatar_versions (user_id, version_key, obj_hash, mtl_hash, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(user_id, version_key) DO UPDATE SET last_seen=excluded.last_seen",
+            (user_id, version_key, obj_hash, mtl_hash, now, now))
+        version_id = self.conn.execute(
+            "SELECT version_id FROM avatar_versions WHERE user_id = ? AND version_key = ?",
+            (user_id, version_key)).fetchone()[0]
+
+        self.conn.execute("DELETE FROM cdn_hashes WHERE version_id = ?", (version_id,))
+        rows = [(version_id, "obj", 0, obj_hash), (version_id, "mtl", 0, mtl_hash)]
+        rows += [(version_id, "texture", i, texture_hash) for i, texture_hash in enumerate(textures)]
+        self.conn.executemany("INSERT INTO cdn_hashes (version_id, role, position, hash) VALUES (?, ?, ?, ?)",
+                              [row for row in rows if row[3]])
+        return version_id
+
+    def record_files(self, folder: Path, files: Iterable[Path], cdn_hashes: Optional[Dict[str, str]] = None):
+        """
+        폴더의 파일 목록 기록 (크기/수정 시각이 같으면 이전 sha256 재사용)
+
+        Args:
+            folder (Path): 카탈로그 폴더
+            files (Iterable[Path]): 폴더에 속한 파일들
+            cdn_hashes (Dict[str, str]): 파일 이름 또는 확장자를 뺀 이름 → CDN 해시
+        """
+        folder_key = str(Path(folder).resolve())
+        cdn_hashes = cdn_hashes or {}
+        previous = {row["path"]: row for row in self.conn.execute(
+            "SELECT path, size, mtime_ns, sha256 FROM files WHERE folder = ?", (folder_key,))}
+
+        rows = []
+        for path in files:
+            stat = path.stat()
+            path_key = str(path.resolve())
+            old = previous.pop(path_key, None)
+            if old is not None and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+                sha256 = old["sha256"]
+            else:
+                sha256 = file_sha256(path)
+            rows.append((path_key, folder_key, file_role(path), stat.st_size, stat.st_mtime_ns, sha256,
+                         cdn_hashes.get(path.name) or cdn_hashes.get(path.stem)))
+
+        # 사라진 파일은 삭제
+        self.conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in previous])
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO files (path, folder, role, size, mtime_ns, sha256, cdn_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def record_groups(self, version_id: int, obj_structure: Optional[Dict], group_stats: Optional[List[Dict]]):
+        """OBJ 구조 분석의 그룹(바디 파트)과 그룹별 기하 통계 기록"""
+        groups: Dict[str, Dict] = {}
+        for group in (obj_structure or {}).get("groups", []):
+            groups.setdefault(group["name"], {"body_part": group.get("type"), "line": group.get("line")})
+        for stats in group_stats or []:
+            groups.setdefault(stats["name"], {}).update(stats)
+        if not groups:
+            return
+
+        self.conn.execute("DELETE FROM body_groups WHERE version_id = ?", (version_id,))
+        self.conn.executemany(
+            "INSERT INTO body_groups (version_id, name, body_part, line, material, vertices, faces, "
+            "degenerate_faces, surface_area, uv_area) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(version_id, name, g.get("body_part"), g.get("line"), g.get("material"), g.get("vertices"),
+              g.get("faces"), g.get("degenerate_faces"), g.get("surface_area"), g.get("uv_area"))
+             for name, g in groups.items()])
+
+    def record_analysis(self, folder: Path, obj_data: Dict, version_id: Optional[int] = None):
+        """폴더의 OBJ 분석 결과 기록 (analyze_obj_structure 또는 OBJAttachmentParser.parse_obj_file 결과)"""
+        folder_key = str(Path(folder).resolve())
+        if version_id is None:
+            row = self.conn.execute("SELECT version_id FROM folders WHERE folder = ?", (folder_key,)).fetchone()
+            version_id = row[0] if row else None
+        attachments = obj_data.get("attachments")
+        self.conn.execute(
+            "INSERT INTO analysis (folder, version_id, vertices, faces, normals, texture_coords, "
+            "groups_count, materials, attachments, analyzed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            # 파서마다 채우는 값이 다르므로 없는 값(NULL)은 이전 값 유지
+            "ON CONFLICT(folder) DO UPDATE SET version_id=COALESCE(excluded.version_id, analysis.version_id), "
+            "vertices=excluded.vertices, faces=excluded.faces, "
+            "normals=COALESCE(excluded.normals, analysis.normals), "
+            "texture_coords=COALESCE(excluded.texture_coords, analysis.texture_coords), "
+            "groups_count=excluded.groups_count, materials=excluded.materials, "
+            "attachments=COALESCE(excluded.attachments, analysis.attachments), analyzed_at=excluded.analyzed_at",
+            (folder_key, version_id, obj_data.get("vertices"), obj_data.get("faces"), obj_data.get("normals"),
+             obj_data.get("texture_coords"), len(obj_data.get("groups", [])), len(obj_data.get("materials", [])),
+             len(attachments) if attachments is not None else None, time.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def catalog_folder(self, folder: Path, recursive: bool = True) -> int:
+        """
+        다운로드 폴더 하나를 메타데이터 파일 기준으로 기록
+
+        Args:
+            folder (Path): 유저 폴더 (metadata.json / user_info.json / COMPLETE_*.json 포함)
+            recursive (bool): 하위 아바타 폴더(3D_Model, *_3D)도 기록
+
+        Returns:
+            int: 기록한 폴더 수
+        """
+        folder = Path(folder)
+        kind = _folder_kind(folder)
+        if kind is None:
+            return 0
+
+        user_id = None
+        version_id = None
+        cdn_hashes: Dict[str, str] = {}
+        extended_info: Dict = {}
+        if kind == "3d":
+            metadata = _read_json(folder / "metadata.json")
+            user_id = self.upsert_user(metadata.get("user_info", {}))
+            avatar_3d_metadata = metadata.get("avatar_3d_metadata") or {}
+            extended_info = metadata.get("extended_avatar_info") or {}
+            if user_id is not None:
+                version_id = self.upsert_version(user_id, avatar_3d_metadata)
+            cdn_hashes = {"avatar.obj": avatar_3d_metadata.get("obj"), "avatar.mtl": avatar_3d_metadata.get("mtl")}
+            for i, texture_hash in enumerate(avatar_3d_metadata.get("textures") or []):
+                cdn_hashes[f"texture_{i + 1:03d}"] = texture_hash
+        elif kind == "package":
+            package = _read_json(folder / "COMPLETE_METADATA.json") or _read_json(folder / "COMPLETE_AVATAR_PACKAGE.json")
+            user_id = self.upsert_user(package.get("user_info") or package.get("user_profile") or {})
+        else:
+            user_id = self.upsert_user(_read_json(folder / "user_info.json"))
+
+        # 하위 아바타 폴더는 따로 기록하고 이 폴더의 파일에서 제외 (textures/는 이 폴더에 포함)
+        children = [child for child in folder.iterdir() if child.is_dir() and _folder_kind(child)]
+        files = [path for path in folder.iterdir() if path.is_file()]
+        textures_folder = folder / "textures"
+        if textures_folder.is_dir():
+            files += [path for path in textures_folder.iterdir() if path.is_file()]
+        files = [path for path in files if path.suffix.lower() not in _SKIPPED_SUFFIXES]
+        self.record_files(folder, files, cdn_hashes)
+
+        folder_key = str(folder.resolve())
+        self.conn.execute(
+            "INSERT OR REPLACE INTO folders (folder, user_id, version_id, kind, cataloged_at) VALUES (?, ?, ?, ?, ?)",
+            (folder_key, user_id, version_id, kind, time.strftime("%Y-%m-%d %H:%M:%S")))
+
+        if version_id is not None:
+            self.record_groups(version_id, extended_info.get("obj_structure"), extended_info.get("group_stats"))
+            if extended_info.get("obj_structure"):
+                self.record_analysis(folder, extended_info["obj_structure"], version_id)
+
+        count = 1
+        if recursive:
+            for child in children:
+                count += self.catalog_folder(child, recursive=True)
+        return count
+
+    def sync(self, roots: Iterable[Path]) -> int:
+        """
+        루트 폴더들을 한 번 순회해 카탈로그 재구성 (다운로드 훅 이전에 받은 폴더 포함)
+
+        Returns:
+            int: 기록한 폴더 수
+        """
+        count = 0
+        for root in roots:
+            root = Path(root)
+            if _folder_kind(root):
+                count += self.catalog_folder(root)
+                continue
+            if not root.is_dir():
+                continue
+            # 최상위 아바타 폴더만 기록 (하위 폴더는 catalog_folder가 재귀 처리)
+            for dirpath, dirnames, _ in os.walk(root):
+                current = Path(dirpath)
+                if _folder_kind(current):
+                    count += self.catalog_folder(current)
+                    dirnames[:] = []
+        # 삭제된 폴더 정리
+        stale = [row["folder"] for row in self.conn.execute("SELECT folder FROM folders")
+                 if not Path(row["folder"]).exists()]
+        for folder_key in stale:
+            self.conn.execute("DELETE FROM folders WHERE folder = ?", (folder_key,))
+            self.conn.execute("DELETE FROM files WHERE folder = ?", (folder_key,))
+            self.conn.execute("DELETE FROM analysis WHERE folder = ?", (folder_key,))
+        return count
+
+    # ------------------------------------------------------------------ 조회
+
+    def users_with_hash(self, hash_value: str) -> List[Dict]:
+        """CDN 해시 또는 파일 sha256을 쓰는 유저/폴더 목록 (예: 텍스처 X를 쓰는 아바타)"""
+        rows = self.conn.execute(
+            "SELECT DISTINCT u.user_id, u.username, v.version_id, c.role, NULL AS path "
+            "FROM cdn_hashes c JOIN avatar_versions v ON v.version_id = c.version_id "
+            "LEFT JOIN users u ON u.user_id = v.user_id WHERE c.hash = ? "
+            "UNION SELECT DISTINCT d.user_id, u.username, d.version_id, f.role, f.path "
+            "FROM files f JOIN folders d ON d.folder = f.folder LEFT JOIN users u ON u.user_id = d.user_id "
+            "WHERE f.sha256 = ? OR f.cdn_hash = ? ORDER BY 1",
+            (hash_value, hash_value, hash_value)).fetchall()
+        return [dict(row) for row in rows]
+
+    def users_without_obj(self) -> List[Dict]:
+        """OBJ 파일이 하나도 없는 유저 목록"""
+        rows = self.conn.execute(
+            "SELECT u.user_id, u.username FROM users u WHERE NOT EXISTS ("
+            "SELECT 1 FROM folders d JOIN files f ON f.folder = d.folder "
+            "WHERE d.user_id = u.user_id AND f.role = 'obj') ORDER BY u.user_id").fetchall()
+        return [dict(row) for row in rows]
+
+    def user_files(self, user_id: int) -> List[Dict]:
+        """유저의 모든 파일 (경로, 역할, 크기, sha256, CDN 해시)"""
+        rows = self.conn.execute(
+            "SELECT f.path, f.role, f.size, f.sha256, f.cdn_hash FROM folders d JOIN files f ON f.folder = d.folder "
+            "WHERE d.user_id = ? ORDER BY f.path", (user_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def summary(self) -> Dict[str, int]:
+        """테이블별 행 수"""
+        tables = ("users", "avatar_versions", "cdn_hashes", "folders", "files", "body_groups", "analysis")
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+
+
+def catalog_folder(folder: Path, db_path: Optional[Path] = None) -> int:
+    """
+    다운로더/파서 훅 - 저장한 폴더를 카탈로그에 기록 (실패해도 다운로드 결과에는 영향 없음)
+
+    Args:
+        folder (Path): 방금 저장한 유저 폴더
+        db_path (Path): 카탈로그 경로 (None이면 ROBLOX_CATALOG_DB 기준, 설정하지 않았으면 기록하지 않음)
+
+    Returns:
+        int: 기록한 폴더 수
+    """
+    db_path = db_path or catalog_path()
+    if db_path is None:
+        return 0
+    try:
+        with AvatarCatalog(db_path) as catalog:
+            return catalog.catalog_folder(folder)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("   ⚠️ 카탈로그 기록 실패: %s", e, extra={"folder": str(folder)})
+        return 0
+
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Avatar Downloader Logging
+다운로더 공용 로깅 설정 - 대화형 이모지 콘솔 출력 / JSON Lines / 레벨 제어
+
+환경 변수:
+    ROBLOX_LOG_FORMAT: console (기본값) 또는 json
+    ROBLOX_LOG_LEVEL: DEBUG, INFO, WARNING ... (기본값: 터미널이면 DEBUG, 아니면 INFO)
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from typing import Optional
+
+ROOT_LOGGER_NAME = "roblox"
+
+# LogRecord 기본 속성 (extra로 전달된 필드만 JSON에 추가하기 위해 사용)
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class ConsoleFormatter(logging.Formatter):
+    """기존 print 출력과 동일하게 메시지만 출력하는 대화형 포매터"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return message
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체를 출력하는 포매터"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage().strip(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """출력 시점의 sys.stdout에 기록 (redirect_stdout과 호환)"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+_configured = False
+
+
+def configure_logging(fmt: Optional[str] = None, level: Optional[str] = None, stream=None) -> logging.Logger:
+    """
+    다운로더 루트 로거 설정
+
+    Args:
+        fmt (str): "console" 또는 "json" (기본값: ROBLOX_LOG_FORMAT 또는 console)
+        level (str): 로그 레벨 이름 (기본값: ROBLOX_LOG_LEVEL, 터미널이면 DEBUG, 아니면 INFO)
+        stream: 출력 스트림 (기본값: 현재 sys.stdout)
+
+    Returns:
+        logging.Logger: 설정된 루트 로거
+    """
+    global _configured
+
+    fmt = (fmt or os.environ.get("ROBLOX_LOG_FORMAT") or "console").lower()
+    if level is None:
+        level = os.environ.get("ROBLOX_LOG_LEVEL") or ("DEBUG" if sys.stdout.isatty() else "INFO")
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream) if stream is not None else _StdoutHandler()
+    handler.setFormatter(JsonLinesFormatter() if fmt == "json" else ConsoleFormatter())
+    root.addHandler(handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.propagate = False
+
+    _configured = True
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    모듈별 로거 반환 (처음 호출 시 환경 변수 기준으로 자동 설정)
+
+    Args:
+        name (str): 모듈 이름 (보통 __name__)
+    """
+    if not _configured:
+        configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Avatar Mesh Loader
+OBJ/MTL을 NumPy 인덱스 메시(positions/normals/uvs/indices + 그룹 테이블)로 변환
+GLB 내보내기 등 바이너리 처리 단계에서 공통으로 사용
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from avatar_metrics import PARSE_SECONDS
+
+
+class AvatarMesh:
+    """삼각형 인덱스 메시 (모든 그룹이 하나의 정점 배열을 공유)"""
+
+    def __init__(self, positions: np.ndarray, normals: Optional[np.ndarray], uvs: Optional[np.ndarray],
+                 indices: np.ndarray, groups: List[Dict], source: Optional[str] = None,
+                 obj_stats: Optional[Dict] = None):
+        """
+        Args:
+            positions (np.ndarray): (N, 3) float32 정점 위치
+            normals (np.ndarray): (N, 3) float32 법선 (없으면 None)
+            uvs (np.ndarray): (N, 2) float32 텍스처 좌표, OBJ 기준(v 위쪽 증가) (없으면 None)
+            indices (np.ndarray): (M * 3,) uint32 삼각형 인덱스
+            groups (List[Dict]): {"name", "material", "start", "count"} - start/count는 indices 단위
+            source (str): 원본 OBJ 경로
+            obj_stats (Dict): 원본 OBJ 라인 통계 (v/vt/vn/f 개수, g/o 라인, usemtl, mtllib, 코멘트)
+        """
+        self.positions = positions
+        self.normals = normals
+        self.uvs = uvs
+        self.indices = indices
+        self.groups = groups
+        self.source = source
+        self.obj_stats = obj_stats or {}
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.positions)
+
+    @property
+    def triangle_count(self) -> int:
+        return len(self.indices) // 3
+
+    @property
+    def nbytes(self) -> int:
+        """정점/인덱스 배열 메모리 크기 (바이트)"""
+        return sum(a.nbytes for a in (self.positions, self.normals, self.uvs, self.indices) if a is not None)
+
+    def group_indices(self, group: Dict) -> np.ndarray:
+        """그룹 하나의 삼각형 인덱스"""
+        return self.indices[group["start"]:group["start"] + group["count"]]
+
+    def __repr__(self) -> str:
+        return (f"AvatarMesh(vertices={self.vertex_count}, triangles={self.triangle_count}, "
+                f"groups={len(self.groups)})")
+
+
+def _resolve_index(token: str, count: int) -> int:
+    """OBJ 인덱스(1부터, 음수는 상대) → 0부터 시작하는 인덱스 (없으면 -1)"""
+    if not token:
+        return -1
+    index = int(token)
+    return index - 1 if index > 0 else count + index
+
+
+def _row_view(rows: np.ndarray) -> np.ndarray:
+    """2차원 배열의 각 행을 하나의 void 값으로 보기 (행 단위 np.unique를 1차원 정렬로 처리)"""
+    rows = np.ascontiguousarray(rows)
+    return rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+
+def _first_occurrence_unique(keys: np.ndarray):
+    """처음 등장한 순서를 유지하는 행 단위 np.unique (캐시 지역성 유지)"""
+    _, first, inverse = np.unique(_row_view(keys), return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse.reshape(-1)]
+
+
+def load_obj(obj_path: Path) -> AvatarMesh:
+    """
+    OBJ 파일을 인덱스 메시로 로드
+
+    다각형은 팬 방식으로 삼각형 분할하고, 같은 v/vt/vn 인덱스 조합은 하나의 정점으로 합침.
+    그룹(g) 또는 재질(usemtl)이 바뀔 때마다 새 그룹 구간을 시작.
+
+    Args:
+        obj_path (Path): OBJ 파일 경로
+
+    Returns:
+        AvatarMesh: 로드된 메시
+    """
+    obj_path = Path(obj_path)
+    parse_start = time.perf_counter()
+
+    positions: List[str] = []
+    normals: List[str] = []
+    uvs: List[str] = []
+    corners: List[tuple] = []
+    groups: List[Dict] = []
+    group_name = "default"
+    material = None
+    obj_stats = {"vertices": 0, "texture_coords": 0, "normals": 0, "faces": 0,
+                 "groups": [], "objects": [], "materials": [], "mtllibs": [], "comments": []}
+
+    def start_group():
+        if groups and groups[-1]["count"] == 0:
+            groups[-1].update(name=group_name, material=material)
+        else:
+            groups.append({"name": group_name, "material": material, "start": len(corners), "count": 0})
+
+    start_group()
+
+    with open(obj_path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            parts = line.split()
+            if not parts:
+                continue
+            key = parts[0]
+            if key == 'v':
+                positions.extend(parts[1:4])
+            elif key == 'vt':
+                uvs.extend((parts[1:3] + ['0'])[:2])
+            elif key == 'vn':
+                normals.extend(parts[1:4])
+            elif key == 'f':
+                counts = (len(positions) // 3, len(uvs) // 2, len(normals) // 3)
+                face = []
+                for corner in parts[1:]:
+                    fields = corner.split('/')
+                    face.append((
+                        _resolve_index(fields[0], counts[0]),
+                        _resolve_index(fields[1], counts[1]) if len(fields) > 1 else -1,
+                        _resolve_index(fields[2], counts[2]) if len(fields) > 2 else -1,
+                    ))
+                for i in range(1, len(face) - 1):
+                    corners.extend((face[0], face[i], face[i + 1]))
+                groups[-1]["count"] = len(corners) - groups[-1]["start"]
+                obj_stats["faces"] += 1
+            elif key == 'g' or key == 'o':
+                group_name = line.strip()[2:].strip() or "default"
+                start_group()
+                if len(parts) > 1:
+                    obj_stats["groups" if key == 'g' else "objects"].append(
+                        {"name": group_name, "line": line_num, "source": line.strip()})
+            elif key == 'usemtl':
+                material = line.strip()[7:].strip()
+                start_group()
+                if material not in obj_stats["materials"]:
+                    obj_stats["materials"].append(material)
+            elif key == 'mtllib' and len(parts) > 1:
+                obj_stats["mtllibs"].append(line.strip()[7:].strip())
+            elif key.startswith('#'):
+                obj_stats["comments"].append({"line": line_num, "source": line.strip()})
+
+    groups = [g for g in groups if g["count"] > 0]
+    obj_stats["vertices"] = len(positions) // 3
+    obj_stats["texture_coords"] = len(uvs) // 2
+    obj_stats["normals"] = len(normals) // 3
+    position_table = np.array(positions, dtype=np.float32).reshape(-1, 3)
+    uv_table = np.array(uvs, dtype=np.float32).reshape(-1, 2)
+    normal_table = np.array(normals, dtype=np.float32).reshape(-1, 3)
+
+    corner_array = np.array(corners, dtype=np.int64).reshape(-1, 3)
+    if len(corner_array):
+        unique_rows, inverse = _first_occurrence_unique(corner_array)
+        vertex_refs = corner_array[unique_rows]
+    else:
+        vertex_refs = np.zeros((0, 3), dtype=np.int64)
+        inverse = np.zeros(0, dtype=np.int64)
+
+    def gather(table: np.ndarray, column: int, width: int) -> Optional[np.ndarray]:
+        refs = vertex_refs[:, column]
+        if len(table) == 0 or (len(refs) and (refs < 0).all()):
+            return None
+        # 일부 모서리에만 vt/vn이 없는 경우 0으로 채움
+        padded = np.vstack([table, np.zeros((1, width), dtype=np.float32)])
+        return padded[np.where(refs < 0, len(table), refs)]
+
+    mesh = AvatarMesh(
+        positions=np.ascontiguousarray(position_table[vertex_refs[:, 0]]),
+        normals=gather(normal_table, 2, 3),
+        uvs=gather(uv_table, 1, 2),
+        indices=inverse.astype(np.uint32),
+        groups=groups,
+        source=str(obj_path),
+        obj_stats=obj_stats,
+    )
+    PARSE_SECONDS.observe(time.perf_counter() - parse_start, parser="load_obj")
+    return mesh
+
+
+def weld_mesh(mesh: AvatarMesh, tolerance: float = 0.0, drop_degenerate: bool = True):
+    """
+    위치/UV/법선이 같은 정점을 하나로 합치고 인덱스 메시를 다시 구성
+
+    모서리(인덱스) 단위로 정점 값을 비교하므로 사용되지 않는 정점도 함께 제거되고,
+    새 정점 순서는 삼각형에서 처음 등장한 순서를 따름
+
+    Args:
+        mesh (AvatarMesh): 원본 메시
+        tolerance (float): 0보다 크면 이 간격으로 양자화한 값이 같은 정점도 합침
+        drop_degenerate (bool): 합친 뒤 두 꼭짓점이 같아진 삼각형 제거
+
+    Returns:
+        Tuple[AvatarMesh, Dict]: (압축된 메시, 전후 정점 수/메모리 리포트)
+    """
+    attributes = [a for a in (mesh.positions, mesh.normals, mesh.uvs) if a is not None]
+    rows = np.hstack([np.asarray(a, dtype=np.float32) for a in attributes]) if attributes else np.zeros((0, 0))
+    if tolerance > 0:
+        keys = np.round(rows / tolerance).astype(np.int64)
+    else:
+        # -0.0과 0.0을 같은 값으로 취급한 뒤 비트 패턴 비교
+        keys = (rows + np.float32(0.0)).view(np.uint32)
+
+    corner_indices = np.asarray(mesh.indices, dtype=np.int64)
+    if len(corner_indices):
+        unique_corners, inverse = _first_occurrence_unique(keys[corner_indices])
+        source_rows = corner_indices[unique_corners]
+    else:
+        source_rows = np.zeros(0, dtype=np.int64)
+        inverse = np.zeros(0, dtype=np.int64)
+    indices = inverse.astype(np.uint32)
+
+    groups = [dict(g) for g in mesh.groups]
+    degenerate = 0
+    if drop_degenerate and len(indices):
+        triangles = indices.reshape(-1, 3)
+        keep = ((triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2])
+                & (triangles[:, 0] != triangles[:, 2]))
+        degenerate = int((~keep).sum())
+        if degenerate:
+            # 그룹 구간을 남은 삼각형 기준으로 다시 계산
+            kept_before = np.concatenate([[0], np.cumsum(keep)])
+            for group in groups:
+                first_tri = group["start"] // 3
+                last_tri = first_tri + group["count"] // 3
+                group["start"] = int(kept_before[first_tri]) * 3
+                group["count"] = int(kept_before[last_tri] - kept_before[first_tri]) * 3
+            groups = [g for g in groups if g["count"] > 0]
+            indices = np.ascontiguousarray(triangles[keep].reshape(-1))
+
+    def take(array: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        return None if array is None else np.ascontiguousarray(np.asarray(array)[source_rows])
+
+    welded = AvatarMesh(take(mesh.positions), take(mesh.normals), take(mesh.uvs), indices, groups,
+                        source=mesh.source, obj_stats=mesh.obj_stats)
+    report = {
+        "vertices_before": mesh.vertex_count,
+        "vertices_after": welded.vertex_count,
+        "triangles_before": mesh.triangle_count,
+        "triangles_after": welded.triangle_count,
+        "degenerate_removed": degenerate,
+        "bytes_before": mesh.nbytes,
+        "bytes_after": welded.nbytes,
+        "tolerance": tolerance,
+    }
+    return welded, report
+
+
+def save_obj(mesh: AvatarMesh, obj_path: Path, mtllib: Optional[str] = None) -> Path:
+    """
+    인덱스 메시를 OBJ 텍스트로 저장 (그룹마다 g/usemtl 라인 유지)
+
+    Args:
+        mesh (AvatarMesh): 저장할 메시
+        obj_path (Path): 출력 OBJ 경로
+        mtllib (str): mtllib 라인에 쓸 MTL 경로 (없으면 생략)
+
+    Returns:
+        Path: 저장된 OBJ 경로
+    """
+    obj_path = Path(obj_path)
+    columns = [mesh.uvs is not None, mesh.normals is not None]
+    if columns == [True, True]:
+        face_format = " ".join(["%d/%d/%d"] * 3)
+    elif columns == [True, False]:
+        face_format = " ".join(["%d/%d"] * 3)
+    elif columns == [False, True]:
+        face_format = " ".join(["%d//%d"] * 3)
+    else:
+        face_format = "%d %d %d"
+    width = 1 + sum(columns)
+
+    with open(obj_path, 'w', encoding='utf-8') as f:
+        if mtllib:
+            f.write(f"mtllib {mtllib}\n")
+        np.savetxt(f, mesh.positions, fmt="v %.6f %.6f %.6f")
+        if mesh.uvs is not None:
+            np.savetxt(f, mesh.uvs, fmt="vt %.6f %.6f")
+        if mesh.normals is not None:
+            np.savetxt(f, mesh.normals, fmt="vn %.6f %.6f %.6f")
+        for group in mesh.groups:
+            f.write(f"g {group['name']}\n")
+            if group.get("material"):
+                f.write(f"usemtl {group['material']}\n")
+            triangles = mesh.group_indices(group).reshape(-1, 3).astype(np.int64) + 1
+            np.savetxt(f, np.repeat(triangles, width, axis=1), fmt="f " + face_format)
+    return obj_path
+
+
+def load_mtl(mtl_path: Path) -> Dict[str, Dict[str, str]]:
+    """
+    MTL 파일을 {재질 이름: {속성: 값}} 형태로 로드
+
+    Args:
+        mtl_path (Path): MTL 파일 경로 (없으면 빈 dict)
+    """
+    materials: Dict[str, Dict[str, str]] = {}
+    mtl_path = Path(mtl_path)
+    if not mtl_path.exists():
+        return materials
+
+    current = None
+    with open(mtl_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            key, _, value = line.partition(' ')
+            if key == 'newmtl':
+                current = materials.setdefault(value.strip(), {})
+            elif current is not None and value:
+                current[key] = value.strip()
+    return materials
+
+
+def resolve_texture_path(value: str, avatar_folder: Path, texture_hashes: Optional[List[str]] = None,
+                         texture_map: Optional[Dict[str, str]] = None) -> Optional[Path]:
+    """
+    MTL map_* 값을 로컬 텍스처 파일로 변환
+
+    값이 상대/절대 경로면 그대로, CDN 해시면 texture_map.json의 파일, 맵이 없는 예전 폴더는
+    metadata.json의 textures 순서로 textures/texture_NNN.* 파일을 찾음
+
+    Args:
+        value (str): map_Kd 등의 값
+        avatar_folder (Path): 아바타 폴더 (avatar.obj 위치)
+        texture_hashes (List[str]): metadata.json의 avatar_3d_metadata.textures
+        texture_map (Dict[str, str]): texture_map.json의 해시 → 상대 경로
+
+    Returns:
+        Optional[Path]: 존재하는 텍스처 파일 경로
+    """
+    avatar_folder = Path(avatar_folder)
+    candidate = Path(value)
+    if not candidate.is_absolute():
+        candidate = avatar_folder / candidate
+    if candidate.is_file():
+        return candidate
+
+    if texture_map and value in texture_map:
+        mapped = avatar_folder / texture_map[value]
+        if mapped.is_file():
+            return mapped
+    if texture_hashes and value in texture_hashes:
+        stem = f"texture_{texture_hashes.index(value) + 1:03d}"
+        for path in sorted((avatar_folder / "textures").glob(stem + ".*")):
+            return path
+    return None
+
+
+def load_texture_hashes(avatar_folder: Path) -> List[str]:
+    """metadata.json에서 텍스처 해시 목록 읽기 (없으면 빈 목록)"""
+    metadata_file = Path(avatar_folder) / "metadata.json"
+    if not metadata_file.exists():
+        return []
+    try:
+        with open(metadata_file, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        return metadata.get("avatar_3d_metadata", {}).get("textures", []) or []
+    except (OSError, ValueError):
+        return []
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Avatar Downloader Metrics
+장시간 실행되는 다운로드 워커를 위한 Prometheus 형식 메트릭 레지스트리
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """라벨을 Prometheus 텍스트 형식으로 변환"""
+    pairs = []
+    for name, value in zip(labelnames, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """숫자 값을 Prometheus 텍스트 형식으로 변환"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """메트릭 공통 클래스"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 라벨 {self.labelnames} 필요 (입력: {tuple(labels)})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError(f"{self.name}: 카운터는 감소할 수 없습니다")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """증감 가능한 게이지"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+
+    metric_type = "histogram"
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [버킷별 카운트..., 합계, 전체 카운트]
+                state = [0] * len(self.buckets) + [0.0, 0]
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels):
+        """with 문으로 경과 시간을 기록하는 타이머"""
+        return _HistogramTimer(self, labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}"
+
+
+class _HistogramTimer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class RateGauge(_Metric):
+    """최근 구간의 이벤트 수를 분당 비율로 보여주는 게이지"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, help_text: str, window_seconds: float = 60.0):
+        super().__init__(name, help_text)
+        self.window_seconds = window_seconds
+        self._events = deque()
+
+    def mark(self):
+        with self._lock:
+            self._events.append(time.monotonic())
+
+    def value(self) -> float:
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            while self._events and self._events[0] < cutoff:
+                self._events.popleft()
+            count = len(self._events)
+        return count * 60.0 / self.window_seconds
+
+    def _samples(self):
+        yield f"{self.name} {_format_value(self.value())}"
+
+
+class MetricsRegistry:
+    """메트릭 레지스트리"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 메트릭: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets=Histogram.DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def rate_gauge(self, name: str, help_text: str, window_seconds: float = 60.0) -> RateGauge:
+        return self._register(RateGauge(name, help_text, window_seconds))
+
+    def render(self) -> str:
+        """Prometheus 텍스트 exposition 형식으로 출력"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# 전역 레지스트리와 다운로더 공용 메트릭
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "roblox_http_requests_total", "HTTP 요청 수 (호스트/상태 코드별)", ("host", "status"))
+HTTP_RATE_LIMITED = REGISTRY.counter(
+    "roblox_http_rate_limited_total", "HTTP 429 응답 수", ("host",))
+CDN_SHARD_FALLBACKS = REGISTRY.counter(
+    "roblox_cdn_shard_fallbacks_total", "기본 CDN 서버 실패 후 대체 서버 시도 수", ("extension",))
+BYTES_DOWNLOADED = REGISTRY.counter(
+    "roblox_downloaded_bytes_total", "디스크에 저장된 다운로드 바이트 수", ("kind",))
+AVATARS_DOWNLOADED = REGISTRY.counter(
+    "roblox_avatars_downloaded_total", "처리된 아바타 수", ("kind", "result"))
+AVATARS_PER_MINUTE = REGISTRY.rate_gauge(
+    "roblox_avatars_per_minute", "최근 1분간 처리된 아바타 수")
+QUEUE_DEPTH = REGISTRY.gauge(
+    "roblox_download_queue_depth", "대기 중인 다운로드 유저 수", ("kind",))
+PARSE_SECONDS = REGISTRY.histogram(
+    "roblox_parse_duration_seconds", "OBJ/MTL 파싱 소요 시간", ("parser",))
+
+
+def _record_response(response, *args, **kwargs):
+    """requests 응답 훅: 호스트/상태 코드별 요청 수 기록"""
+    host = urlparse(response.url).hostname or "unknown"
+    HTTP_REQUESTS.inc(host=host, status=str(response.status_code))
+    if response.status_code == 429:
+        HTTP_RATE_LIMITED.inc(host=host)
+    return response
+
+
+def instrument_session(session):
+    """requests.Session에 메트릭 응답 훅 등록"""
+    hooks = session.hooks.setdefault("response", [])
+    if _record_response not in hooks:
+        hooks.append(_record_response)
+    return session
+
+
+def record_avatar(kind: str, success: bool):
+    """아바타 1건 처리 완료 기록"""
+    AVATARS_DOWNLOADED.inc(kind=kind, result="success" if success else "failure")
+    AVATARS_PER_MINUTE.mark()
+
+
+def _make_handler(registry: MetricsRegistry):
+    """/metrics 요청 핸들러 클래스 생성 (http.server는 서버를 열 때만 import)"""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # 스크레이프마다 콘솔에 로그를 남기지 않음
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics_server(port: int = 9108, host: str = "127.0.0.1",
+                         registry: Optional[MetricsRegistry] = None) -> "ThreadingHTTPServer":
+    """
+    로컬 /metrics 엔드포인트를 백그라운드 스레드로 시작
+
+    Args:
+        port (int): 포트 번호 (0이면 임의 포트)
+        host (str): 바인딩 주소
+        registry (MetricsRegistry): 노출할 레지스트리 (기본값: 전역 레지스트리)
+
+    Returns:
+        ThreadingHTTPServer: 실행 중인 서버 (shutdown()으로 종료)
+    """
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, port), _make_handler(registry or REGISTRY))
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    print(f"📈 메트릭 엔드포인트: http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def start_metrics_server_from_env() -> Optional["ThreadingHTTPServer"]:
+    """ROBLOX_METRICS_PORT 환경 변수가 설정된 경우에만 메트릭 서버 시작"""
+    port = os.environ.get("ROBLOX_METRICS_PORT")
+    if not port:
+        return None
+    host = os.environ.get("ROBLOX_METRICS_HOST", "127.0.0.1")
+    return start_metrics_server(int(port), host)
+
+
+def main():
+    """메트릭 서버 단독 실행"""
+    port = int(os.environ.get("ROBLOX_METRICS_PORT", "9108"))
+    server = start_metrics_server(port)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n메트릭 서버 종료")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
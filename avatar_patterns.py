@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Avatar Pattern Matchers
+바디 파트 분류와 Attachment 패턴 매칭을 위한 미리 컴파일된 다중 패턴 매처
+
+다운로더(classify_body_part)와 OBJAttachmentParser가 공유하며,
+키워드 목록을 하나의 정규식 교대(alternation)로 한 번만 컴파일해 줄마다 반복 검사를 줄임
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+# 로블록스 아바타 파트 매핑 (순서 = 우선순위, 앞의 파트가 먼저 선택됨)
+BODY_PART_KEYWORDS: Dict[str, List[str]] = {
+    "head": ["player1", "head"],
+    "torso": ["player2", "torso", "chest"],
+    "left_arm": ["player3", "leftarm", "left_arm"],
+    "right_arm": ["player4", "rightarm", "right_arm"],
+    "left_leg": ["player5", "leftleg", "left_leg"],
+    "right_leg": ["player6", "rightleg", "right_leg"],
+    "hat": ["player7", "hat", "cap", "helmet"],
+    "hair": ["player8", "hair"],
+    "face": ["player9", "face"],
+    "shirt": ["player10", "shirt", "top"],
+    "pants": ["player11", "pants", "bottom"],
+    "shoes": ["player12", "shoes", "boot"],
+    "accessory": ["player13", "player14", "player15", "accessory", "gear"],
+    "handle": ["handle", "grip", "tool"]
+}
+
+ATTACHMENT_PATTERNS: List[str] = [
+    r'# Attachment\s+(\w+)',
+    r'# Attach\s+(\w+)',
+    r'o\s+(\w*[Aa]ttach\w*)',
+    r'g\s+(\w*[Aa]ttach\w*)',
+    r'# Bone\s+(\w+)',
+    r'o\s+(\w*[Bb]one\w*)',
+    r'g\s+(\w*[Bb]one\w*)',
+]
+
+# o/g 이름 중 Attachment로 기록할 키워드, 저장할 코멘트 키워드 (소문자 기준)
+ATTACHMENT_NAME_KEYWORDS = ['attach', 'bone']
+COMMENT_KEYWORDS = ['attach', 'bone', 'joint', 'bind', 'rig']
+
+
+def _keyword_regex(keywords: Sequence[str]) -> "re.Pattern":
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+
+class BodyPartClassifier:
+    """그룹 이름 → 바디 파트 분류기 (키워드 전체를 하나의 컴파일된 교대로 검사)"""
+
+    def __init__(self, part_keywords: Dict[str, List[str]] = BODY_PART_KEYWORDS, cache_size: int = 4096):
+        """
+        Args:
+            part_keywords (Dict[str, List[str]]): 파트 → 키워드 (딕셔너리 순서가 우선순위)
+            cache_size (int): 이름별 분류 결과 캐시 크기 (그룹 이름은 아바타마다 반복됨)
+        """
+        keywords = []
+        self._rank: Dict[str, Tuple[int, str]] = {}
+        for rank, (part_type, part_words) in enumerate(part_keywords.items()):
+            for keyword in part_words:
+                if keyword not in self._rank:
+                    self._rank[keyword] = (rank, part_type)
+                    keywords.append(keyword)
+
+        # 우선순위 순으로 나열한 교대를 전방 탐색으로 감싸 모든 위치의 (겹치는) 키워드를 찾음
+        ordered = sorted(keywords, key=lambda keyword: self._rank[keyword][0])
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in ordered) + "))")
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, group_name: str) -> str:
+        best = None
+        for match in self._pattern.finditer(group_name.lower()):
+            candidate = self._rank[match.group(1)]
+            if best is None or candidate < best:
+                best = candidate
+                if best[0] == 0:
+                    break
+        return best[1] if best else "unknown"
+
+
+class AttachmentMatcher:
+    """o/g 이름과 코멘트에서 Attachment 정보를 찾는 매처 (모든 정규식을 생성 시 한 번만 컴파일)"""
+
+    def __init__(self, patterns: Sequence[str] = ATTACHMENT_PATTERNS):
+        """
+        Args:
+            patterns (Sequence[str]): Attachment 정규식 목록 (group(1)이 이름)
+        """
+        self.patterns = list(patterns)
+        self._compiled = [(pattern, re.compile(pattern, re.IGNORECASE)) for pattern in self.patterns]
+        # 전체 패턴 교대로 먼저 걸러서 대부분의 코멘트는 개별 패턴을 실행하지 않음
+        self._any_pattern = re.compile("|".join(f"(?:{pattern})" for pattern in self.patterns), re.IGNORECASE)
+        self._name_keywords = _keyword_regex(ATTACHMENT_NAME_KEYWORDS)
+        self._comment_keywords = _keyword_regex(COMMENT_KEYWORDS)
+
+    def is_attachment_name(self, name: str) -> bool:
+        """o/g 이름에 attach/bone이 들어 있는지 (대소문자 무시)"""
+        return self._name_keywords.search(name.lower()) is not None
+
+    def is_important_comment(self, comment: str) -> bool:
+        """저장할 코멘트인지 (attach/bone/joint/bind/rig 포함, 대소문자 무시)"""
+        return self._comment_keywords.search(comment.lower()) is not None
+
+    def match_comment(self, line: str) -> List[Tuple[str, str]]:
+        """
+        코멘트 라인에 맞는 모든 패턴 찾기
+
+        Returns:
+            List[Tuple[str, str]]: (패턴, 이름) - 패턴 목록 순서
+        """
+        if not self._any_pattern.search(line):
+            return []
+        matches = []
+        for pattern, compiled in self._compiled:
+            match = compiled.search(line)
+            if match:
+                matches.append((pattern, match.group(1)))
+        return matches
+
+
+# 다운로더들이 공유하는 기본 분류기 (분류 캐시도 공유)
+BODY_PART_CLASSIFIER = BodyPartClassifier()
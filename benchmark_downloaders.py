@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Downloader Throughput Benchmark
+Mock 로블록스 서버를 상대로 다운로더 클래스별 처리량(avatars/sec)과 p95 지연 측정
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+from unittest import mock
+
+from mock_roblox_server import MockRobloxServer
+
+
+class _NoSleepTime:
+    """time 모듈 대리 객체 - 다운로더의 API 제한용 sleep만 건너뜀"""
+
+    @staticmethod
+    def sleep(seconds):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def _make_2d(output: Path):
+    from roblox_avatar_downloader import RobloxAvatarDownloader
+    downloader = RobloxAvatarDownloader(str(output))
+    return downloader, lambda user_id: downloader.download_user_avatars(user_id, ["150x150", "420x420"])
+
+
+def _make_3d(output: Path):
+    from real_3d_downloader import RobloxAvatar3DDownloader
+    downloader = RobloxAvatar3DDownloader(str(output))
+    return downloader, lambda user_id: downloader.download_avatar_3d_complete(user_id, include_textures=True)
+
+
+def _make_3d_integrated(output: Path):
+    from integrated_3d_downloader import RobloxAvatar3DDownloaderIntegrated
+    downloader = RobloxAvatar3DDownloaderIntegrated(str(output))
+    return downloader, lambda user_id: downloader.download_avatar_3d_complete(user_id, include_textures=True)
+
+
+DOWNLOADERS: Dict[str, Callable] = {
+    "2d": _make_2d,
+    "3d": _make_3d,
+    "3d_integrated": _make_3d_integrated,
+}
+
+# 다운로더 모듈 이름 (sleep 무시 패치 대상)
+_DOWNLOADER_MODULES = {
+    "2d": "roblox_avatar_downloader",
+    "3d": "real_3d_downloader",
+    "3d_integrated": "integrated_3d_downloader",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """선형 보간 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def run_benchmark(name: str, server: MockRobloxServer, user_ids: List[int],
+                  keep_sleeps: bool = False, quiet: bool = True) -> Dict:
+    """
+    다운로더 하나를 벤치마크
+
+    Args:
+        name (str): DOWNLOADERS 키 (2d, 3d, 3d_integrated)
+        server (MockRobloxServer): 실행 중인 Mock 서버
+        user_ids (List[int]): 다운로드할 유저 ID 목록
+        keep_sleeps (bool): 다운로더 내부의 API 제한용 sleep 유지 여부
+        quiet (bool): 다운로더 콘솔 출력 숨김 여부
+
+    Returns:
+        Dict: 처리량/지연 통계
+    """
+    output = Path(tempfile.mkdtemp(prefix=f"bench_{name}_"))
+    latencies = []
+    successes = 0
+    request_count_before = len(server.request_log)
+
+    try:
+        module = __import__(_DOWNLOADER_MODULES[name])
+        sleep_patch = contextlib.nullcontext() if keep_sleeps else mock.patch.object(module, "time", _NoSleepTime())
+        stdout = io.StringIO() if quiet else None
+
+        with sleep_patch, contextlib.redirect_stdout(stdout) if quiet else contextlib.nullcontext():
+            downloader, download = DOWNLOADERS[name](output)
+            server.install(downloader.session)
+
+            started = time.perf_counter()
+            for user_id in user_ids:
+                t0 = time.perf_counter()
+                if download(user_id):
+                    successes += 1
+                latencies.append(time.perf_counter() - t0)
+            elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(output, ignore_errors=True)
+
+    return {
+        "downloader": name,
+        "avatars": len(user_ids),
+        "successes": successes,
+        "elapsed_seconds": round(elapsed, 4),
+        "avatars_per_second": round(len(user_ids) / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "latency_mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+        "http_requests": len(server.request_log) - request_count_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock 서버 기반 다운로더 처리량 벤치마크")
+    parser.add_argument("--users", type=int, default=10, help="다운로드할 아바타 수 (기본값: 10)")
+    parser.add_argument("--downloaders", default=",".join(DOWNLOADERS), help="쉼표로 구분한 다운로더 목록")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="요청당 주입 지연 (ms)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--failing-shards", default="", help="503을 반환할 tN 샤드 번호들 (예: 1,3)")
+    parser.add_argument("--keep-sleeps", action="store_true", help="다운로더 내부 sleep 유지")
+    parser.add_argument("--verbose", action="store_true", help="다운로더 출력 표시")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    failing_shards = [int(s) for s in args.failing_shards.split(",") if s.strip()]
+    server = MockRobloxServer(latency=args.latency_ms / 1000.0, rate_limit_ratio=args.rate_limit,
+                              failing_shards=failing_shards)
+
+    print("=== 다운로더 처리량 벤치마크 (Mock 서버) ===\n")
+    print(f"📦 픽스처: {', '.join(f.user_info['name'] for f in server.fixtures)}")
+    print(f"⚙️ 지연 {args.latency_ms}ms, 429 비율 {args.rate_limit}, 장애 샤드 {failing_shards or '없음'}\n")
+
+    # 픽스처 유저 ID부터 사용하고 부족하면 합성 유저로 채움
+    fixture_ids = [int(f.user_info["id"]) for f in server.fixtures]
+    user_ids = [fixture_ids[i] if i < len(fixture_ids) else 100000 + i for i in range(args.users)]
+
+    results = []
+    with server:
+        for name in [n.strip() for n in args.downloaders.split(",") if n.strip()]:
+            if name not in DOWNLOADERS:
+                print(f"⚠️ 알 수 없는 다운로더: {name}")
+                continue
+            result = run_benchmark(name, server, user_ids, args.keep_sleeps, quiet=not args.verbose)
+            results.append(result)
+            print(f"🏁 {name:<14} {result['avatars_per_second']:>8.2f} avatars/s  "
+                  f"p50 {result['latency_p50_ms']:>8.1f}ms  p95 {result['latency_p95_ms']:>8.1f}ms  "
+                  f"성공 {result['successes']}/{result['avatars']}  요청 {result['http_requests']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"generated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results},
+                      f, indent=2, ensure_ascii=False)
+        print(f"\n📁 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
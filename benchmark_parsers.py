@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+OBJ/MTL Parser Micro-Benchmark
+analyze_obj_structure, parse_obj_file, parse_mtl_file, classify_body_part,
+BodyPartMapper 리포트 생성의 처리 속도(ns/line, MB/s)와 최대 RSS 측정
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 벤치마크 대상 샘플 아바타 (저장소에 포함된 파일)
+SAMPLE_AVATARS = [
+    "real_3d_avatars/builderman_156_3D",
+    "real_3d_avatars/Roblox_1_3D",
+]
+SCALES = [1, 10, 100]
+
+
+def build_scaled_obj(source: Path, scale: int, output: Path) -> Path:
+    """
+    OBJ 파일을 scale배로 복제한 합성 OBJ 생성
+    복제본마다 그룹 이름에 접미사를 붙이고 면 인덱스를 오프셋하여 유효한 OBJ 유지
+    """
+    lines = source.read_text(encoding='utf-8').splitlines()
+    counts = {"v": 0, "vt": 0, "vn": 0}
+    for line in lines:
+        key = line.split(' ', 1)[0]
+        if key in counts:
+            counts[key] += 1
+
+    with open(output, 'w', encoding='utf-8') as f:
+        for copy in range(scale):
+            offsets = (counts["v"] * copy, counts["vt"] * copy, counts["vn"] * copy)
+            for line in lines:
+                if copy and line.startswith('f '):
+                    corners = []
+                    for corner in line[2:].split():
+                        parts = corner.split('/')
+                        corners.append('/'.join(
+                            str(int(p) + offsets[i]) if p else p for i, p in enumerate(parts)))
+                    line = 'f ' + ' '.join(corners)
+                elif copy and line.startswith('g '):
+                    line = f"{line}_{copy}"
+                f.write(line + '\n')
+    return output
+
+
+def _rss_peak_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _run_case(case: Dict) -> Dict:
+    """단일 벤치마크 케이스 실행 (별도 프로세스에서 호출되어 RSS를 독립 측정)"""
+    from real_3d_downloader import RobloxAvatar3DDownloader
+    from obj_attachment_parser import OBJAttachmentParser
+    from body_part_mapping_parser import BodyPartMapper
+
+    target = Path(case["path"]) if case.get("path") else None
+    repeat = case["repeat"]
+    work_dir = Path(case["work_dir"])
+    timings = []
+    lines = 0
+    size = 0
+
+    if case["bench"] == "analyze_obj_structure":
+        downloader = RobloxAvatar3DDownloader(str(work_dir / "downloader"))
+        func = lambda: downloader.analyze_obj_structure(target)
+    elif case["bench"] == "parse_obj_file":
+        parser = OBJAttachmentParser()
+        func = lambda: parser.parse_obj_file(target)
+    elif case["bench"] == "load_obj":
+        from avatar_mesh import load_obj
+        func = lambda: load_obj(target)
+    elif case["bench"] == "weld_mesh":
+        from avatar_mesh import load_obj, weld_mesh
+        mesh = load_obj(target)
+        func = lambda: weld_mesh(mesh)
+    elif case["bench"] == "load_mesh_cache":
+        from mesh_cache import load_mesh_cache
+        func = lambda: load_mesh_cache(Path(case["cache"]))
+    elif case["bench"] == "parse_mtl_file":
+        parser = OBJAttachmentParser()
+        func = lambda: parser.parse_mtl_file(target)
+    elif case["bench"] == "classify_body_part":
+        downloader = RobloxAvatar3DDownloader(str(work_dir / "downloader"))
+        names = case["names"]
+        lines = len(names)
+
+        def func():
+            for name in names:
+                downloader.classify_body_part(name)
+    elif case["bench"] == "body_part_mapping":
+        mapper = BodyPartMapper()
+        structure = RobloxAvatar3DDownloader(str(work_dir / "downloader"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            obj_structure = structure.analyze_obj_structure(target)
+        avatar_data = {
+            "user_id": 0, "username": "bench", "display_name": "bench", "created_at": "",
+            "obj_path": str(target), "vertices": obj_structure["vertices"],
+            "faces": obj_structure["faces"], "groups": obj_structure["groups"],
+        }
+        lines = len(obj_structure["groups"])
+        func = lambda: mapper.create_body_part_mapping_text(avatar_data, work_dir / "BODY_PART_MAPPING.txt")
+    else:
+        raise ValueError(f"알 수 없는 벤치마크: {case['bench']}")
+
+    if target is not None and case["bench"] != "body_part_mapping":
+        size = target.stat().st_size
+        with open(target, 'rb') as f:
+            lines = sum(1 for _ in f)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()  # 워밍업
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - t0)
+
+    best = min(timings)
+    return {
+        "best_seconds": best,
+        "median_seconds": sorted(timings)[len(timings) // 2],
+        "lines": lines,
+        "bytes": size,
+        "ns_per_line": round(best * 1e9 / lines, 1) if lines else None,
+        "mb_per_second": round(size / best / 1e6, 2) if size and best > 0 else None,
+        "peak_rss_kb": _rss_peak_kb(),
+    }
+
+
+def run_case_subprocess(case: Dict) -> Dict:
+    """케이스를 새 인터프리터에서 실행"""
+    completed = subprocess.run(
+        [sys.executable, __file__, "--worker", json.dumps(case)],
+        capture_output=True, text=True, encoding='utf-8', cwd=Path(__file__).parent, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def build_cases(work_dir: Path, repeat: int, scales: List[int]) -> List[Dict]:
+    """샘플 아바타와 합성 OBJ로 벤치마크 케이스 목록 생성"""
+    cases = []
+    group_names = []
+    for sample in SAMPLE_AVATARS:
+        folder = Path(sample)
+        obj_file = folder / "avatar.obj"
+        if not obj_file.exists():
+            continue
+        for line in obj_file.read_text(encoding='utf-8').splitlines():
+            if line.startswith('g '):
+                group_names.append(line[2:].strip())
+
+        for scale in scales:
+            target = obj_file if scale == 1 else build_scaled_obj(obj_file, scale, work_dir / f"{folder.name}_x{scale}.obj")
+            for bench in ("analyze_obj_structure", "parse_obj_file", "load_obj", "weld_mesh"):
+                cases.append({"bench": bench, "sample": folder.name, "scale": scale, "path": str(target)})
+            # 캐시는 측정 프로세스 밖에서 미리 생성 (RSS에 파싱 비용이 섞이지 않도록)
+            cases.append({"bench": "load_mesh_cache", "sample": folder.name, "scale": scale, "path": str(target),
+                          "cache_of": str(target), "cache": str(work_dir / f"{folder.name}_x{scale}.meshcache")})
+        cases.append({"bench": "body_part_mapping", "sample": folder.name, "scale": 1, "path": str(obj_file)})
+
+        mtl_file = folder / "avatar.mtl"
+        if mtl_file.exists():
+            cases.append({"bench": "parse_mtl_file", "sample": folder.name, "scale": 1, "path": str(mtl_file)})
+
+    # 그룹 이름 + 흔한 액세서리 이름을 섞어 10,000번 분류
+    extra_names = ["Handle", "Hair_Accessory", "LeftArm", "RightLowerLeg", "MeshPart", "Hat1", "Torso"]
+    names = (group_names + extra_names) * (10000 // max(1, len(group_names + extra_names)) + 1)
+    cases.append({"bench": "classify_body_part", "sample": "group_names", "scale": 1, "names": names[:10000]})
+
+    for case in cases:
+        case["repeat"] = repeat
+        case["work_dir"] = str(work_dir)
+    return cases
+
+
+def case_key(result: Dict) -> str:
+    return f"{result['bench']}[{result['sample']} x{result['scale']}]"
+
+
+def compare(results: List[Dict], baseline_path: Path):
+    """저장된 기준선과 비교 출력"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {case_key(r): r for r in json.load(f)["results"]}
+
+    print(f"\n📊 기준선 비교: {baseline_path}")
+    for result in results:
+        base = baseline.get(case_key(result))
+        if not base:
+            print(f"   ➕ {case_key(result):<55} (새 케이스)")
+            continue
+        ratio = result["best_seconds"] / base["best_seconds"] if base["best_seconds"] else 0
+        marker = "🟢" if ratio < 0.95 else ("🔴" if ratio > 1.05 else "⚪")
+        print(f"   {marker} {case_key(result):<55} {ratio:>6.2f}x  "
+              f"({base['best_seconds'] * 1000:.2f}ms → {result['best_seconds'] * 1000:.2f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OBJ/MTL 파서 마이크로 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5, help="케이스별 반복 횟수 (기본값: 5)")
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)), help="합성 OBJ 배율 (기본값: 1,10,100)")
+    parser.add_argument("--filter", default="", help="벤치마크 이름 필터 (부분 일치)")
+    parser.add_argument("--save", help="결과를 기준선 JSON으로 저장")
+    parser.add_argument("--compare", help="비교할 기준선 JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--build-cache", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_run_case(json.loads(args.worker))))
+        return
+    if args.build_cache:
+        from avatar_mesh import load_obj
+        from mesh_cache import save_mesh_cache
+        save_mesh_cache(load_obj(Path(args.build_cache[0])), Path(args.build_cache[1]))
+        return
+
+    print("=== OBJ/MTL 파서 마이크로 벤치마크 ===\n")
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="bench_parsers_") as tmp:
+        cases = [c for c in build_cases(Path(tmp), args.repeat, scales) if args.filter in c["bench"]]
+        for case in cases:
+            if "cache_of" in case:
+                # 부모 프로세스의 최대 RSS는 자식에 상속되므로 캐시 생성도 별도 프로세스에서 수행
+                subprocess.run([sys.executable, __file__, "--build-cache", case["cache_of"], case["cache"]],
+                               cwd=Path(__file__).parent, check=True)
+            result = run_case_subprocess(case)
+            result.update({"bench": case["bench"], "sample": case["sample"], "scale": case["scale"]})
+            results.append(result)
+
+            ns_line = f"{result['ns_per_line']:>9,.0f} ns/line" if result["ns_per_line"] else " " * 17
+            mbps = f"{result['mb_per_second']:>7.2f} MB/s" if result["mb_per_second"] else " " * 12
+            rss = f"{result['peak_rss_kb'] / 1024:>7.1f} MB RSS" if result["peak_rss_kb"] else ""
+            print(f"⏱️ {case_key(result):<55} {result['best_seconds'] * 1000:>9.2f}ms {ns_line} {mbps} {rss}")
+
+    if args.compare:
+        compare(results, Path(args.compare))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n📁 기준선 저장: {args.save}")
+
+
+if __name__ == "__main__":
+    main()
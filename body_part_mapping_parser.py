@@ -9,6 +9,8 @@ from pathlib import Path
 import time
 from typing import Dict, List, Tuple
 
+from mesh_stats import avatar_group_stats, format_group_stats, merge_group_stats
+
 class BodyPartMapper:
     """바디 파트 매핑 클래스"""
     
@@ -73,8 +75,14 @@ class BodyPartMapper:
             "Accessory Handle": "액세서리 핸들 (도구, 무기 등의 부착점)"
         }
     
-    def parse_avatar_package(self, package_path: Path) -> Dict:
-        """아바타 패키지에서 바디 파트 정보 추출"""
+    def parse_avatar_package(self, package_path: Path, compute_stats: bool = False) -> Dict:
+        """
+        아바타 패키지에서 바디 파트 정보 추출
+
+        Args:
+            package_path (Path): 아바타 패키지 폴더
+            compute_stats (bool): metadata.json에 그룹 통계가 없으면 avatar.obj에서 계산
+        """
         json_file = package_path / "COMPLETE_AVATAR_PACKAGE.json"
         
         if not json_file.exists():
@@ -101,13 +109,41 @@ class BodyPartMapper:
                 "obj_path": obj_structure.get("file_path"),
                 "vertices": obj_structure.get("vertices", 0),
                 "faces": obj_structure.get("faces", 0),
-                "groups": groups
+                "groups": groups,
+                "group_stats": self.load_group_stats(package_path, compute_stats)
             }
             
         except Exception as e:
             print(f"❌ 패키지 파싱 오류: {e}")
             return {}
     
+    def load_group_stats(self, package_path: Path, compute_missing: bool = False) -> Dict[str, Dict]:
+        """
+        패키지의 그룹별 기하 통계 로드 (3D_Model/metadata.json 기준)
+
+        Args:
+            package_path (Path): 아바타 패키지 폴더
+            compute_missing (bool): metadata.json에 통계가 없으면 avatar.obj에서 계산 (NumPy 필요)
+
+        Returns:
+            Dict[str, Dict]: 그룹 이름 → 통계 (같은 이름의 구간은 합산, 3D 모델이 없으면 빈 딕셔너리)
+        """
+        model_folder = package_path / "3D_Model"
+        group_stats = None
+
+        metadata_file = model_folder / "metadata.json"
+        if metadata_file.exists():
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    group_stats = json.load(f).get("extended_avatar_info", {}).get("group_stats")
+            except (OSError, ValueError):
+                group_stats = None
+
+        if group_stats is None and compute_missing and (model_folder / "avatar.obj").exists():
+            group_stats = avatar_group_stats(model_folder / "avatar.obj")
+
+        return merge_group_stats(group_stats or [])
+    
     def create_body_part_mapping_text(self, avatar_data: Dict, output_path: Path):
         """바디 파트 매핑 텍스트 파일 생성"""
         
@@ -143,6 +179,8 @@ class BodyPartMapper:
         accessory_parts = []
         unknown_parts = []
         
+        group_stats = avatar_data.get('group_stats') or {}
+        
         for group in groups:
             group_name = group.get('name', '')
             line_num = group.get('line', 0)
@@ -155,7 +193,8 @@ class BodyPartMapper:
                 'line_num': line_num,
                 'body_part': body_part,
                 'color': color,
-                'description': description
+                'description': description,
+                'stats': group_stats.get(group_name)
             }
             
             if "Head" in body_part or "Face" in body_part:
@@ -177,42 +216,60 @@ class BodyPartMapper:
             content += "─" * 80 + "\n"
             for part in head_parts:
                 content += f"{part['color']} {part['group_name']:<12} → {part['body_part']:<20} (라인: {part['line_num']:,})\n"
-                content += f"   💡 {part['description']}\n\n"
+                content += f"   💡 {part['description']}\n"
+                if part['stats']:
+                    content += f"   📐 {format_group_stats(part['stats'])}\n"
+                content += "\n"
         
         if torso_parts:
             content += "🟢 TORSO REGION\n"
             content += "─" * 80 + "\n"
             for part in torso_parts:
                 content += f"{part['color']} {part['group_name']:<12} → {part['body_part']:<20} (라인: {part['line_num']:,})\n"
-                content += f"   💡 {part['description']}\n\n"
+                content += f"   💡 {part['description']}\n"
+                if part['stats']:
+                    content += f"   📐 {format_group_stats(part['stats'])}\n"
+                content += "\n"
         
         if arm_parts:
             content += "🔵 ARM & HAND REGION\n"
             content += "─" * 80 + "\n"
             for part in arm_parts:
                 content += f"{part['color']} {part['group_name']:<12} → {part['body_part']:<20} (라인: {part['line_num']:,})\n"
-                content += f"   💡 {part['description']}\n\n"
+                content += f"   💡 {part['description']}\n"
+                if part['stats']:
+                    content += f"   📐 {format_group_stats(part['stats'])}\n"
+                content += "\n"
         
         if leg_parts:
             content += "🟣 LEG & FOOT REGION\n"
             content += "─" * 80 + "\n"
             for part in leg_parts:
                 content += f"{part['color']} {part['group_name']:<12} → {part['body_part']:<20} (라인: {part['line_num']:,})\n"
-                content += f"   💡 {part['description']}\n\n"
+                content += f"   💡 {part['description']}\n"
+                if part['stats']:
+                    content += f"   📐 {format_group_stats(part['stats'])}\n"
+                content += "\n"
         
         if accessory_parts:
             content += "⭐ ACCESSORY REGION\n"
             content += "─" * 80 + "\n"
             for part in accessory_parts:
                 content += f"{part['color']} {part['group_name']:<12} → {part['body_part']:<20} (라인: {part['line_num']:,})\n"
-                content += f"   💡 {part['description']}\n\n"
+                content += f"   💡 {part['description']}\n"
+                if part['stats']:
+                    content += f"   📐 {format_group_stats(part['stats'])}\n"
+                content += "\n"
         
         if unknown_parts:
             content += "❓ UNKNOWN REGION\n"
             content += "─" * 80 + "\n"
             for part in unknown_parts:
                 content += f"{part['color']} {part['group_name']:<12} → {part['body_part']:<20} (라인: {part['line_num']:,})\n"
-                content += f"   💡 {part['description']}\n\n"
+                content += f"   💡 {part['description']}\n"
+                if part['stats']:
+                    content += f"   📐 {format_group_stats(part['stats'])}\n"
+                content += "\n"
         
         content += """
 ═══════════════════════════════════════════════════════════════════════════════════
@@ -288,7 +345,7 @@ def main():
     print(f"📂 패키지 분석: {package_path}")
     
     # 아바타 데이터 추출
-    avatar_data = mapper.parse_avatar_package(package_path)
+    avatar_data = mapper.parse_avatar_package(package_path, compute_stats=True)
     
     if not avatar_data:
         print("❌ 아바타 데이터 추출 실패")
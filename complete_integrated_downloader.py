@@ -7,17 +7,20 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from roblox_avatar_downloader import RobloxAvatarDownloader
 import json
 from pathlib import Path
 import time
-import shutil
+
+from analysis_stream import find_user_analysis
+from avatar_catalog import catalog_folder
+from file_materializer import format_materialize_counts, materialize_mode_for, materialize_tree
 
 def create_integrated_avatar_package(username: str):
     """통합 아바타 패키지 생성"""
     print(f"\n🎯 '{username}' 완전한 아바타 패키지 생성 시작...")
     
-    # 1. 기본 다운로더로 2D 썸네일 다운로드
+    # 1. 기본 다운로더로 2D 썸네일 다운로드 (분석 함수만 쓸 때는 2D 스택을 불러오지 않음)
+    from roblox_avatar_downloader import RobloxAvatarDownloader
     downloader = RobloxAvatarDownloader("final_integrated")
     
     print("👤 사용자 정보 조회...")
@@ -75,28 +78,17 @@ def copy_existing_3d_model(user_id: int, username: str) -> bool:
             if obj_file.exists():
                 print(f"   ✅ 기존 3D 모델 발견: {folder_path}")
                 
-                # 새 위치로 복사
+                # 새 위치에 배치 (final_integrated 설정에 따라 reflink → 하드링크 → 복사)
                 target_folder = Path(f"final_integrated/{username}_{user_id}/3D_Model")
-                target_folder.mkdir(parents=True, exist_ok=True)
-                
-                # 파일들 복사
-                for file in folder.iterdir():
-                    if file.is_file():
-                        shutil.copy2(file, target_folder / file.name)
-                    elif file.is_dir() and file.name == "textures":
-                        target_textures = target_folder / "textures"
-                        target_textures.mkdir(exist_ok=True)
-                        for texture in file.iterdir():
-                            if texture.is_file():
-                                shutil.copy2(texture, target_textures / texture.name)
+                counts = materialize_tree(folder, target_folder, materialize_mode_for(Path("final_integrated")))
                 
-                print(f"   ✅ 3D 모델 복사 완료: {target_folder}")
+                print(f"   ✅ 3D 모델 복사 완료: {target_folder} ({format_materialize_counts(counts)})")
                 return True
     
     print("   ⚠️ 기존 3D 모델을 찾을 수 없음")
     return False
 
-def collect_extended_info(downloader: RobloxAvatarDownloader, user_id: int) -> dict:
+def collect_extended_info(downloader: "RobloxAvatarDownloader", user_id: int) -> dict:
     """확장 아바타 정보 수집"""
     extended_info = {
         "collected_at": time.strftime("%Y-%m-%d %H:%M:%S"),
@@ -142,22 +134,14 @@ def analyze_existing_attachments(user_id: int, username: str) -> dict:
         "attachment_data": None
     }
     
-    # 기존 OBJ 분석 데이터 찾기
-    analysis_file = Path("obj_attachment_analysis.json")
-    if analysis_file.exists():
-        try:
-            with open(analysis_file, 'r', encoding='utf-8') as f:
-                analysis_data = json.load(f)
-            
-            for folder_data in analysis_data.get("avatar_folders", []):
-                if f"{username}_{user_id}" in folder_data.get("folder_name", ""):
-                    for obj_data in folder_data.get("obj_files", []):
-                        attachment_info["obj_structure"] = obj_data
-                        print("   ✅ OBJ 구조 분석 데이터 발견")
-                        break
-                    break
-        except Exception as e:
-            print(f"   ❌ OBJ 분석 데이터 읽기 오류: {e}")
+    # 기존 OBJ 분석 데이터 찾기 (유저 ID 인덱스로 해당 레코드만 seek - 결과 파일 크기와 무관)
+    try:
+        folder_data = find_user_analysis(user_id, username)
+        if folder_data and folder_data.get("obj_files"):
+            attachment_info["obj_structure"] = folder_data["obj_files"][0]
+            print("   ✅ OBJ 구조 분석 데이터 발견")
+    except Exception as e:
+        print(f"   ❌ OBJ 분석 데이터 읽기 오류: {e}")
     
     # 기존 Attachment 데이터 찾기
     attachment_file = Path(f"attachment_data/{username}_{user_id}_attachments.json")
@@ -258,6 +242,7 @@ def create_complete_metadata(user_id: int, username: str, user_info: dict,
     
     print(f"   ✅ 통합 메타데이터 저장: {metadata_file}")
     print(f"   ✅ README 생성: {readme_file}")
+    catalog_folder(user_folder)
 
 def main():
     print("🎯 완전 통합 다운로더 - 모든 Attachment 정보 통합")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+File Inventory
+패키지 폴더 파일 목록 생성 - os.scandir의 DirEntry(파일 종류 캐시)로 파일마다 stat 한 번만 호출하고,
+다운로드 단계가 기록한 파일 목록(FileManifest)이 있으면 폴더 순회 없이 목록을 만듦
+
+선택적으로 스레드 풀에서 sha256을 계산해 무결성 확인용으로 기록
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from avatar_catalog import file_sha256
+
+THUMBNAIL_SUFFIXES = {'.png', '.jpg', '.jpeg'}
+MODEL_SUFFIXES = {'.obj', '.mtl'}
+
+
+class FileManifest:
+    """다운로드 단계에서 기록한 파일 목록 (경로 → 크기, 기록 순서 유지)"""
+
+    def __init__(self):
+        self.files: Dict[Path, Optional[int]] = {}
+
+    def add(self, path: Path, size: Optional[int] = None):
+        """
+        Args:
+            path (Path): 기록한 파일
+            size (int): 파일 크기 (모르면 None - 목록 생성 시 stat)
+        """
+        self.files[Path(path).absolute()] = size
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __iter__(self) -> Iterator[Tuple[Path, Optional[int]]]:
+        return iter(self.files.items())
+
+
+def scan_files(root: Path) -> Iterator[Tuple[Path, int]]:
+    """
+    폴더의 모든 파일 (경로, 크기) - Path.rglob("*")와 같은 순서
+
+    디렉터리마다 scandir 한 번, 파일마다 stat 한 번 (파일 종류는 DirEntry 캐시 사용)
+    """
+    subdirs: List[str] = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_file():
+                yield Path(entry.path), entry.stat().st_size
+            elif entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    for subdir in subdirs:
+        yield from scan_files(Path(subdir))
+
+
+def _category(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in THUMBNAIL_SUFFIXES:
+        return "3d_model" if 'texture' in path.name.lower() else "thumbnails"
+    if suffix in MODEL_SUFFIXES:
+        return "3d_model"
+    if suffix == '.json':
+        return "metadata"
+    return "other"
+
+
+def build_file_inventory(user_folder: Path, known_files: Optional[Iterable[Tuple[Path, Optional[int]]]] = None,
+                         hash_workers: int = 0) -> Dict[str, List[Dict]]:
+    """
+    유저 폴더 파일 목록 (thumbnails / 3d_model / metadata / other)
+
+    Args:
+        user_folder (Path): 유저 패키지 폴더
+        known_files (Iterable): 다운로드 단계가 기록한 (경로, 크기) 목록 (FileManifest) - 있으면 폴더를 순회하지 않음
+        hash_workers (int): 0보다 크면 이 수의 스레드로 sha256 계산해 "sha256" 필드 추가
+
+    Returns:
+        Dict[str, List[Dict]]: 분류별 {"path", "size", "extension"} 목록
+    """
+    inventory = {
+        "thumbnails": [],
+        "3d_model": [],
+        "metadata": [],
+        "other": []
+    }
+
+    user_folder = Path(user_folder)
+    if not user_folder.exists():
+        return inventory
+
+    if known_files is None:
+        files = list(scan_files(user_folder))
+    else:
+        root = user_folder.absolute()
+        files = []
+        for path, size in known_files:
+            path = Path(path).absolute()
+            if path.is_relative_to(root):
+                files.append((user_folder / path.relative_to(root), size if size is not None else path.stat().st_size))
+
+    hashes: Dict[Path, str] = {}
+    if hash_workers > 0 and files:
+        with ThreadPoolExecutor(max_workers=hash_workers) as pool:
+            paths = [path for path, _ in files]
+            hashes = dict(zip(paths, pool.map(file_sha256, paths)))
+
+    for file_path, size in files:
+        file_info = {
+            "path": str(file_path.relative_to(user_folder)),
+            "size": size,
+            "extension": file_path.suffix.lower()
+        }
+        if file_path in hashes:
+            file_info["sha256"] = hashes[file_path]
+        inventory[_category(file_path)].append(file_info)
+
+    return inventory
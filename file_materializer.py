@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+File Materializer
+이미 받은 3D 파일을 패키지 폴더로 옮길 때 내용을 복사하지 않고 reflink → 하드링크 → 복사 순으로 배치
+
+    reflink   copy-on-write 복제 (Btrfs/XFS 등 지원 파일 시스템) - 독립 파일이지만 블록 공유
+    hardlink  같은 inode를 가리키는 링크 - OBJ/MTL/텍스처처럼 제자리에서 수정하지 않는 콘텐츠 파일만
+    copy      shutil.copy2 (다른 파일 시스템이거나 링크가 불가능할 때)
+
+모드는 출력 루트 폴더별 설정 파일(.materialize.json)로 지정하고,
+없으면 ROBLOX_MATERIALIZE 환경 변수, 그것도 없으면 auto(reflink → hardlink → copy)
+"""
+
+import errno
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from avatar_logging import get_logger
+
+logger = get_logger(__name__)
+
+MATERIALIZE_MODES = ("auto", "reflink", "hardlink", "copy")
+DEFAULT_MODE = "auto"
+CONFIG_NAME = ".materialize.json"
+
+# 하드링크해도 되는 콘텐츠 파일 (metadata.json / README 등 나중에 다시 쓰는 파일은 항상 독립 파일로)
+LINKABLE_SUFFIXES = {".obj", ".mtl", ".png", ".jpg", ".jpeg", ".bmp", ".tga", ".webp", ".gif", ".glb"}
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+
+def reflink_file(src: Path, dst: Path):
+    """
+    copy-on-write 복제 (지원하지 않는 파일 시스템/플랫폼이면 OSError)
+
+    Args:
+        src (Path): 원본 파일
+        dst (Path): 새로 만들 파일 (이미 있으면 실패)
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink는 Linux에서만 지원", str(dst))
+    import fcntl
+
+    with open(src, 'rb') as source, open(dst, 'xb') as target:
+        try:
+            fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+        except OSError:
+            target.close()
+            os.unlink(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+def _tmp_path(dst: Path) -> Path:
+    return dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+
+
+def _place(src: Path, dst: Path, method: str):
+    """임시 이름으로 만든 뒤 교체 (기존 dst가 다른 파일의 하드링크여도 그 내용을 건드리지 않음)"""
+    tmp_path = _tmp_path(dst)
+    if tmp_path.exists():
+        tmp_path.unlink()
+    try:
+        if method == "reflink":
+            reflink_file(src, tmp_path)
+        elif method == "hardlink":
+            os.link(src, tmp_path)
+        else:
+            shutil.copy2(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+
+def materialize_file(src: Path, dst: Path, mode: str = DEFAULT_MODE) -> str:
+    """
+    파일 하나를 모드에 따라 배치
+
+    Args:
+        src (Path): 원본 파일
+        dst (Path): 대상 경로 (있으면 교체)
+        mode (str): auto, reflink, hardlink, copy
+
+    Returns:
+        str: 실제로 사용한 방법 (reflink, hardlink, copy, existing)
+    """
+    if mode not in MATERIALIZE_MODES:
+        raise ValueError(f"알 수 없는 배치 모드: {mode} ({', '.join(MATERIALIZE_MODES)})")
+    src, dst = Path(src), Path(dst)
+    if dst.exists() and os.path.samefile(src, dst):
+        return "existing"
+
+    methods = []
+    if mode in ("auto", "reflink"):
+        methods.append("reflink")
+    if mode in ("auto", "hardlink") and src.suffix.lower() in LINKABLE_SUFFIXES:
+        methods.append("hardlink")
+
+    for method in methods:
+        try:
+            _place(src, dst, method)
+            return method
+        except OSError as e:
+            logger.debug("   %s 불가 (%s) - 다음 방법 시도: %s", method, e.strerror or e, dst.name)
+    _place(src, dst, "copy")
+    return "copy"
+
+
+def materialize_tree(src_folder: Path, dst_folder: Path, mode: str = DEFAULT_MODE,
+                     subfolders: Iterable[str] = ("textures",), manifest=None) -> Dict[str, int]:
+    """
+    폴더의 파일들과 지정한 하위 폴더(기본값: textures/)의 파일들을 배치
+
+    Args:
+        manifest (FileManifest): 배치한 파일을 기록할 목록 (패키지 파일 목록용)
+
+    Returns:
+        Dict[str, int]: 방법별 파일 수
+    """
+    src_folder, dst_folder = Path(src_folder), Path(dst_folder)
+    dst_folder.mkdir(parents=True, exist_ok=True)
+    subfolders = set(subfolders)
+    counts: Dict[str, int] = {}
+    for entry in src_folder.iterdir():
+        if entry.is_file():
+            method = materialize_file(entry, dst_folder / entry.name, mode)
+            counts[method] = counts.get(method, 0) + 1
+            if manifest is not None:
+                manifest.add(dst_folder / entry.name)
+        elif entry.is_dir() and entry.name in subfolders:
+            for method, count in materialize_tree(entry, dst_folder / entry.name, mode, (), manifest).items():
+                counts[method] = counts.get(method, 0) + count
+    return counts
+
+
+def materialize_mode_for(output_root: Path) -> str:
+    """출력 루트의 배치 모드 (.materialize.json → ROBLOX_MATERIALIZE → auto)"""
+    config_file = Path(output_root) / CONFIG_NAME
+    mode: Optional[str] = None
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            mode = json.load(f).get("mode")
+    except (OSError, ValueError):
+        pass
+    mode = mode or os.environ.get("ROBLOX_MATERIALIZE") or DEFAULT_MODE
+    if mode not in MATERIALIZE_MODES:
+        logger.warning("⚠️ 알 수 없는 배치 모드 '%s' - %s 사용", mode, DEFAULT_MODE)
+        return DEFAULT_MODE
+    return mode
+
+
+def set_materialize_mode(output_root: Path, mode: str):
+    """출력 루트의 배치 모드 저장 (이후 이 루트에 만드는 패키지에 적용)"""
+    if mode not in MATERIALIZE_MODES:
+        raise ValueError(f"알 수 없는 배치 모드: {mode} ({', '.join(MATERIALIZE_MODES)})")
+    output_root = Path(output_root)
+    output_root.mkdir(parents=True, exist_ok=True)
+    with open(output_root / CONFIG_NAME, 'w', encoding='utf-8') as f:
+        json.dump({"mode": mode}, f)
+
+
+def format_materialize_counts(counts: Dict[str, int]) -> str:
+    """방법별 파일 수 요약 (예: hardlink 5, copy 2)"""
+    return ", ".join(f"{method} {count}" for method, count in sorted(counts.items())) or "파일 없음"
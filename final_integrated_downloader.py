@@ -21,12 +21,29 @@ from roblox_avatar_downloader import RobloxAvatarDownloader
 import json
 from pathlib import Path
 import time
+from typing import Optional
+
+from analysis_stream import find_user_analysis
+from avatar_catalog import catalog_folder
+from file_inventory import FileManifest, build_file_inventory
+from file_materializer import (format_materialize_counts, materialize_mode_for, materialize_tree,
+                               set_materialize_mode)
 
 class FinalIntegratedDownloader(RobloxAvatarDownloader):
     """최종 통합 다운로더 (모든 Attachment 정보 포함)"""
     
-    def __init__(self, download_folder: str = "final_integrated"):
+    def __init__(self, download_folder: str = "final_integrated", materialize_mode: Optional[str] = None,
+                 inventory_hash_workers: int = 0):
+        """
+        Args:
+            download_folder (str): 출력 루트 폴더
+            materialize_mode (str): 3D 파일 배치 모드 (auto, reflink, hardlink, copy) - 지정하면 이 루트에 저장
+            inventory_hash_workers (int): 0보다 크면 파일 목록에 sha256 기록 (스레드 수)
+        """
         super().__init__(download_folder)
+        self.inventory_hash_workers = inventory_hash_workers
+        if materialize_mode:
+            set_materialize_mode(self.download_folder, materialize_mode)
         print("🎯 최종 통합 다운로더 초기화 완료")
         print("   ✅ 2D 썸네일 다운로드")
         print("   ✅ 3D 모델 다운로드 (기존 작동 확인)")
@@ -40,7 +57,7 @@ class FinalIntegratedDownloader(RobloxAvatarDownloader):
         
         # 1. 사용자 정보 가져오기
         print("\n� 사용자 정보 조회...")
-        user_id = self.get_user_id(user_input)
+        user_id = self.resolve_user_input(user_input)
         if not user_id:
             print(f"❌ 사용자 '{user_input}' 정보 조회 실패")
             return False
@@ -53,6 +70,16 @@ class FinalIntegratedDownloader(RobloxAvatarDownloader):
         username = user_info['name']
         print(f"✅ 사용자 정보: {user_info.get('displayName')} (@{username}, ID: {user_id})")
         
+        # 새 패키지 폴더면 이번 실행에서 기록한 파일만 있으므로 파일 목록을 기록 목록으로 생성
+        user_folder = self.download_folder / f"{username}_{user_id}"
+        self.manifest = None if user_folder.exists() else FileManifest()
+        try:
+            return self._build_package(user_id, username, user_info)
+        finally:
+            self.manifest = None
+    
+    def _build_package(self, user_id: int, username: str, user_info: dict) -> bool:
+        """패키지 구성 (2D → 3D → 확장 정보 → Attachment → 통합 메타데이터)"""
         # 2. 2D 썸네일 다운로드
         print("\n📸 2D 썸네일 다운로드...")
         success_2d = self.download_user_avatars(user_id, include_3d=False)
@@ -101,23 +128,12 @@ class FinalIntegratedDownloader(RobloxAvatarDownloader):
                     if obj_file.exists():
                         print(f"   ✅ 기존 3D 모델 발견: {folder_path}")
                         
-                        # 새로운 위치로 복사
+                        # 새로운 위치에 배치 (출력 루트 설정에 따라 reflink → 하드링크 → 복사)
                         new_3d_folder = self.download_folder / f"{username}_{user_id}" / "3D_Model"
-                        new_3d_folder.mkdir(parents=True, exist_ok=True)
+                        counts = materialize_tree(folder, new_3d_folder, materialize_mode_for(self.download_folder),
+                                                  manifest=self.manifest)
                         
-                        # 파일들 복사
-                        import shutil
-                        for file in folder.iterdir():
-                            if file.is_file():
-                                shutil.copy2(file, new_3d_folder / file.name)
-                            elif file.is_dir() and file.name == "textures":
-                                new_textures = new_3d_folder / "textures"
-                                new_textures.mkdir(exist_ok=True)
-                                for texture in file.iterdir():
-                                    if texture.is_file():
-                                        shutil.copy2(texture, new_textures / texture.name)
-                        
-                        print(f"   ✅ 3D 모델 복사 완료: {new_3d_folder}")
+                        print(f"   ✅ 3D 모델 복사 완료: {new_3d_folder} ({format_materialize_counts(counts)})")
                         return True
             
             print("   ⚠️ 기존 3D 모델을 찾을 수 없음")
@@ -173,23 +189,14 @@ class FinalIntegratedDownloader(RobloxAvatarDownloader):
             "attachment_data": None
         }
         
-        # 1. 기존 OBJ 분석 데이터 찾기
-        existing_analysis = Path("obj_attachment_analysis.json")
-        if existing_analysis.exists():
-            try:
-                with open(existing_analysis, 'r', encoding='utf-8') as f:
-                    analysis_data = json.load(f)
-                
-                # 해당 사용자의 OBJ 정보 찾기
-                for folder_data in analysis_data.get("avatar_folders", []):
-                    if f"{username}_{user_id}" in folder_data.get("folder_name", ""):
-                        for obj_data in folder_data.get("obj_files", []):
-                            attachment_info["obj_structure"] = obj_data
-                            print("   ✅ OBJ 구조 분석 데이터 발견")
-                            break
-                        break
-            except Exception as e:
-                print(f"   ❌ OBJ 분석 데이터 읽기 오류: {e}")
+        # 1. 기존 OBJ 분석 데이터 찾기 (유저 ID 인덱스로 해당 레코드만 seek - 결과 파일 크기와 무관)
+        try:
+            folder_data = find_user_analysis(user_id, username)
+            if folder_data and folder_data.get("obj_files"):
+                attachment_info["obj_structure"] = folder_data["obj_files"][0]
+                print("   ✅ OBJ 구조 분석 데이터 발견")
+        except Exception as e:
+            print(f"   ❌ OBJ 분석 데이터 읽기 오류: {e}")
         
         # 2. 기존 Attachment 데이터 찾기
         attachment_file = Path(f"attachment_data/{username}_{user_id}_attachments.json")
@@ -220,7 +227,7 @@ class FinalIntegratedDownloader(RobloxAvatarDownloader):
             },
             "extended_avatar_info": extended_info,
             "attachment_info": attachment_info,
-            "file_inventory": self.create_file_inventory(user_folder)
+            "file_inventory": self.create_file_inventory(user_folder, self.manifest, self.inventory_hash_workers)
         }
         
         # 메타데이터 저장
@@ -232,41 +239,12 @@ class FinalIntegratedDownloader(RobloxAvatarDownloader):
         self.create_final_readme(user_folder, final_metadata)
         
         print(f"   ✅ 통합 메타데이터 저장: {metadata_file}")
+        catalog_folder(user_folder)
     
-    def create_file_inventory(self, user_folder: Path) -> dict:
-        """파일 목록 생성"""
-        inventory = {
-            "thumbnails": [],
-            "3d_model": [],
-            "metadata": [],
-            "other": []
-        }
-        
-        if not user_folder.exists():
-            return inventory
-        
-        for file_path in user_folder.rglob("*"):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(user_folder)
-                file_info = {
-                    "path": str(relative_path),
-                    "size": file_path.stat().st_size,
-                    "extension": file_path.suffix.lower()
-                }
-                
-                if file_path.suffix.lower() in ['.png', '.jpg', '.jpeg']:
-                    if 'texture' in file_path.name.lower():
-                        inventory["3d_model"].append(file_info)
-                    else:
-                        inventory["thumbnails"].append(file_info)
-                elif file_path.suffix.lower() in ['.obj', '.mtl']:
-                    inventory["3d_model"].append(file_info)
-                elif file_path.suffix.lower() == '.json':
-                    inventory["metadata"].append(file_info)
-                else:
-                    inventory["other"].append(file_info)
-        
-        return inventory
+    def create_file_inventory(self, user_folder: Path, known_files: Optional[FileManifest] = None,
+                              hash_workers: int = 0) -> dict:
+        """파일 목록 생성 (scandir 한 번 순회, 기록 목록이 있으면 순회 생략)"""
+        return build_file_inventory(user_folder, known_files, hash_workers)
     
     def create_final_readme(self, user_folder: Path, metadata: dict):
         """최종 통합 README 생성"""
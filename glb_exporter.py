@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+GLB (Binary glTF 2.0) Exporter
+다운로드된 avatar.obj + avatar.mtl + textures/를 렌더러용 단일 .glb 파일로 변환
+"""
+
+import argparse
+import json
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from avatar_mesh import AvatarMesh, load_mtl, load_texture_hashes, resolve_texture_path
+from mesh_cache import load_avatar_mesh
+from mtl_textures import load_texture_map
+
+GLB_MAGIC = 0x46546C67  # "glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+# glTF 상수
+FLOAT = 5126
+UNSIGNED_INT = 5125
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+IMAGE_MIME_TYPES = {
+    b"\x89PNG\r\n\x1a\n": "image/png",
+    b"\xff\xd8\xff": "image/jpeg",
+}
+
+
+def _pad4(data: bytes, fill: bytes = b"\x00") -> bytes:
+    return data + fill * (-len(data) % 4)
+
+
+def _image_mime_type(path: Path) -> Optional[str]:
+    """파일 시그니처로 glTF 지원 이미지 형식 확인"""
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    for magic, mime in IMAGE_MIME_TYPES.items():
+        if head.startswith(magic):
+            return mime
+    return None
+
+
+def write_glb(output_path: Path, gltf: Dict, binary: bytes) -> Path:
+    """glTF JSON과 바이너리 버퍼를 GLB 컨테이너로 저장"""
+    json_chunk = _pad4(json.dumps(gltf, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), b" ")
+    bin_chunk = _pad4(binary)
+    total = 12 + 8 + len(json_chunk) + (8 + len(bin_chunk) if bin_chunk else 0)
+
+    with open(output_path, 'wb') as f:
+        f.write(struct.pack("<III", GLB_MAGIC, 2, total))
+        f.write(struct.pack("<II", len(json_chunk), CHUNK_JSON))
+        f.write(json_chunk)
+        if bin_chunk:
+            f.write(struct.pack("<II", len(bin_chunk), CHUNK_BIN))
+            f.write(bin_chunk)
+    return output_path
+
+
+def read_glb(glb_path: Path) -> Tuple[Dict, bytes]:
+    """GLB 파일에서 glTF JSON과 바이너리 청크 읽기 (검증/테스트용)"""
+    data = Path(glb_path).read_bytes()
+    magic, version, total = struct.unpack_from("<III", data, 0)
+    if magic != GLB_MAGIC or version != 2 or total != len(data):
+        raise ValueError(f"올바른 GLB 파일이 아닙니다: {glb_path}")
+
+    offset = 12
+    gltf, binary = None, b""
+    while offset < total:
+        length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8:offset + 8 + length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(chunk.decode("utf-8"))
+        elif chunk_type == CHUNK_BIN:
+            binary = chunk
+        offset += 8 + length
+    return gltf, binary
+
+
+class GLBExporter:
+    """OBJ/MTL 아바타 폴더 → GLB 변환기"""
+
+    def __init__(self, embed_textures: bool = True):
+        """
+        Args:
+            embed_textures (bool): 텍스처를 GLB 안에 포함 (False면 상대 경로로 참조)
+        """
+        self.embed_textures = embed_textures
+
+    def build_gltf(self, mesh: AvatarMesh, materials: Dict[str, Dict[str, str]], avatar_folder: Path,
+                   output_dir: Path, name: str = "avatar") -> Tuple[Dict, bytes]:
+        """
+        메시와 재질로 glTF JSON + 바이너리 버퍼 생성
+
+        모든 그룹이 위치/법선/UV 버퍼를 공유하고, OBJ 그룹마다 하나의 primitive를 가짐
+
+        Returns:
+            Tuple[Dict, bytes]: (glTF JSON, BIN 청크)
+        """
+        texture_hashes = load_texture_hashes(avatar_folder)
+        texture_map = load_texture_map(avatar_folder)
+        gltf = {
+            "asset": {"version": "2.0", "generator": "Roblox-hook glb_exporter"},
+            "scene": 0,
+            "scenes": [{"nodes": [0]}],
+            "nodes": [{"name": name, "mesh": 0}],
+            "buffers": [],
+            "bufferViews": [],
+            "accessors": [],
+            "materials": [],
+            "meshes": [],
+        }
+        chunks: List[bytes] = []
+        offset = 0
+
+        def add_view(data: bytes, target: Optional[int] = None) -> int:
+            nonlocal offset
+            view = {"buffer": 0, "byteOffset": offset, "byteLength": len(data)}
+            if target:
+                view["target"] = target
+            gltf["bufferViews"].append(view)
+            padded = _pad4(data)
+            chunks.append(padded)
+            offset += len(padded)
+            return len(gltf["bufferViews"]) - 1
+
+        def add_accessor(view: int, component: int, count: int, kind: str, byte_offset: int = 0, **extra) -> int:
+            accessor = {"bufferView": view, "componentType": component, "count": count, "type": kind}
+            if byte_offset:
+                accessor["byteOffset"] = byte_offset
+            accessor.update(extra)
+            gltf["accessors"].append(accessor)
+            return len(gltf["accessors"]) - 1
+
+        # 정점 속성 (float32, 모든 primitive 공유)
+        positions = np.ascontiguousarray(mesh.positions, dtype="<f4")
+        attributes = {"POSITION": add_accessor(
+            add_view(positions.tobytes(), ARRAY_BUFFER), FLOAT, len(positions), "VEC3",
+            min=positions.min(axis=0).tolist() if len(positions) else [0, 0, 0],
+            max=positions.max(axis=0).tolist() if len(positions) else [0, 0, 0])}
+        if mesh.normals is not None:
+            normals = np.ascontiguousarray(mesh.normals, dtype="<f4")
+            attributes["NORMAL"] = add_accessor(add_view(normals.tobytes(), ARRAY_BUFFER), FLOAT, len(normals), "VEC3")
+        if mesh.uvs is not None:
+            # OBJ는 아래쪽 원점, glTF는 위쪽 원점
+            uvs = np.ascontiguousarray(mesh.uvs, dtype="<f4").copy()
+            uvs[:, 1] = 1.0 - uvs[:, 1]
+            attributes["TEXCOORD_0"] = add_accessor(add_view(uvs.tobytes(), ARRAY_BUFFER), FLOAT, len(uvs), "VEC2")
+
+        # 인덱스 (uint32, 하나의 bufferView를 그룹별 accessor가 나눠 사용)
+        indices = np.ascontiguousarray(mesh.indices, dtype="<u4")
+        index_view = add_view(indices.tobytes(), ELEMENT_ARRAY_BUFFER)
+
+        # 재질과 텍스처
+        material_index: Dict[str, int] = {}
+        image_index: Dict[Path, int] = {}
+
+        def texture_for(value: Optional[str]) -> Optional[int]:
+            if not value:
+                return None
+            path = resolve_texture_path(value, avatar_folder, texture_hashes, texture_map)
+            if path is None:
+                return None
+            mime = _image_mime_type(path)
+            if mime is None:
+                return None
+            if path not in image_index:
+                if self.embed_textures:
+                    image = {"bufferView": add_view(path.read_bytes()), "mimeType": mime}
+                else:
+                    image = {"uri": Path(os.path.relpath(path, output_dir)).as_posix()}
+                image["name"] = path.name
+                gltf.setdefault("images", []).append(image)
+                gltf.setdefault("samplers", [{"magFilter": 9729, "minFilter": 9987, "wrapS": 10497, "wrapT": 10497}])
+                gltf.setdefault("textures", []).append({"sampler": 0, "source": len(gltf["images"]) - 1})
+                image_index[path] = len(gltf["textures"]) - 1
+            return image_index[path]
+
+        def material_for(material_name: Optional[str]) -> int:
+            material_name = material_name or "default"
+            if material_name in material_index:
+                return material_index[material_name]
+
+            props = materials.get(material_name, {})
+            kd = [float(x) for x in props.get("Kd", "1 1 1").split()[:3]]
+            alpha = float(props.get("d", "1"))
+            shininess = min(max(float(props.get("Ns", "0")), 0.0), 1000.0)
+            pbr = {
+                "baseColorFactor": kd + [alpha],
+                "metallicFactor": 0.0,
+                "roughnessFactor": round(1.0 - (shininess / 1000.0) ** 0.5, 4),
+            }
+            material = {"name": material_name, "pbrMetallicRoughness": pbr, "doubleSided": False}
+
+            texture = texture_for(props.get("map_Kd") or props.get("map_Ka"))
+            if texture is not None:
+                pbr["baseColorTexture"] = {"index": texture, "texCoord": 0}
+            if alpha < 1.0:
+                material["alphaMode"] = "BLEND"
+            elif texture is not None and props.get("map_d"):
+                # 텍스처 알파를 투명도로 사용 (로블록스 액세서리/얼굴 데칼)
+                material["alphaMode"] = "MASK"
+                material["alphaCutoff"] = 0.5
+
+            gltf["materials"].append(material)
+            material_index[material_name] = len(gltf["materials"]) - 1
+            return material_index[material_name]
+
+        primitives = []
+        for group in mesh.groups:
+            group_indices = mesh.group_indices(group)
+            accessor = add_accessor(index_view, UNSIGNED_INT, len(group_indices), "SCALAR",
+                                    byte_offset=group["start"] * 4)
+            primitives.append({
+                "attributes": dict(attributes),
+                "indices": accessor,
+                "material": material_for(group["material"]),
+                "mode": 4,
+                "extras": {"name": group["name"]},
+            })
+        gltf["meshes"].append({"name": name, "primitives": primitives,
+                               "extras": {"groups": [g["name"] for g in mesh.groups]}})
+
+        binary = b"".join(chunks)
+        gltf["buffers"].append({"byteLength": len(binary)})
+        return gltf, binary
+
+    def export_avatar(self, avatar_folder: Path, output_path: Optional[Path] = None, force: bool = True) -> Optional[Path]:
+        """
+        아바타 폴더 하나를 GLB로 변환
+
+        Args:
+            avatar_folder (Path): avatar.obj가 있는 폴더
+            output_path (Path): 저장 경로 (기본값: <폴더>/avatar.glb)
+            force (bool): False면 GLB가 OBJ보다 최신일 때 건너뜀
+
+        Returns:
+            Optional[Path]: 생성된 GLB 경로 (실패 시 None)
+        """
+        avatar_folder = Path(avatar_folder)
+        obj_file = avatar_folder / "avatar.obj"
+        if not obj_file.exists():
+            print(f"   ❌ OBJ 파일 없음: {obj_file}")
+            return None
+
+        output_path = Path(output_path) if output_path else avatar_folder / "avatar.glb"
+        if not force and output_path.exists() and output_path.stat().st_mtime >= obj_file.stat().st_mtime:
+            return output_path
+
+        try:
+            mesh = load_avatar_mesh(obj_file)
+            materials = load_mtl(avatar_folder / "avatar.mtl")
+            gltf, binary = self.build_gltf(mesh, materials, avatar_folder, output_path.parent,
+                                           name=avatar_folder.name)
+            write_glb(output_path, gltf, binary)
+        except Exception as e:
+            print(f"   ❌ GLB 변환 오류 ({avatar_folder.name}): {e}")
+            return None
+
+        print(f"   ✅ GLB 생성: {output_path} ({output_path.stat().st_size:,} bytes, "
+              f"{len(mesh.groups)}개 그룹, {len(gltf.get('images', []))}개 텍스처)")
+        return output_path
+
+    def export_all(self, root: Path, force: bool = False) -> Dict:
+        """
+        폴더 아래 모든 아바타(avatar.obj)를 GLB로 일괄 변환
+
+        Args:
+            root (Path): 스캔할 최상위 폴더 (예: real_3d_avatars)
+            force (bool): 최신 GLB도 다시 생성
+
+        Returns:
+            Dict: 변환 결과 요약
+        """
+        root = Path(root)
+        print(f"📦 GLB 일괄 변환: {root}")
+        started = time.perf_counter()
+        summary = {"converted": [], "skipped": [], "failed": []}
+
+        for obj_file in sorted(root.rglob("avatar.obj")):
+            folder = obj_file.parent
+            glb_file = folder / "avatar.glb"
+            if not force and glb_file.exists() and glb_file.stat().st_mtime >= obj_file.stat().st_mtime:
+                summary["skipped"].append(str(folder))
+                continue
+            if self.export_avatar(folder, glb_file):
+                summary["converted"].append(str(folder))
+            else:
+                summary["failed"].append(str(folder))
+
+        print(f"🎉 변환 {len(summary['converted'])}개, 건너뜀 {len(summary['skipped'])}개, "
+              f"실패 {len(summary['failed'])}개 ({time.perf_counter() - started:.2f}초)")
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="다운로드된 OBJ 아바타를 GLB로 변환")
+    parser.add_argument("roots", nargs="*", default=["real_3d_avatars"], help="아바타 폴더 또는 상위 폴더")
+    parser.add_argument("--reference-textures", action="store_true", help="텍스처를 포함하지 않고 상대 경로로 참조")
+    parser.add_argument("--force", action="store_true", help="최신 GLB도 다시 생성")
+    args = parser.parse_args()
+
+    exporter = GLBExporter(embed_textures=not args.reference_textures)
+    for root in args.roots:
+        root = Path(root)
+        if (root / "avatar.obj").exists():
+            exporter.export_avatar(root, force=True)
+        else:
+            exporter.export_all(root, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Image Sniffer
+다운로드 스트림의 앞부분 바이트(매직 바이트)로 이미지 형식과 크기(가로×세로)를 판별
+디코딩 없이 헤더만 읽고, 너무 작은 파일/자리표시(placeholder) 이미지를 표시
+
+    PNG   IHDR 청크
+    JPEG  SOFn 세그먼트 (APPn/EXIF 세그먼트는 길이만 보고 건너뜀)
+    GIF   논리 화면 디스크립터
+    BMP   BITMAPINFOHEADER
+    WebP  VP8 / VP8L / VP8X 청크
+"""
+
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# JPEG SOF 세그먼트를 찾을 때까지 모을 최대 바이트 (큰 EXIF/ICC 세그먼트 대비)
+SNIFF_LIMIT = 64 * 1024
+
+# 이보다 작은 파일 / 이 이하 변 길이의 이미지는 자리표시 이미지로 표시
+TINY_IMAGE_BYTES = 1024
+TINY_IMAGE_SIDE = 16
+
+IMAGE_FORMATS = {
+    "png": (".png", "image/png"),
+    "jpeg": (".jpg", "image/jpeg"),
+    "gif": (".gif", "image/gif"),
+    "bmp": (".bmp", "image/bmp"),
+    "webp": (".webp", "image/webp"),
+}
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
+
+# 크기 정보가 없는 JPEG 마커 (DHT, JPG, DAC)
+_JPEG_NON_SOF = {0xC4, 0xC8, 0xCC}
+
+
+def _png_size(head: bytes) -> Optional[Tuple[int, int]]:
+    if len(head) < 24 or head[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", head[16:24])
+
+
+def _jpeg_size(head: bytes) -> Optional[Tuple[int, int]]:
+    """SOFn 세그먼트까지 마커 단위로 건너뛰며 찾기 (헤더가 모자라면 None)"""
+    pos = 2
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            return None
+        marker = head[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            return None
+        length = struct.unpack(">H", head[pos + 2:pos + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in _JPEG_NON_SOF:
+            if pos + 9 > len(head):
+                return None
+            height, width = struct.unpack(">HH", head[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + length
+    return None
+
+
+def _gif_size(head: bytes) -> Optional[Tuple[int, int]]:
+    if len(head) < 10:
+        return None
+    return struct.unpack("<HH", head[6:10])
+
+
+def _bmp_size(head: bytes) -> Optional[Tuple[int, int]]:
+    if len(head) < 26:
+        return None
+    width, height = struct.unpack("<ii", head[18:26])
+    return width, abs(height)
+
+
+def _webp_size(head: bytes) -> Optional[Tuple[int, int]]:
+    if len(head) < 30:
+        return None
+    chunk = head[12:16]
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+    return None
+
+
+def detect_image_format(head: bytes) -> Optional[str]:
+    """매직 바이트로 형식 이름 (png, jpeg, gif, bmp, webp) - 모르면 None"""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head.startswith(b"BM"):
+        return "bmp"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+_SIZE_READERS = {"png": _png_size, "jpeg": _jpeg_size, "gif": _gif_size, "bmp": _bmp_size, "webp": _webp_size}
+
+
+def sniff_image_header(head: bytes, size: Optional[int] = None) -> Dict:
+    """
+    파일 앞부분 바이트로 이미지 정보 판별
+
+    Args:
+        head (bytes): 파일 앞부분 (JPEG는 SOF 세그먼트까지 필요 - 최대 SNIFF_LIMIT)
+        size (int): 전체 파일 크기 (없으면 head 길이)
+
+    Returns:
+        Dict: {"format", "extension", "mime", "width", "height", "bytes", "flags", "placeholder"}
+              모르는 형식이면 format/extension/mime/width/height가 None
+    """
+    image_format = detect_image_format(head)
+    dimensions = _SIZE_READERS[image_format](head) if image_format else None
+    extension, mime = IMAGE_FORMATS.get(image_format, (None, None))
+    width, height = dimensions if dimensions else (None, None)
+    size = len(head) if size is None else size
+
+    flags = []
+    if image_format is None:
+        flags.append("unknown_format")
+    elif dimensions is None:
+        flags.append("no_dimensions")
+    if size < TINY_IMAGE_BYTES:
+        flags.append("tiny_file")
+    if dimensions and max(width, height) <= TINY_IMAGE_SIDE:
+        flags.append("tiny_dimensions")
+
+    return {
+        "format": image_format,
+        "extension": extension,
+        "mime": mime,
+        "width": width,
+        "height": height,
+        "bytes": size,
+        "flags": flags,
+        "placeholder": bool(flags),
+    }
+
+
+class ImageSniffer:
+    """
+    다운로드 스트림 청크를 받으면서 앞부분만 모아 두는 판별기
+
+    파일에 쓰는 청크를 그대로 feed()하면 형식 판별에 필요한 만큼(최대 SNIFF_LIMIT)만 보관하고
+    나머지는 길이만 셈 - 다운로드가 끝나면 result()로 정보 확인
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """새 시도(다른 CDN 서버)를 위해 초기화"""
+        self._head = bytearray()
+        self.total = 0
+
+    def feed(self, chunk: bytes):
+        if len(self._head) < SNIFF_LIMIT:
+            self._head += chunk[:SNIFF_LIMIT - len(self._head)]
+        self.total += len(chunk)
+
+    def result(self) -> Dict:
+        return sniff_image_header(bytes(self._head), self.total)
+
+
+def sniff_image_file(path: Path) -> Dict:
+    """이미 저장된 파일의 이미지 정보 (앞부분만 읽음)"""
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_LIMIT)
+        size = os.fstat(f.fileno()).st_size
+    return sniff_image_header(head, size)
+
+
+def apply_sniffed_extension(path: Path, image_info: Dict) -> Path:
+    """
+    판별한 형식에 맞게 확장자 변경 (모르는 형식이면 그대로)
+
+    같은 이름의 다른 이미지 확장자 파일(이전 실행의 남은 파일)은 삭제
+
+    Returns:
+        Path: 최종 파일 경로
+    """
+    path = Path(path)
+    extension = image_info.get("extension")
+    target = path.with_suffix(extension) if extension else path
+    if target != path:
+        os.replace(path, target)
+    for sibling in target.parent.glob(target.stem + ".*"):
+        if sibling != target and sibling.suffix.lower() in IMAGE_SUFFIXES:
+            sibling.unlink()
+    return target
+
+
+def describe_image(image_info: Dict) -> str:
+    """로그용 요약 (예: png 1024x1024, 199,515 bytes)"""
+    if image_info.get("width") is not None:
+        dimensions = f" {image_info['width']}x{image_info['height']}"
+    else:
+        dimensions = ""
+    return f"{image_info.get('format') or '알 수 없는 형식'}{dimensions}, {image_info['bytes']:,} bytes"
+
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Avatar Mesh Cache
+avatar.obj 옆에 저장하는 메모리 매핑 가능한 바이너리 메시 캐시 (avatar.meshcache)
+
+파일 구조:
+    8바이트 매직 (RBXMESH1) | uint32 헤더 길이 | JSON 헤더 | 64바이트 정렬된 배열들
+
+JSON 헤더에는 배열 위치(dtype/shape/offset), 그룹 테이블, 원본 OBJ 정보와 라인 통계가 들어 있어
+구조 분석은 헤더만 읽고, 메시 로드는 mmap 위의 np.frombuffer로 복사 없이 수행
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from avatar_logging import get_logger
+from avatar_metrics import PARSE_SECONDS
+from obj_scanner import scan_obj_stats
+
+logger = get_logger(__name__)
+
+# NumPy/avatar_mesh는 배열을 다루는 함수 안에서만 import
+# (헤더만 읽는 구조 분석 경로는 NumPy 없이 빠르게 시작)
+
+CACHE_MAGIC = b"RBXMESH1"
+CACHE_SUFFIX = ".meshcache"
+CACHE_VERSION = 3  # 2: 정점 용접(weld_mesh)된 메시 저장, 3: obj_stats를 scan_obj_stats 규칙으로 기록
+ALIGNMENT = 64
+
+_ARRAY_NAMES = ("positions", "normals", "uvs", "indices")
+
+
+def cache_path_for(obj_path: Path) -> Path:
+    """avatar.obj → avatar.meshcache"""
+    obj_path = Path(obj_path)
+    return obj_path.with_suffix(CACHE_SUFFIX)
+
+
+def _source_info(obj_path: Path) -> Dict:
+    stat = obj_path.stat()
+    return {"name": obj_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def save_mesh_cache(mesh, cache_path: Optional[Path] = None, compaction: Optional[Dict] = None) -> Path:
+    """
+    AvatarMesh를 캐시 파일로 저장 (임시 파일에 쓴 뒤 교체)
+
+    Args:
+        mesh (AvatarMesh): 저장할 메시 (mesh.source가 원본 OBJ 경로)
+        cache_path (Path): 저장 경로 (기본값: OBJ 옆 avatar.meshcache)
+        compaction (Dict): weld_mesh 리포트 (헤더에 함께 기록)
+
+    Returns:
+        Path: 저장된 캐시 경로
+    """
+    import numpy as np
+
+    obj_path = Path(mesh.source)
+    cache_path = Path(cache_path) if cache_path else cache_path_for(obj_path)
+
+    arrays = {}
+    for name in _ARRAY_NAMES:
+        array = getattr(mesh, name)
+        if array is not None:
+            arrays[name] = np.ascontiguousarray(array, dtype="<u4" if name == "indices" else "<f4")
+
+    header = {
+        "version": CACHE_VERSION,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": _source_info(obj_path),
+        "groups": mesh.groups,
+        # 캐시 유무와 관계없이 구조 분석 결과가 같도록 캐시 없는 경로와 같은 스캐너로 계산
+        "obj_stats": scan_obj_stats(obj_path),
+        "compaction": compaction,
+        "arrays": {},
+    }
+
+    # 배열 오프셋은 데이터 영역 시작(헤더 뒤 64바이트 정렬) 기준
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes + (-array.nbytes % ALIGNMENT)
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix = len(CACHE_MAGIC) + 4 + len(header_bytes)
+    data_start = prefix + (-prefix % ALIGNMENT)
+
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(CACHE_MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\x00" * (data_start - prefix))
+        for name, array in arrays.items():
+            f.write(array.tobytes())
+            f.write(b"\x00" * (-array.nbytes % ALIGNMENT))
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def read_cache_header(cache_path: Path) -> Optional[Dict]:
+    """캐시 헤더(JSON)만 읽기 - 배열은 읽지 않으므로 NumPy 불필요"""
+    try:
+        with open(cache_path, 'rb') as f:
+            if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                return None
+            (length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length).decode("utf-8"))
+    except (OSError, ValueError, struct.error):
+        return None
+    return header if header.get("version") == CACHE_VERSION else None
+
+
+def fresh_cache_header(obj_path: Path) -> Optional[Dict]:
+    """
+    OBJ보다 최신이고 원본 크기가 같은 캐시의 헤더 반환 (없거나 오래되면 None)
+
+    Args:
+        obj_path (Path): 원본 avatar.obj 경로
+    """
+    obj_path = Path(obj_path)
+    cache_path = cache_path_for(obj_path)
+    try:
+        if cache_path.stat().st_mtime_ns < obj_path.stat().st_mtime_ns:
+            return None
+    except OSError:
+        return None
+
+    header = read_cache_header(cache_path)
+    if header is None or header["source"].get("size") != obj_path.stat().st_size:
+        return None
+    return header
+
+
+def cached_obj_stats(obj_path: Path) -> Optional[Dict]:
+    """
+    최신 캐시의 원본 OBJ 라인 통계 반환 (헤더만 읽음, 없으면 None)
+
+    Returns:
+        Optional[Dict]: vertices/texture_coords/normals/faces 개수, groups/objects(이름+라인),
+                        materials(usemtl 순서), mtllibs, comments(라인+원문)
+    """
+    header = fresh_cache_header(obj_path)
+    return header.get("obj_stats") if header else None
+
+
+def format_compaction_report(report: Dict) -> str:
+    """weld_mesh 리포트를 한 줄 요약으로 변환"""
+    before, after = report["vertices_before"], report["vertices_after"]
+    saved = 1 - after / before if before else 0.0
+    text = (f"정점 {before:,} → {after:,} (-{saved:.1%}), "
+            f"메모리 {report['bytes_before']:,} → {report['bytes_after']:,} bytes")
+    if report.get("degenerate_removed"):
+        text += f", 퇴화 삼각형 {report['degenerate_removed']}개 제거"
+    return text
+
+
+def load_mesh_cache(cache_path: Path, header: Optional[Dict] = None):
+    """
+    캐시 파일을 mmap으로 열어 AvatarMesh로 로드 (배열은 읽기 전용 zero-copy 뷰)
+
+    Args:
+        cache_path (Path): avatar.meshcache 경로
+        header (Dict): 이미 읽은 헤더 (없으면 다시 읽음)
+
+    Returns:
+        AvatarMesh: 로드된 메시 (실패 시 None)
+    """
+    import numpy as np
+    from avatar_mesh import AvatarMesh
+
+    parse_start = time.perf_counter()
+    header = header or read_cache_header(cache_path)
+    if header is None:
+        return None
+
+    with open(cache_path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    length = struct.unpack_from("<I", buffer, len(CACHE_MAGIC))[0]
+    data_start = len(CACHE_MAGIC) + 4 + length
+    data_start += -data_start % ALIGNMENT
+
+    arrays = {}
+    for name in _ARRAY_NAMES:
+        spec = header["arrays"].get(name)
+        if spec is None:
+            arrays[name] = None
+            continue
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                     offset=data_start + spec["offset"]).reshape(spec["shape"])
+
+    obj_path = Path(cache_path).with_name(header["source"]["name"])
+    mesh = AvatarMesh(groups=header["groups"], source=str(obj_path), obj_stats=header.get("obj_stats"), **arrays)
+    PARSE_SECONDS.observe(time.perf_counter() - parse_start, parser="load_mesh_cache")
+    return mesh
+
+
+def load_compacted_obj(obj_path: Path):
+    """
+    OBJ를 파싱한 뒤 중복 정점을 용접한 메시 반환
+
+    Returns:
+        Tuple[AvatarMesh, Dict]: (압축된 메시, weld_mesh 리포트)
+    """
+    from avatar_mesh import load_obj, weld_mesh
+    return weld_mesh(load_obj(obj_path))
+
+
+def load_avatar_mesh(obj_path: Path, use_cache: bool = True, write_cache: bool = True):
+    """
+    캐시가 최신이면 캐시에서, 아니면 OBJ를 파싱·압축해 메시 로드 (파싱 후 캐시 갱신)
+
+    Args:
+        obj_path (Path): avatar.obj 경로
+        use_cache (bool): 최신 캐시가 있으면 사용
+        write_cache (bool): OBJ를 파싱한 경우 캐시 저장
+
+    Returns:
+        AvatarMesh: 로드된 메시 (정점 용접 적용)
+    """
+    obj_path = Path(obj_path)
+    if use_cache:
+        header = fresh_cache_header(obj_path)
+        if header is not None:
+            mesh = load_mesh_cache(cache_path_for(obj_path), header)
+            if mesh is not None:
+                return mesh
+
+    mesh, report = load_compacted_obj(obj_path)
+    if write_cache:
+        try:
+            save_mesh_cache(mesh, compaction=report)
+        except OSError as e:
+            logger.warning("   ⚠️ 메시 캐시 저장 실패: %s", e)
+    return mesh
+
+
+def build_mesh_cache(obj_path: Path) -> Optional[Path]:
+    """
+    OBJ를 파싱·압축해 캐시 생성 (NumPy가 없거나 OBJ를 읽을 수 없으면 None)
+
+    Args:
+        obj_path (Path): avatar.obj 경로
+    """
+    try:
+        mesh, report = load_compacted_obj(obj_path)
+        return save_mesh_cache(mesh, compaction=report)
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def build_cache_tree(root: Path, force: bool = False) -> Dict:
+    """
+    폴더 아래 모든 avatar.obj의 캐시를 생성 (최신 캐시는 건너뜀)
+
+    Args:
+        root (Path): 스캔할 최상위 폴더
+        force (bool): 최신 캐시도 다시 생성
+
+    Returns:
+        Dict: {"built": [...], "fresh": [...], "reports": {OBJ 경로: weld_mesh 리포트}}
+    """
+    summary = {"built": [], "fresh": [], "reports": {}}
+    for obj_file in sorted(Path(root).rglob("avatar.obj")):
+        header = None if force else fresh_cache_header(obj_file)
+        if header is not None:
+            summary["fresh"].append(str(obj_file))
+            summary["reports"][str(obj_file)] = header.get("compaction")
+            continue
+        mesh, report = load_compacted_obj(obj_file)
+        save_mesh_cache(mesh, compaction=report)
+        summary["built"].append(str(obj_file))
+        summary["reports"][str(obj_file)] = report
+    return summary
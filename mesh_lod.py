@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Avatar LOD Generator
+다운로드된 avatar.obj에서 삼각형 수를 줄인 LOD(Level of Detail) 메시를 생성
+
+그룹(바디 파트)마다 따로 정점 클러스터링 방식으로 단순화하므로 그룹/재질 경계와 이름이 유지되어
+바디 파트 매핑이 LOD에서도 그대로 동작. 결과는 아바타 폴더의 lods/ 아래에 저장:
+
+    lods/avatar_lod1.obj, avatar_lod2.obj ... (비율 순서)
+    lods/lod_manifest.json (원본 정보, 비율별 삼각형/정점 수)
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# NumPy/avatar_mesh는 계산 함수 안에서만 import (CLI 시작 시간 유지)
+
+DEFAULT_LOD_RATIOS = (0.5, 0.25, 0.1)
+LOD_FOLDER = "lods"
+MANIFEST_NAME = "lod_manifest.json"
+
+# 목표 삼각형 수에 맞는 격자 크기를 찾는 이분 탐색 횟수
+_SEARCH_STEPS = 16
+
+
+def _cluster_group(positions, normals, uvs, triangles, cell: float):
+    """
+    한 그룹의 정점을 격자 셀 단위로 합쳐 단순화
+
+    같은 위치 셀이라도 UV 셀(텍스처 이음매)이나 법선 방향이 다르면 합치지 않음
+
+    Returns:
+        Tuple: (대표 정점 인덱스별 positions, normals, uvs, 새 삼각형 (T, 3))
+    """
+    import numpy as np
+
+    origin = positions.min(axis=0)
+    extent = float((positions.max(axis=0) - origin).max()) or 1.0
+    keys = [np.floor((positions - origin) / cell).astype(np.int64)]
+    if uvs is not None:
+        uv_origin = uvs.min(axis=0)
+        uv_extent = float((uvs.max(axis=0) - uv_origin).max()) or 1.0
+        keys.append(np.floor((uvs - uv_origin) / (cell / extent * uv_extent)).astype(np.int64))
+    if normals is not None:
+        keys.append(np.rint(normals).astype(np.int64))
+    _, cluster = np.unique(np.hstack(keys), axis=0, return_inverse=True)
+    cluster = cluster.reshape(-1)
+
+    new_triangles = cluster[triangles]
+    keep = ((new_triangles[:, 0] != new_triangles[:, 1]) & (new_triangles[:, 1] != new_triangles[:, 2])
+            & (new_triangles[:, 0] != new_triangles[:, 2]))
+    new_triangles = new_triangles[keep]
+    if len(new_triangles):
+        # 같은 세 정점으로 합쳐진 중복 삼각형 제거 (처음 등장한 방향 유지)
+        _, first = np.unique(np.sort(new_triangles, axis=1), axis=0, return_index=True)
+        new_triangles = new_triangles[np.sort(first)]
+
+    # 삼각형이 참조하는 클러스터만 남기고 대표값은 소속 정점 평균
+    used, compact = np.unique(new_triangles, return_inverse=True)
+    remap = np.full(cluster.max() + 1, -1, dtype=np.int64)
+    remap[used] = np.arange(len(used))
+    members = remap[cluster]
+    valid = members >= 0
+    counts = np.bincount(members[valid], minlength=len(used))[:, None]
+
+    def average(values):
+        if values is None:
+            return None
+        return np.stack([np.bincount(members[valid], weights=values[valid, axis], minlength=len(used))
+                         for axis in range(values.shape[1])], axis=1) / counts
+
+    new_normals = average(normals)
+    if new_normals is not None:
+        lengths = np.linalg.norm(new_normals, axis=1, keepdims=True)
+        new_normals = new_normals / np.where(lengths > 0, lengths, 1)
+    return average(positions), new_normals, average(uvs), compact.reshape(-1, 3)
+
+
+def decimate_group(positions, normals, uvs, triangles, target: int):
+    """
+    한 그룹을 목표 삼각형 수 이하로 단순화 (격자 크기를 이분 탐색)
+
+    Args:
+        positions/normals/uvs: 원본 정점 속성 (normals/uvs는 None 가능)
+        triangles (np.ndarray): (T, 3) 그룹 삼각형 인덱스
+        target (int): 목표 삼각형 수 (최소 1)
+
+    Returns:
+        Tuple: (positions, normals, uvs, triangles) - 그룹에서 사용하는 정점만 포함
+    """
+    import numpy as np
+
+    used, local = np.unique(triangles, return_inverse=True)
+    local = local.reshape(-1, 3)
+    positions = np.asarray(positions, dtype=np.float64)[used]
+    normals = None if normals is None else np.asarray(normals, dtype=np.float64)[used]
+    uvs = None if uvs is None else np.asarray(uvs, dtype=np.float64)[used]
+    if len(local) <= target:
+        return positions, normals, uvs, local
+
+    extent = float((positions.max(axis=0) - positions.min(axis=0)).max()) or 1.0
+    low, high = extent * 1e-4, extent * 2
+    best = None
+    for _ in range(_SEARCH_STEPS):
+        cell = (low * high) ** 0.5
+        result = _cluster_group(positions, normals, uvs, local, cell)
+        count = len(result[3])
+        if 0 < count <= target:
+            if best is None or count > len(best[3]):
+                best = result
+            high = cell
+        elif count == 0:
+            high = cell
+        else:
+            low = cell
+    if best is None:
+        # 법선/UV 경계 때문에 목표까지 줄일 수 없으면 가장 거친 결과 사용 (삼각형 1개 이상)
+        best = _cluster_group(positions, normals, uvs, local, low)
+        if not len(best[3]):
+            best = (positions, normals, uvs, local)
+    return best
+
+
+def decimate_mesh(mesh, ratio: float):
+    """
+    메시의 모든 그룹을 비율에 맞게 단순화 (그룹 순서/이름/재질 유지)
+
+    Args:
+        mesh (AvatarMesh): 원본 메시
+        ratio (float): 그룹별 목표 삼각형 비율 (0~1)
+
+    Returns:
+        AvatarMesh: 단순화된 메시
+    """
+    import numpy as np
+    from avatar_mesh import AvatarMesh
+
+    parts = {"positions": [], "normals": [], "uvs": []}
+    indices = []
+    groups = []
+    vertex_offset = 0
+    index_offset = 0
+    for group in mesh.groups:
+        triangles = mesh.group_indices(group).reshape(-1, 3).astype(np.int64)
+        target = max(1, int(round(len(triangles) * ratio)))
+        positions, normals, uvs, local = decimate_group(mesh.positions, mesh.normals, mesh.uvs, triangles, target)
+
+        parts["positions"].append(positions)
+        parts["normals"].append(normals)
+        parts["uvs"].append(uvs)
+        indices.append(local.reshape(-1) + vertex_offset)
+        groups.append({"name": group["name"], "material": group.get("material"),
+                       "start": index_offset, "count": local.size})
+        vertex_offset += len(positions)
+        index_offset += local.size
+
+    def stack(name: str) -> Optional[np.ndarray]:
+        arrays = parts[name]
+        if not arrays:
+            # 면이 없는 메시: 위치는 빈 (0, 3) 배열, 법선/UV는 없음
+            return np.zeros((0, 3), dtype=np.float32) if name == "positions" else None
+        if any(a is None for a in arrays):
+            return None
+        return np.ascontiguousarray(np.vstack(arrays), dtype=np.float32)
+
+    index_array = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64)
+    return AvatarMesh(stack("positions"), stack("normals"), stack("uvs"), index_array.astype(np.uint32),
+                      groups, source=mesh.source)
+
+
+def lod_folder_for(obj_path: Path) -> Path:
+    """avatar.obj → 같은 폴더의 lods/"""
+    return Path(obj_path).parent / LOD_FOLDER
+
+
+def read_lod_manifest(obj_path: Path) -> Optional[Dict]:
+    """LOD 매니페스트 읽기 (없거나 손상되면 None)"""
+    manifest_file = lod_folder_for(obj_path) / MANIFEST_NAME
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_fresh(manifest: Optional[Dict], obj_path: Path, ratios: Sequence[float]) -> bool:
+    if not manifest or manifest.get("ratios") != list(ratios):
+        return False
+    stat = obj_path.stat()
+    source = manifest.get("source", {})
+    return source.get("size") == stat.st_size and source.get("mtime_ns") == stat.st_mtime_ns
+
+
+def generate_lods(obj_path: Path, ratios: Sequence[float] = DEFAULT_LOD_RATIOS, force: bool = False) -> Dict:
+    """
+    아바타 하나의 LOD OBJ들과 매니페스트 생성 (원본이 바뀌지 않았으면 건너뜀)
+
+    Args:
+        obj_path (Path): avatar.obj 경로
+        ratios (Sequence[float]): LOD 단계별 목표 삼각형 비율 (큰 값부터)
+        force (bool): 최신 LOD도 다시 생성
+
+    Returns:
+        Dict: LOD 매니페스트 (skipped=True면 기존 매니페스트, empty=True면 면이 없어 아무것도 생성하지 않음)
+    """
+    from avatar_mesh import save_obj
+    from mesh_cache import load_avatar_mesh
+
+    obj_path = Path(obj_path)
+    ratios = [float(r) for r in ratios]
+    manifest = read_lod_manifest(obj_path)
+    if not force and _is_fresh(manifest, obj_path, ratios):
+        return dict(manifest, skipped=True)
+
+    mesh = load_avatar_mesh(obj_path)
+    if mesh.triangle_count == 0:
+        # 정점만 있거나 빈 OBJ - 단순화할 삼각형이 없으므로 LOD 파일을 만들지 않음
+        return {"ratios": ratios, "levels": [], "skipped": True, "empty": True}
+
+    lod_folder = lod_folder_for(obj_path)
+    lod_folder.mkdir(exist_ok=True)
+    mtl_file = obj_path.with_suffix(".mtl")
+    mtllib = f"../{mtl_file.name}" if mtl_file.exists() else None
+
+    stat = obj_path.stat()
+    manifest = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": {"name": obj_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                   "vertices": mesh.vertex_count, "triangles": mesh.triangle_count},
+        "ratios": ratios,
+        "levels": [],
+    }
+    for level, ratio in enumerate(ratios, 1):
+        lod_mesh = decimate_mesh(mesh, ratio)
+        lod_file = save_obj(lod_mesh, lod_folder / f"{obj_path.stem}_lod{level}.obj", mtllib)
+        manifest["levels"].append({
+            "level": level,
+            "ratio": ratio,
+            "file": lod_file.name,
+            "vertices": lod_mesh.vertex_count,
+            "triangles": lod_mesh.triangle_count,
+            "groups": [{"name": g["name"], "triangles": g["count"] // 3} for g in lod_mesh.groups],
+        })
+
+    with open(lod_folder / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def _generate_worker(args) -> Dict:
+    """프로세스 풀 작업 단위 (실패도 결과로 반환)"""
+    obj_path, ratios, force = args
+    try:
+        manifest = generate_lods(obj_path, ratios, force)
+        return {"obj": str(obj_path), "skipped": bool(manifest.get("skipped")),
+                "empty": bool(manifest.get("empty")), "levels": manifest["levels"]}
+    except (OSError, ValueError) as e:
+        return {"obj": str(obj_path), "error": str(e)}
+
+
+def generate_lod_tree(root: Path, ratios: Sequence[float] = DEFAULT_LOD_RATIOS,
+                      workers: Optional[int] = None, force: bool = False) -> Dict:
+    """
+    폴더 아래 모든 avatar.obj의 LOD를 프로세스 풀로 일괄 생성
+
+    Args:
+        root (Path): 스캔할 최상위 폴더
+        ratios (Sequence[float]): LOD 단계별 목표 삼각형 비율
+        workers (int): 프로세스 수 (기본값: CPU 수, 1이면 현재 프로세스에서 순차 처리)
+        force (bool): 최신 LOD도 다시 생성
+
+    Returns:
+        Dict: {"generated": [...], "skipped": [...], "empty": [...], "failed": {OBJ 경로: 오류},
+               "levels": {OBJ 경로: [...]}} - empty는 면이 없어 건너뛴 OBJ
+    """
+    jobs = [(obj_file, tuple(ratios), force) for obj_file in sorted(Path(root).rglob("avatar.obj"))]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [_generate_worker(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            results = list(executor.map(_generate_worker, jobs))
+
+    summary: Dict[str, object] = {"generated": [], "skipped": [], "empty": [], "failed": {}, "levels": {}}
+    for result in results:
+        if "error" in result:
+            summary["failed"][result["obj"]] = result["error"]
+            continue
+        if result["empty"]:
+            summary["empty"].append(result["obj"])
+            continue
+        summary["skipped" if result["skipped"] else "generated"].append(result["obj"])
+        summary["levels"][result["obj"]] = result["levels"]
+    return summary
+
+
+def format_lod_levels(levels: List[Dict]) -> str:
+    """LOD 단계 목록을 한 줄 요약으로 변환"""
+    return ", ".join(f"LOD{lv['level']}({lv['ratio']:g}) {lv['triangles']:,}면" for lv in levels)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Avatar Mesh Statistics
+OBJ 그룹(바디 파트)별 기하 통계 - 정점/면 개수, 바운딩 박스, 중심점, 표면적, UV 커버리지
+
+메시 전체를 한 번에 벡터 연산으로 계산하며, 수천 개 아바타에서
+깨진(면적 0, 퇴화 삼각형) 또는 비정상적으로 큰 액세서리를 찾는 데 사용
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# NumPy는 계산 함수 안에서만 import (다운로더가 import 시점에 NumPy를 불러오지 않도록)
+
+# 이 값 이하의 면적은 퇴화 삼각형으로 집계
+DEGENERATE_AREA = 1e-12
+
+
+def _triangle_areas(corners):
+    """(T, 3, D) 삼각형 모서리 좌표 → (T,) 면적 (D는 2 또는 3)"""
+    import numpy as np
+
+    edge1 = corners[:, 1] - corners[:, 0]
+    edge2 = corners[:, 2] - corners[:, 0]
+    if corners.shape[-1] == 2:
+        # 2차원 외적은 z 성분만 직접 계산 (NumPy 2는 2차원 벡터 np.cross를 폐기 예정으로 경고)
+        return 0.5 * np.abs(edge1[:, 0] * edge2[:, 1] - edge1[:, 1] * edge2[:, 0])
+    return 0.5 * np.linalg.norm(np.cross(edge1, edge2), axis=1)
+
+
+def _rounded(values) -> List[float]:
+    return [round(float(v), 6) for v in values]
+
+
+def compute_group_stats(mesh) -> List[Dict]:
+    """
+    그룹별 기하 통계 계산 (모든 그룹을 한 번의 벡터 연산으로 처리)
+
+    Args:
+        mesh (AvatarMesh): 인덱스 메시 (load_avatar_mesh 결과)
+
+    Returns:
+        List[Dict]: 그룹 순서대로 {"name", "material", "vertices", "faces", "degenerate_faces",
+                    "bbox_min", "bbox_max", "size", "centroid", "surface_area", "uv_area", "uv_coverage"}
+                    - faces는 삼각형 기준, centroid는 그룹이 사용하는 정점의 평균 위치
+                    - uv_area는 UV 삼각형 면적 합(겹침 포함), uv_coverage는 이를 [0,1]² 공간 대비 비율로 자른 값
+    """
+    import numpy as np
+
+    groups = mesh.groups
+    if not groups:
+        return []
+
+    group_count = len(groups)
+    triangle_ranges = [np.arange(g["start"] // 3, (g["start"] + g["count"]) // 3) for g in groups]
+    triangle_ids = np.concatenate(triangle_ranges)
+    triangle_group = np.repeat(np.arange(group_count), [len(r) for r in triangle_ranges])
+
+    triangles = np.asarray(mesh.indices, dtype=np.int64).reshape(-1, 3)[triangle_ids]
+    positions = np.asarray(mesh.positions, dtype=np.float64)
+
+    # 면 단위 통계: 개수, 표면적, 퇴화 삼각형
+    areas = _triangle_areas(positions[triangles])
+    faces = np.bincount(triangle_group, minlength=group_count)
+    surface = np.bincount(triangle_group, weights=areas, minlength=group_count)
+    degenerate = np.bincount(triangle_group, weights=areas <= DEGENERATE_AREA, minlength=group_count)
+
+    if mesh.uvs is not None:
+        uv_areas = _triangle_areas(np.asarray(mesh.uvs, dtype=np.float64)[triangles])
+        uv_area = np.bincount(triangle_group, weights=uv_areas, minlength=group_count)
+    else:
+        uv_area = np.zeros(group_count)
+
+    # 정점 단위 통계: (그룹, 정점) 쌍을 중복 제거하면 그룹 순서로 정렬된 고유 정점 목록
+    keys = np.unique(np.repeat(triangle_group, 3) * len(positions) + triangles.ravel())
+    vertex_group = keys // len(positions)
+    group_positions = positions[keys % len(positions)]
+    vertices = np.bincount(vertex_group, minlength=group_count)
+    boundaries = np.concatenate([[0], np.cumsum(vertices)[:-1]])
+    bbox_min = np.minimum.reduceat(group_positions, boundaries, axis=0)
+    bbox_max = np.maximum.reduceat(group_positions, boundaries, axis=0)
+    centroid = np.stack([np.bincount(vertex_group, weights=group_positions[:, axis], minlength=group_count)
+                         for axis in range(3)], axis=1) / vertices[:, None]
+
+    stats = []
+    for i, group in enumerate(groups):
+        stats.append({
+            "name": group["name"],
+            "material": group.get("material"),
+            "vertices": int(vertices[i]),
+            "faces": int(faces[i]),
+            "degenerate_faces": int(degenerate[i]),
+            "bbox_min": _rounded(bbox_min[i]),
+            "bbox_max": _rounded(bbox_max[i]),
+            "size": _rounded(bbox_max[i] - bbox_min[i]),
+            "centroid": _rounded(centroid[i]),
+            "surface_area": round(float(surface[i]), 6),
+            "uv_area": round(float(uv_area[i]), 6),
+            "uv_coverage": round(float(min(uv_area[i], 1.0)), 6),
+        })
+    return stats
+
+
+def merge_group_stats(stats_list: List[Dict]) -> Dict[str, Dict]:
+    """
+    같은 이름의 그룹 구간 통계를 하나로 합침 (한 g 아래 usemtl 구간이 여럿이거나 g 이름이 반복될 때)
+
+    개수/면적은 합, 바운딩 박스는 합집합, 중심점은 정점 수 가중 평균.
+    vertices는 구간별 정점 수의 합 (구간 사이에 공유된 정점은 중복 집계)
+
+    Args:
+        stats_list (List[Dict]): compute_group_stats 결과 (그룹 순서)
+
+    Returns:
+        Dict[str, Dict]: 그룹 이름 → 통계 (처음 등장한 순서)
+    """
+    merged: Dict[str, Dict] = {}
+    for stats in stats_list:
+        current = merged.get(stats["name"])
+        if current is None:
+            merged[stats["name"]] = dict(stats)
+            continue
+        materials = [m for m in (current.get("material") or "").split(", ") if m]
+        if stats.get("material") and stats["material"] not in materials:
+            materials.append(stats["material"])
+        vertices = current["vertices"] + stats["vertices"]
+        bbox_min = [min(a, b) for a, b in zip(current["bbox_min"], stats["bbox_min"])]
+        bbox_max = [max(a, b) for a, b in zip(current["bbox_max"], stats["bbox_max"])]
+        uv_area = current["uv_area"] + stats["uv_area"]
+        current.update({
+            "material": ", ".join(materials) or None,
+            "vertices": vertices,
+            "faces": current["faces"] + stats["faces"],
+            "degenerate_faces": current["degenerate_faces"] + stats["degenerate_faces"],
+            "bbox_min": bbox_min,
+            "bbox_max": bbox_max,
+            "size": _rounded(hi - lo for lo, hi in zip(bbox_min, bbox_max)),
+            "centroid": _rounded((a * current["vertices"] + b * stats["vertices"]) / max(vertices, 1)
+                                 for a, b in zip(current["centroid"], stats["centroid"])),
+            "surface_area": round(current["surface_area"] + stats["surface_area"], 6),
+            "uv_area": round(uv_area, 6),
+            "uv_coverage": round(min(uv_area, 1.0), 6),
+        })
+    return merged
+
+
+def avatar_group_stats(obj_path: Path) -> Optional[List[Dict]]:
+    """
+    avatar.obj에서 그룹별 통계 계산 (NumPy가 없거나 OBJ를 읽을 수 없으면 None)
+
+    메시 캐시는 정점 용접 때 퇴화 삼각형을 제거하므로 사용하지 않고 OBJ 원본 그대로 계산
+    (faces / degenerate_faces가 OBJ의 면과 일치)
+
+    Args:
+        obj_path (Path): avatar.obj 경로
+    """
+    try:
+        from avatar_mesh import load_obj
+        return compute_group_stats(load_obj(obj_path))
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def format_group_stats(stats: Dict) -> str:
+    """그룹 통계를 한 줄 요약으로 변환"""
+    size = " x ".join(f"{v:.2f}" for v in stats["size"])
+    text = (f"{stats['vertices']:,} 버텍스, {stats['faces']:,} 면, 크기 {size}, "
+            f"면적 {stats['surface_area']:.3f}, UV {stats['uv_coverage']:.1%}")
+    if stats.get("degenerate_faces"):
+        text += f", 퇴화 {stats['degenerate_faces']}개"
+    return text
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Mock Roblox API & CDN Server
+오프라인 테스트/벤치마크용 로컬 로블록스 API 및 tN.rbxcdn.com 해시 서버
+녹화된 아바타 폴더(metadata.json + avatar.obj/mtl + textures)를 그대로 서빙
+"""
+
+import json
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 기본 픽스처: 저장소에 포함된 실제 3D 아바타들
+DEFAULT_FIXTURE_FOLDERS = [
+    "test_extended_full/builderman_156_3D",
+    "real_3d_avatars/builderman_156_3D",
+    "real_3d_avatars/Roblox_1_3D",
+]
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+# 썸네일 픽스처가 없을 때 사용하는 1x1 투명 PNG
+_BLANK_PNG = (b"\x89PNG\r\n\x1a\n"
+              + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 6, 0, 0, 0))
+              + _png_chunk(b"IDAT", zlib.compress(b"\x00\x00\x00\x00\x00"))
+              + _png_chunk(b"IEND", b""))
+
+
+def cdn_shard(hash_id: str) -> int:
+    """다운로더와 동일한 CDN 샤드 번호 계산"""
+    i = 31
+    for t in range(min(38, len(hash_id))):
+        i ^= ord(hash_id[t])
+    return i % 8
+
+
+class AvatarFixture:
+    """녹화된 아바타 한 명의 응답 데이터"""
+
+    def __init__(self, folder: Path):
+        self.folder = Path(folder)
+        with open(self.folder / "metadata.json", 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+
+        self.user_info = metadata["user_info"]
+        self.avatar_3d = metadata["avatar_3d_metadata"]
+        self.api_responses = metadata.get("extended_avatar_info", {}).get("api_responses", {})
+
+        # CDN 해시 → 로컬 파일
+        self.files: Dict[str, Path] = {}
+        if self.avatar_3d.get("obj"):
+            self.files[self.avatar_3d["obj"]] = self.folder / "avatar.obj"
+        if self.avatar_3d.get("mtl"):
+            self.files[self.avatar_3d["mtl"]] = self.folder / "avatar.mtl"
+        for i, texture_hash in enumerate(self.avatar_3d.get("textures", [])):
+            # 텍스처는 실제 형식에 맞는 확장자로 저장됨 (texture_NNN.png / .jpg ...)
+            stem = f"texture_{i+1:03d}"
+            recorded = sorted((self.folder / "textures").glob(stem + ".*"))
+            self.files[texture_hash] = recorded[0] if recorded else self.folder / "textures" / f"{stem}.png"
+
+        # 2D 썸네일 (downloads/<username>_<id>/ 폴더가 있으면 사용)
+        self.thumbnail_folder = Path("downloads") / f"{self.user_info['name']}_{self.user_info['id']}"
+
+    def thumbnail_bytes(self, thumb_type: str, size: str) -> bytes:
+        path = self.thumbnail_folder / f"{thumb_type}_{size}.png"
+        if not path.exists():
+            candidates = sorted(self.thumbnail_folder.glob(f"{thumb_type}_*.png"))
+            path = candidates[0] if candidates else None
+        if path is None:
+            return _BLANK_PNG
+        return path.read_bytes()
+
+
+class MockRobloxServer:
+    """
+    로컬 Mock 서버
+
+    요청 경로는 `/<원래 호스트>/<원래 경로>` 형식이며, `install(session)`으로
+    requests.Session의 https:// 요청을 이 서버로 돌려보냅니다.
+
+    Args:
+        fixture_folders: 녹화된 아바타 폴더 목록
+        latency (float | Tuple[float, float]): 응답 지연(초) 또는 (최소, 최대) 범위
+        rate_limit_ratio (float): 429를 반환할 확률 (0~1)
+        failing_shards (Iterable[int]): 항상 503을 반환할 tN CDN 샤드 번호들
+        seed (int): 장애 주입 난수 시드
+    """
+
+    def __init__(self, fixture_folders: Optional[Iterable[str]] = None, latency=0.0,
+                 rate_limit_ratio: float = 0.0, failing_shards: Iterable[int] = (),
+                 seed: int = 0, host: str = "127.0.0.1", port: int = 0):
+        folders = fixture_folders or [f for f in DEFAULT_FIXTURE_FOLDERS if (Path(f) / "metadata.json").exists()]
+        self.fixtures: List[AvatarFixture] = []
+        for folder in folders:
+            fixture = AvatarFixture(Path(folder))
+            # 같은 유저의 녹화본이 여러 개면 첫 번째만 사용
+            if all(f.user_info["id"] != fixture.user_info["id"] for f in self.fixtures):
+                self.fixtures.append(fixture)
+        if not self.fixtures:
+            raise ValueError("사용 가능한 아바타 픽스처가 없습니다")
+
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.failing_shards = set(failing_shards)
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.request_log: List[Tuple[str, str, int]] = []
+
+        self._by_id = {int(f.user_info["id"]): f for f in self.fixtures}
+        self._by_name = {f.user_info["name"].lower(): f for f in self.fixtures}
+        self._files: Dict[str, Path] = {}
+        for fixture in self.fixtures:
+            self._files.update(fixture.files)
+
+        handler = type("MockRobloxHandler", (_MockHandler,), {"mock": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockRobloxServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-roblox", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def install(self, session: requests.Session) -> requests.Session:
+        """세션의 https:// 요청을 Mock 서버로 라우팅"""
+        session.mount("https://", _RewriteAdapter(self.base_url))
+        return session
+
+    # ----- 픽스처 조회 -----
+
+    def fixture_for(self, user_id: int) -> AvatarFixture:
+        return self._by_id.get(user_id) or self.fixtures[user_id % len(self.fixtures)]
+
+    def user_info_for(self, user_id: int) -> Dict:
+        fixture = self.fixture_for(user_id)
+        info = dict(fixture.user_info)
+        if user_id not in self._by_id:
+            info.update({"id": user_id, "name": f"mock_user_{user_id}", "displayName": f"mock_user_{user_id}"})
+        return info
+
+    # ----- 장애 주입 -----
+
+    def _chance(self, ratio: float) -> bool:
+        if ratio <= 0:
+            return False
+        with self._random_lock:
+            return self._random.random() < ratio
+
+    def _delay(self):
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            with self._random_lock:
+                latency = self._random.uniform(*latency)
+        if latency > 0:
+            time.sleep(latency)
+
+
+class _RewriteAdapter(HTTPAdapter):
+    """https://host/path → http://mock/host/path 로 URL을 바꿔 전송"""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        original_url = request.url
+        parts = urlsplit(original_url)
+        if parts.scheme == "https":
+            query = f"?{parts.query}" if parts.query else ""
+            request.url = f"{self.base_url}/{parts.hostname}{parts.path}{query}"
+        response = super().send(request, **kwargs)
+        # 호출자(메트릭 훅 포함)에게는 원래 URL이 보이도록 복원
+        response.url = original_url
+        request.url = original_url
+        return response
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    mock: MockRobloxServer = None
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문을 한 번에 전송 (keep-alive에서 지연 ACK로 인한 40ms 대기 방지)
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    _ROUTES = [
+        ("GET", "users.roblox.com", re.compile(r"^/v1/users/(\d+)$"), "_user_info"),
+        ("POST", "users.roblox.com", re.compile(r"^/v1/usernames/users$"), "_usernames"),
+        ("GET", "thumbnails.roblox.com", re.compile(r"^/v1/users/avatar-3d$"), "_avatar_3d"),
+        ("GET", "thumbnails.roblox.com", re.compile(r"^/v1/users/(avatar|avatar-headshot|avatar-bust)$"), "_thumbnails"),
+        ("GET", "thumbnails.roblox.com", re.compile(r"^/v1/assets$"), "_empty_data"),
+        ("GET", "avatar.roblox.com", re.compile(r"^/v1/users/(\d+)/avatar$"), "_avatar_config"),
+        ("GET", "avatar.roblox.com", re.compile(r"^/v1/users/(\d+)/currently-wearing$"), "_currently_wearing"),
+        ("GET", "games.roblox.com", re.compile(r"^/v2/users/(\d+)/games$"), "_empty_data"),
+        ("GET", "groups.roblox.com", re.compile(r"^/v2/users/(\d+)/groups/roles$"), "_groups"),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip("/").partition("/")
+        path = "/" + path
+        self.query = parse_qs(parts.query)
+        self.mock._delay()
+
+        if self.mock._chance(self.mock.rate_limit_ratio):
+            self._send(429, b'{"errors":[{"code":0,"message":"Too many requests"}]}')
+            return
+
+        if host.endswith("rbxcdn.com"):
+            self._cdn(host, path)
+            return
+
+        for route_method, route_host, pattern, name in self._ROUTES:
+            if method == route_method and host == route_host:
+                match = pattern.match(path)
+                if match:
+                    getattr(self, name)(*match.groups())
+                    return
+        self._send(404, b'{"errors":[{"code":404,"message":"NotFound"}]}')
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.mock.request_log.append((self.command, self.path, status))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, data):
+        self._send(200, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    # ----- API 라우트 -----
+
+    def _user_info(self, user_id: str):
+        self._json(self.mock.user_info_for(int(user_id)))
+
+    def _usernames(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        data = []
+        for username in payload.get("usernames", []):
+            fixture = self.mock._by_name.get(username.lower())
+            if fixture:
+                info = fixture.user_info
+                data.append({"requestedUsername": username, "id": info["id"],
+                             "name": info["name"], "displayName": info["displayName"]})
+        self._json({"data": data})
+
+    def _avatar_3d(self):
+        # real_3d_downloader는 userId(단일 응답), integrated는 userIds(목록 응답)를 사용
+        user_ids = self.query.get("userId") or self.query.get("userIds") or ["0"]
+        user_id = int(user_ids[0].split(",")[0])
+        entry = {
+            "targetId": user_id,
+            "state": "Completed",
+            "imageUrl": f"https://t0.rbxcdn.com/mock-3d/{user_id}",
+        }
+        self._json({"data": [entry]} if "userIds" in self.query else entry)
+
+    def _thumbnails(self, endpoint: str):
+        size = self.query.get("size", ["420x420"])[0]
+        thumb_type = {"avatar": "avatar", "avatar-headshot": "headshot", "avatar-bust": "bust"}[endpoint]
+        data = []
+        for user_id in self.query.get("userIds", [""])[0].split(","):
+            if user_id.strip().isdigit():
+                data.append({
+                    "targetId": int(user_id),
+                    "state": "Completed",
+                    "imageUrl": f"https://tr.rbxcdn.com/mock-thumb/{thumb_type}/{int(user_id)}/{size}/Png",
+                })
+        self._json({"data": data})
+
+    def _avatar_config(self, user_id: str):
+        fixture = self.mock.fixture_for(int(user_id))
+        self._json(fixture.api_responses.get("avatar_config", {"playerAvatarType": "R15", "assets": [], "bodyColors": {}}))
+
+    def _currently_wearing(self, user_id: str):
+        fixture = self.mock.fixture_for(int(user_id))
+        self._json(fixture.api_responses.get("currently_wearing", {"assetIds": []}))
+
+    def _groups(self, user_id: str):
+        fixture = self.mock.fixture_for(int(user_id))
+        self._json(fixture.api_responses.get("groups", {"data": []}))
+
+    def _empty_data(self, *args):
+        self._json({"data": []})
+
+    # ----- CDN -----
+
+    def _cdn(self, host: str, path: str):
+        thumb = re.match(r"^/mock-thumb/(\w+)/(\d+)/(\d+x\d+)/Png$", path)
+        if thumb:
+            thumb_type, user_id, size = thumb.groups()
+            fixture = self.mock.fixture_for(int(user_id))
+            self._send(200, fixture.thumbnail_bytes(thumb_type, size), "image/png")
+            return
+
+        meta = re.match(r"^/mock-3d/(\d+)$", path)
+        if meta:
+            self._json(self.mock.fixture_for(int(meta.group(1))).avatar_3d)
+            return
+
+        hash_id = path.lstrip("/")
+        file_path = self.mock._files.get(hash_id)
+        shard = re.match(r"^t(\d)\.rbxcdn\.com$", host)
+        if shard and int(shard.group(1)) in self.mock.failing_shards:
+            self._send(503, b"")
+            return
+        # 실제 CDN처럼 올바른 샤드에서만 파일 제공
+        if file_path is None or not file_path.exists() or not shard or int(shard.group(1)) != cdn_shard(hash_id):
+            self._send(404, b"")
+            return
+        self._send(200, file_path.read_bytes(), "application/octet-stream")
+
+
+def main():
+    """Mock 서버 단독 실행"""
+    server = MockRobloxServer(port=8765).start()
+    print(f"🧪 Mock Roblox 서버 실행 중: {server.base_url}")
+    print(f"   📦 픽스처: {', '.join(f.user_info['name'] for f in server.fixtures)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\nMock 서버 종료")
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+MTL Texture Localizer
+다운로드된 avatar.mtl의 map_* CDN 해시 참조를 로컬 텍스처 경로(textures/texture_NNN.png)로 바꾸고
+해시 → 파일 맵(texture_map.json)을 기록 - 로더가 metadata.json 조회 / 파일 검색 없이 텍스처를 바로 엶
+
+    map_Kd 30DAY-f6845b98e98108f5a3004ac7d752d8d7   →   map_Kd textures/texture_001.png
+
+다운로드 중에는 MtlTextureRewriter가 스트림 청크를 줄 단위로 변환하고,
+이미 받은 폴더는 localize_mtl()로 임시 파일 + 교체 방식으로 변환 (하드링크된 패키지 파일은 그대로)
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+TEXTURE_MAP_NAME = "texture_map.json"
+
+# 텍스처 파일을 참조하는 MTL 문 (마지막 토큰이 파일 이름, 앞쪽은 -s/-o 등 옵션)
+TEXTURE_STATEMENTS = (b"map_", b"bump", b"disp", b"decal", b"refl", b"norm")
+
+
+class MtlTextureRewriter:
+    """
+    MTL 스트림 변환기 - 청크 경계에서 잘린 줄은 다음 청크까지 보관
+
+    다운로드 루프에서 feed()가 돌려준 바이트를 쓰고, 마지막에 finish()의 나머지를 씀
+    """
+
+    def __init__(self, texture_map: Dict[str, str]):
+        """
+        Args:
+            texture_map (Dict[str, str]): CDN 해시 → 아바타 폴더 기준 상대 경로
+        """
+        self.texture_map = {h.encode(): path.encode() for h, path in texture_map.items()}
+        self.reset()
+
+    def reset(self):
+        """새 시도(다른 CDN 서버)를 위해 초기화"""
+        self._pending = b""
+        self.rewritten = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        data = self._pending + chunk
+        cut = data.rfind(b"\n") + 1
+        self._pending = data[cut:]
+        return self._rewrite(data[:cut])
+
+    def finish(self) -> bytes:
+        data, self._pending = self._pending, b""
+        return self._rewrite(data)
+
+    def _rewrite(self, data: bytes) -> bytes:
+        if not data or not self.texture_map:
+            return data
+        return b"".join(self.rewrite_line(line) for line in data.splitlines(keepends=True))
+
+    def rewrite_line(self, line: bytes) -> bytes:
+        """map_* 줄의 파일 토큰이 맵에 있으면 로컬 경로로 교체 (들여쓰기/옵션/줄 끝은 유지)"""
+        if not line.lstrip().lower().startswith(TEXTURE_STATEMENTS):
+            return line
+        body = line.rstrip()
+        tokens = body.split()
+        if len(tokens) < 2 or tokens[-1] not in self.texture_map:
+            return line
+        start = len(body) - len(tokens[-1])
+        self.rewritten += 1
+        return body[:start] + self.texture_map[tokens[-1]] + line[len(body):]
+
+
+def write_texture_map(avatar_folder: Path, texture_map: Dict[str, str]) -> Path:
+    """해시 → 파일 맵 저장 (임시 파일 후 교체)"""
+    map_file = Path(avatar_folder) / TEXTURE_MAP_NAME
+    tmp_file = map_file.with_name(map_file.name + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(texture_map, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, map_file)
+    return map_file
+
+
+def load_texture_map(avatar_folder: Path) -> Dict[str, str]:
+    """texture_map.json 읽기 (없거나 깨졌으면 빈 dict)"""
+    try:
+        with open(Path(avatar_folder) / TEXTURE_MAP_NAME, 'r', encoding='utf-8') as f:
+            texture_map = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return texture_map if isinstance(texture_map, dict) else {}
+
+
+def build_texture_map(avatar_folder: Path) -> Dict[str, str]:
+    """
+    이미 받은 폴더의 해시 → 파일 맵 (metadata.json 텍스처 순서 + textures/texture_NNN.*)
+
+    받지 못한 텍스처는 맵에서 빠짐 (MTL에는 해시가 그대로 남음)
+    """
+    avatar_folder = Path(avatar_folder)
+    try:
+        with open(avatar_folder / "metadata.json", 'r', encoding='utf-8') as f:
+            textures = json.load(f).get("avatar_3d_metadata", {}).get("textures") or []
+    except (OSError, ValueError):
+        return {}
+
+    texture_map = {}
+    for i, texture_hash in enumerate(textures):
+        for path in sorted((avatar_folder / "textures").glob(f"texture_{i+1:03d}.*")):
+            texture_map[texture_hash] = path.relative_to(avatar_folder).as_posix()
+            break
+    return texture_map
+
+
+def rewrite_mtl_file(mtl_path: Path, texture_map: Dict[str, str]) -> int:
+    """
+    MTL 파일을 변환 (바뀐 줄이 있을 때만 임시 파일 + os.replace - 하드링크 상대 파일은 그대로)
+
+    Returns:
+        int: 바뀐 map_* 줄 수
+    """
+    mtl_path = Path(mtl_path)
+    rewriter = MtlTextureRewriter(texture_map)
+    with open(mtl_path, 'rb') as f:
+        content = rewriter.feed(f.read()) + rewriter.finish()
+    if rewriter.rewritten:
+        tmp_path = mtl_path.with_name(f".{mtl_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, mtl_path)
+    return rewriter.rewritten
+
+
+def localize_mtl(avatar_folder: Path) -> Optional[int]:
+    """
+    이미 받은 아바타 폴더의 MTL 해시 참조를 로컬 경로로 변환하고 texture_map.json 기록
+
+    Returns:
+        Optional[int]: 바뀐 map_* 줄 수 (avatar.mtl 또는 받은 텍스처가 없으면 None)
+    """
+    avatar_folder = Path(avatar_folder)
+    mtl_path = avatar_folder / "avatar.mtl"
+    texture_map = build_texture_map(avatar_folder)
+    if not mtl_path.exists() or not texture_map:
+        return None
+    write_texture_map(avatar_folder, texture_map)
+    return rewrite_mtl_file(mtl_path, texture_map)
+
+
+def find_mtl_folders(root: Path) -> Iterator[Path]:
+    """root 아래 avatar.mtl이 있는 폴더 (root 자신 포함)"""
+    root = Path(root)
+    if (root / "avatar.mtl").exists():
+        yield root
+    for mtl_path in sorted(root.rglob("*/avatar.mtl")):
+        yield mtl_path.parent
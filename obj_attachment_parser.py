@@ -4,26 +4,26 @@ OBJ 파일에서 Attachment 정보 추출기
 3D 모델 파일에서 attachment point, bone structure 등을 파싱
 """
 
-import re
 from pathlib import Path
 import json
 import time
 
+from analysis_stream import ANALYSIS_NDJSON, AnalysisStreamWriter, write_json_sidecar
+from avatar_metrics import PARSE_SECONDS
+from avatar_patterns import ATTACHMENT_PATTERNS, AttachmentMatcher
+from mesh_cache import cached_obj_stats
+from obj_scanner import scan_obj_stats
+
 class OBJAttachmentParser:
     def __init__(self):
-        self.attachment_patterns = [
-            r'# Attachment\s+(\w+)',
-            r'# Attach\s+(\w+)',
-            r'o\s+(\w*[Aa]ttach\w*)',
-            r'g\s+(\w*[Aa]ttach\w*)',
-            r'# Bone\s+(\w+)',
-            r'o\s+(\w*[Bb]one\w*)',
-            r'g\s+(\w*[Bb]one\w*)',
-        ]
+        self.attachment_patterns = list(ATTACHMENT_PATTERNS)
+        # 패턴과 키워드는 생성 시 한 번만 컴파일
+        self.matcher = AttachmentMatcher(self.attachment_patterns)
     
     def parse_obj_file(self, obj_path: Path) -> dict:
         """OBJ 파일에서 attachment 정보 파싱"""
         print(f"🔍 OBJ 파일 분석: {obj_path.name}")
+        parse_start = time.perf_counter()
         
         attachment_data = {
             "file_path": str(obj_path),
@@ -43,88 +43,14 @@ class OBJAttachmentParser:
             return attachment_data
         
         try:
-            with open(obj_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            print(f"   📄 {len(lines):,}라인 분석 중...")
-            
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip()
-                
-                # 빈 라인 건너뛰기
-                if not line:
-                    continue
-                
-                # 버텍스 카운트
-                if line.startswith('v '):
-                    attachment_data["vertices"] += 1
-                
-                # 면 카운트
-                elif line.startswith('f '):
-                    attachment_data["faces"] += 1
-                
-                # 오브젝트
-                elif line.startswith('o '):
-                    obj_name = line[2:].strip()
-                    attachment_data["objects"].append({
-                        "line": line_num,
-                        "name": obj_name
-                    })
-                    
-                    # Attachment 관련 오브젝트 찾기
-                    if 'attach' in obj_name.lower() or 'bone' in obj_name.lower():
-                        attachment_data["attachments"].append({
-                            "type": "object",
-                            "line": line_num,
-                            "name": obj_name,
-                            "source": line
-                        })
-                
-                # 그룹
-                elif line.startswith('g '):
-                    group_name = line[2:].strip()
-                    attachment_data["groups"].append({
-                        "line": line_num,
-                        "name": group_name
-                    })
-                    
-                    # Attachment 관련 그룹 찾기
-                    if 'attach' in group_name.lower() or 'bone' in group_name.lower():
-                        attachment_data["attachments"].append({
-                            "type": "group",
-                            "line": line_num,
-                            "name": group_name,
-                            "source": line
-                        })
-                
-                # 코멘트 (Attachment 정보가 있을 수 있음)
-                elif line.startswith('#'):
-                    comment = line[1:].strip()
-                    
-                    # 중요한 코멘트만 저장
-                    if any(keyword in comment.lower() for keyword in ['attach', 'bone', 'joint', 'bind', 'rig']):
-                        attachment_data["comments"].append({
-                            "line": line_num,
-                            "content": comment,
-                            "source": line
-                        })
-                        
-                        # 패턴 매칭
-                        for pattern in self.attachment_patterns:
-                            match = re.search(pattern, line, re.IGNORECASE)
-                            if match:
-                                attachment_data["attachments"].append({
-                                    "type": "comment",
-                                    "line": line_num,
-                                    "name": match.group(1),
-                                    "pattern": pattern,
-                                    "source": line
-                                })
-                
-                # 재질 라이브러리
-                elif line.startswith('mtllib '):
-                    mtl_file = line[7:].strip()
-                    attachment_data["materials"].append(mtl_file)
+            # 최신 메시 캐시가 있으면 헤더의 라인 통계로 분석 (텍스트 재파싱 없음)
+            obj_stats = cached_obj_stats(obj_path)
+            if obj_stats is not None:
+                print(f"   🗂️ 메시 캐시 사용: {obj_path.with_suffix('.meshcache').name}")
+                self._apply_obj_stats(attachment_data, obj_stats)
+            else:
+                # 바이트 스캐너로 라인 통계를 만든 뒤 같은 경로로 채움 (드문 줄만 디코딩)
+                self._apply_obj_stats(attachment_data, scan_obj_stats(obj_path))
             
             # 결과 출력
             print(f"   ✅ 분석 완료:")
@@ -139,11 +65,67 @@ class OBJAttachmentParser:
             print(f"   ❌ 파일 읽기 오류: {e}")
             attachment_data["error"] = str(e)
         
+        PARSE_SECONDS.observe(time.perf_counter() - parse_start, parser="parse_obj_file")
         return attachment_data
     
+    def _apply_obj_stats(self, attachment_data: dict, obj_stats: dict):
+        """라인 통계(메시 캐시 헤더 또는 scan_obj_stats)로 attachment 정보 채우기"""
+        attachment_data["vertices"] = obj_stats["vertices"]
+        attachment_data["faces"] = obj_stats["faces"]
+        
+        # 원본 라인 순서대로 기록
+        records = [("object", entry) for entry in obj_stats["objects"]]
+        records += [("group", entry) for entry in obj_stats["groups"]]
+        records += [("comment", entry) for entry in obj_stats["comments"]]
+        for kind, entry in sorted(records, key=lambda record: record[1]["line"]):
+            if kind == "comment":
+                self._record_comment(attachment_data, entry["line"], entry["source"])
+            else:
+                self._record_named(attachment_data, kind, entry["line"], entry["name"], entry["source"])
+        
+        attachment_data["materials"].extend(obj_stats["mtllibs"])
+    
+    def _record_named(self, attachment_data: dict, kind: str, line_num: int, name: str, line: str):
+        """오브젝트(o)/그룹(g) 기록 및 Attachment 관련 이름 찾기"""
+        attachment_data["objects" if kind == "object" else "groups"].append({
+            "line": line_num,
+            "name": name
+        })
+        
+        if self.matcher.is_attachment_name(name):
+            attachment_data["attachments"].append({
+                "type": kind,
+                "line": line_num,
+                "name": name,
+                "source": line
+            })
+    
+    def _record_comment(self, attachment_data: dict, line_num: int, line: str):
+        """중요한 코멘트 기록 및 Attachment 패턴 매칭"""
+        comment = line[1:].strip()
+        
+        # 중요한 코멘트만 저장
+        if self.matcher.is_important_comment(comment):
+            attachment_data["comments"].append({
+                "line": line_num,
+                "content": comment,
+                "source": line
+            })
+            
+            # 패턴 매칭
+            for pattern, name in self.matcher.match_comment(line):
+                attachment_data["attachments"].append({
+                    "type": "comment",
+                    "line": line_num,
+                    "name": name,
+                    "pattern": pattern,
+                    "source": line
+                })
+    
     def parse_mtl_file(self, mtl_path: Path) -> dict:
         """MTL 파일에서 재질 정보 파싱"""
         print(f"🎨 MTL 파일 분석: {mtl_path.name}")
+        parse_start = time.perf_counter()
         
         material_data = {
             "file_path": str(mtl_path),
@@ -207,8 +189,54 @@ class OBJAttachmentParser:
             print(f"   ❌ MTL 파일 읽기 오류: {e}")
             material_data["error"] = str(e)
         
+        PARSE_SECONDS.observe(time.perf_counter() - parse_start, parser="parse_mtl_file")
         return material_data
     
+    def find_avatar_folders(self, base_folder: str = ".") -> list:
+        """3D 아바타 폴더 목록 (*_3D, *3d*, avatar_*, *avatar* 패턴, 중복 제거)"""
+        base_path = Path(base_folder)
+        avatar_folders = []
+        for folder_pattern in ["*_3D", "*3d*", "avatar_*", "*avatar*"]:
+            avatar_folders.extend(base_path.glob(f"**/{folder_pattern}"))
+        
+        # 중복 제거
+        avatar_folders = list(set(avatar_folders))
+        return [f for f in avatar_folders if f.is_dir()]
+    
+    def analyze_avatar_folder(self, folder: Path) -> dict:
+        """아바타 폴더 하나의 OBJ/MTL/텍스처 분석"""
+        print(f"\n📂 폴더 분석: {folder.name}")
+        
+        folder_data = {
+            "folder_path": str(folder),
+            "folder_name": folder.name,
+            "obj_files": [],
+            "mtl_files": [],
+            "texture_files": []
+        }
+        
+        # OBJ 파일들 찾기
+        obj_files = list(folder.glob("*.obj"))
+        for obj_file in obj_files:
+            obj_data = self.parse_obj_file(obj_file)
+            folder_data["obj_files"].append(obj_data)
+        
+        # MTL 파일들 찾기
+        mtl_files = list(folder.glob("*.mtl"))
+        for mtl_file in mtl_files:
+            mtl_data = self.parse_mtl_file(mtl_file)
+            folder_data["mtl_files"].append(mtl_data)
+        
+        # 텍스처 파일들 찾기
+        texture_extensions = ["*.png", "*.jpg", "*.jpeg", "*.bmp", "*.tga"]
+        for ext in texture_extensions:
+            folder_data["texture_files"].extend([
+                {"file": str(f), "name": f.name, "size": f.stat().st_size}
+                for f in folder.glob(ext)
+            ])
+        
+        return folder_data
+    
     def scan_avatar_folders(self, base_folder: str = ".") -> dict:
         """아바타 폴더들을 스캔하여 모든 OBJ/MTL 파일 분석"""
         print(f"🔍 '{base_folder}' 폴더에서 3D 아바타 파일들 스캔...")
@@ -221,51 +249,47 @@ class OBJAttachmentParser:
         }
         
         # 3D 폴더들 찾기
-        avatar_folders = []
-        for folder_pattern in ["*_3D", "*3d*", "avatar_*", "*avatar*"]:
-            avatar_folders.extend(base_path.glob(f"**/{folder_pattern}"))
-        
-        # 중복 제거
-        avatar_folders = list(set(avatar_folders))
-        avatar_folders = [f for f in avatar_folders if f.is_dir()]
-        
+        avatar_folders = self.find_avatar_folders(base_folder)
         print(f"   📁 {len(avatar_folders)}개 아바타 폴더 발견")
         
         for folder in avatar_folders:
-            print(f"\n📂 폴더 분석: {folder.name}")
-            
-            folder_data = {
-                "folder_path": str(folder),
-                "folder_name": folder.name,
-                "obj_files": [],
-                "mtl_files": [],
-                "texture_files": []
-            }
-            
-            # OBJ 파일들 찾기
-            obj_files = list(folder.glob("*.obj"))
-            for obj_file in obj_files:
-                obj_data = self.parse_obj_file(obj_file)
-                folder_data["obj_files"].append(obj_data)
-            
-            # MTL 파일들 찾기
-            mtl_files = list(folder.glob("*.mtl"))
-            for mtl_file in mtl_files:
-                mtl_data = self.parse_mtl_file(mtl_file)
-                folder_data["mtl_files"].append(mtl_data)
-            
-            # 텍스처 파일들 찾기
-            texture_extensions = ["*.png", "*.jpg", "*.jpeg", "*.bmp", "*.tga"]
-            for ext in texture_extensions:
-                folder_data["texture_files"].extend([
-                    {"file": str(f), "name": f.name, "size": f.stat().st_size}
-                    for f in folder.glob(ext)
-                ])
-            
-            scan_results["avatar_folders"].append(folder_data)
+            scan_results["avatar_folders"].append(self.analyze_avatar_folder(folder))
         
         return scan_results
     
+    def stream_attachment_analysis(self, base_folder: str = ".", output_file: str = ANALYSIS_NDJSON) -> int:
+        """
+        아바타 폴더를 분석하는 대로 NDJSON 한 줄씩 기록 (전체 결과를 메모리에 모으지 않음)
+        
+        Args:
+            base_folder (str): 스캔할 폴더
+            output_file (str): NDJSON 경로 (유저 ID 인덱스는 같은 이름 + .idx, 리포트는 .md)
+        
+        Returns:
+            int: 기록한 폴더 수
+        """
+        print(f"🔍 '{base_folder}' 폴더에서 3D 아바타 파일들 스트리밍 스캔...")
+        
+        output_path = Path(output_file)
+        scanned_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        avatar_folders = self.find_avatar_folders(base_folder)
+        print(f"   📁 {len(avatar_folders)}개 아바타 폴더 발견")
+        
+        # 요약 리포트도 폴더 단위로 이어서 기록
+        totals = {"vertices": 0, "faces": 0, "objects": 0, "attachments": 0}
+        report_path = output_path.with_suffix('.md')
+        with AnalysisStreamWriter(output_path) as writer, open(report_path, 'w', encoding='utf-8') as report:
+            report.write(self._report_header(scanned_at, str(Path(base_folder).absolute()), len(avatar_folders)))
+            for folder in avatar_folders:
+                folder_data = self.analyze_avatar_folder(folder)
+                writer.write(folder_data)
+                report.write(self._report_folder(folder_data, totals))
+            report.write(self._report_footer(totals, scanned_at))
+        
+        print(f"\n📁 Attachment 분석 스트림 저장: {output_path} ({writer.count}개 폴더)")
+        print(f"📄 분석 리포트 생성: {report_path}")
+        return writer.count
+    
     def save_attachment_analysis(self, scan_results: dict, output_file: str = "attachment_analysis.json"):
         """분석 결과 저장"""
         output_path = Path(output_file)
@@ -275,77 +299,87 @@ class OBJAttachmentParser:
         
         print(f"\n📁 Attachment 분석 결과 저장: {output_path}")
         
+        # 유저 ID 조회용 NDJSON 사본 + 인덱스 (analyze_attachments가 JSON 전체를 읽지 않도록)
+        write_json_sidecar(scan_results, output_path)
+        
         # 요약 리포트도 생성
         self.generate_analysis_report(scan_results, output_path.with_suffix('.md'))
     
     def generate_analysis_report(self, scan_results: dict, report_path: Path):
         """분석 요약 리포트 생성"""
-        report = f"""# 3D 아바타 Attachment 분석 리포트
+        totals = {"vertices": 0, "faces": 0, "objects": 0, "attachments": 0}
+        report = self._report_header(scan_results['scanned_at'], scan_results['base_folder'],
+                                     len(scan_results['avatar_folders']))
+        for folder_data in scan_results["avatar_folders"]:
+            report += self._report_folder(folder_data, totals)
+        report += self._report_footer(totals, scan_results['scanned_at'])
+        
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+        
+        print(f"📄 분석 리포트 생성: {report_path}")
+    
+    def _report_header(self, scanned_at: str, base_folder: str, folder_count: int) -> str:
+        return f"""# 3D 아바타 Attachment 분석 리포트
 
 ## 📋 분석 개요
-- **분석 시간**: {scan_results['scanned_at']}
-- **기준 폴더**: {scan_results['base_folder']}
-- **발견된 아바타 폴더**: {len(scan_results['avatar_folders'])}개
+- **분석 시간**: {scanned_at}
+- **기준 폴더**: {base_folder}
+- **발견된 아바타 폴더**: {folder_count}개
 
 ## 📊 분석 결과
 """
+    
+    def _report_folder(self, folder_data: dict, totals: dict) -> str:
+        """폴더 하나의 리포트 섹션 (totals는 제자리 누적)"""
+        folder_name = folder_data["folder_name"]
+        obj_count = len(folder_data["obj_files"])
+        mtl_count = len(folder_data["mtl_files"])
+        texture_count = len(folder_data["texture_files"])
         
-        total_attachments = 0
-        total_objects = 0
-        total_vertices = 0
-        total_faces = 0
-        
-        for folder_data in scan_results["avatar_folders"]:
-            folder_name = folder_data["folder_name"]
-            obj_count = len(folder_data["obj_files"])
-            mtl_count = len(folder_data["mtl_files"])
-            texture_count = len(folder_data["texture_files"])
-            
-            report += f"\n### 📂 {folder_name}\n"
-            report += f"- **OBJ 파일**: {obj_count}개\n"
-            report += f"- **MTL 파일**: {mtl_count}개\n"
-            report += f"- **텍스처 파일**: {texture_count}개\n"
-            
-            # OBJ 파일 상세 정보
-            for obj_data in folder_data["obj_files"]:
-                if "error" not in obj_data:
-                    vertices = obj_data.get("vertices", 0)
-                    faces = obj_data.get("faces", 0)
-                    objects = len(obj_data.get("objects", []))
-                    attachments = len(obj_data.get("attachments", []))
-                    
-                    total_vertices += vertices
-                    total_faces += faces
-                    total_objects += objects
-                    total_attachments += attachments
-                    
-                    report += f"  - **{Path(obj_data['file_path']).name}**:\n"
-                    report += f"    - 버텍스: {vertices:,}개\n"
-                    report += f"    - 면: {faces:,}개\n"
-                    report += f"    - 오브젝트: {objects}개\n"
-                    report += f"    - Attachment 관련: {attachments}개\n"
-                    
-                    # 발견된 Attachment들
-                    if attachments > 0:
-                        report += f"    - **발견된 Attachment들**:\n"
-                        for att in obj_data.get("attachments", [])[:5]:  # 처음 5개만
-                            att_name = att.get("name", "Unknown")
-                            att_type = att.get("type", "unknown")
-                            report += f"      - {att_name} ({att_type})\n"
+        report = f"\n### 📂 {folder_name}\n"
+        report += f"- **OBJ 파일**: {obj_count}개\n"
+        report += f"- **MTL 파일**: {mtl_count}개\n"
+        report += f"- **텍스처 파일**: {texture_count}개\n"
         
+        # OBJ 파일 상세 정보
+        for obj_data in folder_data["obj_files"]:
+            if "error" not in obj_data:
+                vertices = obj_data.get("vertices", 0)
+                faces = obj_data.get("faces", 0)
+                objects = len(obj_data.get("objects", []))
+                attachments = len(obj_data.get("attachments", []))
+                
+                totals["vertices"] += vertices
+                totals["faces"] += faces
+                totals["objects"] += objects
+                totals["attachments"] += attachments
+                
+                report += f"  - **{Path(obj_data['file_path']).name}**:\n"
+                report += f"    - 버텍스: {vertices:,}개\n"
+                report += f"    - 면: {faces:,}개\n"
+                report += f"    - 오브젝트: {objects}개\n"
+                report += f"    - Attachment 관련: {attachments}개\n"
+                
+                # 발견된 Attachment들
+                if attachments > 0:
+                    report += f"    - **발견된 Attachment들**:\n"
+                    for att in obj_data.get("attachments", [])[:5]:  # 처음 5개만
+                        att_name = att.get("name", "Unknown")
+                        att_type = att.get("type", "unknown")
+                        report += f"      - {att_name} ({att_type})\n"
+        return report
+    
+    def _report_footer(self, totals: dict, scanned_at: str) -> str:
         # 전체 통계
-        report += f"\n## 🎯 전체 통계\n"
-        report += f"- **총 버텍스**: {total_vertices:,}개\n"
-        report += f"- **총 면**: {total_faces:,}개\n"
-        report += f"- **총 오브젝트**: {total_objects}개\n"
-        report += f"- **총 Attachment 관련**: {total_attachments}개\n"
+        report = f"\n## 🎯 전체 통계\n"
+        report += f"- **총 버텍스**: {totals['vertices']:,}개\n"
+        report += f"- **총 면**: {totals['faces']:,}개\n"
+        report += f"- **총 오브젝트**: {totals['objects']}개\n"
+        report += f"- **총 Attachment 관련**: {totals['attachments']}개\n"
         
-        report += f"\n---\n*리포트 생성 시간: {scan_results['scanned_at']}*\n"
-        
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(report)
-        
-        print(f"📄 분석 리포트 생성: {report_path}")
+        report += f"\n---\n*리포트 생성 시간: {scanned_at}*\n"
+        return report
 
 def main():
     print("=== OBJ 파일 Attachment 분석기 ===\n")
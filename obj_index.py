@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+OBJ Group Byte-Offset Index
+avatar.obj 옆에 그룹/오브젝트 구간과 v/vt/vn 블록의 바이트 위치를 저장하는 인덱스 (avatar.objindex)
+
+큰 OBJ에서 바디 파트 하나(예: Handle1, Player1)만 필요할 때 전체 파일을 읽지 않고
+해당 구간과 참조하는 정점 줄만 seek로 읽어 추출
+
+인덱스 구조 (JSON):
+    sections: g/o 라인부터 다음 g/o 라인 전까지 {kind, name, line, offset, length, counts}
+              counts는 구간 시작 시점의 v/vt/vn 개수 (음수 인덱스 해석용)
+    blocks:   {"v"|"vt"|"vn": [{offset, length, line, first, count, checkpoints}]}
+              checkpoints는 블록 안에서 CHECKPOINT_INTERVAL개마다의 줄 시작 오프셋
+"""
+
+import bisect
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+INDEX_SUFFIX = ".objindex"
+INDEX_VERSION = 1
+CHECKPOINT_INTERVAL = 64
+
+_ELEMENT_KEYS = {b"v": "v", b"vt": "vt", b"vn": "vn"}
+
+
+def index_path_for(obj_path: Path) -> Path:
+    """avatar.obj → avatar.objindex"""
+    return Path(obj_path).with_suffix(INDEX_SUFFIX)
+
+
+def build_obj_index(obj_path: Path) -> Dict:
+    """
+    OBJ를 바이트 단위로 한 번 훑어 구간/블록 인덱스 생성
+
+    Args:
+        obj_path (Path): OBJ 파일 경로
+
+    Returns:
+        Dict: 인덱스 (저장은 save_obj_index)
+    """
+    obj_path = Path(obj_path)
+    stat = obj_path.stat()
+    sections: List[Dict] = []
+    blocks: Dict[str, List[Dict]] = {"v": [], "vt": [], "vn": []}
+    counts = {"v": 0, "vt": 0, "vn": 0}
+    mtllibs: List[str] = []
+    current_block = None
+
+    offset = 0
+    with open(obj_path, 'rb') as f:
+        for line_num, line in enumerate(f, 1):
+            parts = line.split(None, 1)
+            key = parts[0] if parts else b""
+            kind = _ELEMENT_KEYS.get(key)
+
+            if kind:
+                if current_block is None or current_block["kind"] != kind:
+                    current_block = {"kind": kind, "offset": offset, "line": line_num,
+                                     "first": counts[kind], "count": 0, "checkpoints": []}
+                    blocks[kind].append(current_block)
+                if current_block["count"] % CHECKPOINT_INTERVAL == 0:
+                    current_block["checkpoints"].append(offset)
+                current_block["count"] += 1
+                current_block["length"] = offset + len(line) - current_block["offset"]
+                counts[kind] += 1
+            elif key in (b"g", b"o"):
+                current_block = None
+                if sections:
+                    sections[-1]["length"] = offset - sections[-1]["offset"]
+                name = line.decode("utf-8", "replace").strip()[2:].strip() or "default"
+                sections.append({"kind": key.decode(), "name": name, "line": line_num,
+                                 "offset": offset, "length": 0, "counts": dict(counts)})
+            elif key and not key.startswith(b"#"):
+                # 빈 줄/코멘트는 블록을 끊지 않고, 다른 종류의 줄은 블록을 끝냄
+                current_block = None
+                if key == b"mtllib" and len(parts) > 1:
+                    mtllibs.append(parts[1].decode("utf-8", "replace").strip())
+            offset += len(line)
+
+    if sections:
+        sections[-1]["length"] = offset - sections[-1]["offset"]
+    for kind_blocks in blocks.values():
+        for block in kind_blocks:
+            del block["kind"]
+
+    return {
+        "version": INDEX_VERSION,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": {"name": obj_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+        "checkpoint_interval": CHECKPOINT_INTERVAL,
+        "mtllibs": mtllibs,
+        "counts": counts,
+        "sections": sections,
+        "blocks": blocks,
+    }
+
+
+def save_obj_index(index: Dict, index_path: Path) -> Path:
+    """인덱스를 JSON으로 저장 (임시 파일에 쓴 뒤 교체)"""
+    index_path = Path(index_path)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+def load_obj_index(obj_path: Path) -> Optional[Dict]:
+    """
+    OBJ와 크기/수정 시각이 같은 인덱스 반환 (없거나 오래되면 None)
+
+    Args:
+        obj_path (Path): 원본 OBJ 경로
+    """
+    obj_path = Path(obj_path)
+    try:
+        with open(index_path_for(obj_path), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        stat = obj_path.stat()
+    except (OSError, ValueError):
+        return None
+
+    source = index.get("source", {})
+    if (index.get("version") != INDEX_VERSION or source.get("size") != stat.st_size
+            or source.get("mtime_ns") != stat.st_mtime_ns):
+        return None
+    return index
+
+
+def ensure_obj_index(obj_path: Path, force: bool = False) -> Dict:
+    """최신 인덱스를 읽고, 없거나 오래되었으면 새로 생성해 저장"""
+    index = None if force else load_obj_index(obj_path)
+    if index is None:
+        index = build_obj_index(obj_path)
+        save_obj_index(index, index_path_for(obj_path))
+    return index
+
+
+def group_names(index: Dict) -> List[str]:
+    """인덱스의 그룹/오브젝트 이름 (등장 순서, 중복 제거)"""
+    return list(dict.fromkeys(section["name"] for section in index["sections"]))
+
+
+def read_group_section(obj_path: Path, name: str, index: Optional[Dict] = None) -> bytes:
+    """
+    이름이 같은 모든 g/o 구간의 원문 바이트를 seek로 읽기
+
+    Raises:
+        KeyError: 해당 이름의 그룹이 없는 경우
+    """
+    index = index or ensure_obj_index(obj_path)
+    sections = [s for s in index["sections"] if s["name"] == name]
+    if not sections:
+        raise KeyError(name)
+
+    chunks = []
+    with open(obj_path, 'rb') as f:
+        for section in sections:
+            f.seek(section["offset"])
+            chunks.append(f.read(section["length"]))
+    return b"".join(chunks)
+
+
+def read_elements(obj_path: Path, kind: str, wanted: Iterable[int], index: Optional[Dict] = None) -> Dict[int, bytes]:
+    """
+    v/vt/vn 요소 중 필요한 것만 체크포인트에서 seek해 읽기
+
+    Args:
+        obj_path (Path): OBJ 경로
+        kind (str): "v", "vt", "vn"
+        wanted (Iterable[int]): 0부터 시작하는 전역 요소 번호
+        index (Dict): OBJ 인덱스
+
+    Returns:
+        Dict[int, bytes]: 요소 번호 → 키워드를 뺀 값 부분 (예: b"0.1 0.2 0.3")
+    """
+    index = index or ensure_obj_index(obj_path)
+    blocks = index["blocks"][kind]
+    firsts = [block["first"] for block in blocks]
+    interval = index["checkpoint_interval"]
+    key = kind.encode()
+
+    result: Dict[int, bytes] = {}
+    with open(obj_path, 'rb') as f:
+        position = None  # (블록, 다음에 읽을 요소 번호)
+        for element in sorted(set(wanted)):
+            block_no = bisect.bisect_right(firsts, element) - 1
+            if block_no < 0 or element >= blocks[block_no]["first"] + blocks[block_no]["count"]:
+                raise IndexError(f"{kind} {element + 1}")
+            block = blocks[block_no]
+
+            # 같은 체크포인트 구간에서 앞으로 읽고 있으면 이어서 읽고, 아니면 체크포인트로 이동
+            checkpoint = (element - block["first"]) // interval
+            if (position is None or position[0] != block_no or position[1] > element
+                    or (element - block["first"]) // interval != (position[1] - block["first"]) // interval):
+                f.seek(block["checkpoints"][checkpoint])
+                position = (block_no, block["first"] + checkpoint * interval)
+
+            while True:
+                line = f.readline()
+                if not line:
+                    raise ValueError(f"인덱스와 OBJ가 일치하지 않음: {kind} {element + 1}")
+                parts = line.split(None, 1)
+                if not parts or parts[0] != key:
+                    continue
+                current = position[1]
+                position = (block_no, current + 1)
+                if current == element:
+                    result[element] = parts[1].strip() if len(parts) > 1 else b""
+                    break
+    return result
+
+
+def _resolve(token: bytes, count: int) -> int:
+    """OBJ 인덱스 토큰(1부터, 음수는 상대)을 0부터 시작하는 전역 번호로 변환"""
+    value = int(token)
+    return value - 1 if value > 0 else count + value
+
+
+def extract_group(obj_path: Path, name: str, output_path: Path, index: Optional[Dict] = None) -> Path:
+    """
+    그룹 하나만 독립된 OBJ로 추출 (참조하는 v/vt/vn만 포함하고 인덱스를 다시 매김)
+
+    Args:
+        obj_path (Path): 원본 OBJ 경로
+        name (str): 그룹/오브젝트 이름 (예: "Handle1")
+        output_path (Path): 출력 OBJ 경로
+        index (Dict): OBJ 인덱스 (없으면 읽거나 생성)
+
+    Returns:
+        Path: 저장된 OBJ 경로
+    """
+    obj_path = Path(obj_path)
+    index = index or ensure_obj_index(obj_path)
+    sections = [s for s in index["sections"] if s["name"] == name]
+    if not sections:
+        raise KeyError(name)
+
+    # 1. 구간 바이트에서 면/재질 줄 수집 (면 인덱스는 전역 번호로 변환)
+    kinds = ("v", "vt", "vn")
+    body: List[tuple] = []
+    with open(obj_path, 'rb') as f:
+        for section in sections:
+            f.seek(section["offset"])
+            counts = dict(section["counts"])
+            for line in f.read(section["length"]).splitlines():
+                parts = line.split()
+                if not parts:
+                    continue
+                key = parts[0]
+                if key in _ELEMENT_KEYS:
+                    counts[_ELEMENT_KEYS[key]] += 1
+                elif key == b"f":
+                    corners = []
+                    for corner in parts[1:]:
+                        fields = corner.split(b"/")
+                        corners.append(tuple(_resolve(fields[i], counts[kinds[i]])
+                                             if i < len(fields) and fields[i] else None for i in range(3)))
+                    body.append(("f", corners))
+                elif key in (b"usemtl", b"s"):
+                    body.append(("raw", line.strip()))
+
+    # 2. 참조하는 요소만 읽어 새 번호 부여
+    remap = {}
+    values = {}
+    for i, kind in enumerate(kinds):
+        used = sorted({c[i] for item in body if item[0] == "f" for c in item[1] if c[i] is not None})
+        remap[kind] = {element: n for n, element in enumerate(used, 1)}
+        values[kind] = read_elements(obj_path, kind, used, index) if used else {}
+
+    # 3. 독립 OBJ 작성
+    output_path = Path(output_path)
+    with open(output_path, 'wb') as out:
+        for mtllib in index.get("mtllibs", []):
+            out.write(b"mtllib " + mtllib.encode("utf-8") + b"\n")
+        for kind in kinds:
+            for element in remap[kind]:
+                out.write(kind.encode() + b" " + values[kind][element] + b"\n")
+        out.write(b"g " + name.encode("utf-8") + b"\n")
+        for item_type, item in body:
+            if item_type == "raw":
+                out.write(item + b"\n")
+                continue
+            tokens = []
+            for corner in item:
+                fields = [str(remap[kind][c]) if c is not None else "" for kind, c in zip(kinds, corner)]
+                tokens.append("/".join(fields).rstrip("/"))
+            out.write(("f " + " ".join(tokens) + "\n").encode())
+    return output_path
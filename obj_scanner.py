@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+OBJ Line Scanner
+OBJ 구조 분석용 바이트 단위 스캐너 - 큰 버퍼 단위로 v/vt/vn/f 줄은 bytes.count로 한 번에 세고,
+드문 줄(g/o/usemtl/mtllib/#, 앞 공백 등 예외 형태)만 디코딩해 기존 텍스트 루프와 같은 규칙으로 처리
+
+파일은 고정 크기 mmap 창으로 읽으므로(줄 목록 없음) 여러 워커에서 큰 OBJ를 동시에 분석해도
+워커당 최대 RSS가 OBJ 크기와 관계없이 창 크기 수준으로 제한됨
+
+결과는 load_obj의 obj_stats와 같은 형식이라 analyze_obj_structure / parse_obj_file의
+캐시 경로(_structure_from_obj_stats / _apply_obj_stats)를 그대로 재사용
+"""
+
+import mmap
+import re
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+READ_BUFFER_SIZE = 1 << 20
+# mmap 창 크기 - 창 단위로 매핑/해제하므로 OBJ 크기와 관계없이 워커당 RSS가 이 정도로 제한됨
+MMAP_WINDOW_SIZE = 8 << 20
+
+# 줄 앞 키워드 → obj_stats 카운터
+_COUNTED_KEYS = ((b"v", "vertices"), (b"vt", "texture_coords"), (b"vn", "normals"), (b"f", "faces"))
+
+# 빠른 줄: 공백 없이 키워드 + 공백으로 시작하고 뒤에 출력 가능한 ASCII 문자가 있는 줄
+# (strip() 후에도 반드시 같은 키워드로 시작하므로 개수만 세면 됨)
+# 그 외 비어 있지 않은 모든 줄은 드문 줄로 매칭해 텍스트 규칙으로 처리
+_RARE_LINE = re.compile(rb"\n(?!(?:v|vt|vn|f) [^\n]*?[!-~])([^\n]+)")
+
+
+def new_obj_stats() -> Dict:
+    """빈 라인 통계 (load_obj의 obj_stats와 같은 키)"""
+    return {"vertices": 0, "texture_coords": 0, "normals": 0, "faces": 0,
+            "groups": [], "objects": [], "materials": [], "mtllibs": [], "comments": []}
+
+
+def record_text_line(obj_stats: Dict, line_num: int, line: str):
+    """
+    디코딩한 한 줄을 기존 텍스트 루프와 같은 규칙으로 기록
+
+    Args:
+        obj_stats (Dict): 라인 통계
+        line_num (int): 1부터 시작하는 줄 번호
+        line (str): 원문 줄 (strip 전)
+    """
+    line = line.strip()
+    if not line:
+        return
+    if line.startswith('#'):
+        obj_stats["comments"].append({"line": line_num, "source": line})
+    elif line.startswith('v '):
+        obj_stats["vertices"] += 1
+    elif line.startswith('vt '):
+        obj_stats["texture_coords"] += 1
+    elif line.startswith('vn '):
+        obj_stats["normals"] += 1
+    elif line.startswith('f '):
+        obj_stats["faces"] += 1
+    elif line.startswith('g '):
+        obj_stats["groups"].append({"name": line[2:].strip(), "line": line_num, "source": line})
+    elif line.startswith('o '):
+        obj_stats["objects"].append({"name": line[2:].strip(), "line": line_num, "source": line})
+    elif line.startswith('usemtl '):
+        material = line[7:].strip()
+        if material not in obj_stats["materials"]:
+            obj_stats["materials"].append(material)
+    elif line.startswith('mtllib '):
+        obj_stats["mtllibs"].append(line[7:].strip())
+
+
+def _read_line_chunks(obj_path: Path, buffer_size: int) -> Iterator[bytes]:
+    """줄 경계(\\n)에서 자른 큰 버퍼 단위로 파일 읽기"""
+    remainder = b""
+    with open(obj_path, 'rb') as f:
+        while True:
+            block = f.read(buffer_size)
+            if not block:
+                break
+            block = remainder + block
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                remainder = block
+                continue
+            remainder = block[cut:]
+            yield block[:cut]
+    if remainder:
+        yield remainder
+
+
+def _mmap_line_chunks(obj_path: Path, buffer_size: int, window_size: int) -> Iterator[bytes]:
+    """
+    파일을 고정 크기 mmap 창으로 나눠 매핑하고 줄 경계에서 자른 버퍼 단위로 반환
+
+    줄 목록을 만들지 않고 창 안에서 rfind로 줄 경계만 찾으며, 처리한 창은 바로 해제
+    """
+    granularity = mmap.ALLOCATIONGRANULARITY
+    window_size = max(granularity, window_size - window_size % granularity)
+    with open(obj_path, 'rb') as f:
+        size = f.seek(0, 2)
+        position = 0
+        while position < size:
+            window_start = position - position % granularity
+            length = min(window_size, size - window_start)
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=window_start) as window:
+                start = position - window_start
+                if window_start + length < size:
+                    end = window.rfind(b"\n", start) + 1
+                    if end == 0:
+                        # 창보다 긴 줄 - 창을 키워 다시 매핑
+                        window_size *= 2
+                        continue
+                else:
+                    end = length
+
+                while start < end:
+                    stop = min(start + buffer_size, end)
+                    if stop < end:
+                        cut = window.rfind(b"\n", start, stop)
+                        stop = cut + 1 if cut >= 0 else end
+                    yield window[start:stop]
+                    start = stop
+                position = window_start + end
+
+
+def scan_chunk(obj_stats: Dict, chunk: bytes, first_line: int) -> Tuple[int, bool]:
+    """
+    줄 경계에서 시작하는 버퍼 하나를 스캔
+
+    Args:
+        obj_stats (Dict): 라인 통계 (제자리 갱신)
+        chunk (bytes): 완전한 줄들 (마지막 줄은 개행 없이 끝날 수 있음)
+        first_line (int): chunk 첫 줄의 번호
+
+    Returns:
+        Tuple[int, bool]: (chunk 안의 줄 수, 단독 \\r 개행이 있어 텍스트 경로로 다시 읽어야 하는지)
+    """
+    # 텍스트 모드는 단독 \r도 줄바꿈으로 처리하므로 이런 파일은 텍스트 경로로 위임
+    carriage_returns = chunk.count(b"\r")
+    if carriage_returns and carriage_returns != chunk.count(b"\r\n"):
+        return 0, True
+
+    # 텍스트 모드와 같은 UTF-8 오류 동작 (잘못된 바이트면 UnicodeDecodeError)
+    chunk.decode("utf-8")
+
+    data = b"\n" + chunk
+    for key, counter in _COUNTED_KEYS:
+        obj_stats[counter] += data.count(b"\n" + key + b" ")
+
+    line_num = first_line
+    position = 0
+    for match in _RARE_LINE.finditer(data):
+        line_num += data.count(b"\n", position, match.start() + 1)
+        position = match.start() + 1
+        raw = match.group(1)
+        # bulk 카운트에 포함된 예외 형태 줄은 빼고 텍스트 규칙으로 다시 기록
+        for key, counter in _COUNTED_KEYS:
+            if raw.startswith(key + b" "):
+                obj_stats[counter] -= 1
+                break
+        record_text_line(obj_stats, line_num - 1, raw.decode("utf-8"))
+
+    lines = chunk.count(b"\n") + (0 if chunk.endswith(b"\n") else 1)
+    return lines, False
+
+
+def _scan_text(obj_path: Path) -> Dict:
+    """텍스트 모드로 한 줄씩 스캔 (단독 \\r 개행 파일용)"""
+    obj_stats = new_obj_stats()
+    with open(obj_path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            record_text_line(obj_stats, line_num, line)
+    return obj_stats
+
+
+def scan_obj_stats(obj_path: Path, buffer_size: int = READ_BUFFER_SIZE, use_mmap: bool = True,
+                   window_size: int = MMAP_WINDOW_SIZE) -> Dict:
+    """
+    OBJ 라인 통계 스캔 (v/vt/vn/f 개수, g/o 이름+라인, usemtl, mtllib, # 코멘트)
+
+    Args:
+        obj_path (Path): OBJ 파일 경로
+        buffer_size (int): 한 번에 처리할 바이트 수
+        use_mmap (bool): mmap 창으로 읽기 (False면 read 버퍼, 빈 파일도 read 경로)
+        window_size (int): mmap 창 크기 (워커당 최대 상주 메모리의 기준)
+
+    Returns:
+        Dict: load_obj의 obj_stats와 같은 형식의 라인 통계
+    """
+    obj_path = Path(obj_path)
+    if use_mmap and obj_path.stat().st_size > 0:
+        chunks = _mmap_line_chunks(obj_path, buffer_size, window_size)
+    else:
+        chunks = _read_line_chunks(obj_path, buffer_size)
+
+    obj_stats = new_obj_stats()
+    line_num = 1
+    for chunk in chunks:
+        lines, needs_text = scan_chunk(obj_stats, chunk, line_num)
+        if needs_text:
+            return _scan_text(obj_path)
+        line_num += lines
+    return obj_stats
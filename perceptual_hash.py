@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Perceptual Hash Index
+텍스처 / 썸네일 이미지의 지각 해시(aHash, dHash)를 카탈로그 DB에 기록하고 BK-트리로 근사 중복 검색
+
+CDN 해시가 달라도 같은 모양의 텍스처(같은 아이템)는 지각 해시의 해밍 거리가 작으므로
+저장 공간 중복 제거나 "같은 아이템을 착용한 아바타" 검색을 이미지를 다시 읽지 않고 인덱스로 처리
+
+    aHash  8x8 축소 회색조의 평균 이상 여부 (64비트)
+    dHash  9x8 축소 회색조의 가로 방향 밝기 증가 여부 (64비트, 검색 기준)
+
+image_hashes 테이블은 크기/수정 시각이 같으면 다시 계산하지 않음 (증분 갱신)
+PNG만 해시 계산 (texture_atlas.read_png) - 다른 형식은 해시 없이 기록해 매번 다시 시도하지 않음
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from avatar_catalog import AvatarCatalog, file_role
+
+# NumPy/PNG 디코더는 해시 계산 시에만 import (CLI 시작 시간 유지)
+
+HASH_BITS = 64
+DEFAULT_MAX_DISTANCE = 6
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_hashes (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    role TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    width INTEGER,
+    height INTEGER,
+    ahash TEXT,
+    dhash TEXT,
+    hashed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_image_hashes_folder ON image_hashes(folder);
+CREATE INDEX IF NOT EXISTS idx_image_hashes_dhash ON image_hashes(dhash);
+"""
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _resize_gray(gray, width: int, height: int):
+    """면적 평균 축소 (원본이 더 작은 축은 최근접 확대)"""
+    import numpy as np
+
+    for axis, target in ((0, height), (1, width)):
+        size = gray.shape[axis]
+        if size < target:
+            gray = np.take(gray, np.arange(target) * size // target, axis=axis)
+        else:
+            edges = np.arange(target) * size // target
+            counts = np.diff(np.append(edges, size))
+            shape = [1, 1]
+            shape[axis] = target
+            gray = np.add.reduceat(gray, edges, axis=axis) / counts.reshape(shape)
+    return gray
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def image_hashes(rgba) -> Tuple[int, int]:
+    """
+    RGBA 배열의 (aHash, dHash)
+
+    투명 영역은 검은색 위에 합성 (알파가 다른 같은 텍스처도 같은 모양으로 취급)
+    """
+    import numpy as np
+
+    pixels = rgba.astype(np.float64)
+    gray = (pixels[..., 0] * 0.299 + pixels[..., 1] * 0.587 + pixels[..., 2] * 0.114) * (pixels[..., 3] / 255.0)
+    small = _resize_gray(gray, 8, 8)
+    average_hash = _bits_to_int(small > small.mean())
+    wide = _resize_gray(gray, 9, 8)
+    difference_hash = _bits_to_int(wide[:, 1:] > wide[:, :-1])
+    return average_hash, difference_hash
+
+
+def hash_image_file(path: Path) -> Dict:
+    """
+    이미지 파일 하나의 지각 해시
+
+    Returns:
+        Dict: {"width", "height", "ahash", "dhash"} (PNG가 아니면 해시 None)
+    """
+    from texture_atlas import read_png
+
+    try:
+        rgba = read_png(path)
+    except ValueError:
+        return {"width": None, "height": None, "ahash": None, "dhash": None}
+    average_hash, difference_hash = image_hashes(rgba)
+    return {"width": rgba.shape[1], "height": rgba.shape[0], "ahash": average_hash, "dhash": difference_hash}
+
+
+class BKTree:
+    """해밍 거리 BK-트리 - 거리 d 이내 검색 시 삼각 부등식으로 가지를 잘라냄"""
+
+    def __init__(self):
+        self.root: Optional[list] = None
+        self.size = 0
+
+    def add(self, value: int, item):
+        """
+        Args:
+            value (int): 64비트 해시
+            item: 검색 결과로 돌려줄 값 (같은 해시도 각각 보관)
+        """
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, object]]:
+        """거리 max_distance 이내 항목 [(거리, item)] (가까운 순)"""
+        results = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= max_distance:
+                results.extend((distance, item) for item in node[1])
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        results.sort(key=lambda result: result[0])
+        return results
+
+
+def _image_folder(path: Path) -> Path:
+    """이미지가 속한 아바타 폴더 (textures/ 안이면 상위 폴더 - 카탈로그 folders 키와 같음)"""
+    return path.parent.parent if path.parent.name == "textures" else path.parent
+
+
+def find_image_files(root: Path) -> Iterator[Path]:
+    """root 아래 텍스처 / 썸네일 이미지 (atlas/ 등 파생 폴더 제외)"""
+    from texture_atlas import ATLAS_FOLDER
+
+    root = Path(root)
+    if root.is_file():
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != ATLAS_FOLDER and not d.startswith("."))
+        for name in sorted(filenames):
+            if Path(name).suffix.lower() in IMAGE_SUFFIXES:
+                yield Path(dirpath) / name
+
+
+class PerceptualIndex:
+    """카탈로그 DB의 image_hashes 테이블 + 메모리 BK-트리"""
+
+    def __init__(self, catalog: AvatarCatalog):
+        self.catalog = catalog
+        self.conn = catalog.conn
+        self.conn.executescript(_SCHEMA)
+        self._tree: Optional[BKTree] = None
+
+    def update(self, roots: Iterable[Path]) -> Dict[str, int]:
+        """
+        루트 폴더들의 이미지 해시 갱신 (크기/수정 시각이 같은 파일은 건너뜀, 사라진 파일은 삭제)
+
+        Returns:
+            Dict[str, int]: {"hashed", "unchanged", "unsupported", "removed"}
+        """
+        counts = {"hashed": 0, "unchanged": 0, "unsupported": 0, "removed": 0}
+        for root in roots:
+            root_key = str(Path(root).resolve())
+            previous = {row["path"]: row for row in self.conn.execute(
+                "SELECT path, size, mtime_ns FROM image_hashes WHERE path = ? OR path LIKE ?",
+                (root_key, root_key.rstrip(os.sep) + os.sep + "%"))}
+            rows = []
+            for path in find_image_files(root):
+                stat = path.stat()
+                path_key = str(path.resolve())
+                old = previous.pop(path_key, None)
+                if old is not None and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+                    counts["unchanged"] += 1
+                    continue
+                hashes = hash_image_file(path)
+                counts["hashed" if hashes["dhash"] is not None else "unsupported"] += 1
+                rows.append((path_key, str(_image_folder(path).resolve()), file_role(path), stat.st_size,
+                             stat.st_mtime_ns, hashes["width"], hashes["height"],
+                             None if hashes["ahash"] is None else f"{hashes['ahash']:016x}",
+                             None if hashes["dhash"] is None else f"{hashes['dhash']:016x}",
+                             time.strftime("%Y-%m-%d %H:%M:%S")))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO image_hashes (path, folder, role, size, mtime_ns, width, height, "
+                "ahash, dhash, hashed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.executemany("DELETE FROM image_hashes WHERE path = ?", [(path,) for path in previous])
+            counts["removed"] += len(previous)
+        self.conn.commit()
+        self._tree = None
+        return counts
+
+    def tree(self) -> BKTree:
+        """dHash BK-트리 (갱신 전까지 재사용)"""
+        if self._tree is None:
+            tree = BKTree()
+            for row in self.conn.execute(
+                    "SELECT path, folder, role, size, width, height, ahash, dhash FROM image_hashes "
+                    "WHERE dhash IS NOT NULL"):
+                tree.add(int(row["dhash"], 16), dict(row))
+            self._tree = tree
+        return self._tree
+
+    def similar(self, dhash: int, max_distance: int = DEFAULT_MAX_DISTANCE) -> List[Dict]:
+        """
+        dHash 거리 max_distance 이내 이미지 (가까운 순, 유저 정보 포함)
+
+        Returns:
+            List[Dict]: {"path", "folder", "role", "size", "distance", "user_id", "username", ...}
+        """
+        results = []
+        for distance, item in self.tree().search(dhash, max_distance):
+            results.append(dict(item, distance=distance, **self._folder_user(item["folder"])))
+        return results
+
+    def similar_to_file(self, path: Path, max_distance: int = DEFAULT_MAX_DISTANCE) -> List[Dict]:
+        """파일과 비슷한 이미지 (인덱스에 있으면 저장된 해시 사용, 자기 자신 제외)"""
+        path_key = str(Path(path).resolve())
+        row = self.conn.execute("SELECT dhash, size, mtime_ns FROM image_hashes WHERE path = ?", (path_key,)).fetchone()
+        stat = Path(path).stat()
+        if row is not None and row["dhash"] and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns:
+            dhash = int(row["dhash"], 16)
+        else:
+            dhash = hash_image_file(Path(path))["dhash"]
+            if dhash is None:
+                raise ValueError(f"해시를 계산할 수 없는 이미지 (PNG만 지원): {path}")
+        return [result for result in self.similar(dhash, max_distance) if result["path"] != path_key]
+
+    def duplicate_groups(self, max_distance: int = DEFAULT_MAX_DISTANCE) -> List[List[Dict]]:
+        """
+        근사 중복 이미지 묶음 (2개 이상, 묶음 안의 이미지는 서로 직접 또는 연쇄적으로 max_distance 이내)
+
+        Returns:
+            List[List[Dict]]: 크기가 큰 묶음부터, 묶음 안은 경로 순
+        """
+        tree = self.tree()
+        rows = [dict(row) for row in self.conn.execute(
+            "SELECT path, folder, role, size, width, height, dhash FROM image_hashes WHERE dhash IS NOT NULL "
+            "ORDER BY path")]
+        parent = {row["path"]: row["path"] for row in rows}
+
+        def find(path):
+            while parent[path] != path:
+                parent[path] = parent[parent[path]]
+                path = parent[path]
+            return path
+
+        for row in rows:
+            for _, item in tree.search(int(row["dhash"], 16), max_distance):
+                a, b = find(row["path"]), find(item["path"])
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+
+        groups: Dict[str, List[Dict]] = {}
+        for row in rows:
+            groups.setdefault(find(row["path"]), []).append(dict(row, **self._folder_user(row["folder"])))
+        return sorted((group for group in groups.values() if len(group) > 1), key=lambda g: (-len(g), g[0]["path"]))
+
+    def _folder_user(self, folder: str) -> Dict:
+        row = self.conn.execute(
+            "SELECT d.user_id, u.username FROM folders d LEFT JOIN users u ON u.user_id = d.user_id "
+            "WHERE d.folder = ?", (folder,)).fetchone()
+        return {"user_id": row["user_id"], "username": row["username"]} if row else {"user_id": None, "username": None}
+
+    def summary(self) -> Dict[str, int]:
+        """해시된 이미지 수 / 해시 없는 이미지 수"""
+        hashed, total = self.conn.execute(
+            "SELECT COUNT(dhash), COUNT(*) FROM image_hashes").fetchone()
+        return {"hashed": hashed, "unsupported": total - hashed}
+
+
+def reclaimable_bytes(groups: List[List[Dict]]) -> int:
+    """묶음마다 가장 큰 파일 하나만 남길 때 줄어드는 바이트"""
+    return sum(sum(item["size"] for item in group) - max(item["size"] for item in group) for group in groups)
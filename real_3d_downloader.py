@@ -11,60 +11,46 @@ from typing import Optional, List, Dict, Tuple
 from pathlib import Path
 import time
 
+from avatar_catalog import catalog_folder
+from avatar_logging import get_logger
+from avatar_metrics import (BYTES_DOWNLOADED, CDN_SHARD_FALLBACKS, PARSE_SECONDS, QUEUE_DEPTH,
+                            instrument_session, record_avatar, start_metrics_server_from_env)
+from avatar_patterns import BODY_PART_CLASSIFIER
+from image_sniffer import ImageSniffer, apply_sniffed_extension, describe_image
+from mesh_cache import build_mesh_cache, cached_obj_stats, format_compaction_report, read_cache_header
+from mesh_stats import avatar_group_stats
+from mtl_textures import MtlTextureRewriter, write_texture_map
+from obj_index import ensure_obj_index
+from obj_scanner import scan_obj_stats
+
+logger = get_logger(__name__)
+
 class RobloxAvatar3DDownloader:
     """로블록스 3D 아바타 다운로더 (최신 API 사용)"""
     
-    def __init__(self, download_folder: str = "avatar_3d_models"):
+    def __init__(self, download_folder: str = "avatar_3d_models", build_cache: bool = False, group_stats: bool = False):
         """
         초기화
         
         Args:
             download_folder (str): 다운로드할 폴더 경로
+            build_cache (bool): OBJ 다운로드 직후 메시 캐시(avatar.meshcache) + 그룹 오프셋 인덱스 생성
+                                (끄면 캐시/인덱스는 처음 사용할 때 생성)
+            group_stats (bool): metadata.json에 그룹별 기하 통계 기록
+                                (끄면 `roblox_cli.py stats --update-metadata` 또는 매핑 생성 시 계산)
         """
         self.download_folder = Path(download_folder)
         self.download_folder.mkdir(exist_ok=True)
+        # 다운로드 경로의 CPU 후처리 (기본값: 끔 - 다운로드는 네트워크 작업만)
+        self.build_cache = build_cache
+        self.group_stats = group_stats
         
         # 세션 생성
         self.session = requests.Session()
-        self.session.headers.upda                    readme_content += f"- **{group_name}**: {role_name}\n"
-
-        # OBJ 구조 정보 추가
-        if extended_info and "obj_structure" in extended_info:
-            obj_struct = extended_info["obj_structure"]
-            readme_content += f"\n## 🎯 3D 모델 구조 정보\n"
-            readme_content += f"- **버텍스**: {obj_struct.get('vertices', 0):,}개\n"
-            readme_content += f"- **면**: {obj_struct.get('faces', 0):,}개\n"
-            readme_content += f"- **그룹**: {len(obj_struct.get('groups', []))}개\n"
-            readme_content += f"- **재질**: {len(obj_struct.get('materials', []))}개\n"
-            
-            # 바디 파트 정보
-            body_parts = obj_struct.get('body_parts', [])
-            if body_parts:
-                readme_content += f"\n### 🚶 아바타 바디 파트\n"
-                part_types = {}
-                for part in body_parts:
-                    part_type = part.get('type', 'unknown')
-                    if part_type not in part_types:
-                        part_types[part_type] = []
-                    part_types[part_type].append(part.get('name', 'Unknown'))
-                
-                for part_type, names in part_types.items():
-                    part_names = ', '.join(names)
-                    readme_content += f"- **{part_type.replace('_', ' ').title()}**: {part_names}\n"
-            
-            # 사용된 재질들
-            materials = obj_struct.get('materials', [])
-            if materials:
-                readme_content += f"\n### 🎨 사용된 재질들\n"
-                for material in materials[:10]:  # 처음 10개만
-                    readme_content += f"- {material}\n"
-                if len(materials) > 10:
-                    readme_content += f"- ... 그리고 {len(materials) - 10}개 더\n"
-
-        readme_content += f"""
-## 📐 3D 모델 정보
+        self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        instrument_session(self.session)
     
     def calculate_cdn_url(self, hash_id: str) -> str:
         """
@@ -202,7 +188,9 @@ class RobloxAvatar3DDownloader:
             print(f"❌ JSON 파싱 실패: {e}")
             return None
     
-    def download_file_from_hash(self, hash_id: str, file_path: Path, file_type: str = "파일") -> bool:
+    def download_file_from_hash(self, hash_id: str, file_path: Path, file_type: str = "파일",
+                                sniffer: Optional[ImageSniffer] = None,
+                                rewriter: Optional[MtlTextureRewriter] = None) -> bool:
         """
         해시 ID로부터 파일 다운로드 (향상된 재시도 로직)
         
@@ -237,7 +225,7 @@ class RobloxAvatar3DDownloader:
             primary_cdn_url = self.calculate_cdn_url(hash_id)
             cdn_urls_to_try.append(primary_cdn_url)
         except Exception as e:
-            print(f"⚠️ 기본 CDN URL 계산 실패: {e}")
+            logger.warning("⚠️ 기본 CDN URL 계산 실패: %s", e, extra={"hash": hash_id})
         
         # 2. 모든 CDN 서버 번호 시도 (t0~t7)
         for cdn_num in range(8):
@@ -255,15 +243,19 @@ class RobloxAvatar3DDownloader:
             if pattern not in cdn_urls_to_try:
                 cdn_urls_to_try.append(pattern)
         
-        print(f"� {file_type} 다운로드 중...")
+        logger.debug("📥 %s 다운로드 중...", file_type, extra={"hash": hash_id})
+        
+        # 메트릭 라벨 (obj, mtl, png ...)
+        extension = file_path.suffix.lstrip('.') or "file"
         
         # 각 URL 시도
         for i, url in enumerate(cdn_urls_to_try):
             try:
                 if i == 0:
-                    print(f"   🎯 기본 서버: {url}")
+                    logger.debug("   🎯 기본 서버: %s", url, extra={"url": url})
                 else:
-                    print(f"   🔄 대체 서버 #{i}: {url}")
+                    CDN_SHARD_FALLBACKS.inc(extension=extension)
+                    logger.debug("   🔄 대체 서버 #%d: %s", i, url, extra={"url": url})
                 
                 # 타임아웃과 재시도 추가
                 response = self.session.get(
@@ -278,75 +270,90 @@ class RobloxAvatar3DDownloader:
                     # 파일 크기 확인
                     content_length = response.headers.get('content-length')
                     if content_length and int(content_length) == 0:
-                        print(f"   ⚠️ 빈 파일 응답, 다음 서버 시도...")
+                        logger.debug("   ⚠️ 빈 파일 응답, 다음 서버 시도...", extra={"url": url})
                         continue
                     
                     # 파일 저장
+                    if sniffer is not None:
+                        sniffer.reset()
+                    if rewriter is not None:
+                        rewriter.reset()
                     with open(file_path, 'wb') as f:
                         downloaded = 0
                         for chunk in response.iter_content(chunk_size=8192):
                             if chunk:
-                                f.write(chunk)
+                                f.write(rewriter.feed(chunk) if rewriter is not None else chunk)
                                 downloaded += len(chunk)
+                                if sniffer is not None:
+                                    sniffer.feed(chunk)
+                        if rewriter is not None:
+                            f.write(rewriter.finish())
                     
                     # 파일 크기 검증
                     if file_path.exists() and file_path.stat().st_size > 0:
-                        print(f"   ✅ {file_type} 다운로드 완료: {file_path}")
+                        BYTES_DOWNLOADED.inc(file_path.stat().st_size, kind=extension)
+                        logger.info("   ✅ %s 다운로드 완료: %s", file_type, file_path,
+                                    extra={"hash": hash_id, "url": url, "attempts": i + 1})
                         return True
                     else:
-                        print(f"   ⚠️ 다운로드된 파일이 비어있음, 다음 서버 시도...")
+                        logger.debug("   ⚠️ 다운로드된 파일이 비어있음, 다음 서버 시도...", extra={"url": url})
                         if file_path.exists():
                             file_path.unlink()
                         continue
                         
                 else:
-                    print(f"   ❌ HTTP {response.status_code}: {response.reason}")
+                    logger.debug("   ❌ HTTP %s: %s", response.status_code, response.reason, extra={"url": url})
                     
             except requests.exceptions.Timeout:
-                print(f"   ⏰ 타임아웃, 다음 서버 시도...")
+                logger.debug("   ⏰ 타임아웃, 다음 서버 시도...", extra={"url": url})
                 continue
             except requests.exceptions.ConnectionError:
-                print(f"   🔌 연결 오류, 다음 서버 시도...")
+                logger.debug("   🔌 연결 오류, 다음 서버 시도...", extra={"url": url})
                 continue
             except requests.exceptions.RequestException as e:
-                print(f"   ❌ 요청 오류: {e}")
+                logger.debug("   ❌ 요청 오류: %s", e, extra={"url": url})
                 continue
             except Exception as e:
-                print(f"   ❌ 예상치 못한 오류: {e}")
+                logger.warning("   ❌ 예상치 못한 오류: %s", e, extra={"url": url})
                 continue
                 
             # 서버 간 딜레이
             if i < len(cdn_urls_to_try) - 1:
                 time.sleep(0.5)
         
-        print(f"   💔 모든 CDN 서버에서 {file_type} 다운로드 실패")
+        logger.warning("   💔 모든 CDN 서버에서 %s 다운로드 실패", file_type, extra={"hash": hash_id})
         return False
     
-    def download_avatar_3d_complete(self, user_id: int, include_textures: bool = True) -> bool:
+    def download_avatar_3d_complete(self, user_id: int, include_textures: bool = True, export_glb: bool = False,
+                                    build_atlas: bool = False) -> bool:
         """
         완전한 3D 아바타 다운로드 (OBJ + MTL + 텍스처)
         
         Args:
             user_id (int): 로블록스 유저 ID
             include_textures (bool): 텍스처 포함 여부
+            export_glb (bool): 다운로드 후 avatar.glb 생성 여부
+            build_atlas (bool): 다운로드 후 텍스처 아틀라스(atlas/) 생성 여부
             
         Returns:
             bool: 성공 여부
         """
-        print(f"🎯 유저 ID {user_id}의 완전한 3D 아바타 다운로드 시작...")
+        logger.info("🎯 유저 ID %s의 완전한 3D 아바타 다운로드 시작...", user_id)
         
         # 유저 정보 가져오기
         user_info = self.get_user_info(user_id)
         if not user_info:
+            record_avatar("3d", False)
             return False
         
         username = user_info.get("name", f"user_{user_id}")
         display_name = user_info.get("displayName", username)
-        print(f"👤 {display_name} (@{username})")
+        logger.info("👤 %s (@%s)", display_name, username)
         
         # 3D 메타데이터 가져오기
         metadata = self.get_avatar_3d_metadata(user_id)
         if not metadata:
+            record_avatar("3d", False)
             return False
         
         # 유저별 폴더 생성
@@ -368,38 +375,62 @@ class RobloxAvatar3DDownloader:
             total_files += 1
             if self.download_file_from_hash(obj_hash, obj_file, "OBJ 모델"):
                 success_count += 1
-        
-        # MTL 파일 다운로드
-        mtl_hash = metadata.get("mtl")
-        if mtl_hash:
-            mtl_file = user_folder / "avatar.mtl"
-            total_files += 1
-            if self.download_file_from_hash(mtl_hash, mtl_file, "MTL 재질"):
-                success_count += 1
+                if self.build_cache:
+                    # 이후 분석/내보내기 도구가 텍스트 OBJ 대신 읽을 바이너리 캐시 (중복 정점 용접 포함)
+                    cache_file = build_mesh_cache(obj_file)
+                    if cache_file:
+                        compaction = read_cache_header(cache_file)["compaction"]
+                        logger.info("   🗜️ 메시 압축: %s", format_compaction_report(compaction),
+                                    extra={"compaction": compaction})
+                    # 그룹 하나만 seek로 읽을 수 있도록 구간 바이트 오프셋 인덱스 생성 (최신이면 재사용)
+                    ensure_obj_index(obj_file)
         
         # 텍스처 파일들 다운로드
+        texture_files = []
         if include_textures:
             textures = metadata.get("textures", [])
             if textures:
-                print(f"🎨 {len(textures)}개의 텍스처 다운로드 중...")
+                logger.info("🎨 %d개의 텍스처 다운로드 중...", len(textures))
                 
                 texture_success = 0
                 for i, texture_hash in enumerate(textures):
                     texture_file = textures_folder / f"texture_{i+1:03d}.png"
                     total_files += 1
                     
-                    print(f"   🖼️ 텍스처 {i+1}/{len(textures)} 처리 중...")
-                    if self.download_file_from_hash(texture_hash, texture_file, f"텍스처 {i+1}"):
+                    logger.debug("   🖼️ 텍스처 %d/%d 처리 중...", i + 1, len(textures))
+                    sniffer = ImageSniffer()
+                    if self.download_file_from_hash(texture_hash, texture_file, f"텍스처 {i+1}", sniffer):
                         success_count += 1
                         texture_success += 1
+                        # 실제 형식(매직 바이트)에 맞는 확장자로 저장하고 형식/크기 기록
+                        image_info = sniffer.result()
+                        texture_file = apply_sniffed_extension(texture_file, image_info)
+                        texture_files.append(dict(hash=texture_hash, file=f"textures/{texture_file.name}", **image_info))
+                        if image_info["placeholder"]:
+                            logger.warning("   ⚠️ 텍스처 %d: 자리표시/비정상 이미지 의심 (%s, %s)", i + 1,
+                                           describe_image(image_info), ", ".join(image_info["flags"]),
+                                           extra={"hash": texture_hash})
                     
                     # API 제한 방지를 위한 딜레이
                     if i < len(textures) - 1:
                         time.sleep(0.3)
                 
-                print(f"   🎨 텍스처 다운로드 결과: {texture_success}/{len(textures)} 성공")
+                logger.info("   🎨 텍스처 다운로드 결과: %d/%d 성공", texture_success, len(textures))
             else:
-                print("🎨 텍스처 정보 없음")
+                logger.info("🎨 텍스처 정보 없음")
+        
+        # MTL 파일 다운로드 (받은 텍스처의 해시 참조를 로컬 경로로 바꾸면서 저장)
+        mtl_hash = metadata.get("mtl")
+        if mtl_hash:
+            mtl_file = user_folder / "avatar.mtl"
+            total_files += 1
+            texture_map = {t["hash"]: t["file"] for t in texture_files}
+            rewriter = MtlTextureRewriter(texture_map) if texture_map else None
+            if self.download_file_from_hash(mtl_hash, mtl_file, "MTL 재질", rewriter=rewriter):
+                success_count += 1
+                if rewriter is not None:
+                    write_texture_map(user_folder, texture_map)
+                    logger.debug("   🔗 MTL 텍스처 참조 %d개를 로컬 경로로 변환", rewriter.rewritten)
         
         # 확장 아바타 정보 수집
         extended_info = self.get_extended_avatar_info(user_id)
@@ -408,9 +439,18 @@ class RobloxAvatar3DDownloader:
         if obj_hash and (user_folder / "avatar.obj").exists():
             obj_structure = self.analyze_obj_structure(user_folder / "avatar.obj")
             extended_info["obj_structure"] = obj_structure
+            # 그룹(바디 파트)별 기하 통계 - 깨지거나 비정상적으로 큰 액세서리 탐지용
+            group_stats = avatar_group_stats(user_folder / "avatar.obj") if self.group_stats else None
+            if group_stats is not None:
+                extended_info["group_stats"] = group_stats
+        if texture_files:
+            # 텍스처별 실제 형식 / 크기 / 바이트 수 (자리표시 이미지 표시 포함)
+            extended_info["texture_files"] = texture_files
         
         # 메타데이터 저장 (확장 정보 포함)
         self.save_metadata(user_info, metadata, user_folder, extended_info)
+        # 유저 / 버전 / CDN 해시 / 파일 sha256 / 그룹 통계를 카탈로그에 기록 (ROBLOX_CATALOG_DB 설정 시)
+        catalog_folder(user_folder)
         
         # 핵심 파일 다운로드 여부 확인
         core_files_success = 0
@@ -420,33 +460,73 @@ class RobloxAvatar3DDownloader:
             core_files_success += 1
         
         # 결과 출력
-        print(f"\n🎉 다운로드 완료: {success_count}/{total_files} 파일 성공")
+        logger.info("\n🎉 다운로드 완료: %d/%d 파일 성공", success_count, total_files)
         
         # 최소한 OBJ 또는 MTL 중 하나는 성공해야 함
         download_success = core_files_success > 0
+        record_avatar("3d", download_success)
         
         if download_success:
-            print(f"📁 저장 위치: {user_folder}")
-            print(f"📦 포함된 파일:")
+            logger.info("📁 저장 위치: %s", user_folder)
+            logger.info("📦 포함된 파일:")
             if obj_hash and (user_folder / "avatar.obj").exists():
                 obj_size = (user_folder / "avatar.obj").stat().st_size
-                print(f"   📄 avatar.obj (3D 모델, {obj_size:,} bytes)")
+                logger.info("   📄 avatar.obj (3D 모델, %s bytes)", format(obj_size, ","))
             if mtl_hash and (user_folder / "avatar.mtl").exists():
-                print(f"   🎨 avatar.mtl (재질 정보)")
+                logger.info("   🎨 avatar.mtl (재질 정보)")
             if include_textures and textures:
-                texture_count = len([f for f in textures_folder.glob("texture_*.png")])
-                print(f"   🖼️ textures/ ({texture_count}/{len(textures)}개 텍스처)")
-            print(f"   📋 metadata.json (상세 정보)")
-            print(f"   📖 README.md (사용법)")
+                texture_count = len([f for f in textures_folder.glob("texture_*.*")])
+                logger.info("   🖼️ textures/ (%d/%d개 텍스처)", texture_count, len(textures))
+            logger.info("   📋 metadata.json (상세 정보)")
+            logger.info("   📖 README.md (사용법)")
             
             if success_count < total_files:
                 missing_count = total_files - success_count
-                print(f"   ⚠️ {missing_count}개 파일 다운로드 실패 (하지만 핵심 파일은 다운로드됨)")
+                logger.warning("   ⚠️ %d개 파일 다운로드 실패 (하지만 핵심 파일은 다운로드됨)", missing_count)
+            
+            if build_atlas and include_textures and (user_folder / "avatar.obj").exists():
+                self.build_texture_atlas(user_folder)
+            if export_glb and (user_folder / "avatar.obj").exists():
+                self.export_glb(user_folder)
         else:
-            print(f"   ❌ 핵심 3D 파일 다운로드 실패")
+            logger.warning("   ❌ 핵심 3D 파일 다운로드 실패")
         
         return download_success
     
+    def export_glb(self, user_folder: Path, embed_textures: bool = True) -> Optional[Path]:
+        """
+        다운로드된 아바타 폴더를 avatar.glb로 변환
+        
+        Args:
+            user_folder (Path): avatar.obj가 있는 아바타 폴더
+            embed_textures (bool): 텍스처를 GLB 안에 포함할지 여부
+            
+        Returns:
+            Optional[Path]: 생성된 GLB 경로
+        """
+        # numpy는 GLB 변환 시에만 필요
+        from glb_exporter import GLBExporter
+        return GLBExporter(embed_textures=embed_textures).export_avatar(user_folder)
+    
+    def build_texture_atlas(self, user_folder: Path) -> Optional[Dict]:
+        """
+        다운로드된 아바타의 텍스처들을 atlas/atlas.png 한 장으로 합치고 UV/MTL 변환본 생성
+        
+        Args:
+            user_folder (Path): avatar.obj / avatar.mtl / textures/가 있는 아바타 폴더
+            
+        Returns:
+            Optional[Dict]: 아틀라스 매니페스트 (실패 시 None - 다운로드 결과에는 영향 없음)
+        """
+        from texture_atlas import build_texture_atlas, format_atlas
+        try:
+            manifest = build_texture_atlas(user_folder, force=True)
+        except (OSError, ValueError) as e:
+            logger.warning("   ⚠️ 텍스처 아틀라스 생성 실패: %s", e)
+            return None
+        logger.info("   🧩 텍스처 아틀라스: %s", format_atlas(manifest))
+        return manifest
+    
     def get_extended_avatar_info(self, user_id: int) -> dict:
         """
         사용자 아바타의 확장 정보 수집
@@ -457,7 +537,7 @@ class RobloxAvatar3DDownloader:
         Returns:
             dict: 확장된 아바타 정보
         """
-        print(f"📊 확장 아바타 정보 수집 중...")
+        logger.info("📊 확장 아바타 정보 수집 중...")
         
         extended_info = {
             "user_id": user_id,
@@ -467,73 +547,73 @@ class RobloxAvatar3DDownloader:
         
         # 1. 아바타 구성 정보 (가장 중요)
         try:
-            print("   👤 아바타 구성 정보...")
+            logger.debug("   👤 아바타 구성 정보...")
             response = self.session.get(f"https://avatar.roblox.com/v1/users/{user_id}/avatar")
             if response.status_code == 200:
                 extended_info["api_responses"]["avatar_config"] = response.json()
-                print("   ✅ 아바타 구성 정보 수집 완료")
+                logger.debug("   ✅ 아바타 구성 정보 수집 완료")
             else:
-                print(f"   ⚠️ 아바타 구성 정보 실패: {response.status_code}")
+                logger.debug("   ⚠️ 아바타 구성 정보 실패: %s", response.status_code)
         except Exception as e:
-            print(f"   ❌ 아바타 구성 오류: {e}")
+            logger.debug("   ❌ 아바타 구성 오류: %s", e)
             
         # 2. 현재 착용 중인 아바타 아이템들
         try:
-            print("   🎽 착용 아이템 정보...")
+            logger.debug("   🎽 착용 아이템 정보...")
             response = self.session.get(f"https://avatar.roblox.com/v1/users/{user_id}/currently-wearing")
             if response.status_code == 200:
                 extended_info["api_responses"]["currently_wearing"] = response.json()
-                print("   ✅ 착용 아이템 정보 수집 완료")
+                logger.debug("   ✅ 착용 아이템 정보 수집 완료")
             elif response.status_code == 429:
-                print("   ⚠️ 착용 아이템 정보 - API 제한 (429)")
+                logger.debug("   ⚠️ 착용 아이템 정보 - API 제한 (429)")
             else:
-                print(f"   ⚠️ 착용 아이템 정보 실패: {response.status_code}")
+                logger.debug("   ⚠️ 착용 아이템 정보 실패: %s", response.status_code)
         except Exception as e:
-            print(f"   ❌ 착용 아이템 오류: {e}")
+            logger.debug("   ❌ 착용 아이템 오류: %s", e)
             
         # 3. 다양한 썸네일 정보
         try:
-            print("   📸 썸네일 정보...")
+            logger.debug("   📸 썸네일 정보...")
             response = self.session.get(f"https://thumbnails.roblox.com/v1/users/avatar?userIds={user_id}&size=720x720&format=Png&isCircular=false")
             if response.status_code == 200:
                 extended_info["api_responses"]["thumbnails"] = response.json()
-                print("   ✅ 썸네일 정보 수집 완료")
+                logger.debug("   ✅ 썸네일 정보 수집 완료")
             else:
-                print(f"   ⚠️ 썸네일 정보 실패: {response.status_code}")
+                logger.debug("   ⚠️ 썸네일 정보 실패: %s", response.status_code)
         except Exception as e:
-            print(f"   ❌ 썸네일 오류: {e}")
+            logger.debug("   ❌ 썸네일 오류: %s", e)
             
         # 4. 게임 정보 (공개 게임만)
         try:
-            print("   🎮 게임 정보...")
+            logger.debug("   🎮 게임 정보...")
             response = self.session.get(f"https://games.roblox.com/v2/users/{user_id}/games?accessFilter=Public&limit=10")
             if response.status_code == 200:
                 games_data = response.json()
                 if games_data.get("data"):
                     extended_info["api_responses"]["games"] = games_data
-                    print(f"   ✅ 게임 정보 수집 완료 ({len(games_data['data'])}개)")
+                    logger.debug("   ✅ 게임 정보 수집 완료 (%d개)", len(games_data['data']))
                 else:
-                    print("   📝 공개 게임 없음")
+                    logger.debug("   📝 공개 게임 없음")
             else:
-                print(f"   ⚠️ 게임 정보 실패: {response.status_code}")
+                logger.debug("   ⚠️ 게임 정보 실패: %s", response.status_code)
         except Exception as e:
-            print(f"   ❌ 게임 정보 오류: {e}")
+            logger.debug("   ❌ 게임 정보 오류: %s", e)
             
         # 5. 그룹 정보
         try:
-            print("   👥 그룹 정보...")
+            logger.debug("   👥 그룹 정보...")
             response = self.session.get(f"https://groups.roblox.com/v2/users/{user_id}/groups/roles")
             if response.status_code == 200:
                 groups_data = response.json()
                 if groups_data.get("data"):
                     extended_info["api_responses"]["groups"] = groups_data
-                    print(f"   ✅ 그룹 정보 수집 완료 ({len(groups_data['data'])}개)")
+                    logger.debug("   ✅ 그룹 정보 수집 완료 (%d개)", len(groups_data['data']))
                 else:
-                    print("   📝 소속 그룹 없음")
+                    logger.debug("   📝 소속 그룹 없음")
             else:
-                print(f"   ⚠️ 그룹 정보 실패: {response.status_code}")
+                logger.debug("   ⚠️ 그룹 정보 실패: %s", response.status_code)
         except Exception as e:
-            print(f"   ❌ 그룹 정보 오류: {e}")
+            logger.debug("   ❌ 그룹 정보 오류: %s", e)
             
         return extended_info
     
@@ -547,7 +627,8 @@ class RobloxAvatar3DDownloader:
         Returns:
             dict: OBJ 구조 분석 결과
         """
-        print(f"   🎯 OBJ 파일 구조 분석...")
+        logger.info("   🎯 OBJ 파일 구조 분석...")
+        parse_start = time.perf_counter()
         
         structure = {
             "file_path": str(obj_path),
@@ -563,97 +644,46 @@ class RobloxAvatar3DDownloader:
         }
         
         try:
-            with open(obj_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # 버텍스
-                    if line.startswith('v '):
-                        structure["vertices"] += 1
-                    
-                    # 노말
-                    elif line.startswith('vn '):
-                        structure["normals"] += 1
-                    
-                    # 텍스처 좌표
-                    elif line.startswith('vt '):
-                        structure["texture_coords"] += 1
-                    
-                    # 면
-                    elif line.startswith('f '):
-                        structure["faces"] += 1
-                    
-                    # 그룹 (아바타 파트)
-                    elif line.startswith('g '):
-                        group_name = line[2:].strip()
-                        group_info = {
-                            "name": group_name,
-                            "line": line_num,
-                            "type": self.classify_body_part(group_name)
-                        }
-                        structure["groups"].append(group_info)
-                        
-                        # 바디 파트 분류
-                        if group_info["type"] != "unknown":
-                            structure["body_parts"].append(group_info)
-                    
-                    # 오브젝트
-                    elif line.startswith('o '):
-                        obj_name = line[2:].strip()
-                        structure["objects"].append({
-                            "name": obj_name,
-                            "line": line_num
-                        })
-                    
-                    # 재질
-                    elif line.startswith('usemtl '):
-                        material = line[7:].strip()
-                        if material not in structure["materials"]:
-                            structure["materials"].append(material)
-            
-            print(f"   ✅ OBJ 구조 분석 완료:")
-            print(f"      - 버텍스: {structure['vertices']:,}개")
-            print(f"      - 면: {structure['faces']:,}개")
-            print(f"      - 그룹: {len(structure['groups'])}개")
-            print(f"      - 바디 파트: {len(structure['body_parts'])}개")
-            print(f"      - 재질: {len(structure['materials'])}개")
+            # 최신 메시 캐시가 있으면 텍스트 파싱 없이 캐시 헤더의 라인 통계 사용
+            obj_stats = cached_obj_stats(obj_path)
+            if obj_stats is None:
+                # 캐시가 없으면 바이트 스캐너로 라인 통계를 만든 뒤 같은 경로로 채움
+                obj_stats = scan_obj_stats(obj_path)
+            self._structure_from_obj_stats(structure, obj_stats)
+            
+            logger.info("   ✅ OBJ 구조 분석 완료:")
+            logger.debug("      - 버텍스: %s개", format(structure['vertices'], ","))
+            logger.debug("      - 면: %s개", format(structure['faces'], ","))
+            logger.debug("      - 그룹: %d개", len(structure['groups']))
+            logger.debug("      - 바디 파트: %d개", len(structure['body_parts']))
+            logger.debug("      - 재질: %d개", len(structure['materials']))
             
         except Exception as e:
-            print(f"   ❌ OBJ 분석 오류: {e}")
+            logger.warning("   ❌ OBJ 분석 오류: %s", e)
             structure["error"] = str(e)
         
+        PARSE_SECONDS.observe(time.perf_counter() - parse_start, parser="analyze_obj_structure")
         return structure
     
+    def _structure_from_obj_stats(self, structure: dict, obj_stats: dict):
+        """라인 통계(메시 캐시 헤더 또는 scan_obj_stats)로 구조 정보 채우기"""
+        for key in ("vertices", "faces", "normals", "texture_coords"):
+            structure[key] = obj_stats[key]
+        structure["materials"] = list(obj_stats["materials"])
+        structure["objects"] = [{"name": obj["name"], "line": obj["line"]} for obj in obj_stats["objects"]]
+        for group in obj_stats["groups"]:
+            group_info = {
+                "name": group["name"],
+                "line": group["line"],
+                "type": self.classify_body_part(group["name"])
+            }
+            structure["groups"].append(group_info)
+            if group_info["type"] != "unknown":
+                structure["body_parts"].append(group_info)
+    
     def classify_body_part(self, group_name: str) -> str:
-        """그룹 이름으로 바디 파트 분류"""
-        name_lower = group_name.lower()
-        
-        # 로블록스 아바타 파트 매핑
-        part_mappings = {
-            "head": ["player1", "head"],
-            "torso": ["player2", "torso", "chest"],
-            "left_arm": ["player3", "leftarm", "left_arm"],
-            "right_arm": ["player4", "rightarm", "right_arm"],
-            "left_leg": ["player5", "leftleg", "left_leg"],
-            "right_leg": ["player6", "rightleg", "right_leg"],
-            "hat": ["player7", "hat", "cap", "helmet"],
-            "hair": ["player8", "hair"],
-            "face": ["player9", "face"],
-            "shirt": ["player10", "shirt", "top"],
-            "pants": ["player11", "pants", "bottom"],
-            "shoes": ["player12", "shoes", "boot"],
-            "accessory": ["player13", "player14", "player15", "accessory", "gear"],
-            "handle": ["handle", "grip", "tool"]
-        }
-        
-        for part_type, keywords in part_mappings.items():
-            if any(keyword in name_lower for keyword in keywords):
-                return part_type
-        
-        return "unknown"
+        """그룹 이름으로 바디 파트 분류 (avatar_patterns의 컴파일된 공유 분류기 사용)"""
+        return BODY_PART_CLASSIFIER.classify(group_name)
 
     def save_metadata(self, user_info: Dict, metadata: Dict, user_folder: Path, extended_info: Optional[Dict] = None):
         """메타데이터와 사용법 저장"""
@@ -759,8 +789,41 @@ class RobloxAvatar3DDownloader:
                     role_name = role.get("name", "Member")
                     readme_content += f"- **{group_name}**: {role_name}\n"
 
+        # OBJ 구조 정보 추가
+        if extended_info and "obj_structure" in extended_info:
+            obj_struct = extended_info["obj_structure"]
+            readme_content += f"\n## 🎯 3D 모델 구조 정보\n"
+            readme_content += f"- **버텍스**: {obj_struct.get('vertices', 0):,}개\n"
+            readme_content += f"- **면**: {obj_struct.get('faces', 0):,}개\n"
+            readme_content += f"- **그룹**: {len(obj_struct.get('groups', []))}개\n"
+            readme_content += f"- **재질**: {len(obj_struct.get('materials', []))}개\n"
+            
+            # 바디 파트 정보
+            body_parts = obj_struct.get('body_parts', [])
+            if body_parts:
+                readme_content += f"\n### 🚶 아바타 바디 파트\n"
+                part_types = {}
+                for part in body_parts:
+                    part_type = part.get('type', 'unknown')
+                    if part_type not in part_types:
+                        part_types[part_type] = []
+                    part_types[part_type].append(part.get('name', 'Unknown'))
+                
+                for part_type, names in part_types.items():
+                    part_names = ', '.join(names)
+                    readme_content += f"- **{part_type.replace('_', ' ').title()}**: {part_names}\n"
+            
+            # 사용된 재질들
+            materials = obj_struct.get('materials', [])
+            if materials:
+                readme_content += f"\n### 🎨 사용된 재질들\n"
+                for material in materials[:10]:  # 처음 10개만
+                    readme_content += f"- {material}\n"
+                if len(materials) > 10:
+                    readme_content += f"- ... 그리고 {len(materials) - 10}개 더\n"
+
         readme_content += f"""
-## �📐 3D 모델 정보
+## 📐 3D 모델 정보
 - **카메라 위치**: {camera_info.get('position', 'N/A')}
 - **카메라 FOV**: {camera_info.get('fov', 'N/A')}
 - **바운딩 박스**: {aabb_info.get('min', 'N/A')} ~ {aabb_info.get('max', 'N/A')}
@@ -819,13 +882,15 @@ mtlLoader.load('avatar.mtl', (materials) => {{
         
         print(f"📋 사용법 안내 파일 생성: {readme_file}")
     
-    def download_multiple_avatars_3d(self, user_ids: List[int], include_textures: bool = True):
-        """여러 유저의 3D 아바타 다운로드"""
+    def download_multiple_avatars_3d(self, user_ids: List[int], include_textures: bool = True, export_glb: bool = False,
+                                     build_atlas: bool = False):
+        """여러 유저의 3D 아바타 다운로드 (build_atlas: 아바타마다 텍스처 아틀라스 후처리)"""
         print(f"🚀 총 {len(user_ids)}명의 3D 아바타 다운로드 시작...")
         
         for i, user_id in enumerate(user_ids, 1):
+            QUEUE_DEPTH.set(len(user_ids) - i, kind="3d")
             print(f"\n[{i}/{len(user_ids)}] 처리 중...")
-            self.download_avatar_3d_complete(user_id, include_textures)
+            self.download_avatar_3d_complete(user_id, include_textures, export_glb, build_atlas)
             
             # API 제한 방지
             if i < len(user_ids):
@@ -838,6 +903,7 @@ mtlLoader.load('avatar.mtl', (materials) => {{
 def main():
     """메인 함수"""
     print("=== 로블록스 3D 아바타 다운로더 (최신 API) ===\n")
+    start_metrics_server_from_env()
     
     downloader = RobloxAvatar3DDownloader("real_3d_avatars")
     
@@ -5,21 +5,49 @@ Roblox Avatar & Thumbnail Downloader
 """
 
 import os
+import hashlib
 import requests
 import json
-from typing import Optional, List, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Iterable, Tuple
 from pathlib import Path
+from urllib.parse import urlsplit
 import time
 
+from requests.adapters import HTTPAdapter
+
+from avatar_catalog import catalog_folder
+from avatar_logging import get_logger
+from avatar_metrics import BYTES_DOWNLOADED, QUEUE_DEPTH, instrument_session, record_avatar, start_metrics_server_from_env
+from thumbnail_cache import CACHE_NAME, ThumbnailCache
+
+logger = get_logger(__name__)
+
+# 썸네일 종류 → thumbnails.roblox.com 엔드포인트 (파일명은 "<종류>_<크기>.png")
+THUMBNAIL_ENDPOINTS = {
+    "avatar": "avatar",
+    "headshot": "avatar-headshot",
+    "bust": "avatar-bust",
+}
+# 썸네일 API 한 번에 조회할 유저 수
+THUMBNAIL_BATCH_SIZE = 100
+DEFAULT_WORKERS = 16
+DEFAULT_PER_HOST = 8
+
 class RobloxAvatarDownloader:
     """로블록스 아바타 다운로드 클래스"""
     
-    def __init__(self, download_folder: str = "downloads"):
+    def __init__(self, download_folder: str = "downloads", workers: int = DEFAULT_WORKERS,
+                 per_host: int = DEFAULT_PER_HOST, thumbnail_ttl: Optional[float] = None):
         """
         초기화
         
         Args:
             download_folder (str): 다운로드할 폴더 경로
+            workers (int): 이미지/유저 정보 동시 요청 스레드 수
+            per_host (int): 호스트 하나에 동시에 보내는 최대 요청 수
+            thumbnail_ttl (float): 썸네일 URL 캐시 유효 시간(초, None이면 ROBLOX_THUMBNAIL_TTL)
         """
         self.base_url = "https://www.roblox.com/api"
         self.thumbnails_url = "https://thumbnails.roblox.com"
@@ -31,6 +59,20 @@ class RobloxAvatarDownloader:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # 스레드 수만큼 연결 유지 (기본 풀 10개를 넘으면 연결을 버리고 다시 맺음)
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=max(workers, 10)))
+        instrument_session(self.session)
+        
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # (유저, 종류, 크기) → URL, URL → 로컬 파일 캐시 (재실행 시 조회/다운로드 생략)
+        self.thumbnail_cache = ThumbnailCache(self.download_folder / CACHE_NAME, thumbnail_ttl)
+        
+        # 기록한 파일 목록 (file_inventory.FileManifest - 설정하면 패키지 파일 목록을 폴더 순회 없이 생성)
+        self.manifest = None
     
     def get_user_info(self, user_id: int) -> Optional[Dict]:
         """
@@ -44,7 +86,8 @@ class RobloxAvatarDownloader:
         """
         try:
             url = f"https://users.roblox.com/v1/users/{user_id}"
-            response = self.session.get(url)
+            with self._host_slot(url):
+                response = self.session.get(url)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -106,6 +149,52 @@ class RobloxAvatarDownloader:
             print(f"🔍 유저명 '{user_input}'으로 검색 중...")
             return self.get_user_id_by_username(user_input)
     
+    def _get_thumbnails(self, endpoint: str, user_ids: Iterable[int], size: str) -> List[Dict]:
+        """
+        썸네일 API 한 번 호출 (userIds 여러 개를 쉼표로 묶어 조회)
+        
+        Args:
+            endpoint (str): avatar / avatar-headshot / avatar-bust
+            user_ids (Iterable[int]): 로블록스 유저 ID들
+            size (str): 썸네일 크기
+            
+        Returns:
+            List[Dict]: 썸네일 정보 리스트 (targetId, state, imageUrl)
+            
+        Raises:
+            requests.exceptions.RequestException: 요청 실패
+        """
+        url = f"{self.thumbnails_url}/v1/users/{endpoint}"
+        params = {
+            "userIds": ",".join(str(user_id) for user_id in user_ids),
+            "size": size,
+            "format": "Png",
+            "isCircular": "false"
+        }
+        with self._host_slot(url):
+            response = self.session.get(url, params=params)
+        response.raise_for_status()
+        return response.json().get("data", [])
+    
+    def _remember_urls(self, thumb_type: str, size: str, data: List[Dict]) -> Dict[int, str]:
+        """API 응답에서 완료된 썸네일 URL을 캐시에 기록 (유저 ID → URL)"""
+        urls = {}
+        for item in data:
+            if item.get("state") == "Completed" and item.get("imageUrl"):
+                urls[int(item["targetId"])] = item["imageUrl"]
+                self.thumbnail_cache.record_url(int(item["targetId"]), thumb_type, size, item["imageUrl"])
+        return urls
+    
+    def _user_thumbnails(self, thumb_type: str, user_id: int, size: str) -> List[Dict]:
+        """캐시된 URL이 만료 전이면 API 호출 없이 반환, 아니면 조회 후 기록"""
+        url = self.thumbnail_cache.url_for(user_id, thumb_type, size)
+        if url:
+            return [{"targetId": user_id, "state": "Completed", "imageUrl": url}]
+        data = self._get_thumbnails(THUMBNAIL_ENDPOINTS[thumb_type], [user_id], size)
+        self._remember_urls(thumb_type, size, data)
+        self.thumbnail_cache.save()
+        return data
+    
     def get_user_avatar_thumbnails(self, user_id: int, size: str = "420x420") -> Optional[List[Dict]]:
         """
         유저 아바타 썸네일 URL 가져오기
@@ -118,17 +207,7 @@ class RobloxAvatarDownloader:
             List[Dict]: 썸네일 정보 리스트
         """
         try:
-            url = f"{self.thumbnails_url}/v1/users/avatar"
-            params = {
-                "userIds": str(user_id),
-                "size": size,
-                "format": "Png",
-                "isCircular": "false"
-            }
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("data", [])
+            return self._user_thumbnails("avatar", user_id, size)
         except requests.exceptions.RequestException as e:
             print(f"아바타 썸네일 URL 가져오기 실패 (ID: {user_id}): {e}")
             return None
@@ -145,17 +224,7 @@ class RobloxAvatarDownloader:
             List[Dict]: 썸네일 정보 리스트
         """
         try:
-            url = f"{self.thumbnails_url}/v1/users/avatar-headshot"
-            params = {
-                "userIds": str(user_id),
-                "size": size,
-                "format": "Png",
-                "isCircular": "false"
-            }
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("data", [])
+            return self._user_thumbnails("headshot", user_id, size)
         except requests.exceptions.RequestException as e:
             print(f"헤드샷 썸네일 URL 가져오기 실패 (ID: {user_id}): {e}")
             return None
@@ -172,21 +241,54 @@ class RobloxAvatarDownloader:
             List[Dict]: 썸네일 정보 리스트
         """
         try:
-            url = f"{self.thumbnails_url}/v1/users/avatar-bust"
-            params = {
-                "userIds": str(user_id),
-                "size": size,
-                "format": "Png",
-                "isCircular": "false"
-            }
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("data", [])
+            return self._user_thumbnails("bust", user_id, size)
         except requests.exceptions.RequestException as e:
             print(f"흉상 썸네일 URL 가져오기 실패 (ID: {user_id}): {e}")
             return None
     
+    def resolve_thumbnail_urls(self, user_ids: List[int], sizes: List[str],
+                               types: Iterable[str] = tuple(THUMBNAIL_ENDPOINTS)) -> Dict[Tuple[int, str, str], str]:
+        """
+        여러 유저의 썸네일 URL을 (종류, 크기)별로 THUMBNAIL_BATCH_SIZE명씩 묶어 조회
+        (캐시된 URL이 만료 전인 유저는 조회하지 않음)
+        
+        Args:
+            user_ids (List[int]): 로블록스 유저 ID 리스트
+            sizes (List[str]): 썸네일 크기 리스트
+            types (Iterable[str]): 썸네일 종류 (avatar, headshot, bust)
+            
+        Returns:
+            Dict[Tuple[int, str, str], str]: (유저 ID, 종류, 크기) → 이미지 URL (완료된 썸네일만)
+        """
+        urls = {}
+        batches = []
+        for thumb_type in types:
+            for size in sizes:
+                pending = []
+                for user_id in user_ids:
+                    url = self.thumbnail_cache.url_for(user_id, thumb_type, size)
+                    if url:
+                        urls[(user_id, thumb_type, size)] = url
+                    else:
+                        pending.append(user_id)
+                batches += [(thumb_type, size, pending[i:i + THUMBNAIL_BATCH_SIZE])
+                            for i in range(0, len(pending), THUMBNAIL_BATCH_SIZE)]
+        
+        def resolve(batch):
+            thumb_type, size, ids = batch
+            try:
+                return thumb_type, size, self._get_thumbnails(THUMBNAIL_ENDPOINTS[thumb_type], ids, size)
+            except requests.exceptions.RequestException as e:
+                logger.warning("%s 썸네일 URL 가져오기 실패 (%s, %d명): %s", thumb_type, size, len(ids), e)
+                return thumb_type, size, []
+        
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(batches) or 1)) as pool:
+            for thumb_type, size, data in pool.map(resolve, batches):
+                for user_id, url in self._remember_urls(thumb_type, size, data).items():
+                    urls[(user_id, thumb_type, size)] = url
+        self.thumbnail_cache.save()
+        return urls
+    
     def get_user_avatar_3d_model(self, user_id: int) -> Optional[str]:
         """
         유저 아바타 3D 모델 URL 가져오기
@@ -234,7 +336,9 @@ class RobloxAvatarDownloader:
     
     def download_image(self, url: str, file_path: Path) -> bool:
         """
-        이미지 다운로드
+        이미지 다운로드 (같은 URL을 이미 이 경로로 받았고 파일이 그대로면 건너뜀)
+        
+        캐시된 파일은 호스트 슬롯 없이 바로 처리하고, 실제 요청만 호스트별 per_host개까지 동시에 보냄
         
         Args:
             url (str): 이미지 URL
@@ -243,20 +347,67 @@ class RobloxAvatarDownloader:
         Returns:
             bool: 성공 여부
         """
+        cached = self.thumbnail_cache.cached_file(url, file_path)
+        if cached is not None:
+            if self.manifest is not None:
+                self.manifest.add(file_path, cached["size"])
+            logger.debug("캐시 사용 (변경 없음): %s", file_path, extra={"url": url})
+            return True
+        
         try:
-            response = self.session.get(url, stream=True)
-            response.raise_for_status()
-            
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            print(f"다운로드 완료: {file_path}")
+            with self._host_slot(url):
+                response = self.session.get(url, stream=True)
+                response.raise_for_status()
+                
+                downloaded = 0
+                digest = hashlib.sha256()
+                with open(file_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        downloaded += len(chunk)
+            BYTES_DOWNLOADED.inc(downloaded, kind="image")
+            self.thumbnail_cache.record_file(url, file_path, digest.hexdigest())
+            if self.manifest is not None:
+                self.manifest.add(file_path, downloaded)
+            
+            logger.debug("다운로드 완료: %s", file_path, extra={"url": url})
             return True
         except requests.exceptions.RequestException as e:
-            print(f"이미지 다운로드 실패 ({url}): {e}")
+            logger.warning("이미지 다운로드 실패 (%s): %s", url, e, extra={"url": url})
             return False
     
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """호스트별 동시 요청 제한 세마포어 (with 문으로 사용)"""
+        host = urlsplit(url).hostname or ""
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+        return slot
+    
+    def download_images(self, jobs: List[Tuple[str, Path]]) -> Dict[Path, bool]:
+        """
+        이미지 여러 개를 스레드 풀로 동시에 다운로드 (호스트별 per_host개까지)
+        
+        Args:
+            jobs (List[Tuple[str, Path]]): (이미지 URL, 저장할 파일 경로) 리스트
+            
+        Returns:
+            Dict[Path, bool]: 파일 경로별 성공 여부
+        """
+        def fetch(job):
+            url, file_path = job
+            # 캐시 확인과 호스트 슬롯은 download_image가 처리
+            return file_path, self.download_image(url, file_path)
+        
+        if not jobs:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+            results = dict(pool.map(fetch, jobs))
+        self.thumbnail_cache.save()
+        return results
+    
     def download_3d_model(self, url: str, file_path: Path) -> bool:
         """
         3D 모델 다운로드 (OBJ 파일)
@@ -272,14 +423,17 @@ class RobloxAvatarDownloader:
             response = self.session.get(url, stream=True)
             response.raise_for_status()
             
+            downloaded = 0
             with open(file_path, 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     f.write(chunk)
+                    downloaded += len(chunk)
+            BYTES_DOWNLOADED.inc(downloaded, kind="model")
             
-            print(f"3D 모델 다운로드 완료: {file_path}")
+            logger.debug("3D 모델 다운로드 완료: %s", file_path, extra={"url": url})
             return True
         except requests.exceptions.RequestException as e:
-            print(f"3D 모델 다운로드 실패 ({url}): {e}")
+            logger.warning("3D 모델 다운로드 실패 (%s): %s", url, e, extra={"url": url})
             return False
     
     def download_avatar_textures(self, user_id: int, user_folder: Path) -> bool:
@@ -340,27 +494,8 @@ class RobloxAvatarDownloader:
             print(f"텍스처 다운로드 중 오류: {e}")
             return False
     
-    def download_user_avatars(self, user_id: int, sizes: List[str] = None, include_3d: bool = False, include_textures: bool = False) -> bool:
-        """
-        유저의 모든 아바타 이미지 및 3D 모델 다운로드
-        
-        Args:
-            user_id (int): 로블록스 유저 ID
-            sizes (List[str]): 다운로드할 크기 리스트
-            include_3d (bool): 3D 모델 포함 여부 (실제 OBJ/MTL 파일)
-            include_textures (bool): 텍스처 포함 여부
-            
-        Returns:
-            bool: 성공 여부
-        """
-        if sizes is None:
-            sizes = ["150x150", "420x420"]
-        
-        # 유저 정보 가져오기
-        user_info = self.get_user_info(user_id)
-        if not user_info:
-            return False
-        
+    def _prepare_user_folder(self, user_id: int, user_info: Dict) -> Path:
+        """유저별 폴더 생성 + user_info.json 저장"""
         username = user_info.get("name", f"user_{user_id}")
         display_name = user_info.get("displayName", username)
         
@@ -374,50 +509,25 @@ class RobloxAvatarDownloader:
         user_info_path = user_folder / "user_info.json"
         with open(user_info_path, 'w', encoding='utf-8') as f:
             json.dump(user_info, f, indent=2, ensure_ascii=False)
-        
-        success_count = 0
-        total_count = 0
-        
-        # 각 크기별로 2D 이미지 다운로드
+        if self.manifest is not None:
+            self.manifest.add(user_info_path)
+        return user_folder
+    
+    @staticmethod
+    def _thumbnail_jobs(user_id: int, user_folder: Path, sizes: List[str],
+                        thumbnail_urls: Dict[Tuple[int, str, str], str]) -> List[Tuple[str, Path]]:
+        """한 유저의 (이미지 URL, 저장 경로) 목록 - 크기별 전신/헤드샷/흉상 순"""
+        jobs = []
         for size in sizes:
-            print(f"\n크기 {size} 다운로드 중...")
-            
-            # 전신 아바타
-            avatar_data = self.get_user_avatar_thumbnails(user_id, size)
-            if avatar_data:
-                for item in avatar_data:
-                    if item.get("state") == "Completed" and item.get("imageUrl"):
-                        file_name = f"avatar_{size}.png"
-                        file_path = user_folder / file_name
-                        total_count += 1
-                        if self.download_image(item["imageUrl"], file_path):
-                            success_count += 1
-                        time.sleep(0.1)  # API 제한 방지
-            
-            # 헤드샷
-            headshot_data = self.get_user_headshot_thumbnails(user_id, size)
-            if headshot_data:
-                for item in headshot_data:
-                    if item.get("state") == "Completed" and item.get("imageUrl"):
-                        file_name = f"headshot_{size}.png"
-                        file_path = user_folder / file_name
-                        total_count += 1
-                        if self.download_image(item["imageUrl"], file_path):
-                            success_count += 1
-                        time.sleep(0.1)  # API 제한 방지
-            
-            # 흉상
-            bust_data = self.get_user_bust_thumbnails(user_id, size)
-            if bust_data:
-                for item in bust_data:
-                    if item.get("state") == "Completed" and item.get("imageUrl"):
-                        file_name = f"bust_{size}.png"
-                        file_path = user_folder / file_name
-                        total_count += 1
-                        if self.download_image(item["imageUrl"], file_path):
-                            success_count += 1
-                        time.sleep(0.1)  # API 제한 방지
-        
+            for thumb_type in THUMBNAIL_ENDPOINTS:
+                url = thumbnail_urls.get((user_id, thumb_type, size))
+                if url:
+                    jobs.append((url, user_folder / f"{thumb_type}_{size}.png"))
+        return jobs
+    
+    def _finish_user(self, user_id: int, user_folder: Path, success_count: int, total_count: int,
+                     include_3d: bool, include_textures: bool) -> bool:
+        """2D 이미지 이후 단계 (3D 모델, 텍스처, 메트릭, 카탈로그)"""
         # 실제 3D 모델 다운로드 (최신 API 사용)
         if include_3d:
             print(f"\n🎯 실제 3D 모델 다운로드 중...")
@@ -444,31 +554,86 @@ class RobloxAvatarDownloader:
                 success_count += 5  # 텍스처는 여러 개이므로 보너스 점수
         
         print(f"\n다운로드 완료: {success_count}/{total_count} 성공")
+        self.thumbnail_cache.save()
+        record_avatar("2d", success_count > 0)
+        # 카탈로그 갱신 (하위 3D 폴더 포함)
+        catalog_folder(user_folder)
         return success_count > 0
     
+    def download_user_avatars(self, user_id: int, sizes: List[str] = None, include_3d: bool = False, include_textures: bool = False) -> bool:
+        """
+        유저의 모든 아바타 이미지 및 3D 모델 다운로드
+        
+        Args:
+            user_id (int): 로블록스 유저 ID
+            sizes (List[str]): 다운로드할 크기 리스트
+            include_3d (bool): 3D 모델 포함 여부 (실제 OBJ/MTL 파일)
+            include_textures (bool): 텍스처 포함 여부
+            
+        Returns:
+            bool: 성공 여부
+        """
+        if sizes is None:
+            sizes = ["150x150", "420x420"]
+        
+        # 유저 정보 가져오기
+        user_info = self.get_user_info(user_id)
+        if not user_info:
+            record_avatar("2d", False)
+            return False
+        
+        user_folder = self._prepare_user_folder(user_id, user_info)
+        
+        # 크기별 전신/헤드샷/흉상 URL 조회 후 이미지 동시 다운로드
+        logger.debug("\n크기 %s 다운로드 중...", ", ".join(sizes))
+        jobs = self._thumbnail_jobs(user_id, user_folder, sizes, self.resolve_thumbnail_urls([user_id], sizes))
+        results = self.download_images(jobs)
+        
+        return self._finish_user(user_id, user_folder, sum(results.values()), len(jobs), include_3d, include_textures)
+    
     def download_multiple_users(self, user_ids: List[int], sizes: List[str] = None, include_3d: bool = False, include_textures: bool = False) -> None:
         """
         여러 유저의 아바타 다운로드
         
+        유저 정보는 동시에 조회하고, 썸네일 URL은 (종류, 크기)별로 묶어서 조회한 뒤
+        모든 유저의 이미지를 하나의 스레드 풀로 다운로드 (3D/텍스처는 이후 유저별로 처리)
+        
         Args:
             user_ids (List[int]): 유저 ID 리스트
             sizes (List[str]): 다운로드할 크기 리스트
             include_3d (bool): 3D 모델 포함 여부
             include_textures (bool): 텍스처 포함 여부
         """
+        if sizes is None:
+            sizes = ["150x150", "420x420"]
+        
         print(f"총 {len(user_ids)}명의 유저 아바타 다운로드 시작...")
         if include_3d:
             print("📦 3D 모델 포함")
         if include_textures:
             print("🎨 텍스처 포함")
         
-        for i, user_id in enumerate(user_ids, 1):
-            print(f"\n[{i}/{len(user_ids)}] 유저 ID {user_id} 처리 중...")
-            self.download_user_avatars(user_id, sizes, include_3d, include_textures)
-            
-            # 다음 유저 처리 전 잠시 대기 (API 제한 방지)
-            if i < len(user_ids):
-                time.sleep(1)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(user_ids) or 1)) as pool:
+            user_infos = list(pool.map(self.get_user_info, user_ids))
+        
+        user_folders = {}
+        for user_id, user_info in zip(user_ids, user_infos):
+            if user_info:
+                user_folders[user_id] = self._prepare_user_folder(user_id, user_info)
+            else:
+                record_avatar("2d", False)
+        
+        thumbnail_urls = self.resolve_thumbnail_urls(list(user_folders), sizes)
+        jobs = {user_id: self._thumbnail_jobs(user_id, folder, sizes, thumbnail_urls)
+                for user_id, folder in user_folders.items()}
+        print(f"🖼️ 이미지 {sum(len(user_jobs) for user_jobs in jobs.values())}개 동시 다운로드 중...")
+        results = self.download_images([job for user_jobs in jobs.values() for job in user_jobs])
+        
+        for i, (user_id, user_folder) in enumerate(user_folders.items(), 1):
+            QUEUE_DEPTH.set(len(user_folders) - i, kind="2d")
+            print(f"\n[{i}/{len(user_folders)}] 유저 ID {user_id} 처리 중...")
+            success_count = sum(results[path] for _, path in jobs[user_id])
+            self._finish_user(user_id, user_folder, success_count, len(jobs[user_id]), include_3d, include_textures)
         
         print(f"\n모든 다운로드 완료! 저장 위치: {self.download_folder.absolute()}")
 
@@ -476,6 +641,7 @@ class RobloxAvatarDownloader:
 def main():
     """메인 함수"""
     print("=== 로블록스 아바타 다운로더 ===\n")
+    start_metrics_server_from_env()
     
     # 다운로드 객체 생성
     downloader = RobloxAvatarDownloader("downloads")
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Roblox Avatar CLI
+다운로더/분석기 통합 명령줄 진입점 - 서브커맨드 모듈은 실행 시점에만 import
+
+사용 예:
+    python roblox_cli.py 3d builderman 156
+    python roblox_cli.py 2d Roblox --sizes 150x150,420x420 --with-3d
+    python roblox_cli.py analyze real_3d_avatars
+    python roblox_cli.py map final_integrated/builderman_156
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+# --help와 분석 전용 명령이 requests/다운로더 스택을 불러오지 않도록
+# 모든 무거운 import는 각 핸들러 안에서 수행
+
+
+def _resolve_user_ids(downloader, user_inputs: List[str]) -> List[int]:
+    """유저 ID/유저명 목록을 유저 ID 목록으로 변환"""
+    user_ids = []
+    for user_input in user_inputs:
+        user_id = downloader.resolve_user_input(user_input)
+        if user_id:
+            user_ids.append(user_id)
+        else:
+            print(f"⚠️ '{user_input}' 건너뜀 (찾을 수 없음)")
+    return user_ids
+
+
+def cmd_2d(args) -> int:
+    from avatar_metrics import start_metrics_server_from_env
+    from roblox_avatar_downloader import RobloxAvatarDownloader
+
+    start_metrics_server_from_env()
+    downloader = RobloxAvatarDownloader(args.output)
+    user_ids = _resolve_user_ids(downloader, args.users)
+    if not user_ids:
+        print("❌ 유효한 유저를 찾을 수 없습니다.")
+        return 1
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    downloader.download_multiple_users(user_ids, sizes, include_3d=args.with_3d, include_textures=args.textures)
+    return 0
+
+
+def cmd_3d(args) -> int:
+    from avatar_metrics import start_metrics_server_from_env
+    from real_3d_downloader import RobloxAvatar3DDownloader
+
+    start_metrics_server_from_env()
+    downloader = RobloxAvatar3DDownloader(args.output, build_cache=args.cache, group_stats=args.stats)
+    user_ids = _resolve_user_ids(downloader, args.users)
+    if not user_ids:
+        print("❌ 유효한 유저를 찾을 수 없습니다.")
+        return 1
+
+    downloader.download_multiple_avatars_3d(user_ids, include_textures=not args.no_textures, export_glb=args.glb,
+                                            build_atlas=args.atlas)
+    return 0
+
+
+def cmd_glb(args) -> int:
+    from pathlib import Path
+    from glb_exporter import GLBExporter
+
+    exporter = GLBExporter(embed_textures=not args.reference_textures)
+    failures = 0
+    for root in args.roots:
+        root = Path(root)
+        if (root / "avatar.obj").exists():
+            failures += exporter.export_avatar(root) is None
+        else:
+            failures += len(exporter.export_all(root, force=args.force)["failed"])
+    return 1 if failures else 0
+
+
+def cmd_cache(args) -> int:
+    from mesh_cache import build_cache_tree, format_compaction_report
+
+    for root in args.roots:
+        summary = build_cache_tree(root, force=args.force)
+        print(f"🗂️ {root}: 캐시 생성 {len(summary['built'])}개, 최신 {len(summary['fresh'])}개")
+        for obj_file, report in summary["reports"].items():
+            if report:
+                print(f"   🗜️ {obj_file}: {format_compaction_report(report)}")
+    return 0
+
+
+def cmd_lod(args) -> int:
+    from mesh_lod import format_lod_levels, generate_lod_tree
+
+    ratios = [float(r) for r in args.ratios.split(",") if r.strip()]
+    failures = 0
+    for root in args.roots:
+        summary = generate_lod_tree(root, ratios, workers=args.workers, force=args.force)
+        print(f"🔻 {root}: LOD 생성 {len(summary['generated'])}개, 최신 {len(summary['skipped'])}개, "
+              f"면 없음 {len(summary['empty'])}개, 실패 {len(summary['failed'])}개")
+        for obj_file in summary["generated"]:
+            print(f"   {obj_file}: {format_lod_levels(summary['levels'][obj_file])}")
+        for obj_file, error in summary["failed"].items():
+            print(f"   ❌ {obj_file}: {error}")
+        failures += len(summary["failed"])
+    return 1 if failures else 0
+
+
+def cmd_atlas(args) -> int:
+    from texture_atlas import build_atlas_tree
+
+    failures = 0
+    for root in args.roots:
+        summary = build_atlas_tree(root, padding=args.padding, workers=args.workers, force=args.force)
+        print(f"🧩 {root}: 아틀라스 생성 {len(summary['built'])}개, 건너뜀 {len(summary['skipped'])}개, "
+              f"실패 {len(summary['failed'])}개")
+        for folder, error in summary["failed"].items():
+            print(f"   ❌ {folder}: {error}")
+        failures += len(summary["failed"])
+    return 1 if failures else 0
+
+
+def cmd_extract(args) -> int:
+    from pathlib import Path
+    from obj_index import ensure_obj_index, extract_group, group_names
+
+    obj_path = Path(args.obj)
+    if obj_path.is_dir():
+        obj_path = obj_path / "avatar.obj"
+    if not obj_path.exists():
+        print(f"❌ OBJ 파일을 찾을 수 없습니다: {obj_path}")
+        return 1
+
+    index = ensure_obj_index(obj_path)
+    names = group_names(index)
+    if not args.groups:
+        for name in names:
+            print(name)
+        return 0
+
+    failures = 0
+    for name in args.groups:
+        if name not in names:
+            print(f"❌ 그룹 없음: {name} (사용 가능: {', '.join(names)})")
+            failures += 1
+            continue
+        output_path = Path(args.output_dir or obj_path.parent) / f"{obj_path.stem}_{name}.obj"
+        extract_group(obj_path, name, output_path, index)
+        print(f"✂️ {name} → {output_path}")
+    return 1 if failures else 0
+
+
+def cmd_textures(args) -> int:
+    from mtl_textures import find_mtl_folders, localize_mtl
+
+    for root in args.roots:
+        for folder in find_mtl_folders(root):
+            rewritten = localize_mtl(folder)
+            if rewritten is None:
+                print(f"   ⏭️ {folder}: 받은 텍스처 없음")
+            else:
+                print(f"🔗 {folder}: MTL 텍스처 참조 {rewritten}개 변환")
+    return 0
+
+
+def cmd_package(args) -> int:
+    from final_integrated_downloader import FinalIntegratedDownloader
+
+    downloader = FinalIntegratedDownloader(args.output, args.materialize, args.inventory_hashes)
+    failures = 0
+    for user_input in args.users:
+        if not downloader.download_complete_avatar_package(user_input):
+            failures += 1
+    return 1 if failures else 0
+
+
+def cmd_resolve(args) -> int:
+    from roblox_avatar_downloader import RobloxAvatarDownloader
+
+    downloader = RobloxAvatarDownloader(args.output)
+    user_ids = _resolve_user_ids(downloader, args.users)
+    for user_id in user_ids:
+        print(user_id)
+    return 0 if len(user_ids) == len(args.users) else 1
+
+
+def cmd_analyze(args) -> int:
+    from pathlib import Path
+    from obj_attachment_parser import OBJAttachmentParser
+
+    parser = OBJAttachmentParser()
+    if args.ndjson:
+        output = args.output if args.output.endswith(".ndjson") else str(Path(args.output).with_suffix(".ndjson"))
+        parser.stream_attachment_analysis(args.root, output)
+        return 0
+    scan_results = parser.scan_avatar_folders(args.root)
+    parser.save_attachment_analysis(scan_results, args.output)
+    return 0
+
+
+def cmd_attachments(args) -> int:
+    import json
+    from complete_integrated_downloader import analyze_existing_attachments
+
+    attachment_info = analyze_existing_attachments(args.user_id, args.username)
+    print(json.dumps(attachment_info, indent=2, ensure_ascii=False))
+    return 0
+
+
+def cmd_map(args) -> int:
+    from pathlib import Path
+    from body_part_mapping_parser import BodyPartMapper
+
+    package_path = Path(args.package)
+    if not package_path.exists():
+        print(f"❌ 패키지 폴더를 찾을 수 없습니다: {package_path}")
+        return 1
+
+    mapper = BodyPartMapper()
+    avatar_data = mapper.parse_avatar_package(package_path, compute_stats=args.stats)
+    if not avatar_data:
+        print("❌ 아바타 데이터 추출 실패")
+        return 1
+
+    output_path = Path(args.output) if args.output else package_path / "BODY_PART_MAPPING.txt"
+    return 0 if mapper.create_body_part_mapping_text(avatar_data, output_path) else 1
+
+
+def cmd_stats(args) -> int:
+    import json
+    from pathlib import Path
+    from mesh_stats import avatar_group_stats, format_group_stats
+
+    failures = 0
+    for root in args.roots:
+        root = Path(root)
+        obj_files = [root / "avatar.obj"] if (root / "avatar.obj").exists() else sorted(root.rglob("avatar.obj"))
+        for obj_file in obj_files:
+            group_stats = avatar_group_stats(obj_file)
+            if group_stats is None:
+                print(f"❌ {obj_file}: 통계 계산 실패")
+                failures += 1
+                continue
+
+            print(f"📐 {obj_file}: {len(group_stats)}개 그룹")
+            for stats in group_stats:
+                print(f"   {stats['name']:<12} {format_group_stats(stats)}")
+
+            metadata_file = obj_file.parent / "metadata.json"
+            if args.update_metadata and metadata_file.exists():
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                metadata.setdefault("extended_avatar_info", {})["group_stats"] = group_stats
+                with open(metadata_file, 'w', encoding='utf-8') as f:
+                    json.dump(metadata, f, indent=2, ensure_ascii=False)
+                print(f"   📋 {metadata_file} 갱신")
+    return 1 if failures else 0
+
+
+def cmd_catalog(args) -> int:
+    from pathlib import Path
+    from avatar_catalog import DEFAULT_CATALOG, AvatarCatalog, catalog_path
+
+    db_path = Path(args.db) if args.db else (catalog_path() or Path(DEFAULT_CATALOG))
+
+    with AvatarCatalog(db_path) as catalog:
+        if args.action == "sync":
+            roots = args.targets or ["downloads", "real_3d_avatars", "final_integrated"]
+            count = catalog.sync(Path(root) for root in roots)
+            print(f"🗃️ {count}개 폴더 기록: {db_path}")
+        elif args.action == "hash":
+            for hash_value in args.targets:
+                rows = catalog.users_with_hash(hash_value)
+                print(f"🔎 {hash_value}: {len(rows)}건")
+                for row in rows:
+                    print(f"   {row['user_id']} {row['username']} [{row['role']}] {row['path'] or ''}")
+        elif args.action == "missing-obj":
+            for row in catalog.users_without_obj():
+                print(f"{row['user_id']} {row['username']}")
+        else:
+            for table, count in catalog.summary().items():
+                print(f"{table:<16} {count:,}")
+    return 0
+
+
+def cmd_phash(args) -> int:
+    from pathlib import Path
+    from avatar_catalog import DEFAULT_CATALOG, AvatarCatalog, catalog_path
+    from perceptual_hash import PerceptualIndex, reclaimable_bytes
+
+    db_path = Path(args.db) if args.db else (catalog_path() or Path(DEFAULT_CATALOG))
+    failures = 0
+
+    with AvatarCatalog(db_path) as catalog:
+        index = PerceptualIndex(catalog)
+        if args.action == "update":
+            roots = args.targets or ["downloads", "real_3d_avatars", "final_integrated"]
+            counts = index.update(Path(root) for root in roots if Path(root).exists())
+            print(f"🖼️ 해시 계산 {counts['hashed']}개, 변경 없음 {counts['unchanged']}개, "
+                  f"미지원 {counts['unsupported']}개, 삭제 {counts['removed']}개: {db_path}")
+        elif args.action == "similar":
+            for target in args.targets:
+                if Path(target).exists():
+                    rows = index.similar_to_file(Path(target), args.distance)
+                else:
+                    try:
+                        dhash = int(target, 16)
+                    except ValueError:
+                        print(f"❌ 이미지 파일 또는 16진수 dHash가 아닙니다: {target}")
+                        failures += 1
+                        continue
+                    rows = index.similar(dhash, args.distance)
+                print(f"🔎 {target}: {len(rows)}건")
+                for row in rows:
+                    print(f"   d={row['distance']:<2} {row['user_id'] or '-'} {row['username'] or ''} {row['path']}")
+        elif args.action == "dups":
+            groups = index.duplicate_groups(args.distance)
+            for group in groups:
+                print(f"🧬 {len(group)}개")
+                for row in group:
+                    print(f"   {row['user_id'] or '-'} {row['username'] or ''} {row['path']}")
+            print(f"근사 중복 묶음 {len(groups)}개, 정리 시 {reclaimable_bytes(groups):,} bytes 절약")
+        else:
+            for key, count in index.summary().items():
+                print(f"{key:<16} {count:,}")
+    return 1 if failures else 0
+
+
+def cmd_metrics(args) -> int:
+    import time
+    from avatar_metrics import start_metrics_server
+
+    server = start_metrics_server(args.port, args.host)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n메트릭 서버 종료")
+        server.shutdown()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """서브커맨드 파서 생성 (모듈 import 없이 구성)"""
+    parser = argparse.ArgumentParser(prog="roblox_cli", description="로블록스 아바타 다운로더 / 분석 도구")
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
+
+    p = subparsers.add_parser("2d", help="2D 썸네일 다운로드 (선택적으로 3D 포함)")
+    p.add_argument("users", nargs="+", help="유저 ID 또는 유저명")
+    p.add_argument("--sizes", default="150x150,420x420", help="쉼표로 구분한 크기 (기본값: 150x150,420x420)")
+    p.add_argument("--with-3d", action="store_true", help="실제 3D 모델도 다운로드")
+    p.add_argument("--textures", action="store_true", help="아바타 아이템 텍스처도 다운로드")
+    p.add_argument("--output", default="downloads", help="저장 폴더 (기본값: downloads)")
+    p.set_defaults(func=cmd_2d)
+
+    p = subparsers.add_parser("3d", help="3D 아바타(OBJ/MTL/텍스처) 다운로드")
+    p.add_argument("users", nargs="+", help="유저 ID 또는 유저명")
+    p.add_argument("--no-textures", action="store_true", help="텍스처 제외")
+    p.add_argument("--glb", action="store_true", help="다운로드 후 avatar.glb 생성")
+    p.add_argument("--atlas", action="store_true", help="다운로드 후 텍스처 아틀라스(atlas/) 생성")
+    p.add_argument("--cache", action="store_true", help="다운로드 후 메시 캐시 + 그룹 오프셋 인덱스 생성")
+    p.add_argument("--stats", action="store_true", help="다운로드 후 그룹별 기하 통계를 metadata.json에 기록")
+    p.add_argument("--output", default="real_3d_avatars", help="저장 폴더 (기본값: real_3d_avatars)")
+    p.set_defaults(func=cmd_3d)
+
+    p = subparsers.add_parser("package", help="2D + 3D + Attachment 통합 패키지 생성")
+    p.add_argument("users", nargs="+", help="유저 ID 또는 유저명")
+    p.add_argument("--output", default="final_integrated", help="저장 폴더 (기본값: final_integrated)")
+    p.add_argument("--materialize", choices=["auto", "reflink", "hardlink", "copy"],
+                   help="기존 3D 파일 배치 방식 - 저장 폴더에 기록되어 이후에도 적용 (기본값: auto = reflink → hardlink → copy)")
+    p.add_argument("--inventory-hashes", type=int, default=0, metavar="WORKERS",
+                   help="파일 목록에 sha256 기록 (계산 스레드 수, 기본값: 0 = 기록 안 함)")
+    p.set_defaults(func=cmd_package)
+
+    p = subparsers.add_parser("resolve", help="유저명을 유저 ID로 변환")
+    p.add_argument("users", nargs="+", help="유저 ID 또는 유저명")
+    p.add_argument("--output", default="downloads", help=argparse.SUPPRESS)
+    p.set_defaults(func=cmd_resolve)
+
+    p = subparsers.add_parser("analyze", help="폴더의 OBJ/MTL Attachment 분석 (네트워크 없음)")
+    p.add_argument("root", nargs="?", default=".", help="스캔할 폴더 (기본값: 현재 폴더)")
+    p.add_argument("--output", default="obj_attachment_analysis.json", help="결과 JSON 경로")
+    p.add_argument("--ndjson", action="store_true",
+                   help="폴더마다 NDJSON 한 줄씩 바로 기록 + 유저 ID 오프셋 인덱스 (.ndjson/.ndjson.idx)")
+    p.set_defaults(func=cmd_analyze)
+
+    p = subparsers.add_parser("attachments", help="수집된 Attachment 정보 조회 (네트워크 없음)")
+    p.add_argument("username", help="유저명")
+    p.add_argument("user_id", type=int, help="유저 ID")
+    p.set_defaults(func=cmd_attachments)
+
+    p = subparsers.add_parser("map", help="패키지 폴더의 바디 파트 매핑 텍스트 생성 (네트워크 없음)")
+    p.add_argument("package", help="아바타 패키지 폴더 (예: final_integrated/builderman_156)")
+    p.add_argument("--output", help="출력 파일 (기본값: <패키지>/BODY_PART_MAPPING.txt)")
+    p.add_argument("--stats", action="store_true", help="metadata.json에 그룹 통계가 없으면 OBJ에서 계산")
+    p.set_defaults(func=cmd_map)
+
+    p = subparsers.add_parser("glb", help="다운로드된 OBJ 아바타를 GLB로 일괄 변환 (네트워크 없음)")
+    p.add_argument("roots", nargs="*", default=["real_3d_avatars"], help="아바타 폴더 또는 상위 폴더")
+    p.add_argument("--reference-textures", action="store_true", help="텍스처를 포함하지 않고 상대 경로로 참조")
+    p.add_argument("--force", action="store_true", help="최신 GLB도 다시 생성")
+    p.set_defaults(func=cmd_glb)
+
+    p = subparsers.add_parser("cache", help="중복 정점 용접 후 바이너리 메시 캐시(avatar.meshcache) 생성")
+    p.add_argument("roots", nargs="*", default=["real_3d_avatars"], help="스캔할 폴더")
+    p.add_argument("--force", action="store_true", help="최신 캐시도 다시 생성")
+    p.set_defaults(func=cmd_cache)
+
+    p = subparsers.add_parser("extract", help="OBJ에서 그룹 하나만 독립 OBJ로 추출 (바이트 오프셋 인덱스 사용)")
+    p.add_argument("obj", help="avatar.obj 또는 아바타 폴더")
+    p.add_argument("groups", nargs="*", help="추출할 그룹 이름 (생략하면 그룹 목록 출력)")
+    p.add_argument("--output-dir", help="출력 폴더 (기본값: OBJ 폴더)")
+    p.set_defaults(func=cmd_extract)
+
+    p = subparsers.add_parser("textures", help="MTL의 텍스처 해시 참조를 로컬 경로로 변환 + texture_map.json 생성 (네트워크 없음)")
+    p.add_argument("roots", nargs="*", default=["real_3d_avatars"], help="아바타 폴더 또는 상위 폴더")
+    p.set_defaults(func=cmd_textures)
+
+    p = subparsers.add_parser("lod", help="그룹별 단순화 LOD OBJ 일괄 생성 (네트워크 없음)")
+    p.add_argument("roots", nargs="*", default=["real_3d_avatars"], help="스캔할 폴더")
+    p.add_argument("--ratios", default="0.5,0.25,0.1", help="쉼표로 구분한 목표 삼각형 비율 (기본값: 0.5,0.25,0.1)")
+    p.add_argument("--workers", type=int, help="프로세스 수 (기본값: CPU 수)")
+    p.add_argument("--force", action="store_true", help="최신 LOD도 다시 생성")
+    p.set_defaults(func=cmd_lod)
+
+    p = subparsers.add_parser("atlas", help="아바타별 텍스처를 아틀라스 한 장으로 합치고 UV/MTL 변환 (네트워크 없음)")
+    p.add_argument("roots", nargs="*", default=["real_3d_avatars"], help="아바타 폴더 또는 상위 폴더")
+    p.add_argument("--padding", type=int, default=2, help="텍스처 주변 여백 픽셀 (기본값: 2)")
+    p.add_argument("--workers", type=int, help="프로세스 수 (기본값: CPU 수)")
+    p.add_argument("--force", action="store_true", help="최신 아틀라스도 다시 생성")
+    p.set_defaults(func=cmd_atlas)
+
+    p = subparsers.add_parser("stats", help="그룹(바디 파트)별 기하 통계 계산 (네트워크 없음)")
+    p.add_argument("roots", nargs="*", default=["real_3d_avatars"], help="아바타 폴더 또는 상위 폴더")
+    p.add_argument("--update-metadata", action="store_true", help="각 아바타의 metadata.json에 group_stats 기록")
+    p.set_defaults(func=cmd_stats)
+
+    p = subparsers.add_parser("catalog", help="SQLite 아바타 카탈로그 갱신/조회 (네트워크 없음)")
+    p.add_argument("action", choices=["sync", "hash", "missing-obj", "summary"],
+                   help="sync: 폴더 순회로 갱신, hash: CDN 해시/sha256 사용처, missing-obj: OBJ 없는 유저, summary: 행 수")
+    p.add_argument("targets", nargs="*", help="sync할 폴더 또는 조회할 해시")
+    p.add_argument("--db", help="카탈로그 경로 (기본값: ROBLOX_CATALOG_DB 또는 avatar_catalog.db)")
+    p.set_defaults(func=cmd_catalog)
+
+    p = subparsers.add_parser("phash", help="텍스처/썸네일 지각 해시 인덱스 갱신 및 근사 중복 검색 (네트워크 없음)")
+    p.add_argument("action", choices=["update", "similar", "dups", "summary"],
+                   help="update: 폴더 순회로 해시 갱신, similar: 파일/dHash와 비슷한 이미지, dups: 근사 중복 묶음, summary: 개수")
+    p.add_argument("targets", nargs="*", help="update할 폴더 또는 검색할 이미지 파일 / 16진수 dHash")
+    p.add_argument("--distance", type=int, default=6, help="허용 해밍 거리 (기본값: 6)")
+    p.add_argument("--db", help="카탈로그 경로 (기본값: ROBLOX_CATALOG_DB 또는 avatar_catalog.db)")
+    p.set_defaults(func=cmd_phash)
+
+    p = subparsers.add_parser("metrics", help="Prometheus /metrics 엔드포인트 단독 실행")
+    p.add_argument("--port", type=int, default=9108, help="포트 (기본값: 9108)")
+    p.add_argument("--host", default="127.0.0.1", help="바인딩 주소 (기본값: 127.0.0.1)")
+    p.set_defaults(func=cmd_metrics)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, "func", None):
+        parser.print_help()
+        return 2
+
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        print("\n프로그램이 중단되었습니다.")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Attachment 분석 NDJSON 스트림 / 유저 ID 오프셋 인덱스 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import analysis_stream
+from analysis_stream import (build_stream_index, find_in_scan_results, find_user_analysis, find_user_folder_record, index_path_for,
+                             load_stream_index, sidecar_path_for, user_ids_from_folder, write_analysis_stream)
+from obj_attachment_parser import OBJAttachmentParser
+
+def test_stream_matches_json_scan():
+    """NDJSON 레코드가 기존 JSON 스캔 결과의 폴더와 같고, 인덱스 seek 결과가 선형 검색과 동일"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "avatars"
+        for name in ("builderman_156_3D", "Roblox_1_3D"):
+            shutil.copytree(Path("real_3d_avatars") / name, root / name,
+                            ignore=shutil.ignore_patterns("*.meshcache", "*.objindex", "lods"))
+        ndjson = Path(tmp) / "analysis.ndjson"
+
+        parser = OBJAttachmentParser()
+        with contextlib.redirect_stdout(io.StringIO()):
+            count = parser.stream_attachment_analysis(str(root), str(ndjson))
+            scan_results = parser.scan_avatar_folders(str(root))
+
+        records = [json.loads(line) for line in ndjson.read_text(encoding="utf-8").splitlines()]
+        assert count == len(records) == len(scan_results["avatar_folders"]) == 2
+        assert ndjson.with_suffix(".md").exists()
+
+        for record in records:
+            user_id = user_ids_from_folder(record["folder_name"])[0]
+            username = record["folder_name"].split("_")[0]
+            found = find_user_folder_record(ndjson, user_id, username)
+            expected = find_in_scan_results(scan_results, user_id, username)
+            assert found == record
+            assert [o["file_path"] for o in found["obj_files"]] == [o["file_path"] for o in expected["obj_files"]]
+            assert found["obj_files"][0]["vertices"] == expected["obj_files"][0]["vertices"]
+
+        assert find_user_folder_record(ndjson, 156, "Roblox") is None
+        assert find_user_folder_record(ndjson, 999, "nobody") is None
+        assert find_user_folder_record(Path(tmp) / "missing.ndjson", 1, "Roblox") is None
+    print("✅ NDJSON 스트림 / 유저 조회 결과 일치")
+
+def test_index_rebuilds_when_stale():
+    """NDJSON이 바뀌면 인덱스를 다시 만들고, 같은 유저 ID의 다른 폴더도 이름으로 구분"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ndjson = Path(tmp) / "analysis.ndjson"
+        records = [{"folder_name": f"user{i}_{i}_3D", "obj_files": [{"vertices": i}]} for i in range(1, 200)]
+        assert write_analysis_stream(records, ndjson) == 199
+
+        index = load_stream_index(ndjson)
+        assert index == json.loads(index_path_for(ndjson).read_text(encoding="utf-8"))
+        assert find_user_folder_record(ndjson, 150, "user150", index)["obj_files"][0]["vertices"] == 150
+
+        with open(ndjson, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"folder_name": "other_150_3D", "obj_files": [{"vertices": -1}]}) + "\n")
+        assert load_stream_index(ndjson)["users"]["150"] == ["user150_150_3D", "other_150_3D"]
+        assert find_user_folder_record(ndjson, 150, "other")["obj_files"][0]["vertices"] == -1
+        assert build_stream_index(ndjson)["folders"] == load_stream_index(ndjson)["folders"]
+    assert user_ids_from_folder("builderman_156_3D") == [156]
+    assert user_ids_from_folder("avatar_3d") == []
+    print("✅ 오래된 인덱스 재생성 확인")
+
+def test_interrupted_index_write_keeps_old_index(monkeypatch):
+    """인덱스 저장 중 실패해도 기존 .idx는 그대로, 임시 파일도 남지 않음"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ndjson = Path(tmp) / "analysis.ndjson"
+        write_analysis_stream([{"folder_name": "user1_1_3D", "obj_files": []}], ndjson)
+        previous = index_path_for(ndjson).read_text(encoding="utf-8")
+
+        def failing_dump(obj, f, **kwargs):
+            f.write('{"version": 1, "source": ')
+            raise OSError("디스크 가득 참")
+        monkeypatch.setattr(analysis_stream.json, "dump", failing_dump)
+
+        with open(ndjson, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"folder_name": "user2_2_3D", "obj_files": []}) + "\n")
+        assert "2" in build_stream_index(ndjson)["users"]  # 저장은 실패해도 인덱스는 반환
+        assert index_path_for(ndjson).read_text(encoding="utf-8") == previous
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["analysis.ndjson", "analysis.ndjson.idx"]
+    print("✅ 인덱스 저장 중단 시 기존 인덱스 유지")
+
+def test_json_lookup_uses_cached_index():
+    """기존 JSON 결과도 사본 인덱스로 조회하고, 같은 프로세스의 반복 조회는 메모리 캐시 사용"""
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "analysis.json"
+        ndjson_path = Path(tmp) / "analysis.ndjson"
+        folders = [{"folder_name": f"user{i}_{i}_3D", "obj_files": [{"file_path": f"user{i}/avatar.obj", "vertices": i}],
+                    "mtl_files": [], "texture_files": []} for i in range(1, 500)]
+        scan_results = {"scanned_at": "now", "base_folder": tmp, "avatar_folders": folders}
+
+        parser = OBJAttachmentParser()
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.save_attachment_analysis(scan_results, str(json_path))
+        sidecar = sidecar_path_for(json_path)
+        assert sidecar.exists()
+
+        for user_id in (1, 250, 499):
+            expected = find_in_scan_results(scan_results, user_id, f"user{user_id}")
+            assert find_user_analysis(user_id, f"user{user_id}", json_path, ndjson_path) == expected
+        assert find_user_analysis(250, "someone", json_path, ndjson_path) is None
+
+        # 캐시된 인덱스 사용 - .idx 파일을 지워도 다시 만들지 않음
+        index_path_for(sidecar).unlink()
+        assert find_user_analysis(7, "user7", json_path, ndjson_path)["obj_files"][0]["vertices"] == 7
+        assert not index_path_for(sidecar).exists()
+
+        # JSON이 따로 바뀌면 오래된 사본은 무시하고 JSON 선형 검색 (사본을 다시 쓰지 않음)
+        sidecar_bytes = sidecar.read_bytes()
+        folders[6]["obj_files"][0]["vertices"] = -7
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(scan_results, f)
+        assert find_user_analysis(7, "user7", json_path, ndjson_path)["obj_files"][0]["vertices"] == -7
+        assert sidecar.read_bytes() == sidecar_bytes
+
+        # 더 최근에 기록된 NDJSON 스트림이 우선
+        write_analysis_stream([{"folder_name": "user7_7_3D", "obj_files": [{"vertices": 70}]}], ndjson_path)
+        os.utime(json_path, ns=(1, 1))
+        assert find_user_analysis(7, "user7", json_path, ndjson_path)["obj_files"][0]["vertices"] == 70
+        assert find_user_analysis(7, "user7", Path(tmp) / "none.json", Path(tmp) / "none.ndjson") is None
+    print("✅ JSON 결과 인덱스 조회 / 메모리 캐시 확인")
+
+def test_lookup_does_not_write(monkeypatch):
+    """조회는 사본을 만들지 않고, 인덱스를 쓸 수 없어도 성공 (JSON 선형 검색 / 메모리 인덱스)"""
+    def denied(*args, **kwargs):
+        raise PermissionError("읽기 전용")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "analysis.json"
+        ndjson_path = Path(tmp) / "analysis.ndjson"
+        folders = [{"folder_name": f"user{i}_{i}_3D", "obj_files": [{"vertices": i}]} for i in range(1, 50)]
+        json_path.write_text(json.dumps({"avatar_folders": folders}), encoding="utf-8")
+
+        # 다른 방법으로 저장된 JSON (사본 없음)
+        assert find_user_analysis(7, "user7", json_path, ndjson_path)["obj_files"][0]["vertices"] == 7
+        assert find_user_analysis(7, "nobody", json_path, ndjson_path) is None
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["analysis.json"]
+
+        # 스트림 인덱스를 쓸 수 없으면 메모리에 보관한 인덱스로 조회
+        write_analysis_stream(folders, ndjson_path)
+        index_path_for(ndjson_path).unlink()
+        with open(ndjson_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"folder_name": "user99_99_3D", "obj_files": [{"vertices": 99}]}) + "\n")
+        monkeypatch.setattr(analysis_stream, "_write_index", denied)
+        assert find_user_analysis(99, "user99", json_path, ndjson_path)["obj_files"][0]["vertices"] == 99
+        assert not index_path_for(ndjson_path).exists()
+    print("✅ 조회 시 파일 미생성 / 쓰기 권한 없이 조회 확인")
+
+if __name__ == "__main__":
+    test_stream_matches_json_scan()
+    test_index_rebuilds_when_stale()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_interrupted_index_write_keeps_old_index(monkeypatch)
+    test_json_lookup_uses_cached_index()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_lookup_does_not_write(monkeypatch)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+SQLite 아바타 카탈로그 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import avatar_catalog
+from avatar_catalog import AvatarCatalog, catalog_folder, file_sha256
+from obj_attachment_parser import OBJAttachmentParser
+
+SAMPLE = Path("real_3d_avatars/builderman_156_3D")
+
+def copy_sample(target: Path) -> Path:
+    shutil.copytree(SAMPLE, target, ignore=shutil.ignore_patterns("*.meshcache", "*.objindex", "lods", "*.glb"))
+    return target
+
+def test_sync_and_queries():
+    """폴더 순회 기록 후 해시 사용처 / OBJ 없는 유저 / 파일 sha256 조회"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "avatars"
+        folder = copy_sample(root / "builderman_156" / "builderman_156_3D")
+        (root / "builderman_156" / "user_info.json").write_text(
+            json.dumps({"id": 156, "name": "builderman", "displayName": "builderman"}), encoding="utf-8")
+        only_2d = root / "nobody_7"
+        only_2d.mkdir()
+        (only_2d / "user_info.json").write_text(json.dumps({"id": 7, "name": "nobody"}), encoding="utf-8")
+        (only_2d / "avatar_420x420.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+
+        metadata = json.loads((folder / "metadata.json").read_text(encoding="utf-8"))
+        texture_hash = metadata["avatar_3d_metadata"]["textures"][0]
+
+        with AvatarCatalog(Path(tmp) / "catalog.db") as catalog:
+            assert catalog.sync([root]) == 3
+            summary = catalog.summary()
+            assert summary["users"] == 2 and summary["avatar_versions"] == 1 and summary["folders"] == 3
+
+            rows = catalog.users_with_hash(texture_hash)
+            paths = [row["path"] for row in rows if row["path"]]
+            assert {row["user_id"] for row in rows} == {156}
+            assert paths == [str((folder / "textures" / "texture_001.png").resolve())]
+
+            obj_sha = file_sha256(folder / "avatar.obj")
+            assert [row["role"] for row in catalog.users_with_hash(obj_sha)] == ["obj"]
+            assert catalog.users_with_hash(metadata["avatar_3d_metadata"]["obj"])[0]["user_id"] == 156
+            assert [row["user_id"] for row in catalog.users_without_obj()] == [7]
+            assert not any(path.endswith(".meshcache") for path in (f["path"] for f in catalog.user_files(156)))
+
+            # 폴더 삭제 후 다시 sync하면 정리
+            shutil.rmtree(only_2d)
+            catalog.sync([root])
+            assert catalog.summary()["folders"] == 2
+    print("✅ 카탈로그 sync / 조회 확인")
+
+def test_hooks_reuse_hashes(monkeypatch):
+    """훅 재호출 시 바뀌지 않은 파일은 sha256을 다시 계산하지 않고, 환경 변수가 없으면 기록하지 않음"""
+    calls = []
+    original = avatar_catalog.file_sha256
+
+    def counting_sha256(path):
+        calls.append(path.name)
+        return original(path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = copy_sample(Path(tmp) / "builderman_156_3D")
+        db_path = Path(tmp) / "catalog.db"
+        avatar_catalog.file_sha256 = counting_sha256
+        try:
+            assert catalog_folder(folder, db_path) == 1
+            first = len(calls)
+            assert catalog_folder(folder, db_path) == 1
+            assert len(calls) == first
+
+            with open(folder / "avatar.mtl", 'a', encoding='utf-8') as f:
+                f.write("# edited\n")
+            catalog_folder(folder, db_path)
+            assert calls[first:] == ["avatar.mtl"]
+        finally:
+            avatar_catalog.file_sha256 = original
+
+        # 분석 전용 파서는 카탈로그에 쓰지 않음 (분석 결과는 AvatarCatalog.record_analysis로 직접 기록)
+        monkeypatch.setenv("ROBLOX_CATALOG_DB", str(db_path))
+        with contextlib.redirect_stdout(io.StringIO()):
+            obj_data = OBJAttachmentParser().analyze_avatar_folder(folder)["obj_files"][0]
+        with AvatarCatalog(db_path) as catalog:
+            assert catalog.summary()["analysis"] == 0
+            catalog.record_analysis(folder, obj_data)
+            row = catalog.conn.execute("SELECT * FROM analysis WHERE folder = ?", (str(folder.resolve()),)).fetchone()
+        assert row["vertices"] == obj_data["vertices"] and row["attachments"] == len(obj_data["attachments"])
+        assert row["version_id"] is not None
+
+        # 기본값은 기록하지 않음 (opt-in)
+        monkeypatch.delenv("ROBLOX_CATALOG_DB")
+        assert catalog_folder(folder) == 0
+        monkeypatch.setenv("ROBLOX_CATALOG_DB", "off")
+        assert catalog_folder(folder) == 0
+    print("✅ 카탈로그 훅 / sha256 재사용 확인")
+
+if __name__ == "__main__":
+    test_sync_and_queries()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_hooks_reuse_hashes(monkeypatch)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Prometheus 메트릭 레지스트리 / 세션 훅 / /metrics 엔드포인트 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import tempfile
+from pathlib import Path
+
+import pytest
+import requests
+
+from avatar_metrics import (CDN_SHARD_FALLBACKS, HTTP_RATE_LIMITED, HTTP_REQUESTS, MetricsRegistry,
+                            instrument_session, start_metrics_server)
+from mock_roblox_server import MockRobloxServer, cdn_shard
+from real_3d_downloader import RobloxAvatar3DDownloader
+
+FIXTURE_HASH = "30DAY-8ef1bba9d13b79b6bacd058754347c72"
+
+def test_text_format():
+    """HELP/TYPE 줄, 라벨 정렬/이스케이프, 정수/실수 값 표기 확인"""
+    registry = MetricsRegistry()
+    requests_total = registry.counter("demo_requests_total", "요청 수", ("host", "path"))
+    queue = registry.gauge("demo_queue_depth", "대기열 길이")
+
+    requests_total.inc(host="b.example", path="/plain")
+    requests_total.inc(2, host="a.example", path='C:\\dir\n"quoted"')
+    queue.set(2.5)
+    queue.dec(1)
+
+    assert registry.render() == (
+        "# HELP demo_requests_total 요청 수\n"
+        "# TYPE demo_requests_total counter\n"
+        'demo_requests_total{host="a.example",path="C:\\\\dir\\n\\"quoted\\""} 2\n'
+        'demo_requests_total{host="b.example",path="/plain"} 1\n'
+        "# HELP demo_queue_depth 대기열 길이\n"
+        "# TYPE demo_queue_depth gauge\n"
+        "demo_queue_depth 1.5\n"
+    )
+
+    with pytest.raises(ValueError):
+        requests_total.inc(host="a.example")
+    with pytest.raises(ValueError):
+        requests_total.inc(-1, host="a.example", path="/")
+    with pytest.raises(ValueError):
+        registry.gauge("demo_queue_depth", "중복")
+    print("✅ 텍스트 형식 / 라벨 이스케이프 확인")
+
+def test_histogram_buckets():
+    """버킷은 누적 카운트, +Inf 버킷 = _count, _sum은 관측값 합계"""
+    registry = MetricsRegistry()
+    parse = registry.histogram("demo_parse_seconds", "파싱 시간", ("parser",), buckets=(1.0, 0.1))
+    for value in (0.05, 0.5, 0.5, 3):
+        parse.observe(value, parser="obj")
+
+    assert registry.render().splitlines()[2:] == [
+        'demo_parse_seconds_bucket{parser="obj",le="0.1"} 1',
+        'demo_parse_seconds_bucket{parser="obj",le="1"} 3',
+        'demo_parse_seconds_bucket{parser="obj",le="+Inf"} 4',
+        'demo_parse_seconds_sum{parser="obj"} 4.05',
+        'demo_parse_seconds_count{parser="obj"} 4',
+    ]
+
+    with parse.time(parser="mtl"):
+        pass
+    assert 'demo_parse_seconds_count{parser="mtl"} 1' in registry.render()
+    print("✅ 히스토그램 누적 버킷 / _sum / _count 확인")
+
+def test_session_hook_counters():
+    """세션 응답 훅으로 호스트/상태별 요청 수, 429 수, 대체 CDN 시도 수가 증가"""
+    with MockRobloxServer(rate_limit_ratio=1.0) as server:
+        session = server.install(instrument_session(requests.Session()))
+        hooks = list(session.hooks["response"])
+        instrument_session(session)
+        assert session.hooks["response"] == hooks  # 두 번 등록해도 훅은 하나
+
+        before = (HTTP_RATE_LIMITED.get(host="users.roblox.com"),
+                  HTTP_REQUESTS.get(host="users.roblox.com", status="429"))
+        for _ in range(3):
+            assert session.get("https://users.roblox.com/v1/users/156").status_code == 429
+        after = (HTTP_RATE_LIMITED.get(host="users.roblox.com"),
+                 HTTP_REQUESTS.get(host="users.roblox.com", status="429"))
+        assert (after[0] - before[0], after[1] - before[1]) == (3, 3)
+
+    with MockRobloxServer(failing_shards=[cdn_shard(FIXTURE_HASH)]) as server, \
+            tempfile.TemporaryDirectory() as output:
+        downloader = RobloxAvatar3DDownloader(output)
+        server.install(downloader.session)
+        shard_host = f"t{cdn_shard(FIXTURE_HASH)}.rbxcdn.com"
+        fallbacks = CDN_SHARD_FALLBACKS.get(extension="obj")
+        unavailable = HTTP_REQUESTS.get(host=shard_host, status="503")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            downloader.download_file_from_hash(FIXTURE_HASH, Path(output) / "avatar.obj", "OBJ 모델")
+
+        attempts = [path for _, path, _ in server.request_log if FIXTURE_HASH in path]
+        assert CDN_SHARD_FALLBACKS.get(extension="obj") - fallbacks == len(attempts) - 1 > 0
+        assert HTTP_REQUESTS.get(host=shard_host, status="503") - unavailable >= 1
+    print("✅ 세션 훅 429 / 대체 CDN 카운터 확인")
+
+def test_metrics_endpoint():
+    """임의 포트의 /metrics 엔드포인트가 레지스트리 텍스트를 그대로 제공"""
+    registry = MetricsRegistry()
+    registry.counter("demo_scrapes_total", "스크레이프 테스트").inc()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = start_metrics_server(port=0, registry=registry)
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        response = requests.get(f"{base_url}/metrics", timeout=5)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert response.text == registry.render()
+        assert "demo_scrapes_total 1\n" in response.text
+        assert requests.get(f"{base_url}/other", timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"✅ /metrics 엔드포인트 확인 (포트 {server.server_address[1]})")
+
+if __name__ == "__main__":
+    test_text_format()
+    test_histogram_buckets()
+    test_session_hook_counters()
+    test_metrics_endpoint()
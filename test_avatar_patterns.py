@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+컴파일된 바디 파트 분류기 / Attachment 매처 테스트 (네트워크 없음)
+기존 키워드 루프·re.search 구현과 결과가 같은지 비교
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import re
+
+from avatar_patterns import ATTACHMENT_PATTERNS, BODY_PART_KEYWORDS, AttachmentMatcher, BodyPartClassifier
+
+NAMES = [f"Player{i}" for i in range(1, 20)] + [
+    "Handle1", "Handle", "Hair_Accessory", "LeftArm", "RightLowerLeg", "MeshPart", "Hat1", "Torso",
+    "TopHat", "Left_Leg_Boot", "player13", "PLAYER1", "ShirtGrip", "chest_tool", "FaceCap", "", "default",
+    "BottomPlayer2", "gearHead", "HelmetPlayer15", "toolhandle", "Ünïcode_Hair",
+]
+
+COMMENTS = [
+    "# Attachment RightGrip", "# attach HatAttachment", "# Bone Neck", "# bone spine01 rig",
+    "# joint Hip", "# bind pose", "# rigged with blender", "# exported by roblox",
+    "# g LeftAttach_01", "# o BoneRoot", "#Attachment", "# ATTACHMENT  Waist",
+]
+
+def reference_classify(group_name):
+    """기존 classify_body_part 구현"""
+    name_lower = group_name.lower()
+    for part_type, keywords in BODY_PART_KEYWORDS.items():
+        if any(keyword in name_lower for keyword in keywords):
+            return part_type
+    return "unknown"
+
+def reference_comment(line):
+    """기존 _record_comment 구현의 (저장 여부, 패턴 매치 목록)"""
+    comment = line[1:].strip()
+    if not any(keyword in comment.lower() for keyword in ['attach', 'bone', 'joint', 'bind', 'rig']):
+        return False, []
+    matches = []
+    for pattern in ATTACHMENT_PATTERNS:
+        match = re.search(pattern, line, re.IGNORECASE)
+        if match:
+            matches.append((pattern, match.group(1)))
+    return True, matches
+
+def test_classifier_matches_reference():
+    """겹치는 키워드(player1/player13 등)를 포함해 기존 분류와 동일"""
+    classifier = BodyPartClassifier()
+    for name in NAMES * 2:
+        assert classifier.classify(name) == reference_classify(name), name
+    assert classifier.classify("Player13") == "head"  # 기존 동작: player1이 먼저 일치
+    print(f"✅ 바디 파트 분류 {len(NAMES)}개 이름 일치")
+
+def test_attachment_matcher_matches_reference():
+    """코멘트 저장 여부와 패턴 매치 결과(순서 포함)가 기존 구현과 동일"""
+    matcher = AttachmentMatcher()
+    for line in COMMENTS:
+        important, matches = reference_comment(line)
+        assert matcher.is_important_comment(line[1:].strip()) == important, line
+        if important:
+            assert matcher.match_comment(line) == matches, line
+    for name in NAMES + ["RightGripAttachment", "BoneRoot", "neck_BONE"]:
+        assert matcher.is_attachment_name(name) == ('attach' in name.lower() or 'bone' in name.lower())
+    print(f"✅ Attachment 매칭 {len(COMMENTS)}개 코멘트 일치")
+
+if __name__ == "__main__":
+    test_classifier_matches_reference()
+    test_attachment_matcher_matches_reference()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+CLI 시작 시간 예산 테스트
+--help와 분석 전용 명령이 100ms 안에 끝나고 requests/다운로더 스택을 불러오지 않는지 확인
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+BUDGET_MS = 100
+
+# 새 인터프리터에서 roblox_cli import + 실행 시간을 측정 (인터프리터 자체 시작 시간 제외)
+_PROBE = """
+import contextlib, io, json, sys, time
+t0 = time.perf_counter()
+import roblox_cli
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        code = roblox_cli.main(json.loads(sys.argv[1]))
+    except SystemExit as e:
+        code = e.code
+elapsed = (time.perf_counter() - t0) * 1000
+heavy = [m for m in ("requests", "real_3d_downloader", "roblox_avatar_downloader", "http.server") if m in sys.modules]
+print(json.dumps({"ms": elapsed, "code": code, "heavy": heavy}))
+"""
+
+def run_probe(argv):
+    completed = subprocess.run([sys.executable, "-c", _PROBE, json.dumps(argv)], capture_output=True, text=True,
+                               encoding='utf-8', cwd=Path(__file__).parent, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def check_budget(argv):
+    # 디스크 캐시 영향을 줄이기 위해 3번 중 최솟값 사용
+    results = [run_probe(argv) for _ in range(3)]
+    best = min(r["ms"] for r in results)
+    assert results[0]["code"] in (0, None), results[0]
+    assert not results[0]["heavy"], f"{argv}: 불필요한 모듈 로드 {results[0]['heavy']}"
+    assert best < BUDGET_MS, f"{argv}: {best:.1f}ms (예산 {BUDGET_MS}ms)"
+    print(f"✅ {' '.join(argv):<45} {best:>6.1f}ms")
+
+def test_help_startup():
+    """--help는 서브커맨드 모듈을 불러오지 않음"""
+    check_budget(["--help"])
+    check_budget(["3d", "--help"])
+
+def test_analysis_startup():
+    """분석 전용 명령은 다운로더 스택 없이 실행"""
+    check_budget(["attachments", "builderman", "156"])
+    with tempfile.TemporaryDirectory() as output:
+        check_budget(["map", "final_integrated/builderman_156", "--output", str(Path(output) / "MAPPING.txt")])
+        check_budget(["analyze", "real_3d_avatars", "--output", str(Path(output) / "analysis.json")])
+
+if __name__ == "__main__":
+    test_help_startup()
+    test_analysis_startup()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+scandir 기반 파일 목록 / 다운로드 기록 목록 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import file_inventory
+from file_inventory import FileManifest, build_file_inventory
+from mock_roblox_server import MockRobloxServer
+
+SAMPLES = [Path("final_integrated/builderman_156"), Path("real_3d_avatars/builderman_156_3D")]
+
+def reference_inventory(user_folder):
+    """기존 create_file_inventory 구현 (rglob + is_file + stat)"""
+    inventory = {"thumbnails": [], "3d_model": [], "metadata": [], "other": []}
+    if not user_folder.exists():
+        return inventory
+    for file_path in user_folder.rglob("*"):
+        if file_path.is_file():
+            file_info = {"path": str(file_path.relative_to(user_folder)), "size": file_path.stat().st_size,
+                         "extension": file_path.suffix.lower()}
+            if file_path.suffix.lower() in ['.png', '.jpg', '.jpeg']:
+                if 'texture' in file_path.name.lower():
+                    inventory["3d_model"].append(file_info)
+                else:
+                    inventory["thumbnails"].append(file_info)
+            elif file_path.suffix.lower() in ['.obj', '.mtl']:
+                inventory["3d_model"].append(file_info)
+            elif file_path.suffix.lower() == '.json':
+                inventory["metadata"].append(file_info)
+            else:
+                inventory["other"].append(file_info)
+    return inventory
+
+def test_scandir_matches_rglob():
+    """scandir 목록이 기존 rglob 목록과 순서까지 같고, sha256은 스레드 풀에서 계산"""
+    for folder in SAMPLES:
+        assert build_file_inventory(folder) == reference_inventory(folder)
+        hashed = build_file_inventory(folder, hash_workers=4)
+        for file_info in hashed["3d_model"]:
+            expected = hashlib.sha256((folder / file_info["path"]).read_bytes()).hexdigest()
+            assert file_info["sha256"] == expected
+    assert build_file_inventory(Path("no_such_folder")) == reference_inventory(Path("no_such_folder"))
+    print("✅ scandir 파일 목록 일치")
+
+def test_manifest_skips_walk():
+    """새 패키지는 다운로드 단계의 기록 목록으로 파일 목록을 만들고 폴더를 순회하지 않음"""
+    from final_integrated_downloader import FinalIntegratedDownloader
+
+    with MockRobloxServer() as server, tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree("real_3d_avatars/builderman_156_3D", Path(tmp) / "test_extended_full" / "builderman_156_3D",
+                        ignore=shutil.ignore_patterns("*.meshcache", "*.objindex", "lods", "*.glb"))
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        original_scan = file_inventory.scan_files
+
+        def no_walk(root):
+            raise AssertionError("기록 목록이 있으면 폴더를 순회하지 않아야 함")
+
+        file_inventory.scan_files = no_walk
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                downloader = FinalIntegratedDownloader("final", "copy")
+                server.install(downloader.session)
+                assert downloader.download_complete_avatar_package("156")
+        finally:
+            file_inventory.scan_files = original_scan
+            os.chdir(cwd)
+
+        user_folder = Path(tmp) / "final" / "builderman_156"
+        metadata = json.loads((user_folder / "COMPLETE_METADATA.json").read_text(encoding="utf-8"))
+        inventory = metadata["file_inventory"]
+        expected = reference_inventory(user_folder)
+        # 파일 목록 이후에 쓰는 파일 제외
+        expected["metadata"] = [f for f in expected["metadata"] if f["path"] != "COMPLETE_METADATA.json"]
+        expected["other"] = [f for f in expected["other"] if f["path"] != "COMPLETE_README.md"]
+        for category in expected:
+            assert sorted(inventory[category], key=lambda f: f["path"]) == \
+                sorted(expected[category], key=lambda f: f["path"]), category
+        assert inventory["thumbnails"] and inventory["3d_model"]
+        assert downloader.manifest is None
+
+    manifest = FileManifest()
+    manifest.add(SAMPLES[1] / "avatar.obj")
+    manifest.add(Path("real_3d_avatars/Roblox_1_3D/avatar.obj"))
+    inventory = build_file_inventory(SAMPLES[1], manifest)
+    assert [f["path"] for f in inventory["3d_model"]] == ["avatar.obj"]
+    print("✅ 기록 목록 기반 파일 목록 확인")
+
+if __name__ == "__main__":
+    test_scandir_matches_rglob()
+    test_manifest_skips_walk()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+reflink / 하드링크 / 복사 파일 배치 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+from file_materializer import (CONFIG_NAME, materialize_file, materialize_mode_for, materialize_tree,
+                               set_materialize_mode)
+
+SAMPLE = Path("real_3d_avatars/builderman_156_3D").absolute()
+
+def copy_sample(target: Path) -> Path:
+    shutil.copytree(SAMPLE, target, ignore=shutil.ignore_patterns("*.meshcache", "*.objindex", "lods", "*.glb"))
+    return target
+
+def same_inode(a: Path, b: Path) -> bool:
+    return os.stat(a).st_ino == os.stat(b).st_ino
+
+def test_auto_links_content_files():
+    """auto: 콘텐츠 파일은 reflink 또는 하드링크, metadata/README는 독립 파일, 내용은 모두 동일"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = copy_sample(Path(tmp) / "source")
+        target = Path(tmp) / "package" / "3D_Model"
+        counts = materialize_tree(source, target, "auto")
+
+        files = [p for p in source.rglob("*") if p.is_file()]
+        assert sum(counts.values()) == len(files)
+        for path in files:
+            placed = target / path.relative_to(source)
+            assert placed.read_bytes() == path.read_bytes()
+            if path.suffix in (".json", ".md"):
+                assert not same_inode(path, placed)
+        linked = counts.get("hardlink", 0) + counts.get("reflink", 0)
+        assert linked == len([p for p in files if p.suffix in (".obj", ".mtl", ".png")])
+        if counts.get("hardlink"):
+            assert same_inode(source / "avatar.obj", target / "avatar.obj")
+
+        # 다시 실행하면 이미 링크된 파일은 그대로
+        again = materialize_tree(source, target, "auto")
+        assert again.get("existing", 0) == counts.get("hardlink", 0)
+    print(f"✅ auto 배치: {counts}")
+
+def test_copy_mode_and_replacement():
+    """copy 모드는 독립 파일, 하드링크된 기존 대상을 교체해도 링크 상대 파일은 그대로"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = copy_sample(Path(tmp) / "source")
+        target = Path(tmp) / "copy"
+        counts = materialize_tree(source, target, "copy")
+        assert set(counts) == {"copy"}
+        assert not same_inode(source / "avatar.obj", target / "avatar.obj")
+
+        other = Path(tmp) / "other.obj"
+        other.write_text("v 0 0 0\n", encoding="utf-8")
+        linked_target = Path(tmp) / "linked.obj"
+        os.link(other, linked_target)
+        for mode in ("copy", "hardlink", "reflink"):
+            materialize_file(source / "avatar.obj", linked_target, mode)
+            assert other.read_text(encoding="utf-8") == "v 0 0 0\n"
+            assert linked_target.read_bytes() == (source / "avatar.obj").read_bytes()
+        assert not list(Path(tmp).glob(".*.tmp"))
+
+        try:
+            materialize_file(source / "avatar.obj", target / "x.obj", "symlink")
+            assert False, "잘못된 모드"
+        except ValueError:
+            pass
+    print("✅ copy 모드 / 대상 교체 확인")
+
+def test_mode_per_output_root():
+    """출력 루트별 설정 파일 → 환경 변수 → auto 순으로 모드 결정, 통합 다운로더가 설정 사용"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root_a, root_b = Path(tmp) / "a", Path(tmp) / "b"
+        set_materialize_mode(root_a, "copy")
+        assert (root_a / CONFIG_NAME).exists()
+        assert materialize_mode_for(root_a) == "copy"
+        assert materialize_mode_for(root_b) == "auto"
+        os.environ["ROBLOX_MATERIALIZE"] = "hardlink"
+        try:
+            assert materialize_mode_for(root_b) == "hardlink"
+            assert materialize_mode_for(root_a) == "copy"
+        finally:
+            del os.environ["ROBLOX_MATERIALIZE"]
+
+        from final_integrated_downloader import FinalIntegratedDownloader
+        copy_sample(Path(tmp) / "test_extended_full" / "builderman_156_3D")
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                downloader = FinalIntegratedDownloader(str(root_a))
+                assert downloader.try_3d_download(156, "builderman")
+                downloader = FinalIntegratedDownloader(str(root_b), "hardlink")
+                assert downloader.try_3d_download(156, "builderman")
+        finally:
+            os.chdir(cwd)
+        source_obj = Path(tmp) / "test_extended_full" / "builderman_156_3D" / "avatar.obj"
+        assert not same_inode(source_obj, root_a / "builderman_156" / "3D_Model" / "avatar.obj")
+        assert same_inode(source_obj, root_b / "builderman_156" / "3D_Model" / "avatar.obj")
+        assert materialize_mode_for(root_b) == "hardlink"
+    print("✅ 출력 루트별 배치 모드 확인")
+
+if __name__ == "__main__":
+    test_auto_links_content_files()
+    test_copy_mode_and_replacement()
+    test_mode_per_output_root()
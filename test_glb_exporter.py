@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+GLB 내보내기 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from mesh_cache import load_avatar_mesh
+from glb_exporter import GLBExporter, read_glb
+
+SAMPLE = Path("real_3d_avatars/builderman_156_3D")
+
+def _accessor_array(gltf, binary, index, dtype, width):
+    accessor = gltf["accessors"][index]
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    start = view["byteOffset"] + accessor.get("byteOffset", 0)
+    return np.frombuffer(binary, dtype=dtype, count=accessor["count"] * width, offset=start).reshape(-1, width)
+
+def test_export_builderman():
+    """그룹별 primitive, float32/uint32 버퍼, MTL 재질, 포함된 텍스처 확인"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / SAMPLE.name
+        shutil.copytree(SAMPLE, folder)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            glb_path = GLBExporter().export_avatar(folder)
+        gltf, binary = read_glb(glb_path)
+
+        # 내보내기와 같은 (용접된) 메시를 캐시에서 로드
+        mesh = load_avatar_mesh(folder / "avatar.obj")
+        primitives = gltf["meshes"][0]["primitives"]
+        assert [p["extras"]["name"] for p in primitives] == [g["name"] for g in mesh.groups]
+        assert "Handle1" in gltf["meshes"][0]["extras"]["groups"]
+
+        positions = _accessor_array(gltf, binary, primitives[0]["attributes"]["POSITION"], "<f4", 3)
+        assert np.array_equal(positions, mesh.positions)
+
+        total = 0
+        for primitive, group in zip(primitives, mesh.groups):
+            indices = _accessor_array(gltf, binary, primitive["indices"], "<u4", 1).ravel()
+            assert np.array_equal(indices, mesh.group_indices(group))
+            assert indices.max() < len(positions)
+            total += len(indices)
+        assert total == mesh.triangle_count * 3
+
+        materials = {m["name"]: m for m in gltf["materials"]}
+        assert set(materials) == {"Player1Mtl", "Player2Mtl", "Handle1Mtl"}
+        assert materials["Player1Mtl"]["pbrMetallicRoughness"]["baseColorFactor"][:3] == [0.917647, 0.721569, 0.572549]
+        # texture_003.png는 없으므로 Player1Mtl만 텍스처 없음
+        assert "baseColorTexture" not in materials["Player1Mtl"]["pbrMetallicRoughness"]
+        assert len(gltf["images"]) == 2 and all("bufferView" in image for image in gltf["images"])
+        print(f"✅ GLB 내보내기 확인 ({len(primitives)}개 primitive, {glb_path.stat().st_size:,} bytes)")
+
+def test_bulk_reference_textures():
+    """일괄 변환 + 텍스처 참조 모드 + 최신 GLB 건너뛰기"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for sample in ("builderman_156_3D", "Roblox_1_3D"):
+            shutil.copytree(Path("real_3d_avatars") / sample, Path(tmp) / sample)
+
+        exporter = GLBExporter(embed_textures=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = exporter.export_all(Path(tmp))
+            second = exporter.export_all(Path(tmp))
+
+        assert len(first["converted"]) == 2 and not first["failed"]
+        assert len(second["skipped"]) == 2
+        gltf, _ = read_glb(Path(tmp) / "builderman_156_3D" / "avatar.glb")
+        assert {image["uri"] for image in gltf["images"]} == {"textures/texture_001.png", "textures/texture_002.png"}
+        print("✅ 일괄 변환 / 텍스처 참조 확인")
+
+if __name__ == "__main__":
+    test_export_builderman()
+    test_bulk_reference_textures()
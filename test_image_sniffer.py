@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+매직 바이트 이미지 형식 판별 / 텍스처 확장자 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import json
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+
+from image_sniffer import ImageSniffer, sniff_image_file, sniff_image_header
+from mock_roblox_server import MockRobloxServer
+from real_3d_downloader import RobloxAvatar3DDownloader
+
+TEXTURES = Path("real_3d_avatars/builderman_156_3D/textures")
+
+def make_jpeg(width: int, height: int, exif_bytes: int = 0) -> bytes:
+    """SOF0 앞에 APP0 / APP1 세그먼트가 있는 최소 JPEG 헤더 + 채움 데이터"""
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    app1 = b"\xff\xe1" + struct.pack(">H", exif_bytes + 2) + b"\x00" * exif_bytes if exif_bytes else b""
+    sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 17, 8, height, width, 3) + b"\x01\x22\x00\x02\x11\x01\x03\x11\x01"
+    return b"\xff\xd8" + app0 + app1 + sof0 + b"\xff\xda" + b"\x00" * 4096 + b"\xff\xd9"
+
+def test_sniff_formats():
+    """PNG/JPEG/GIF/BMP/WebP 형식과 크기, 청크 단위 입력, 자리표시 이미지 표시"""
+    samples = {
+        "jpeg": (make_jpeg(640, 480, exif_bytes=20000), (640, 480)),
+        "gif": (b"GIF89a" + struct.pack("<HH", 300, 200) + b"\x00" * 2000, (300, 200)),
+        "bmp": (b"BM" + b"\x00" * 16 + struct.pack("<ii", 128, -64) + b"\x00" * 2000, (128, 64)),
+        "webp": (b"RIFF\x00\x00\x00\x00WEBPVP8X" + b"\x00" * 8 + (511).to_bytes(3, "little")
+                 + (255).to_bytes(3, "little") + b"\x00" * 2000, (512, 256)),
+    }
+    for image_format, (data, (width, height)) in samples.items():
+        info = sniff_image_header(data)
+        assert (info["format"], info["width"], info["height"]) == (image_format, width, height), info
+        assert not info["placeholder"]
+
+        # 다운로드 청크가 헤더 중간에서 잘려도 같은 결과
+        sniffer = ImageSniffer()
+        for start in range(0, len(data), 7):
+            sniffer.feed(data[start:start + 7])
+        assert sniffer.result() == info
+
+    tiny = sniff_image_file(TEXTURES / "texture_001.png")
+    assert (tiny["format"], tiny["width"], tiny["height"], tiny["bytes"]) == ("png", 16, 16, 106)
+    assert tiny["placeholder"] and set(tiny["flags"]) == {"tiny_file", "tiny_dimensions"}
+    full = sniff_image_file(TEXTURES / "texture_002.png")
+    assert (full["width"], full["height"], full["placeholder"]) == (1024, 1024, False)
+
+    unknown = sniff_image_header(b"<html>not an image</html>")
+    assert unknown["format"] is None and unknown["extension"] is None and "unknown_format" in unknown["flags"]
+    truncated = sniff_image_header(make_jpeg(64, 64, exif_bytes=20000)[:1000])
+    assert truncated["format"] == "jpeg" and truncated["width"] is None and "no_dimensions" in truncated["flags"]
+    print("✅ 이미지 형식 / 크기 판별")
+
+def test_texture_extensions_in_download():
+    """JPEG 텍스처는 .jpg로 저장되고 metadata.json에 형식 / 크기 / 자리표시 여부 기록"""
+    jpeg = make_jpeg(512, 512, exif_bytes=100)
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = Path(tmp) / "fixture"
+        shutil.copytree("real_3d_avatars/builderman_156_3D", fixture,
+                        ignore=shutil.ignore_patterns("*.meshcache", "*.objindex", "lods", "*.glb"))
+        # CDN이 PNG 이름 그대로 JPEG 내용을 주는 상황
+        (fixture / "textures" / "texture_002.png").write_bytes(jpeg)
+
+        output = Path(tmp) / "output"
+        stale = output / "builderman_156_3D" / "textures" / "texture_001.jpg"
+        stale.parent.mkdir(parents=True)
+        stale.write_bytes(jpeg)
+
+        with MockRobloxServer([str(fixture)]) as server, contextlib.redirect_stdout(io.StringIO()):
+            downloader = RobloxAvatar3DDownloader(str(output))
+            server.install(downloader.session)
+            assert downloader.download_avatar_3d_complete(156, include_textures=True)
+
+        user_folder = output / "builderman_156_3D"
+        assert sorted(p.name for p in (user_folder / "textures").iterdir()) == ["texture_001.png", "texture_002.jpg"]
+        assert (user_folder / "textures" / "texture_002.jpg").read_bytes() == jpeg
+
+        metadata = json.loads((user_folder / "metadata.json").read_text(encoding="utf-8"))
+        texture_files = metadata["extended_avatar_info"]["texture_files"]
+        assert [(t["file"], t["format"], t["width"], t["height"], t["placeholder"]) for t in texture_files] == [
+            ("textures/texture_001.png", "png", 16, 16, True),
+            ("textures/texture_002.jpg", "jpeg", 512, 512, False),
+        ]
+        assert texture_files[1]["bytes"] == len(jpeg)
+        assert texture_files[0]["hash"] == metadata["avatar_3d_metadata"]["textures"][0]
+    print("✅ 텍스처 확장자 / 메타데이터 기록")
+
+if __name__ == "__main__":
+    test_sniff_formats()
+    test_texture_extensions_in_download()
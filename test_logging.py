@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+로깅 설정 테스트 (JSON Lines / 레벨 제어)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from avatar_logging import configure_logging
+from mock_roblox_server import MockRobloxServer
+from real_3d_downloader import RobloxAvatar3DDownloader
+
+def test_json_lines_output():
+    """JSON 포맷에서 각 줄이 hash/url 필드를 가진 JSON 객체인지 확인"""
+    stream = io.StringIO()
+    configure_logging(fmt="json", level="DEBUG", stream=stream)
+    try:
+        with MockRobloxServer() as server, tempfile.TemporaryDirectory() as output:
+            downloader = RobloxAvatar3DDownloader(output)
+            server.install(downloader.session)
+            downloader.download_file_from_hash("30DAY-8ef1bba9d13b79b6bacd058754347c72",
+                                               Path(output) / "avatar.obj", "OBJ 모델")
+    finally:
+        configure_logging()
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert entries
+    success = [e for e in entries if e["level"] == "INFO"]
+    assert success and success[-1]["hash"] == "30DAY-8ef1bba9d13b79b6bacd058754347c72"
+    assert "rbxcdn.com" in success[-1]["url"]
+    print(f"✅ JSON Lines 출력 확인 ({len(entries)}줄)")
+
+def test_warning_level_is_quiet():
+    """WARNING 레벨에서는 정상 다운로드가 아무것도 출력하지 않는지 확인"""
+    stream = io.StringIO()
+    configure_logging(fmt="console", level="WARNING", stream=stream)
+    try:
+        with MockRobloxServer() as server, tempfile.TemporaryDirectory() as output:
+            downloader = RobloxAvatar3DDownloader(output)
+            server.install(downloader.session)
+            assert downloader.download_file_from_hash("30DAY-8ef1bba9d13b79b6bacd058754347c72",
+                                                      Path(output) / "avatar.obj", "OBJ 모델")
+    finally:
+        configure_logging()
+
+    assert stream.getvalue() == ""
+    print("✅ WARNING 레벨 무출력 확인")
+
+if __name__ == "__main__":
+    test_json_lines_output()
+    test_warning_level_is_quiet()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+바이너리 메시 캐시 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from avatar_logging import configure_logging
+from avatar_mesh import load_obj, weld_mesh
+from mesh_cache import build_mesh_cache, cache_path_for, cached_obj_stats, fresh_cache_header, load_avatar_mesh
+from obj_scanner import scan_obj_stats
+from obj_attachment_parser import OBJAttachmentParser
+from real_3d_downloader import RobloxAvatar3DDownloader
+
+SAMPLE = Path("real_3d_avatars/builderman_156_3D")
+
+def test_cache_roundtrip():
+    """캐시 로드 결과가 OBJ 파싱+용접 결과와 같고 mmap 위의 읽기 전용 뷰인지 확인"""
+    with tempfile.TemporaryDirectory() as tmp:
+        obj_file = Path(tmp) / "avatar.obj"
+        shutil.copy(SAMPLE / "avatar.obj", obj_file)
+
+        parsed, report = weld_mesh(load_obj(obj_file))
+        assert build_mesh_cache(obj_file) == cache_path_for(obj_file)
+        cached = load_avatar_mesh(obj_file)
+
+        for name in ("positions", "normals", "uvs", "indices"):
+            assert np.array_equal(getattr(cached, name), getattr(parsed, name))
+            assert not getattr(cached, name).flags.writeable
+        assert cached.groups == parsed.groups
+        assert fresh_cache_header(obj_file)["compaction"] == report
+        print(f"✅ 캐시 왕복 확인 ({cache_path_for(obj_file).stat().st_size:,} bytes)")
+
+def test_stale_cache_is_ignored():
+    """OBJ가 바뀌면 캐시를 무시하고 다시 생성"""
+    with tempfile.TemporaryDirectory() as tmp:
+        obj_file = Path(tmp) / "avatar.obj"
+        shutil.copy(SAMPLE / "avatar.obj", obj_file)
+        build_mesh_cache(obj_file)
+        assert fresh_cache_header(obj_file) is not None
+
+        with open(obj_file, 'a', encoding='utf-8') as f:
+            f.write("g Extra\nv 0 0 0\nv 1 0 0\nv 0 1 0\nf -3 -2 -1\n")
+        stat = cache_path_for(obj_file).stat()
+        os.utime(obj_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert fresh_cache_header(obj_file) is None
+
+        mesh = load_avatar_mesh(obj_file)
+        assert mesh.groups[-1]["name"] == "Extra"
+        assert fresh_cache_header(obj_file) is not None
+        print("✅ 오래된 캐시 무시 확인")
+
+def test_analyzers_use_cache():
+    """구조 분석/Attachment 분석이 캐시를 사용해도 결과가 같은지 확인"""
+    configure_logging(level="WARNING")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            obj_file = Path(tmp) / "avatar.obj"
+            shutil.copy(SAMPLE / "avatar.obj", obj_file)
+            downloader = RobloxAvatar3DDownloader(str(Path(tmp) / "downloads"))
+            parser = OBJAttachmentParser()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                text_structure = downloader.analyze_obj_structure(obj_file)
+                text_attachments = parser.parse_obj_file(obj_file)
+                build_mesh_cache(obj_file)
+                cached_structure = downloader.analyze_obj_structure(obj_file)
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    cached_attachments = parser.parse_obj_file(obj_file)
+
+            assert "메시 캐시 사용" in output.getvalue()
+            for result in (text_structure, cached_structure, text_attachments, cached_attachments):
+                result.pop("analyzed_at", None)
+                result.pop("parsed_at", None)
+            assert cached_structure == text_structure
+            assert cached_attachments == text_attachments
+            print("✅ 캐시 기반 분석 결과 일치")
+    finally:
+        configure_logging()
+
+# 탭 구분 줄, 좌표가 모자란 v 줄 - 텍스트 split() 규칙과 startswith('v ') 규칙이 갈리는 형태
+EDGE_CASE_OBJS = {
+    "tab_separated.obj": "v 0 0 0\nv\t0 1 0\nv 1 0 0\nvt 0 0\nvt\t1 0\nvn 0 0 1\n"
+                         "g\tTabGroup\ng Player1\nusemtl Mat\nf 1/1/1 2/1/1 3/2/1\nf\t1 2 3\n",
+    "short_v.obj": "v 0 0 0\nv\nv 1 0 0 1.0\nv 0 1 0\nvt 0.5\n# short\ng Player1\nf 1/1 2/1 3/1\n",
+}
+
+def test_cached_stats_match_scanner():
+    """캐시 헤더의 라인 통계 = 캐시 없이 스캔한 통계 (샘플 아바타 + 예외 형태 줄)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = sorted(Path("real_3d_avatars").glob("*/avatar.obj")) + sorted(Path("test_3d").glob("*/avatar.obj"))
+        checked = []
+        for i, source in enumerate(sources):
+            obj_file = Path(tmp) / f"sample_{i}" / "avatar.obj"
+            obj_file.parent.mkdir()
+            shutil.copy(source, obj_file)
+            checked.append(obj_file)
+        for name, text in EDGE_CASE_OBJS.items():
+            obj_file = Path(tmp) / name.replace(".obj", "") / "avatar.obj"
+            obj_file.parent.mkdir()
+            obj_file.write_text(text, encoding="utf-8")
+            checked.append(obj_file)
+
+        for obj_file in checked:
+            uncached = scan_obj_stats(obj_file)
+            assert build_mesh_cache(obj_file) is not None, obj_file
+            assert cached_obj_stats(obj_file) == uncached, obj_file
+            with contextlib.redirect_stdout(io.StringIO()):
+                with_cache = OBJAttachmentParser().parse_obj_file(obj_file)
+                cache_path_for(obj_file).unlink()
+                without_cache = OBJAttachmentParser().parse_obj_file(obj_file)
+            for result in (with_cache, without_cache):
+                result.pop("parsed_at", None)
+            assert with_cache == without_cache, obj_file
+
+        assert scan_obj_stats(checked[-2])["vertices"] == 2
+        assert scan_obj_stats(checked[-1])["vertices"] == 3
+    print(f"✅ 캐시/스캔 라인 통계 일치 ({len(checked)}개 OBJ)")
+
+if __name__ == "__main__":
+    test_cache_roundtrip()
+    test_stale_cache_is_ignored()
+    test_analyzers_use_cache()
+    test_cached_stats_match_scanner()
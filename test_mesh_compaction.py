@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+정점 용접(메시 압축) 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pathlib import Path
+
+import numpy as np
+
+from avatar_mesh import AvatarMesh, load_obj, weld_mesh
+
+SAMPLES = [Path("real_3d_avatars/builderman_156_3D/avatar.obj"), Path("real_3d_avatars/Roblox_1_3D/avatar.obj")]
+
+def test_weld_preserves_geometry():
+    """용접 후에도 모든 삼각형 모서리의 위치/법선/UV가 그대로인지 확인"""
+    for obj_file in SAMPLES:
+        mesh = load_obj(obj_file)
+        welded, report = weld_mesh(mesh)
+
+        assert report["vertices_after"] < report["vertices_before"]
+        assert report["bytes_after"] < report["bytes_before"]
+        assert report["triangles_after"] == report["triangles_before"]
+        for name in ("positions", "normals", "uvs"):
+            assert np.array_equal(getattr(mesh, name)[mesh.indices], getattr(welded, name)[welded.indices])
+        assert [g["name"] for g in welded.groups] == [g["name"] for g in mesh.groups]
+
+        # 용접 결과에는 같은 값의 정점이 남지 않음
+        rows = np.hstack([welded.positions, welded.normals, welded.uvs])
+        assert len(np.unique(rows, axis=0)) == len(rows)
+        print(f"✅ {obj_file.parent.name}: {report['vertices_before']:,} → {report['vertices_after']:,} 정점")
+
+def test_weld_drops_degenerate_and_unused():
+    """허용 오차 용접으로 퇴화한 삼각형과 사용되지 않는 정점 제거, 그룹 구간 재계산"""
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1e-6, 0, 0], [5, 5, 5]], dtype=np.float32)
+    indices = np.array([0, 1, 2, 0, 3, 2, 1, 2, 0], dtype=np.uint32)
+    groups = [{"name": "A", "material": None, "start": 0, "count": 3},
+              {"name": "B", "material": None, "start": 3, "count": 3},
+              {"name": "C", "material": None, "start": 6, "count": 3}]
+    mesh = AvatarMesh(positions, None, None, indices, groups)
+
+    exact, _ = weld_mesh(mesh)
+    assert exact.vertex_count == 4 and exact.triangle_count == 3
+
+    welded, report = weld_mesh(mesh, tolerance=1e-4)
+    assert welded.vertex_count == 3
+    assert report["degenerate_removed"] == 1
+    assert [(g["name"], g["start"], g["count"]) for g in welded.groups] == [("A", 0, 3), ("C", 3, 3)]
+    print("✅ 퇴화 삼각형/미사용 정점 제거 확인")
+
+if __name__ == "__main__":
+    test_weld_preserves_geometry()
+    test_weld_drops_degenerate_and_unused()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+LOD 메시 생성 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from avatar_mesh import load_obj
+from mesh_cache import load_compacted_obj
+from mesh_lod import decimate_mesh, generate_lod_tree, generate_lods, read_lod_manifest
+
+SAMPLES = [Path("real_3d_avatars/builderman_156_3D"), Path("real_3d_avatars/Roblox_1_3D")]
+
+def test_decimate_preserves_groups():
+    """그룹 순서/이름/재질 유지, 단계가 낮을수록 삼각형 감소, 모든 그룹이 남아 있음"""
+    for folder in SAMPLES:
+        mesh, _ = load_compacted_obj(folder / "avatar.obj")
+        previous = mesh.triangle_count
+        for ratio in (0.5, 0.25, 0.1):
+            lod = decimate_mesh(mesh, ratio)
+            assert [(g["name"], g["material"]) for g in lod.groups] == \
+                   [(g["name"], g["material"]) for g in mesh.groups]
+            assert all(g["count"] > 0 for g in lod.groups)
+            assert lod.triangle_count < previous
+            assert lod.triangle_count <= mesh.triangle_count * ratio * 1.5
+            assert int(lod.indices.max()) < lod.vertex_count
+            previous = lod.triangle_count
+        print(f"✅ {folder.name}: {mesh.triangle_count:,} → {previous:,} 면 (LOD 0.1)")
+
+def test_lod_tree_with_process_pool():
+    """프로세스 풀 일괄 생성 → OBJ 재로드 시 그룹 유지, 두 번째 실행은 건너뜀"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for folder in SAMPLES:
+            shutil.copytree(folder, Path(tmp) / folder.name,
+                            ignore=shutil.ignore_patterns("*.meshcache", "*.glb", "lods"))
+
+        summary = generate_lod_tree(tmp, ratios=(0.5, 0.2), workers=2)
+        assert len(summary["generated"]) == len(SAMPLES) and not summary["failed"]
+
+        for folder in SAMPLES:
+            obj_file = Path(tmp) / folder.name / "avatar.obj"
+            manifest = read_lod_manifest(obj_file)
+            original = load_obj(obj_file)
+            for level in manifest["levels"]:
+                lod = load_obj(obj_file.parent / "lods" / level["file"])
+                assert lod.triangle_count == level["triangles"]
+                assert [g["name"] for g in lod.groups] == [g["name"] for g in original.groups]
+
+        again = generate_lod_tree(tmp, ratios=(0.5, 0.2), workers=2)
+        assert len(again["skipped"]) == len(SAMPLES) and not again["generated"]
+    print("✅ 프로세스 풀 LOD 일괄 생성 / 재실행 건너뜀 확인")
+
+def test_empty_mesh_is_skipped():
+    """면이 없는 OBJ(정점만 / 빈 파일)는 오류 없이 건너뛰고 LOD 파일을 만들지 않음"""
+    with tempfile.TemporaryDirectory() as tmp:
+        contents = {"vertex_only": "v 0 0 0\nv 1 0 0\nv 0 1 0\n", "blank": ""}
+        for name, text in contents.items():
+            obj_file = Path(tmp) / name / "avatar.obj"
+            obj_file.parent.mkdir()
+            obj_file.write_text(text, encoding="utf-8")
+
+        vertex_only = Path(tmp) / "vertex_only" / "avatar.obj"
+        lod = decimate_mesh(load_obj(vertex_only), 0.5)
+        assert (lod.triangle_count, lod.vertex_count) == (0, 0)
+
+        manifest = generate_lods(vertex_only)
+        assert manifest["empty"] and manifest["levels"] == []
+        assert not (vertex_only.parent / "lods").exists()
+
+        summary = generate_lod_tree(tmp, workers=1)
+        assert len(summary["empty"]) == len(contents)
+        assert not summary["failed"] and not summary["generated"]
+    print("✅ 면 없는 OBJ 건너뜀 확인")
+
+if __name__ == "__main__":
+    test_decimate_preserves_groups()
+    test_lod_tree_with_process_pool()
+    test_empty_mesh_is_skipped()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+그룹별 기하 통계 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from avatar_mesh import AvatarMesh, load_obj
+from body_part_mapping_parser import BodyPartMapper
+from mesh_stats import avatar_group_stats, compute_group_stats, merge_group_stats
+
+SAMPLES = [Path("real_3d_avatars/builderman_156_3D/avatar.obj"), Path("real_3d_avatars/Roblox_1_3D/avatar.obj")]
+
+def test_known_geometry():
+    """단위 정사각형(삼각형 2개)과 퇴화 삼각형 그룹의 통계 값 확인"""
+    positions = np.array([[0, 0, 0], [2, 0, 0], [2, 1, 0], [0, 1, 0], [5, 5, 5]], dtype=np.float32)
+    uvs = np.array([[0, 0], [1, 0], [1, 1], [0, 1], [0.5, 0.5]], dtype=np.float32)
+    indices = np.array([0, 1, 2, 0, 2, 3, 4, 4, 1], dtype=np.uint32)
+    groups = [{"name": "Quad", "material": "M", "start": 0, "count": 6},
+              {"name": "Broken", "material": None, "start": 6, "count": 3}]
+    stats = compute_group_stats(AvatarMesh(positions, None, uvs, indices, groups))
+
+    quad, broken = stats
+    assert (quad["vertices"], quad["faces"], quad["degenerate_faces"]) == (4, 2, 0)
+    assert quad["bbox_min"] == [0, 0, 0] and quad["bbox_max"] == [2, 1, 0]
+    assert quad["centroid"] == [1, 0.5, 0]
+    assert quad["surface_area"] == 2.0 and quad["uv_coverage"] == 1.0
+    assert (broken["vertices"], broken["faces"], broken["degenerate_faces"]) == (2, 1, 1)
+    assert broken["surface_area"] == 0.0
+    print("✅ 알려진 도형 통계 확인")
+
+def test_sample_avatars():
+    """샘플 아바타: 그룹 면 수 합계 = 전체 삼각형 수, 중심점은 바운딩 박스 안"""
+    for obj_file in SAMPLES:
+        mesh = load_obj(obj_file)
+        stats = compute_group_stats(mesh)
+
+        assert [s["name"] for s in stats] == [g["name"] for g in mesh.groups]
+        assert sum(s["faces"] for s in stats) == mesh.triangle_count
+        for s in stats:
+            assert all(lo <= c <= hi for lo, c, hi in zip(s["bbox_min"], s["centroid"], s["bbox_max"]))
+            assert s["surface_area"] > 0 and 0 <= s["uv_coverage"] <= 1
+
+        # 그룹 하나만 따로 계산해도 같은 값
+        first = mesh.groups[0]
+        alone = compute_group_stats(AvatarMesh(mesh.positions, mesh.normals, mesh.uvs,
+                                               mesh.group_indices(first), [dict(first, start=0)]))
+        assert alone[0] == stats[0]
+        print(f"✅ {obj_file.parent.name}: {len(stats)}개 그룹 통계 확인")
+
+# 같은 인덱스가 반복된 면, 한 직선 위의 면, 전부 퇴화한 그룹 - 용접하면 사라지는 면들
+DEGENERATE_OBJ = """v 0 0 0
+v 1 0 0
+v 0 1 0
+v 2 0 0
+g Body
+f 1 2 3
+f 1 1 2
+f 1 2 4
+g BrokenAccessory
+f 3 3 3
+f 2 2 3
+"""
+
+def test_avatar_group_stats_keeps_degenerate_faces():
+    """avatar_group_stats는 OBJ 원본 기준: 퇴화 삼각형도 면 수/퇴화 수에 포함, 캐시 파일을 만들지 않음"""
+    with tempfile.TemporaryDirectory() as tmp:
+        obj_file = Path(tmp) / "avatar.obj"
+        obj_file.write_text(DEGENERATE_OBJ, encoding="utf-8")
+        stats = avatar_group_stats(obj_file)
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["avatar.obj"]
+
+    body, broken = stats
+    assert (body["name"], body["faces"], body["degenerate_faces"]) == ("Body", 3, 2)
+    assert (broken["name"], broken["faces"], broken["degenerate_faces"]) == ("BrokenAccessory", 2, 2)
+    assert broken["surface_area"] == 0.0
+    print("✅ 퇴화 삼각형 포함 통계 확인")
+
+# 한 그룹 아래 재질 구간 두 개 + 같은 g 이름 반복
+REPEATED_GROUP_OBJ = """v 0 0 0
+v 1 0 0
+v 0 1 0
+v 4 0 0
+v 4 2 0
+g Body
+usemtl A
+f 1 2 3
+usemtl B
+f 2 4 5
+g Hat
+f 1 3 5
+g Body
+usemtl A
+f 1 1 2
+"""
+
+def test_repeated_group_names_are_merged():
+    """같은 이름의 구간 통계는 버리지 않고 합산 (load_group_stats 포함)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        obj_file = Path(tmp) / "3D_Model" / "avatar.obj"
+        obj_file.parent.mkdir()
+        obj_file.write_text(REPEATED_GROUP_OBJ, encoding="utf-8")
+        sections = avatar_group_stats(obj_file)
+        loaded = BodyPartMapper().load_group_stats(Path(tmp), compute_missing=True)
+
+    assert [s["name"] for s in sections] == ["Body", "Body", "Hat", "Body"]
+    merged = merge_group_stats(sections)
+    assert loaded == merged and list(merged) == ["Body", "Hat"]
+
+    body = merged["Body"]
+    assert (body["faces"], body["degenerate_faces"], body["material"]) == (3, 1, "A, B")
+    assert body["bbox_min"] == [0, 0, 0] and body["bbox_max"] == [4, 2, 0] and body["size"] == [4, 2, 0]
+    assert body["surface_area"] == 0.5 + 3.0
+    assert merged["Hat"] == sections[2]
+    print("✅ 반복된 그룹 이름 통계 합산 확인")
+
+if __name__ == "__main__":
+    test_known_geometry()
+    test_sample_avatars()
+    test_avatar_group_stats_keeps_degenerate_faces()
+    test_repeated_group_names_are_merged()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Mock 서버 기반 오프라인 다운로더 테스트
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import tempfile
+from pathlib import Path
+
+from mock_roblox_server import MockRobloxServer, cdn_shard
+from real_3d_downloader import RobloxAvatar3DDownloader
+
+def test_3d_download_offline():
+    """녹화된 builderman 픽스처로 3D 다운로드"""
+    with MockRobloxServer() as server, tempfile.TemporaryDirectory() as output:
+        downloader = RobloxAvatar3DDownloader(output)
+        server.install(downloader.session)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            success = downloader.download_avatar_3d_complete(156, include_textures=True)
+
+        assert success
+        user_folder = Path(output) / "builderman_156_3D"
+        assert (user_folder / "avatar.obj").read_bytes() == Path("real_3d_avatars/builderman_156_3D/avatar.obj").read_bytes()
+        assert (user_folder / "avatar.mtl").exists()
+        assert (user_folder / "metadata.json").exists()
+        print("✅ 오프라인 3D 다운로드 성공")
+
+def test_shard_fallback():
+    """기본 CDN 샤드 장애 시 대체 서버들을 순서대로 시도하는지 확인"""
+    fixture_hash = "30DAY-8ef1bba9d13b79b6bacd058754347c72"
+    with MockRobloxServer(failing_shards=[cdn_shard(fixture_hash)]) as server, tempfile.TemporaryDirectory() as output:
+        downloader = RobloxAvatar3DDownloader(output)
+        server.install(downloader.session)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            success = downloader.download_file_from_hash(fixture_hash, Path(output) / "avatar.obj", "OBJ 모델")
+
+        assert not success
+        statuses = [status for _, path, status in server.request_log if fixture_hash in path]
+        assert statuses[0] == 503 and 404 in statuses
+        print(f"✅ 샤드 장애 처리 확인 ({len(statuses)}개 서버 시도)")
+
+if __name__ == "__main__":
+    test_3d_download_offline()
+    test_shard_fallback()
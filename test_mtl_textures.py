@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+MTL 텍스처 해시 → 로컬 경로 변환 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from avatar_mesh import load_mtl, resolve_texture_path
+from mock_roblox_server import MockRobloxServer
+from mtl_textures import TEXTURE_MAP_NAME, MtlTextureRewriter, load_texture_map, localize_mtl
+from real_3d_downloader import RobloxAvatar3DDownloader
+
+SAMPLE = Path("real_3d_avatars/builderman_156_3D")
+HASHES = json.loads((SAMPLE / "metadata.json").read_text(encoding="utf-8"))["avatar_3d_metadata"]["textures"]
+
+def copy_sample(target: Path) -> Path:
+    shutil.copytree(SAMPLE, target, ignore=shutil.ignore_patterns("*.meshcache", "*.objindex", "lods", "*.glb"))
+    return target
+
+def test_stream_rewrite():
+    """청크 크기와 무관하게 같은 결과, 옵션/줄 끝 유지, 맵에 없는 해시는 그대로"""
+    texture_map = {HASHES[0]: "textures/texture_001.png", HASHES[1]: "textures/texture_002.jpg"}
+    source = (SAMPLE / "avatar.mtl").read_bytes() + f"\r\n  map_Kd -s 1 1 1 {HASHES[0]}\r\nmap_Ks".encode()
+
+    outputs = []
+    for chunk_size in (1, 7, 64, 1 << 20):
+        rewriter = MtlTextureRewriter(texture_map)
+        parts = [rewriter.feed(source[i:i + chunk_size]) for i in range(0, len(source), chunk_size)]
+        outputs.append((b"".join(parts) + rewriter.finish(), rewriter.rewritten))
+    assert len(set(outputs)) == 1
+    output, rewritten = outputs[0]
+
+    text = output.decode()
+    assert rewritten == 7
+    assert text.count("textures/texture_001.png") == 4 and text.count("textures/texture_002.jpg") == 3
+    assert HASHES[0] not in text and HASHES[1] not in text and text.count(HASHES[2]) == 3
+    assert "\r\n  map_Kd -s 1 1 1 textures/texture_001.png\r\nmap_Ks" in text
+    assert text.count("\n") == source.decode().count("\n")
+    print("✅ MTL 스트림 변환")
+
+def test_download_writes_local_mtl():
+    """다운로드한 MTL은 로컬 경로를 참조하고, texture_map.json으로 바로 텍스처를 찾음"""
+    with MockRobloxServer() as server, tempfile.TemporaryDirectory() as output:
+        downloader = RobloxAvatar3DDownloader(output)
+        server.install(downloader.session)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert downloader.download_avatar_3d_complete(156, include_textures=True)
+
+        user_folder = Path(output) / "builderman_156_3D"
+        texture_map = load_texture_map(user_folder)
+        assert texture_map == {HASHES[0]: "textures/texture_001.png", HASHES[1]: "textures/texture_002.png"}
+
+        materials = load_mtl(user_folder / "avatar.mtl")
+        assert materials["Handle1Mtl"]["map_Kd"] == "textures/texture_001.png"
+        assert materials["Player2Mtl"]["map_Kd"] == "textures/texture_002.png"
+        # 받지 못한 텍스처는 해시 그대로
+        assert materials["Player1Mtl"]["map_Kd"] == HASHES[2]
+        for props in materials.values():
+            path = resolve_texture_path(props["map_Kd"], user_folder, texture_map=texture_map)
+            assert path is None or path.parent.name == "textures"
+        assert resolve_texture_path(HASHES[1], user_folder, texture_map=texture_map) == \
+            user_folder / "textures" / "texture_002.png"
+    print("✅ 다운로드 MTL 로컬 경로 / texture_map.json")
+
+def test_localize_existing_folder():
+    """이미 받은 폴더 변환 - 하드링크된 패키지 MTL은 그대로, 두 번째 실행은 변경 없음"""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = copy_sample(Path(tmp) / "builderman_156_3D")
+        linked = Path(tmp) / "package_avatar.mtl"
+        os.link(folder / "avatar.mtl", linked)
+        original = linked.read_bytes()
+
+        assert localize_mtl(folder) == 6
+        assert (folder / TEXTURE_MAP_NAME).exists()
+        assert linked.read_bytes() == original
+        assert load_mtl(folder / "avatar.mtl")["Handle1Mtl"]["map_d"] == "textures/texture_001.png"
+        assert localize_mtl(folder) == 0
+        assert not list(folder.glob(".*.tmp"))
+
+        shutil.rmtree(folder / "textures")
+        assert localize_mtl(folder) is None
+    print("✅ 기존 폴더 MTL 변환")
+
+if __name__ == "__main__":
+    test_stream_rewrite()
+    test_download_writes_local_mtl()
+    test_localize_existing_folder()
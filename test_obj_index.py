@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+OBJ 그룹 바이트 오프셋 인덱스 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from avatar_mesh import load_obj
+from obj_index import (build_obj_index, ensure_obj_index, extract_group, index_path_for, load_obj_index,
+                       read_elements, read_group_section)
+
+SAMPLES = [Path("real_3d_avatars/builderman_156_3D/avatar.obj"), Path("real_3d_avatars/Roblox_1_3D/avatar.obj")]
+
+def test_index_offsets_match_file():
+    """구간 바이트가 g 라인으로 시작하고, 체크포인트로 읽은 정점이 원문 줄과 같은지 확인"""
+    for obj_file in SAMPLES:
+        index = build_obj_index(obj_file)
+        data = obj_file.read_bytes()
+        lines = [line.split(None, 1) for line in data.splitlines()]
+        vertices = [parts[1].strip() for parts in lines if parts and parts[0] == b"v"]
+
+        assert index["counts"]["v"] == len(vertices)
+        assert sum(s["length"] for s in index["sections"]) == len(data) - index["sections"][0]["offset"]
+        for section in index["sections"]:
+            chunk = read_group_section(obj_file, section["name"], index)
+            assert chunk.startswith(b"g " + section["name"].encode())
+
+        wanted = [0, 63, 64, 65, len(vertices) // 2, len(vertices) - 1]
+        assert read_elements(obj_file, "v", wanted, index) == {i: vertices[i] for i in wanted}
+        print(f"✅ {obj_file.parent.name}: {len(index['sections'])}개 구간 오프셋 확인")
+
+def test_extract_group_matches_full_parse():
+    """추출한 그룹 OBJ의 삼각형 모서리 값이 전체 파싱 결과의 같은 그룹과 일치"""
+    for obj_file in SAMPLES:
+        full = load_obj(obj_file)
+        index = build_obj_index(obj_file)
+        with tempfile.TemporaryDirectory() as tmp:
+            for group in (full.groups[0], full.groups[-1]):
+                part = load_obj(extract_group(obj_file, group["name"], Path(tmp) / "part.obj", index))
+                corners = full.group_indices(group)
+                assert [g["name"] for g in part.groups] == [group["name"]]
+                for name in ("positions", "normals", "uvs"):
+                    assert np.array_equal(getattr(full, name)[corners], getattr(part, name)[part.indices])
+        print(f"✅ {obj_file.parent.name}: 그룹 추출 결과 일치")
+
+def test_index_freshness():
+    """OBJ가 바뀌면 저장된 인덱스를 무시하고 다시 생성"""
+    with tempfile.TemporaryDirectory() as tmp:
+        obj_file = Path(tmp) / "avatar.obj"
+        shutil.copy2(SAMPLES[0], obj_file)
+        ensure_obj_index(obj_file)
+        assert index_path_for(obj_file).exists() and load_obj_index(obj_file) is not None
+
+        with open(obj_file, 'a', encoding='utf-8') as f:
+            f.write("g Extra\nv 0 0 0\nv 1 0 0\nv 0 1 0\nf -3 -2 -1\n")
+        assert load_obj_index(obj_file) is None
+        index = ensure_obj_index(obj_file)
+        assert index["sections"][-1]["name"] == "Extra"
+
+        extra = load_obj(extract_group(obj_file, "Extra", Path(tmp) / "extra.obj", index))
+        assert extra.triangle_count == 1 and extra.vertex_count == 3
+    print("✅ 인덱스 갱신 / 음수 인덱스 추출 확인")
+
+if __name__ == "__main__":
+    test_index_offsets_match_file()
+    test_extract_group_matches_full_parse()
+    test_index_freshness()
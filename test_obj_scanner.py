@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+바이트 단위 OBJ 스캐너 테스트 (네트워크 없음)
+기존 텍스트 루프(analyze_obj_structure / parse_obj_file)와 결과가 같은지 비교
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+from obj_attachment_parser import OBJAttachmentParser
+from obj_scanner import new_obj_stats, scan_obj_stats
+from real_3d_downloader import RobloxAvatar3DDownloader
+
+SAMPLES = [Path("real_3d_avatars/builderman_156_3D/avatar.obj"), Path("real_3d_avatars/Roblox_1_3D/avatar.obj")]
+
+# 앞 공백, 탭, 빈 키워드 줄, CRLF, 유니코드 공백, BOM 등 예외 형태를 섞은 OBJ
+TRICKY_OBJ = (
+    "﻿v 9 9 9\n"
+    "# Attachment RightGrip\r\n"
+    "mtllib avatar.mtl\n"
+    "v 0 0 0\r\n"
+    "  v 1 0 0\n"
+    "v\t2 0 0\n"
+    "v \n"
+    "v  \n"
+    "vt 0.5 0.5\n"
+    "vn 0 1 0\n"
+    "\n"
+    "   \n"
+    "g Player1\n"
+    "g\n"
+    "usemtl Player1Mtl\n"
+    "usemtl Player1Mtl\n"
+    "f 1/1/1 2/1/1 3/1/1\n"
+    "f\n"
+    "  f 1 2 3\n"
+    "o HatAttachment　\n"
+    "# bone neck\n"
+    "g Handle1 "
+)
+
+def reference_structure(obj_path):
+    """기존 _scan_obj_structure 루프 (분류 제외)"""
+    structure = {"groups": [], "objects": [], "materials": [], "vertices": 0, "faces": 0,
+                 "normals": 0, "texture_coords": 0}
+    with open(obj_path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('v '):
+                structure["vertices"] += 1
+            elif line.startswith('vn '):
+                structure["normals"] += 1
+            elif line.startswith('vt '):
+                structure["texture_coords"] += 1
+            elif line.startswith('f '):
+                structure["faces"] += 1
+            elif line.startswith('g '):
+                structure["groups"].append({"name": line[2:].strip(), "line": line_num})
+            elif line.startswith('o '):
+                structure["objects"].append({"name": line[2:].strip(), "line": line_num})
+            elif line.startswith('usemtl '):
+                material = line[7:].strip()
+                if material not in structure["materials"]:
+                    structure["materials"].append(material)
+    return structure
+
+def reference_attachment_data(parser, obj_path):
+    """기존 _scan_obj_lines 루프"""
+    data = {"attachments": [], "bones": [], "objects": [], "groups": [], "comments": [],
+            "vertices": 0, "faces": 0, "materials": []}
+    with open(obj_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('v '):
+            data["vertices"] += 1
+        elif line.startswith('f '):
+            data["faces"] += 1
+        elif line.startswith('o '):
+            parser._record_named(data, "object", line_num, line[2:].strip(), line)
+        elif line.startswith('g '):
+            parser._record_named(data, "group", line_num, line[2:].strip(), line)
+        elif line.startswith('#'):
+            parser._record_comment(data, line_num, line)
+        elif line.startswith('mtllib '):
+            data["materials"].append(line[7:].strip())
+    return data
+
+def check_equivalent(obj_path, buffer_size=1 << 20):
+    stats = scan_obj_stats(obj_path, buffer_size)
+    # mmap 창 경로(작은 창 포함)와 read 버퍼 경로가 같은 결과
+    assert scan_obj_stats(obj_path, buffer_size, use_mmap=False) == stats
+    assert scan_obj_stats(obj_path, buffer_size, window_size=1) == stats
+    expected = reference_structure(obj_path)
+    for key in ("vertices", "faces", "normals", "texture_coords", "materials"):
+        assert stats[key] == expected[key], (key, stats[key], expected[key])
+    assert [{"name": g["name"], "line": g["line"]} for g in stats["groups"]] == expected["groups"]
+    assert [{"name": o["name"], "line": o["line"]} for o in stats["objects"]] == expected["objects"]
+
+    parser = OBJAttachmentParser()
+    data = {"attachments": [], "bones": [], "objects": [], "groups": [], "comments": [],
+            "vertices": 0, "faces": 0, "materials": []}
+    parser._apply_obj_stats(data, stats)
+    assert data == reference_attachment_data(parser, obj_path)
+
+def test_samples_match_text_loops():
+    """샘플 OBJ: 작은 버퍼(줄 경계 처리 포함)와 기본 버퍼 모두 기존 결과와 동일"""
+    for obj_file in SAMPLES:
+        check_equivalent(obj_file)
+        check_equivalent(obj_file, buffer_size=4096)
+    print("✅ 샘플 OBJ 스캔 결과 일치")
+
+def test_tricky_lines_match_text_loops():
+    """예외 형태 줄과 단독 \\r 개행 파일도 기존 결과와 동일"""
+    with tempfile.TemporaryDirectory() as tmp:
+        obj_file = Path(tmp) / "tricky.obj"
+        obj_file.write_bytes(TRICKY_OBJ.encode("utf-8"))
+        for buffer_size in (7, 64, 1 << 20):
+            check_equivalent(obj_file, buffer_size)
+
+        stats = scan_obj_stats(obj_file)
+        assert stats["vertices"] == 2 and stats["faces"] == 2
+        assert [g["name"] for g in stats["groups"]] == ["Player1", "Handle1"]
+
+        mac_file = Path(tmp) / "mac.obj"
+        mac_file.write_bytes(b"v 0 0 0\rv 1 0 0\rg Part\rf 1 2 2\r")
+        check_equivalent(mac_file)
+        assert scan_obj_stats(mac_file)["groups"][0]["line"] == 3
+    print("✅ 예외 형태 줄 스캔 결과 일치")
+
+def test_analyzers_use_scanner():
+    """캐시 없는 OBJ에서 analyze_obj_structure / parse_obj_file 결과가 기존 루프와 동일"""
+    with tempfile.TemporaryDirectory() as tmp:
+        obj_file = Path(tmp) / "avatar.obj"
+        obj_file.write_bytes(SAMPLES[0].read_bytes())
+        downloader = RobloxAvatar3DDownloader(str(Path(tmp) / "out"))
+        parser = OBJAttachmentParser()
+        with contextlib.redirect_stdout(io.StringIO()):
+            structure = downloader.analyze_obj_structure(obj_file)
+            data = parser.parse_obj_file(obj_file)
+
+        expected = reference_structure(obj_file)
+        assert structure["vertices"] == expected["vertices"] and structure["faces"] == expected["faces"]
+        assert [g["name"] for g in structure["groups"]] == [g["name"] for g in expected["groups"]]
+        reference = reference_attachment_data(parser, obj_file)
+        assert {k: data[k] for k in reference} == reference
+        assert scan_obj_stats(obj_file).keys() == new_obj_stats().keys()
+    print("✅ 분석기 결과 일치")
+
+# 별도 프로세스에서 스캔 전후 최대 RSS(VmHWM) 증가량 측정
+_RSS_PROBE = r"""
+import json, sys
+sys.path.insert(0, sys.argv[1])
+from obj_scanner import scan_obj_stats
+
+def peak_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+
+before = peak_kb()
+stats = scan_obj_stats(sys.argv[2], window_size=4 << 20)
+print(json.dumps({"growth_kb": peak_kb() - before, "vertices": stats["vertices"]}))
+"""
+
+def test_mmap_rss_is_bounded():
+    """OBJ 크기보다 훨씬 작은 RSS 증가로 스캔 (Linux /proc 필요)"""
+    if not os.path.exists("/proc/self/status"):
+        print("⏭️ /proc 없음 - RSS 테스트 건너뜀")
+        return
+
+    sample = SAMPLES[1].read_bytes()
+    copies = (48 << 20) // len(sample) + 1
+    with tempfile.TemporaryDirectory() as tmp:
+        big_file = Path(tmp) / "merged.obj"
+        with open(big_file, 'wb') as f:
+            for _ in range(copies):
+                f.write(sample)
+
+        result = subprocess.run([sys.executable, "-c", _RSS_PROBE, os.path.dirname(os.path.abspath(__file__)),
+                                 str(big_file)], capture_output=True, text=True, check=True)
+        probe = json.loads(result.stdout)
+        size_kb = big_file.stat().st_size // 1024
+
+    assert probe["vertices"] == scan_obj_stats(SAMPLES[1])["vertices"] * copies
+    assert probe["growth_kb"] < size_kb // 3, probe
+    print(f"✅ {size_kb // 1024}MB OBJ 스캔 RSS 증가 {probe['growth_kb'] // 1024}MB")
+
+if __name__ == "__main__":
+    test_samples_match_text_loops()
+    test_tricky_lines_match_text_loops()
+    test_analyzers_use_scanner()
+    test_mmap_rss_is_bounded()
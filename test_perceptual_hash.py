@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+지각 해시 / BK-트리 / 증분 인덱스 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from avatar_catalog import AvatarCatalog
+from perceptual_hash import BKTree, PerceptualIndex, hamming_distance, image_hashes, reclaimable_bytes
+from roblox_cli import main as cli_main
+from texture_atlas import read_png, write_png
+
+SAMPLE = Path("real_3d_avatars/builderman_156_3D/textures")
+
+def test_hashes_and_bk_tree():
+    """밝기/크기가 조금 달라도 가깝고, 다른 텍스처와는 멂, BK-트리 = 전수 비교"""
+    texture = read_png(SAMPLE / "texture_002.png")
+    other = read_png(SAMPLE / "texture_001.png")
+    brighter = texture.copy()
+    brighter[..., :3] = np.clip(texture[..., :3].astype(np.int16) + 4, 0, 255)
+    small = texture[::4, ::4]
+
+    base = image_hashes(texture)
+    for variant in (brighter, small):
+        ahash, dhash = image_hashes(variant)
+        assert hamming_distance(base[0], ahash) <= 4 and hamming_distance(base[1], dhash) <= 6
+    assert hamming_distance(base[1], image_hashes(other)[1]) > 12
+    # 16px보다 작은 이미지도 해시 가능
+    assert image_hashes(texture[:5, :3]) is not None
+
+    rng = random.Random(11)
+    values = [rng.getrandbits(64) for _ in range(2000)] + [0, 0]
+    tree = BKTree()
+    for i, value in enumerate(values):
+        tree.add(value, i)
+    assert tree.size == len(values)
+    for _ in range(20):
+        query = values[rng.randrange(len(values))] ^ (1 << rng.randrange(64))
+        expected = sorted((hamming_distance(query, v), i) for i, v in enumerate(values) if hamming_distance(query, v) <= 20)
+        assert sorted(tree.search(query, 20)) == expected
+    assert [item for _, item in tree.search(0, 0)] == [2000, 2001]
+    print("✅ aHash/dHash + BK-트리")
+
+def test_incremental_index():
+    """두 아바타의 같은 텍스처를 근사 중복으로 묶고, 변경 없는 파일은 다시 읽지 않음"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "archive"
+        shutil.copytree(SAMPLE, root / "a_1_3D" / "textures")
+        (root / "b_2_3D" / "textures").mkdir(parents=True)
+        texture = read_png(SAMPLE / "texture_002.png")
+        write_png(root / "b_2_3D" / "textures" / "texture_001.png", texture[::2, ::2])
+        (root / "b_2_3D" / "avatar_420x420.jpg").write_bytes(b"\xff\xd8\xff\xe0" + b"\x00" * 64)
+
+        with AvatarCatalog(Path(tmp) / "catalog.db") as catalog:
+            index = PerceptualIndex(catalog)
+            assert index.update([root]) == {"hashed": 3, "unchanged": 0, "unsupported": 1, "removed": 0}
+            assert index.update([root]) == {"hashed": 0, "unchanged": 4, "unsupported": 0, "removed": 0}
+
+            groups = index.duplicate_groups()
+            assert len(groups) == 1
+            assert sorted(Path(row["path"]).parent.parent.name for row in groups[0]) == ["a_1_3D", "b_2_3D"]
+            assert reclaimable_bytes(groups) == min(row["size"] for row in groups[0])
+
+            target = root / "b_2_3D" / "textures" / "texture_001.png"
+            similar = index.similar_to_file(target)
+            assert [Path(row["path"]).name for row in similar] == ["texture_002.png"]
+            assert similar[0]["folder"] == str((root / "a_1_3D").resolve())
+
+            target.unlink()
+            assert index.update([root])["removed"] == 1
+            assert index.duplicate_groups() == []
+            assert index.summary() == {"hashed": 2, "unsupported": 1}
+    print("✅ 증분 지각 해시 인덱스")
+
+def test_cli_similar_rejects_bad_target():
+    """phash similar: 파일도 16진수도 아닌 대상은 오류 메시지 + 종료 코드 1 (다른 대상은 계속 검색)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = str(Path(tmp) / "catalog.db")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            assert cli_main(["phash", "similar", "not-a-hash", "00ff", "--db", db]) == 1
+            assert cli_main(["phash", "similar", "00ff", "--db", db]) == 0
+        assert "❌ 이미지 파일 또는 16진수 dHash가 아닙니다: not-a-hash" in output.getvalue()
+        assert "🔎 00ff: 0건" in output.getvalue()
+    print("✅ phash similar 잘못된 대상 처리 확인")
+
+if __name__ == "__main__":
+    test_hashes_and_bk_tree()
+    test_incremental_index()
+    test_cli_similar_rejects_bad_target()
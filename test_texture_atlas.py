@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+텍스처 아틀라스 / PNG 읽기·쓰기 / 사각형 패커 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import io
+import random
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from mock_roblox_server import MockRobloxServer
+from real_3d_downloader import RobloxAvatar3DDownloader
+from texture_atlas import build_texture_atlas, pack_rectangles, read_atlas_manifest, read_png, write_png
+
+def encode_png(image: np.ndarray, color_type: int) -> bytes:
+    """줄마다 필터 0~4를 돌아가며 쓰는 테스트용 PNG 인코더"""
+    height, width, channels = image.shape
+    rows = image.reshape(height, width * channels).astype(np.int16)
+    filtered = []
+    prior = np.zeros(width * channels, np.int16)
+    for y in range(height):
+        filter_type = y % 5
+        x = rows[y]
+        a = np.concatenate([np.zeros(channels, np.int16), x[:-channels]])
+        c = np.concatenate([np.zeros(channels, np.int16), prior[:-channels]])
+        b = prior
+        if filter_type == 1:
+            x = x - a
+        elif filter_type == 2:
+            x = x - b
+        elif filter_type == 3:
+            x = x - ((a + b) >> 1)
+        elif filter_type == 4:
+            p = a + b - c
+            pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+            x = x - np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+        filtered.append(bytes([filter_type]) + (x & 0xFF).astype(np.uint8).tobytes())
+        prior = rows[y]
+
+    def chunk(chunk_type, data):
+        return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(b"".join(filtered))) + chunk(b"IEND", b""))
+
+def test_png_codec():
+    """모든 필터 종류 복원, RGB → RGBA 변환, write_png 왕복"""
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        rgba = rng.integers(0, 256, (23, 37, 4), dtype=np.uint8)
+        (Path(tmp) / "rgba.png").write_bytes(encode_png(rgba, 6))
+        assert np.array_equal(read_png(Path(tmp) / "rgba.png"), rgba)
+
+        rgb = rng.integers(0, 256, (9, 11, 3), dtype=np.uint8)
+        (Path(tmp) / "rgb.png").write_bytes(encode_png(rgb, 2))
+        decoded = read_png(Path(tmp) / "rgb.png")
+        assert np.array_equal(decoded[..., :3], rgb) and (decoded[..., 3] == 255).all()
+
+        write_png(Path(tmp) / "out.png", rgba)
+        assert np.array_equal(read_png(Path(tmp) / "out.png"), rgba)
+
+        (Path(tmp) / "bad.png").write_bytes(encode_png(rgba, 6)[:60])
+        try:
+            read_png(Path(tmp) / "bad.png")
+            assert False, "손상된 PNG"
+        except ValueError:
+            pass
+
+    texture = read_png(Path("real_3d_avatars/builderman_156_3D/textures/texture_002.png"))
+    assert texture.shape == (1024, 1024, 4) and texture.dtype == np.uint8
+    print("✅ PNG 읽기/쓰기")
+
+def test_pack_rectangles():
+    """배치된 사각형은 겹치지 않고 아틀라스 안에 있음"""
+    rng = random.Random(3)
+    for _ in range(50):
+        sizes = [(rng.randint(1, 300), rng.randint(1, 300)) for _ in range(rng.randint(1, 12))]
+        positions, width, height = pack_rectangles(sizes)
+        boxes = [(x, y, x + w, y + h) for (x, y), (w, h) in zip(positions, sizes)]
+        for i, (x0, y0, x1, y1) in enumerate(boxes):
+            assert 0 <= x0 and 0 <= y0 and x1 <= width and y1 <= height
+            for ox0, oy0, ox1, oy1 in boxes[i + 1:]:
+                assert x1 <= ox0 or ox1 <= x0 or y1 <= oy0 or oy1 <= y0
+        assert sum(w * h for w, h in sizes) <= width * height
+    assert pack_rectangles([(1028, 1028), (20, 20)])[1:] == (1028, 1048)
+    print("✅ 사각형 패커")
+
+def read_faces(obj_path: Path):
+    """(재질, vt 좌표) 목록 - 면 모서리 순서"""
+    uvs, corners, material = [], [], None
+    for line in obj_path.read_text(encoding="utf-8").splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == 'vt':
+            uvs.append((float(parts[1]), float(parts[2])))
+        elif parts[0] == 'usemtl':
+            material = parts[1]
+        elif parts[0] == 'f':
+            corners += [(material, uvs[int(c.split('/')[1]) - 1]) for c in parts[1:]]
+    return corners
+
+def texel(image: np.ndarray, u: float, v: float) -> np.ndarray:
+    height, width = image.shape[:2]
+    return image[min(int((1.0 - v) * height), height - 1), min(int(u * width), width - 1)]
+
+def test_atlas_after_bulk_download():
+    """일괄 다운로드 후처리로 아틀라스 생성, 모든 면 모서리가 같은 텍셀을 가리킴"""
+    with MockRobloxServer() as server, tempfile.TemporaryDirectory() as output:
+        downloader = RobloxAvatar3DDownloader(output)
+        server.install(downloader.session)
+        with contextlib.redirect_stdout(io.StringIO()):
+            downloader.download_multiple_avatars_3d([156], include_textures=True, build_atlas=True)
+
+        folder = Path(output) / "builderman_156_3D"
+        manifest = read_atlas_manifest(folder)
+        assert manifest["atlas"]["width"] == 1028 and manifest["atlas"]["height"] == 1048
+        atlas = read_png(folder / "atlas" / "atlas.png")
+        assert atlas.shape == (1048, 1028, 4)
+
+        mtl = (folder / "atlas" / "avatar_atlas.mtl").read_text(encoding="utf-8")
+        assert mtl.count("map_Kd atlas.png") == 2
+        assert (folder / "atlas" / "avatar_atlas.obj").read_text(encoding="utf-8").startswith("mtllib avatar_atlas.mtl")
+
+        textures = {name: read_png(folder / path) for name, path in manifest["materials"].items()}
+        original = read_faces(folder / "avatar.obj")
+        rewritten = read_faces(folder / "atlas" / "avatar_atlas.obj")
+        assert len(original) == len(rewritten)
+        checked = 0
+        for (material, uv), (new_material, new_uv) in zip(original, rewritten):
+            assert material == new_material
+            if material in textures:
+                assert np.array_equal(texel(textures[material], *uv), texel(atlas, *new_uv))
+                checked += 1
+            else:
+                assert uv == new_uv
+        assert checked > 1000
+
+        # 원본이 그대로면 건너뛰고, 텍스처가 바뀌면 다시 생성
+        assert build_texture_atlas(folder).get("skipped")
+        os.utime(folder / "textures" / "texture_001.png")
+        assert not build_texture_atlas(folder).get("skipped")
+    print(f"✅ 아틀라스 생성 ({checked}개 면 모서리 확인)")
+
+if __name__ == "__main__":
+    test_png_codec()
+    test_pack_rectangles()
+    test_atlas_after_bulk_download()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+여러 유저 2D 썸네일 동시 다운로드 / URL 캐시 테스트 (네트워크 없음)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import contextlib
+import hashlib
+import io
+import json
+import tempfile
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+from mock_roblox_server import MockRobloxServer
+from roblox_avatar_downloader import RobloxAvatarDownloader
+from thumbnail_cache import CACHE_NAME, ThumbnailCache
+
+SIZES = ["150x150", "420x420"]
+
+def test_parallel_multi_user_download(monkeypatch):
+    """URL은 (종류, 크기)별 한 번에 조회, 이미지는 호스트당 per_host개까지 동시에, sleep 없음"""
+    monkeypatch.delenv("ROBLOX_CATALOG_DB", raising=False)
+    user_ids = [156] + list(range(1000, 1039))
+    with MockRobloxServer(latency=0.02) as server, tempfile.TemporaryDirectory() as output:
+        downloader = RobloxAvatarDownloader(output, workers=16, per_host=8)
+        server.install(downloader.session)
+
+        # 호스트별 동시에 진행 중인 HTTP 요청 수 (세션 단위 - API 조회와 이미지 다운로드 모두 포함)
+        active, peak, lock = {}, {}, threading.Lock()
+        session_get = downloader.session.get
+
+        def counting_get(url, **kwargs):
+            host = urlsplit(url).hostname
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            try:
+                return session_get(url, **kwargs)
+            finally:
+                with lock:
+                    active[host] -= 1
+        downloader.session.get = counting_get
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            downloader.download_multiple_users(user_ids, SIZES)
+
+        thumbnail_requests = [path for _, path, _ in server.request_log if path.startswith("/thumbnails.roblox.com/")]
+        assert len(thumbnail_requests) == 3 * len(SIZES)
+        # 어떤 호스트도 per_host개를 넘지 않고, 이미지 CDN은 한도까지 동시에 받음
+        assert all(count <= 8 for count in peak.values()), peak
+        assert peak["tr.rbxcdn.com"] == 8, peak
+
+        for user_id in user_ids:
+            folder = Path(output) / f"{server.user_info_for(user_id)['name']}_{user_id}"
+            assert (folder / "user_info.json").exists()
+            for thumb_type in ("avatar", "headshot", "bust"):
+                for size in SIZES:
+                    data = (folder / f"{thumb_type}_{size}.png").read_bytes()
+                    assert data == server.fixture_for(user_id).thumbnail_bytes(thumb_type, size)
+    print(f"✅ {len(user_ids)}명 × 6개 썸네일 동시 다운로드 (호스트별 최대 동시 요청: {peak})")
+
+def test_single_user_download(monkeypatch):
+    """단일 유저 다운로드도 같은 경로 사용, 없는 썸네일은 실패로 집계하지 않음"""
+    monkeypatch.delenv("ROBLOX_CATALOG_DB", raising=False)
+    with MockRobloxServer() as server, tempfile.TemporaryDirectory() as output:
+        downloader = RobloxAvatarDownloader(output)
+        server.install(downloader.session)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert downloader.download_user_avatars(156, ["420x420"])
+        files = sorted(p.name for p in (Path(output) / "builderman_156").iterdir())
+        assert files == ["avatar_420x420.png", "bust_420x420.png", "headshot_420x420.png", "user_info.json"]
+        assert downloader.resolve_thumbnail_urls([], SIZES) == {}
+    print("✅ 단일 유저 썸네일 다운로드")
+
+def test_rerun_uses_cache(monkeypatch):
+    """재실행 시 만료 전 URL은 조회하지 않고, URL과 파일이 그대로면 다시 받지 않음"""
+    monkeypatch.delenv("ROBLOX_CATALOG_DB", raising=False)
+    user_ids = [156, 1000]
+    with MockRobloxServer() as server, tempfile.TemporaryDirectory() as output:
+        def run(**kwargs):
+            downloader = RobloxAvatarDownloader(output, **kwargs)
+            server.install(downloader.session)
+            server.request_log.clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                downloader.download_multiple_users(user_ids, SIZES)
+            hosts = [path.split("/")[1] for _, path, _ in server.request_log]
+            return downloader, hosts.count("thumbnails.roblox.com"), hosts.count("tr.rbxcdn.com")
+
+        assert run()[1:] == (6, 12)
+        avatar = Path(output) / "builderman_156" / "avatar_420x420.png"
+        mtime = avatar.stat().st_mtime_ns
+
+        # 파일 캐시 확인은 이미지마다 한 번
+        lookups = []
+        cached_file = ThumbnailCache.cached_file
+        monkeypatch.setattr(ThumbnailCache, "cached_file",
+                            lambda cache, url, file_path: lookups.append(url) or cached_file(cache, url, file_path))
+        downloader, resolves, downloads = run()
+        assert (resolves, downloads) == (0, 0)
+        assert len(lookups) == len(user_ids) * 3 * len(SIZES)
+        assert avatar.stat().st_mtime_ns == mtime
+        server.request_log.clear()
+        assert downloader.get_user_headshot_thumbnails(156, "150x150")[0]["imageUrl"].endswith("/156/150x150/Png")
+        assert downloader.get_user_bust_thumbnails(156, "720x720") and len(server.request_log) == 1
+
+        # 만료되면 URL은 다시 조회하지만 같은 URL의 파일은 재사용, 바뀐 파일만 다시 받음
+        avatar.write_bytes(b"corrupt")
+        assert run(thumbnail_ttl=0)[1:] == (6, 1)
+        assert avatar.read_bytes() == server.fixture_for(156).thumbnail_bytes("avatar", "420x420")
+
+        cache = json.loads((Path(output) / CACHE_NAME).read_text(encoding="utf-8"))
+        entry = cache["files"][cache["urls"]["156:avatar:420x420"]["url"]]
+        assert entry["sha256"] == hashlib.sha256(avatar.read_bytes()).hexdigest()
+    print("✅ 썸네일 URL / 파일 캐시 재사용")
+
+if __name__ == "__main__":
+    for test in (test_parallel_multi_user_download, test_single_user_download, test_rerun_uses_cache):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch)
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Texture Atlas Builder
+아바타 하나의 여러 텍스처를 한 장의 아틀라스 이미지로 합치고 OBJ UV / MTL을 아틀라스에 맞게 변환
+(아바타당 텍스처 바인딩 1회 - 대량 렌더링용)
+
+결과는 아바타 폴더의 atlas/ 아래에 저장 (원본 avatar.obj / avatar.mtl / textures/는 그대로):
+
+    atlas/atlas.png             텍스처를 셸프(선반) 방식 사각형 패커로 배치한 RGBA 이미지
+    atlas/avatar_atlas.obj      재질별 UV를 아틀라스 사각형으로 옮긴 OBJ (정점/법선/그룹은 원본과 동일)
+    atlas/avatar_atlas.mtl      map_* 참조를 atlas.png로 바꾼 MTL
+    atlas/atlas_manifest.json   원본 서명, 아틀라스 크기, 텍스처별 사각형
+
+PNG는 zlib + NumPy로 직접 읽고 씀 (8/16비트, 모든 색 형식, 인터레이스 제외).
+PNG가 아닌 텍스처나 재질 하나가 서로 다른 텍스처를 쓰는 아바타는 건너뜀.
+"""
+
+import json
+import math
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# NumPy/avatar_mesh는 계산 함수 안에서만 import (CLI 시작 시간 유지)
+
+ATLAS_FOLDER = "atlas"
+ATLAS_IMAGE = "atlas.png"
+MANIFEST_NAME = "atlas_manifest.json"
+DEFAULT_PADDING = 2
+
+# 재질이 텍스처를 참조하는 MTL 키
+TEXTURE_KEYS = ("map_Kd", "map_Ka", "map_Ks", "map_d", "map_Bump", "bump", "norm")
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# 색 형식별 채널 수 (0: 회색, 2: RGB, 3: 팔레트, 4: 회색+알파, 6: RGBA)
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def _unfilter_row(filter_type: int, line: bytes, prior: bytes, bpp: int) -> bytes:
+    """Average / Paeth 필터는 앞 픽셀 결과에 의존하므로 바이트 단위로 복원"""
+    out = bytearray(line)
+    if filter_type == 3:
+        for i in range(len(out)):
+            left = out[i - bpp] if i >= bpp else 0
+            out[i] = (out[i] + ((left + prior[i]) >> 1)) & 0xFF
+    elif filter_type == 4:
+        for i in range(len(out)):
+            if i >= bpp:
+                a, c = out[i - bpp], prior[i - bpp]
+            else:
+                a = c = 0
+            b = prior[i]
+            pa, pb, pc = abs(b - c), abs(a - c), abs(a + b - 2 * c)
+            out[i] = (out[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+    else:
+        raise ValueError(f"알 수 없는 PNG 필터: {filter_type}")
+    return bytes(out)
+
+
+def read_png(path: Path):
+    """
+    PNG를 (높이, 너비, 4) uint8 RGBA 배열로 읽기
+
+    Raises:
+        ValueError: PNG가 아니거나 손상됐거나 지원하지 않는 형식 (인터레이스, 1/2/4비트 회색)
+    """
+    import numpy as np
+
+    data = Path(path).read_bytes()
+    if not data.startswith(_PNG_SIGNATURE):
+        raise ValueError(f"PNG 파일이 아님: {path}")
+
+    pos = len(_PNG_SIGNATURE)
+    header = None
+    palette = transparency = None
+    idat = []
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"PLTE":
+            palette = np.frombuffer(chunk, np.uint8).reshape(-1, 3)
+        elif chunk_type == b"tRNS":
+            transparency = chunk
+        elif chunk_type == b"IDAT":
+            idat.append(chunk)
+        elif chunk_type == b"IEND":
+            break
+    if header is None:
+        raise ValueError(f"IHDR 없음: {path}")
+
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if interlace or color_type not in _PNG_CHANNELS:
+        raise ValueError(f"지원하지 않는 PNG (색 형식 {color_type}, 인터레이스 {interlace}): {path}")
+    if bit_depth not in (8, 16) and not (color_type == 3 and bit_depth in (1, 2, 4)):
+        raise ValueError(f"지원하지 않는 PNG 비트 깊이 {bit_depth}: {path}")
+
+    channels = _PNG_CHANNELS[color_type]
+    bpp = max(1, channels * bit_depth // 8)
+    stride = (width * channels * bit_depth + 7) // 8
+    try:
+        raw = np.frombuffer(zlib.decompress(b"".join(idat)), np.uint8)[:height * (stride + 1)]
+        raw = raw.reshape(height, stride + 1)
+    except (zlib.error, ValueError) as e:
+        raise ValueError(f"손상된 PNG 데이터: {path} ({e})") from e
+
+    rows = np.empty((height, stride), np.uint8)
+    prior = np.zeros(stride, np.uint8)
+    for y in range(height):
+        filter_type, line = raw[y, 0], raw[y, 1:]
+        if filter_type == 0:
+            rows[y] = line
+        elif filter_type == 1:
+            # Sub: 같은 채널끼리 누적 합 (uint8 오버플로 = mod 256)
+            rows[y] = np.cumsum(line.reshape(-1, bpp), axis=0, dtype=np.uint8).reshape(-1)
+        elif filter_type == 2:
+            rows[y] = line + prior
+        else:
+            rows[y] = np.frombuffer(_unfilter_row(int(filter_type), line.tobytes(), prior.tobytes(), bpp), np.uint8)
+        prior = rows[y]
+
+    if bit_depth == 16:
+        # 상위 바이트만 사용
+        samples = rows.reshape(height, width, channels, 2)[..., 0]
+    elif bit_depth < 8:
+        bits = np.unpackbits(rows, axis=1).reshape(height, -1, bit_depth)[:, :width]
+        samples = (bits * (1 << np.arange(bit_depth - 1, -1, -1))).sum(axis=2).astype(np.uint8)[..., None]
+    else:
+        samples = rows.reshape(height, width, channels)
+
+    if color_type == 3:
+        if palette is None:
+            raise ValueError(f"PLTE 없음: {path}")
+        alpha = np.full(len(palette), 255, np.uint8)
+        if transparency:
+            alpha[:len(transparency)] = np.frombuffer(transparency, np.uint8)[:len(palette)]
+        indices = samples[..., 0]
+        return np.dstack([palette[indices], alpha[indices]])
+    if color_type in (0, 4):
+        gray = samples[..., :1]
+        alpha = samples[..., 1:2] if color_type == 4 else np.full_like(gray, 255)
+        return np.dstack([gray, gray, gray, alpha])
+    if color_type == 2:
+        return np.dstack([samples, np.full(samples.shape[:2] + (1,), 255, np.uint8)])
+    return np.ascontiguousarray(samples)
+
+
+def write_png(path: Path, rgba) -> Path:
+    """(높이, 너비, 4) uint8 배열을 RGBA PNG로 저장 (모든 줄에 Up 필터)"""
+    import numpy as np
+
+    height, width = rgba.shape[:2]
+    rows = np.ascontiguousarray(rgba, dtype=np.uint8).reshape(height, width * 4)
+    filtered = np.empty((height, width * 4 + 1), np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 1:] = rows[0]
+    filtered[1:, 1:] = rows[1:] - rows[:-1]
+
+    path = Path(path)
+    with open(path, 'wb') as f:
+        f.write(_PNG_SIGNATURE)
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        f.write(_png_chunk(b"IDAT", zlib.compress(filtered.tobytes(), 6)))
+        f.write(_png_chunk(b"IEND", b""))
+    return path
+
+
+def pack_rectangles(sizes: Sequence[Tuple[int, int]]) -> Tuple[List[Tuple[int, int]], int, int]:
+    """
+    셸프(선반) 방식 사각형 배치 - 높이 내림차순으로 한 줄씩 채우고, 후보 너비 중 면적이 가장 작은 배치 선택
+
+    Args:
+        sizes (Sequence[Tuple[int, int]]): (너비, 높이) 목록
+
+    Returns:
+        Tuple: (입력 순서의 (x, y) 왼쪽 위 좌표 목록, 아틀라스 너비, 아틀라스 높이)
+    """
+    if not sizes:
+        return [], 0, 0
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    max_width = max(w for w, _ in sizes)
+    side = math.isqrt(sum(w * h for w, h in sizes)) + 1
+    candidates = {max_width, sum(w for w, _ in sizes)}
+    width = 1 << max(max_width - 1, 0).bit_length()
+    while width <= 2 * max(side, max_width):
+        candidates.add(max(width, max_width))
+        width <<= 1
+
+    best = None
+    for atlas_width in sorted(candidates):
+        positions: List[Tuple[int, int]] = [(0, 0)] * len(sizes)
+        x = y = shelf_height = 0
+        for i in order:
+            w, h = sizes[i]
+            if x + w > atlas_width:
+                x, y, shelf_height = 0, y + shelf_height, 0
+            positions[i] = (x, y)
+            x += w
+            shelf_height = max(shelf_height, h)
+        atlas_height = y + shelf_height
+        key = (atlas_width * atlas_height, abs(atlas_width - atlas_height))
+        if best is None or key < best[0]:
+            best = (key, positions, atlas_width, atlas_height)
+    return best[1], best[2], best[3]
+
+
+def _source_signature(avatar_folder: Path, texture_paths: Sequence[Path]) -> List[Dict]:
+    files = [Path("avatar.obj"), Path("avatar.mtl")] + [p.relative_to(avatar_folder) for p in texture_paths]
+    signature = []
+    for relative in files:
+        stat = (avatar_folder / relative).stat()
+        signature.append({"name": relative.as_posix(), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+    return signature
+
+
+def read_atlas_manifest(avatar_folder: Path) -> Optional[Dict]:
+    """atlas/atlas_manifest.json 읽기 (없거나 깨졌으면 None)"""
+    try:
+        with open(Path(avatar_folder) / ATLAS_FOLDER / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _material_textures(avatar_folder: Path) -> Tuple[Dict[str, Path], Dict[str, str]]:
+    """
+    재질 → 텍스처 파일, MTL 값 → 텍스처 파일 상대 경로
+
+    Raises:
+        ValueError: 재질 하나가 서로 다른 텍스처를 참조 (재질별 UV 하나로는 옮길 수 없음)
+    """
+    from avatar_mesh import load_mtl, load_texture_hashes, resolve_texture_path
+    from mtl_textures import load_texture_map
+
+    texture_hashes = load_texture_hashes(avatar_folder)
+    texture_map = load_texture_map(avatar_folder)
+    material_texture: Dict[str, Path] = {}
+    value_paths: Dict[str, str] = {}
+    for name, props in load_mtl(avatar_folder / "avatar.mtl").items():
+        for key in TEXTURE_KEYS:
+            value = props.get(key, "").split()[-1:]
+            if not value:
+                continue
+            path = resolve_texture_path(value[0], avatar_folder, texture_hashes, texture_map)
+            if path is None:
+                # 받지 못한 텍스처 - 재질은 원래 참조와 UV 그대로
+                continue
+            if name in material_texture and material_texture[name] != path:
+                raise ValueError(f"재질 {name}이(가) 여러 텍스처를 참조: {material_texture[name].name}, {path.name}")
+            material_texture[name] = path
+            value_paths[value[0]] = path.relative_to(avatar_folder).as_posix()
+    return material_texture, value_paths
+
+
+def _rewrite_obj(obj_path: Path, output_path: Path, material_rects: Dict[str, Tuple[float, float, float, float]],
+                 mtllib: str) -> int:
+    """
+    재질별 UV를 아틀라스 사각형으로 옮긴 OBJ 저장
+
+    같은 vt를 서로 다른 텍스처 재질이 공유할 수 있으므로 (사각형, vt) 조합마다 새 vt를 만들고,
+    모든 새 vt는 원본의 첫 vt 위치에 모아서 씀
+
+    Returns:
+        int: 새 vt 개수
+    """
+    with open(obj_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    uvs: List[Tuple[float, float]] = []
+    uv_lines: List[str] = []
+    new_uvs: List[str] = []
+    remap: Dict[Tuple[Optional[str], int], int] = {}
+    faces: Dict[int, str] = {}
+    material = None
+    for line_num, line in enumerate(lines):
+        parts = line.split()
+        if not parts:
+            continue
+        key = parts[0]
+        if key == 'vt':
+            uvs.append((float(parts[1]), float(parts[2]) if len(parts) > 2 else 0.0))
+            uv_lines.append(line if line.endswith("\n") else line + "\n")
+        elif key == 'usemtl':
+            material = line.strip()[7:].strip()
+        elif key == 'f':
+            rect_key = material if material in material_rects else None
+            corners = []
+            for corner in parts[1:]:
+                fields = corner.split('/')
+                if len(fields) > 1 and fields[1]:
+                    index = int(fields[1])
+                    index = index - 1 if index > 0 else len(uvs) + index
+                    slot = remap.get((rect_key, index))
+                    if slot is None:
+                        if rect_key is None:
+                            # 텍스처가 없는 재질은 원본 vt 그대로
+                            new_uvs.append(uv_lines[index])
+                        else:
+                            u, v = uvs[index]
+                            x, y, w, h = material_rects[rect_key]
+                            u = x + min(max(u, 0.0), 1.0) * w
+                            v = 1.0 - (y + (1.0 - min(max(v, 0.0), 1.0)) * h)
+                            new_uvs.append(f"vt {u:.7f} {v:.7f}\n")
+                        slot = remap[(rect_key, index)] = len(new_uvs)
+                    fields[1] = str(slot)
+                corners.append("/".join(fields))
+            faces[line_num] = "f " + " ".join(corners) + "\n"
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        # 다운로드된 OBJ에는 mtllib 줄이 없을 수 있음 - 아틀라스 OBJ는 항상 자기 MTL을 참조
+        if not any(line.startswith('mtllib') for line in lines):
+            f.write(f"mtllib {mtllib}\n")
+        uvs_written = False
+        for line_num, line in enumerate(lines):
+            parts = line.split()
+            key = parts[0] if parts else ""
+            if key == 'vt' or (key == 'f' and not uvs_written):
+                if not uvs_written:
+                    f.writelines(new_uvs)
+                    uvs_written = True
+                if key == 'vt':
+                    continue
+            if key == 'mtllib':
+                f.write(f"mtllib {mtllib}\n")
+            elif key == 'f':
+                f.write(faces[line_num])
+            else:
+                f.write(line)
+    return len(new_uvs)
+
+
+def build_texture_atlas(avatar_folder: Path, padding: int = DEFAULT_PADDING, force: bool = False) -> Dict:
+    """
+    아바타 하나의 텍스처 아틀라스 + 변환된 OBJ/MTL 생성 (원본이 바뀌지 않았으면 건너뜀)
+
+    Args:
+        avatar_folder (Path): avatar.obj / avatar.mtl / textures/가 있는 폴더
+        padding (int): 텍스처 주변 가장자리 복제 여백 (밉맵/필터링 번짐 방지, 픽셀)
+        force (bool): 최신 아틀라스도 다시 생성
+
+    Returns:
+        Dict: 아틀라스 매니페스트 (skipped=True면 기존 매니페스트, 만들 필요가 없으면 {"skipped": True, "reason"})
+
+    Raises:
+        ValueError: PNG가 아닌 텍스처 / 여러 텍스처를 쓰는 재질
+    """
+    import numpy as np
+    from mtl_textures import MtlTextureRewriter
+
+    avatar_folder = Path(avatar_folder)
+    obj_path, mtl_path = avatar_folder / "avatar.obj", avatar_folder / "avatar.mtl"
+    if not obj_path.exists() or not mtl_path.exists():
+        return {"skipped": True, "reason": "avatar.obj / avatar.mtl 없음"}
+
+    material_texture, value_paths = _material_textures(avatar_folder)
+    texture_paths = sorted(set(material_texture.values()))
+    if len(texture_paths) < 2:
+        return {"skipped": True, "reason": f"텍스처 {len(texture_paths)}개 - 아틀라스 불필요"}
+
+    signature = _source_signature(avatar_folder, texture_paths)
+    manifest = read_atlas_manifest(avatar_folder)
+    if not force and manifest and manifest.get("source") == signature and manifest.get("padding") == padding:
+        return dict(manifest, skipped=True)
+
+    images = [read_png(path) for path in texture_paths]
+    padded = [np.pad(image, ((padding, padding), (padding, padding), (0, 0)), mode="edge") for image in images]
+    positions, atlas_width, atlas_height = pack_rectangles([(p.shape[1], p.shape[0]) for p in padded])
+
+    atlas = np.zeros((atlas_height, atlas_width, 4), np.uint8)
+    rects: Dict[str, List[int]] = {}
+    for path, image, block, (x, y) in zip(texture_paths, images, padded, positions):
+        atlas[y:y + block.shape[0], x:x + block.shape[1]] = block
+        rects[path.relative_to(avatar_folder).as_posix()] = [x + padding, y + padding, image.shape[1], image.shape[0]]
+
+    atlas_folder = avatar_folder / ATLAS_FOLDER
+    atlas_folder.mkdir(exist_ok=True)
+    write_png(atlas_folder / ATLAS_IMAGE, atlas)
+
+    # 재질별 UV 사각형 (0~1, 왼쪽 위 원점)
+    material_rects = {}
+    for name, path in material_texture.items():
+        x, y, w, h = rects[path.relative_to(avatar_folder).as_posix()]
+        material_rects[name] = (x / atlas_width, y / atlas_height, w / atlas_width, h / atlas_height)
+    uv_count = _rewrite_obj(obj_path, atlas_folder / "avatar_atlas.obj", material_rects, "avatar_atlas.mtl")
+
+    rewriter = MtlTextureRewriter({value: ATLAS_IMAGE for value in value_paths})
+    with open(mtl_path, 'rb') as f:
+        mtl_content = rewriter.feed(f.read()) + rewriter.finish()
+    with open(atlas_folder / "avatar_atlas.mtl", 'wb') as f:
+        f.write(mtl_content)
+
+    manifest = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": signature,
+        "padding": padding,
+        "atlas": {"file": ATLAS_IMAGE, "width": atlas_width, "height": atlas_height},
+        "textures": rects,
+        "materials": {name: path.relative_to(avatar_folder).as_posix() for name, path in material_texture.items()},
+        "uv_count": uv_count,
+    }
+    with open(atlas_folder / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def _atlas_worker(args) -> Dict:
+    """프로세스 풀 작업 단위 (실패도 결과로 반환)"""
+    folder, padding, force = args
+    try:
+        return dict(build_texture_atlas(folder, padding, force), folder=str(folder))
+    except (OSError, ValueError) as e:
+        return {"folder": str(folder), "error": str(e)}
+
+
+def build_atlas_tree(root: Path, padding: int = DEFAULT_PADDING, workers: Optional[int] = None,
+                     force: bool = False) -> Dict:
+    """
+    폴더 아래 모든 아바타(avatar.obj)의 텍스처 아틀라스를 프로세스 풀로 일괄 생성
+
+    Returns:
+        Dict: {"built": [...], "skipped": [...], "failed": {폴더: 오류}}
+    """
+    root = Path(root)
+    folders = [root] if (root / "avatar.obj").exists() else [p.parent for p in sorted(root.rglob("avatar.obj"))]
+    jobs = [(folder, padding, force) for folder in folders]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [_atlas_worker(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            results = list(executor.map(_atlas_worker, jobs))
+
+    summary: Dict[str, object] = {"built": [], "skipped": [], "failed": {}}
+    for result in results:
+        if "error" in result:
+            summary["failed"][result["folder"]] = result["error"]
+        else:
+            summary["skipped" if result.get("skipped") else "built"].append(result["folder"])
+    return summary
+
+
+def format_atlas(manifest: Dict) -> str:
+    """아틀라스 한 줄 요약 (예: 텍스처 2개 → 1028x1048)"""
+    if "atlas" not in manifest:
+        return manifest.get("reason", "건너뜀")
+    return f"텍스처 {len(manifest['textures'])}개 → {manifest['atlas']['width']}x{manifest['atlas']['height']}"
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Thumbnail URL Cache
+(유저, 종류, 크기) → 썸네일 URL, URL → 로컬 파일(sha256) 캐시
+
+아바타가 바뀌지 않으면 썸네일 URL도 그대로이므로
+    - 만료(TTL) 전에는 썸네일 API를 다시 호출하지 않고 저장된 URL 사용
+    - URL이 같고 로컬 파일의 크기/수정 시각이 기록과 같으면 이미지를 다시 받지 않음
+
+캐시 파일은 다운로드 폴더의 .thumbnail_cache.json (임시 파일 후 교체로 저장)
+
+환경 변수:
+    ROBLOX_THUMBNAIL_TTL: URL 캐시 유효 시간(초, 기본값: 86400, 0이면 매번 URL 조회 - 파일 재사용은 유지)
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from avatar_logging import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_NAME = ".thumbnail_cache.json"
+DEFAULT_TTL = 24 * 3600
+
+
+def thumbnail_ttl() -> float:
+    """환경 변수 기준 URL 캐시 유효 시간 (잘못된 값이면 기본값)"""
+    try:
+        return max(0.0, float(os.environ.get("ROBLOX_THUMBNAIL_TTL", DEFAULT_TTL)))
+    except ValueError:
+        return float(DEFAULT_TTL)
+
+
+class ThumbnailCache:
+    """다운로드 폴더 하나의 썸네일 URL / 파일 캐시 (스레드 안전)"""
+
+    def __init__(self, path: Path, ttl: Optional[float] = None):
+        """
+        Args:
+            path (Path): 캐시 파일 경로
+            ttl (float): URL 캐시 유효 시간(초, None이면 ROBLOX_THUMBNAIL_TTL)
+        """
+        self.path = Path(path)
+        self.ttl = thumbnail_ttl() if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.urls: Dict[str, Dict] = {}
+        self.files: Dict[str, Dict] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.urls = dict(data.get("urls", {}))
+            self.files = dict(data.get("files", {}))
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    @staticmethod
+    def _key(user_id: int, thumb_type: str, size: str) -> str:
+        return f"{user_id}:{thumb_type}:{size}"
+
+    def url_for(self, user_id: int, thumb_type: str, size: str) -> Optional[str]:
+        """만료되지 않은 썸네일 URL (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self.urls.get(self._key(user_id, thumb_type, size))
+        if entry and time.time() - entry.get("resolved_at", 0) < self.ttl:
+            return entry["url"]
+        return None
+
+    def record_url(self, user_id: int, thumb_type: str, size: str, url: str):
+        """조회한 URL 기록 (URL이 바뀌면 이전 URL의 파일 기록 삭제)"""
+        key = self._key(user_id, thumb_type, size)
+        with self._lock:
+            previous = self.urls.get(key, {}).get("url")
+            self.urls[key] = {"url": url, "resolved_at": time.time()}
+            if previous and previous != url:
+                self.files.pop(previous, None)
+            self._dirty = True
+
+    def cached_file(self, url: str, file_path: Path) -> Optional[Dict]:
+        """
+        URL을 이미 file_path로 받았고 파일이 그대로면 기록 반환
+
+        Returns:
+            Dict: {"path", "sha256", "size", "mtime_ns"} 또는 None
+        """
+        with self._lock:
+            entry = self.files.get(url)
+        if not entry or entry["path"] != str(Path(file_path).absolute()):
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime_ns"]:
+            return None
+        return entry
+
+    def record_file(self, url: str, file_path: Path, sha256: str):
+        """받은 파일 기록 (크기/수정 시각은 기록 시점 기준)"""
+        stat = os.stat(file_path)
+        with self._lock:
+            self.files[url] = {"path": str(Path(file_path).absolute()), "sha256": sha256,
+                               "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            self._dirty = True
+
+    def save(self):
+        """변경이 있으면 저장 (임시 파일 후 교체)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"urls": dict(self.urls), "files": dict(self.files)}
+            self._dirty = False
+        tmp_file = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_file, self.path)
+        except OSError as e:
+            logger.warning("썸네일 캐시 저장 실패 (%s): %s", self.path, e)